@@ -0,0 +1,181 @@
+"""
+LLM后端池 - 多个OpenAI兼容接口之间的负载均衡与故障摘除
+"""
+import time
+from typing import Optional, List, Dict, Any, Iterable
+from config.settings import settings
+
+
+class Backend:
+    """
+    单个LLM后端（一个OpenAI兼容接口 + 密钥）
+
+    记录延迟EWMA、在途请求数和健康状态
+    """
+
+    # EWMA平滑系数（越大越看重最近的请求）
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, name: str, base_url: str, api_key: str):
+        """
+        Args:
+            name: 后端名称（用于统计展示）
+            base_url: 接口地址
+            api_key: 接口密钥
+        """
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+
+        self.ewma_ms: Optional[float] = None  # 延迟EWMA，None表示尚无数据
+        self.outstanding = 0                  # 在途请求数
+        self.calls = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0            # 摘除截止时间（monotonic），0表示健康
+
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        """是否在轮换中（摘除期结束后重新参与，作为探测）"""
+        now = time.monotonic() if now is None else now
+        return now >= self.unhealthy_until
+
+    def score(self) -> float:
+        """
+        负载评分（越低越优先）
+
+        延迟EWMA × (在途请求数 + 1)；尚无延迟数据的后端视为最快，以便尽快被测量
+        """
+        latency = self.ewma_ms if self.ewma_ms is not None else 1.0
+        return latency * (self.outstanding + 1)
+
+    def on_start(self) -> None:
+        """请求开始"""
+        self.outstanding += 1
+
+    def on_success(self, latency_ms: float) -> None:
+        """请求成功"""
+        self.outstanding = max(0, self.outstanding - 1)
+        self.calls += 1
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        if self.ewma_ms is None:
+            self.ewma_ms = latency_ms
+        else:
+            self.ewma_ms = self.EWMA_ALPHA * latency_ms + (1 - self.EWMA_ALPHA) * self.ewma_ms
+
+    def on_cancel(self) -> None:
+        """请求被取消（如对冲请求中落败的一方），不计入成功或失败"""
+        self.outstanding = max(0, self.outstanding - 1)
+
+    def on_failure(self, failure_threshold: int, cooldown: float) -> None:
+        """
+        请求失败
+
+        连续失败达到阈值后摘除 cooldown 秒
+        """
+        self.outstanding = max(0, self.outstanding - 1)
+        self.calls += 1
+        self.errors += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= failure_threshold:
+            self.unhealthy_until = time.monotonic() + cooldown
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计数据（不包含密钥）"""
+        return {
+            "base_url": self.base_url,
+            "healthy": self.is_healthy(),
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "outstanding": self.outstanding,
+            "calls": self.calls,
+            "errors": self.errors,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+    def __repr__(self) -> str:
+        return f"<Backend(name={self.name}, base_url={self.base_url}, healthy={self.is_healthy()})>"
+
+
+class BackendPool:
+    """
+    后端池
+
+    职责：
+    - 按延迟EWMA和在途请求数选择后端
+    - 连续失败的后端暂时移出轮换
+    - 汇总每个后端的统计数据
+    """
+
+    def __init__(
+        self,
+        backends: List[Backend],
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None
+    ):
+        """
+        Args:
+            backends: 后端列表（至少一个）
+            failure_threshold: 连续失败几次后摘除（默认取配置）
+            cooldown: 摘除时长（秒，默认取配置）
+        """
+        if not backends:
+            raise ValueError("BackendPool requires at least one backend")
+        self.backends = backends
+        self.failure_threshold = failure_threshold or settings.LLM_BACKEND_FAILURE_THRESHOLD
+        self.cooldown = cooldown if cooldown is not None else settings.LLM_BACKEND_COOLDOWN
+
+    def acquire(self, exclude: Iterable[Backend] = ()) -> Optional[Backend]:
+        """
+        选择一个后端并标记请求开始
+
+        Args:
+            exclude: 本次调用中已经失败过的后端
+
+        Returns:
+            Optional[Backend]: 选中的后端；所有后端都已被排除时返回None
+        """
+        excluded = set(id(b) for b in exclude)
+        candidates = [b for b in self.backends if id(b) not in excluded]
+        if not candidates:
+            return None
+
+        now = time.monotonic()
+        healthy = [b for b in candidates if b.is_healthy(now)]
+        if healthy:
+            backend = min(healthy, key=lambda b: b.score())
+        else:
+            # 全部被摘除时不拒绝请求，选择最早恢复的后端
+            backend = min(candidates, key=lambda b: b.unhealthy_until)
+
+        backend.on_start()
+        return backend
+
+    def release(self, backend: Backend, latency_ms: float, success: bool) -> None:
+        """
+        标记请求结束
+
+        Args:
+            backend: acquire返回的后端
+            latency_ms: 请求耗时
+            success: 是否成功
+        """
+        if success:
+            backend.on_success(latency_ms)
+        else:
+            backend.on_failure(self.failure_threshold, self.cooldown)
+
+    def cancel(self, backend: Backend) -> None:
+        """标记请求被取消"""
+        backend.on_cancel()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取每个后端的统计数据
+
+        Returns:
+            Dict[str, Dict]: 后端名称 -> 统计数据
+        """
+        return {b.name: b.to_dict() for b in self.backends}
+
+    def __len__(self) -> int:
+        return len(self.backends)
@@ -0,0 +1,248 @@
+"""
+LLM流量录制/回放 - 离线重跑游戏
+
+录制模式：每次调用追加一行JSON（序号、提示词哈希、调用标签、提示词、响应、耗时）
+回放模式：按提示词哈希或调用序号返回录制的响应，不访问网络
+
+录制的记录先缓冲在内存中，按条数或定时批量写入同一个文件句柄，写文件在线程中进行，
+不阻塞事件循环；进程退出时写出剩余记录
+"""
+import os
+import json
+import atexit
+import asyncio
+import hashlib
+import threading
+from collections import defaultdict, deque
+from typing import Optional, Dict, Any, List, Deque, Tuple
+
+
+class Cassette:
+    """
+    LLM调用录制带
+
+    文件格式：JSON Lines，每行一次调用，只追加不改写：
+        {"seq": 0, "hash": "...", "tag": "decision", "latency_ms": 812.3,
+         "prompt": "...", "response": "..."}
+
+    回放匹配方式：
+    - hash：按 (调用标签, 提示词) 的哈希匹配，同一提示词多次调用按录制顺序依次返回
+    - sequence：按调用序号返回，不检查提示词（游戏流程与录制时不同也能继续跑下去）
+    """
+
+    MODES = ("record", "replay")
+    MATCHES = ("hash", "sequence")
+
+    def __init__(
+        self,
+        path: str,
+        mode: str,
+        match: str = "hash",
+        flush_interval: float = 1.0,
+        max_buffer: int = 32
+    ):
+        """
+        Args:
+            path: 录制文件路径
+            mode: record / replay
+            match: 回放匹配方式 hash / sequence
+            flush_interval: 录制时的定时刷新间隔（秒）
+            max_buffer: 录制时缓冲区达到多少条时立即刷新
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if match not in self.MATCHES:
+            raise ValueError(f"Unknown cassette match: {match}")
+
+        self.path = path
+        self.mode = mode
+        self.match = match
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._seq = 0
+        self._entries: List[Dict[str, Any]] = []
+        self._by_hash: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.hits = 0
+        self.misses = 0
+
+        self._file = None
+        self._buffer: List[str] = []
+        self._write_lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._timer: Optional[asyncio.Task] = None
+        self.flushes = 0
+
+        if mode == "replay":
+            self._load()
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 续写已有文件时序号接着往后排
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._seq = sum(1 for line in f if line.strip())
+            self._file = open(path, 'a', encoding='utf-8')
+            atexit.register(self.close)
+
+    @staticmethod
+    def prompt_hash(tag: str, prompt: str) -> str:
+        """
+        计算调用的匹配哈希
+
+        Args:
+            tag: 调用标签
+            prompt: 提示词
+
+        Returns:
+            str: 16位十六进制哈希
+        """
+        digest = hashlib.sha256()
+        digest.update(tag.encode('utf-8'))
+        digest.update(b"\0")
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def _load(self) -> None:
+        """读取录制文件"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                self._entries.append(json.loads(line))
+        # 批量写入可能与同步调用的写入交错，按序号恢复调用顺序
+        self._entries.sort(key=lambda entry: entry["seq"])
+        for entry in self._entries:
+            self._by_hash[entry["hash"]].append(entry)
+
+    def record(self, tag: str, prompt: str, response: str, latency_ms: float) -> None:
+        """
+        追加一次调用记录
+
+        Args:
+            tag: 调用标签
+            prompt: 提示词
+            response: 响应（失败为空字符串）
+            latency_ms: 调用耗时
+        """
+        entry = {
+            "seq": self._seq,
+            "hash": self.prompt_hash(tag, prompt),
+            "tag": tag,
+            "latency_ms": round(latency_ms, 1),
+            "prompt": prompt,
+            "response": response,
+        }
+        self._seq += 1
+        self._buffer.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环中（同步调用）：直接写入
+            self._write(self._take_buffer())
+            return
+
+        if self._timer is None or self._timer.done():
+            self._timer = loop.create_task(self._flush_periodically(), name="cassette-flush")
+        if len(self._buffer) >= self.max_buffer:
+            self._schedule_flush(loop)
+
+    def _take_buffer(self) -> str:
+        """取出缓冲区中的全部记录"""
+        data = "".join(self._buffer)
+        self._buffer = []
+        return data
+
+    def _write(self, data: str) -> None:
+        """写入文件句柄并刷新（可在线程中执行）"""
+        if not data:
+            return
+        with self._write_lock:
+            if self._file is None or self._file.closed:
+                return
+            self._file.write(data)
+            self._file.flush()
+        self.flushes += 1
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """启动后台刷新（同一时间只有一个，保证写入顺序）"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._drain(), name="cassette-write")
+
+    async def _drain(self) -> None:
+        """在线程中把缓冲区写入文件，直到缓冲区为空"""
+        while self._buffer:
+            await asyncio.to_thread(self._write, self._take_buffer())
+
+    async def flush(self) -> None:
+        """等待进行中的后台刷新，并写出缓冲区"""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        await self._drain()
+
+    async def _flush_periodically(self) -> None:
+        """定时刷新"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._buffer:
+                self._schedule_flush(asyncio.get_running_loop())
+
+    async def aclose(self) -> None:
+        """停止定时刷新，写出剩余记录并关闭文件"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+        self.close()
+
+    def close(self) -> None:
+        """写出剩余记录并关闭文件（进程退出时自动调用）"""
+        if self._file is None:
+            return
+        self._write(self._take_buffer())
+        with self._write_lock:
+            self._file.close()
+        self._file = None
+        atexit.unregister(self.close)
+
+    def play(self, tag: str, prompt: str) -> Optional[Tuple[str, float]]:
+        """
+        回放一次调用
+
+        Args:
+            tag: 调用标签
+            prompt: 提示词
+
+        Returns:
+            Optional[Tuple[str, float]]: (响应, 录制时的耗时毫秒)，没有匹配的记录时返回None
+        """
+        if self.match == "sequence":
+            entry = self._entries[self._seq] if self._seq < len(self._entries) else None
+        else:
+            queue = self._by_hash.get(self.prompt_hash(tag, prompt))
+            entry = queue.popleft() if queue else None
+        self._seq += 1
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["response"], entry["latency_ms"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取录制/回放统计"""
+        return {
+            "mode": self.mode,
+            "match": self.match,
+            "path": self.path,
+            "calls": self._seq,
+            "hits": self.hits,
+            "misses": self.misses,
+            "flushes": self.flushes,
+            "buffered": len(self._buffer),
+        }
@@ -0,0 +1,112 @@
+"""
+熔断器 - LLM服务降级时快速失败
+"""
+import time
+from enum import Enum
+from typing import Dict, Any
+
+
+class CircuitState(Enum):
+    """熔断器状态"""
+    CLOSED = "closed"        # 正常：请求全部放行
+    OPEN = "open"            # 熔断：请求直接拒绝
+    HALF_OPEN = "half_open"  # 半开：放行少量探测请求
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    状态转换：
+    - CLOSED：连续失败达到阈值 -> OPEN
+    - OPEN：经过 reset_timeout 秒 -> HALF_OPEN
+    - HALF_OPEN：探测成功 -> CLOSED；探测失败 -> OPEN（重新计时）
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        """
+        Args:
+            failure_threshold: 连续失败几次后熔断
+            reset_timeout: 熔断后多久进入半开状态（秒）
+            half_open_max_calls: 半开状态同时放行的探测请求数
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self.times_opened = 0  # 累计熔断次数
+
+    @property
+    def state(self) -> CircuitState:
+        """当前状态（OPEN超时后自动转为HALF_OPEN）"""
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_in_flight = 0
+        return self._state
+
+    def is_open(self) -> bool:
+        """是否处于熔断状态（不占用探测名额）"""
+        return self.state == CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        判断是否放行一个请求
+
+        半开状态下放行的请求会占用探测名额，必须随后调用 record_success 或 record_failure
+
+        Returns:
+            bool: True表示放行
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+            self._half_open_in_flight += 1
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """记录请求成功"""
+        if self._state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """记录请求失败"""
+        if self._state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            self._trip()
+            return
+
+        self._consecutive_failures += 1
+        if self._state == CircuitState.CLOSED and self._consecutive_failures >= self.failure_threshold:
+            self._trip()
+
+    def record_cancel(self) -> None:
+        """请求被调用方取消，不计入成败，只归还探测名额"""
+        if self._state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def _trip(self) -> None:
+        """进入熔断状态"""
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出状态"""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self.times_opened,
+        }
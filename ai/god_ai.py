@@ -2,7 +2,7 @@
 主持人AI - 游戏旁白和氛围营造
 """
 from typing import List, TYPE_CHECKING
-from ai.llm_client import llm_client
+from ai.llm_client import LLMClient, get_llm_client
 from ai.prompts import god_prompts
 
 if TYPE_CHECKING:
@@ -19,8 +19,10 @@ class GodAI:
     - 引导游戏流程
     """
 
-    def __init__(self):
-        self.llm = llm_client
+    @property
+    def llm(self) -> LLMClient:
+        """LLM客户端（首次访问时创建）"""
+        return get_llm_client()
 
     async def announce_night_start(self, round_num: int) -> str:
         """
@@ -33,7 +35,7 @@ class GodAI:
             str: 宣布内容
         """
         prompt = god_prompts.NIGHT_START.format(round=round_num)
-        message = await self.llm.generate(prompt)
+        message = await self.llm.generate(prompt, profile="narration", tag="god.announce_night_start")
 
         if not message:
             message = f"第{round_num}个夜晚开始了，天黑请闭眼..."
@@ -55,7 +57,7 @@ class GodAI:
             round=round_num,
             night_summary=night_summary or "一切看似平静"
         )
-        message = await self.llm.generate(prompt)
+        message = await self.llm.generate(prompt, profile="narration", tag="god.announce_day_start")
 
         if not message:
             message = f"第{round_num}个白天到来了。"
@@ -80,7 +82,7 @@ class GodAI:
             victims=victim_names,
             victim_name=victims[0].name if len(victims) == 1 else victim_names
         )
-        message = await self.llm.generate(prompt)
+        message = await self.llm.generate(prompt, profile="narration", tag="god.announce_death")
 
         if not message:
             message = f"昨晚，{victim_names} 死了。"
@@ -102,7 +104,7 @@ class GodAI:
             exiled_name=f"{exiled.name}（{exiled.id}号）",
             votes=votes
         )
-        message = await self.llm.generate(prompt)
+        message = await self.llm.generate(prompt, profile="narration", tag="god.announce_vote_result")
 
         if not message:
             message = f"{exiled.name}被投票放逐了。"
@@ -124,7 +126,7 @@ class GodAI:
             winning_camp=winning_camp,
             rounds=rounds
         )
-        message = await self.llm.generate(prompt)
+        message = await self.llm.generate(prompt, profile="narration", tag="god.announce_victory")
 
         if not message:
             message = f"游戏结束！{winning_camp}获胜！"
@@ -0,0 +1,348 @@
+"""
+启发式策略 - LLM不可用时的本地快速决策
+"""
+import re
+import random
+from typing import Optional, List, Dict, Tuple, TYPE_CHECKING
+from roles.base_role import RoleType, RoleCamp
+
+if TYPE_CHECKING:
+    from players.player import Player
+    from core.game_state import GameState
+
+
+class HeuristicPolicy:
+    """
+    启发式策略
+
+    只使用公开游戏信息和玩家自己合法掌握的信息（预言家查验结果、狼人队友、
+    AI自己的角色推理），不调用LLM
+
+    职责：
+    - 投票、杀人、查验、开枪目标选择
+    - 女巫用药
+    - 警长竞选与警徽传递
+    - 模板化发言
+    """
+
+    # 发言中声明身份的模式，如 "我是预言家"
+    ROLE_CLAIM_PATTERN = re.compile(r'我是真?(预言家|女巫|猎人)')
+    # 发言中提及玩家的模式，如 "3号"
+    PLAYER_MENTION_PATTERN = re.compile(r'(\d+)号')
+    # 女巫用毒需要的最低可疑度
+    POISON_SUSPICION_THRESHOLD = 3.0
+
+    # ---------- 公开信息分析 ----------
+
+    def get_role_claims(self, game_state: 'GameState') -> Dict[int, str]:
+        """
+        从公开发言中提取身份声明
+
+        Returns:
+            Dict[int, str]: 玩家ID -> 最近一次声明的身份
+        """
+        claims = {}
+        for record in game_state.conversation_history:
+            if record.get('action_type') != 'speech':
+                continue
+            match = self.ROLE_CLAIM_PATTERN.search(record['content'])
+            if match:
+                claims[record['player_id']] = match.group(1)
+        return claims
+
+    def get_suspicion_scores(self, player: 'Player', game_state: 'GameState') -> Dict[int, float]:
+        """
+        计算每个玩家的可疑度（越高越可疑）
+
+        依据：
+        - 历史投票中被投的次数
+        - 其他玩家在提到"狼"的发言中点名的次数
+        - AI自己的角色推理（如果有）
+        - 女巫救过的玩家曾被狼人刀过，视为更可能是好人
+
+        Args:
+            player: 做判断的玩家
+            game_state: 游戏状态
+
+        Returns:
+            Dict[int, float]: 玩家ID -> 可疑度
+        """
+        scores: Dict[int, float] = {p.id: 0.0 for p in game_state.alive_players}
+
+        for record in game_state.conversation_history:
+            action_type = record.get('action_type')
+            if action_type == 'vote':
+                target_id = record.get('target_id')
+                if target_id in scores:
+                    scores[target_id] += 1.0
+            elif action_type == 'speech' and '狼' in record['content']:
+                for num in self.PLAYER_MENTION_PATTERN.findall(record['content']):
+                    target_id = int(num)
+                    if target_id in scores and target_id != record['player_id']:
+                        scores[target_id] += 0.5
+
+        beliefs = getattr(player, 'role_beliefs', None) or {}
+        confidence_weight = {"high": 3.0, "medium": 2.0, "low": 1.0}
+        for pid, analysis in beliefs.items():
+            try:
+                target_id = int(pid)
+            except (TypeError, ValueError):
+                continue
+            if target_id not in scores or not isinstance(analysis, dict):
+                continue
+            weight = confidence_weight.get(analysis.get('confidence'), 1.0)
+            if analysis.get('camp_belief') == 'werewolf':
+                scores[target_id] += weight
+            elif analysis.get('camp_belief') == 'good':
+                scores[target_id] -= weight
+
+        if player.role.role_type == RoleType.WITCH:
+            for record in game_state.witch_action_history:
+                if record['action_type'] == 'save' and record['target_id'] in scores:
+                    scores[record['target_id']] -= 2.0
+
+        return scores
+
+    def get_seer_knowledge(self, player: 'Player', game_state: 'GameState') -> Dict[int, bool]:
+        """
+        预言家自己的查验结果
+
+        Returns:
+            Dict[int, bool]: 玩家ID -> 是否狼人（非预言家返回空字典）
+        """
+        if player.role.role_type != RoleType.SEER:
+            return {}
+        knowledge = {}
+        for pid in getattr(player.role, 'checked_players', []):
+            target = next((p for p in game_state.all_players if p.id == pid), None)
+            if target:
+                knowledge[pid] = target.role.camp == RoleCamp.WEREWOLF
+        return knowledge
+
+    def _pick_most(self, candidates: List['Player'], scores: Dict[int, float]) -> Optional['Player']:
+        """在可疑度最高的候选人中随机选一个"""
+        if not candidates:
+            return None
+        best = max(scores.get(c.id, 0.0) for c in candidates)
+        return random.choice([c for c in candidates if scores.get(c.id, 0.0) == best])
+
+    def _pick_least(self, candidates: List['Player'], scores: Dict[int, float]) -> Optional['Player']:
+        """在可疑度最低的候选人中随机选一个"""
+        if not candidates:
+            return None
+        best = min(scores.get(c.id, 0.0) for c in candidates)
+        return random.choice([c for c in candidates if scores.get(c.id, 0.0) == best])
+
+    # ---------- 决策 ----------
+
+    def choose_vote_target(
+        self,
+        player: 'Player',
+        game_state: 'GameState',
+        candidates: List['Player']
+    ) -> Optional['Player']:
+        """
+        选择放逐投票目标
+
+        - 预言家：优先投查验出的狼人，不投查验过的好人
+        - 狼人：不投队友，跟随公开怀疑投好人
+        - 其他好人：投可疑度最高的玩家
+        """
+        if not candidates:
+            return None
+
+        scores = self.get_suspicion_scores(player, game_state)
+
+        if player.role.camp == RoleCamp.WEREWOLF:
+            good = [c for c in candidates if c.role.camp != RoleCamp.WEREWOLF]
+            return self._pick_most(good or candidates, scores)
+
+        knowledge = self.get_seer_knowledge(player, game_state)
+        known_wolves = [c for c in candidates if knowledge.get(c.id) is True]
+        if known_wolves:
+            return random.choice(known_wolves)
+
+        unknown = [c for c in candidates if knowledge.get(c.id) is not False]
+        return self._pick_most(unknown or candidates, scores)
+
+    def choose_kill_target(
+        self,
+        player: 'Player',
+        game_state: 'GameState',
+        candidates: List['Player']
+    ) -> Optional['Player']:
+        """
+        狼人选择杀人目标
+
+        优先级：声明预言家/女巫的玩家 > 警长 > 最不被怀疑的好人（避免刀猎人声明者）
+        """
+        targets = [c for c in candidates if c.role.camp != RoleCamp.WEREWOLF] or candidates
+        if not targets:
+            return None
+
+        claims = self.get_role_claims(game_state)
+        for claimed_role in ("预言家", "女巫"):
+            claimed = [t for t in targets if claims.get(t.id) == claimed_role]
+            if claimed:
+                return random.choice(claimed)
+
+        sheriff = next((t for t in targets if t.is_sheriff), None)
+        if sheriff and claims.get(sheriff.id) != "猎人":
+            return sheriff
+
+        non_hunters = [t for t in targets if claims.get(t.id) != "猎人"] or targets
+        scores = self.get_suspicion_scores(player, game_state)
+        return self._pick_least(non_hunters, scores)
+
+    def choose_check_target(
+        self,
+        player: 'Player',
+        game_state: 'GameState',
+        candidates: List['Player']
+    ) -> Optional['Player']:
+        """
+        预言家选择查验目标
+
+        只查未查验过的玩家，优先警长和可疑度最高的玩家
+        """
+        checked = set(getattr(player.role, 'checked_players', []))
+        unchecked = [c for c in candidates if c.id not in checked]
+        if not unchecked:
+            return None
+
+        sheriff = next((c for c in unchecked if c.is_sheriff), None)
+        if sheriff:
+            return sheriff
+
+        scores = self.get_suspicion_scores(player, game_state)
+        return self._pick_most(unchecked, scores)
+
+    def choose_shoot_target(
+        self,
+        player: 'Player',
+        game_state: 'GameState',
+        candidates: List['Player']
+    ) -> Optional['Player']:
+        """猎人选择开枪目标：可疑度最高且不是自己"""
+        targets = [c for c in candidates if c.id != player.id]
+        scores = self.get_suspicion_scores(player, game_state)
+        return self._pick_most(targets, scores)
+
+    def choose_witch_action(
+        self,
+        player: 'Player',
+        game_state: 'GameState',
+        witch_role
+    ) -> Optional[Tuple[str, 'Player']]:
+        """
+        女巫选择行动
+
+        - 有解药且被刀的不是自己：救人
+        - 有毒药且有明显可疑的玩家（可疑度达到阈值）：毒人
+        - 否则跳过
+        """
+        victim = game_state.tonight_victim
+        if witch_role.has_antidote and victim and victim.id != player.id:
+            return ("save", victim)
+
+        if witch_role.has_poison:
+            candidates = [p for p in game_state.alive_players if p.id != player.id]
+            scores = self.get_suspicion_scores(player, game_state)
+            target = self._pick_most(candidates, scores)
+            if target and scores.get(target.id, 0.0) >= self.POISON_SUSPICION_THRESHOLD:
+                return ("poison", target)
+
+        return None
+
+    def choose_sheriff_successor(
+        self,
+        player: 'Player',
+        game_state: 'GameState',
+        candidates: List['Player']
+    ) -> Optional['Player']:
+        """
+        选择警徽继承人，None表示撕毁警徽
+
+        - 狼人：传给狼队友，没有队友则撕毁
+        - 预言家：传给查验过的好人
+        - 其他好人：传给可疑度最低的玩家
+        """
+        if not candidates:
+            return None
+
+        if player.role.camp == RoleCamp.WEREWOLF:
+            teammates = [c for c in candidates if c.role.camp == RoleCamp.WEREWOLF]
+            return random.choice(teammates) if teammates else None
+
+        knowledge = self.get_seer_knowledge(player, game_state)
+        known_good = [c for c in candidates if knowledge.get(c.id) is False]
+        if known_good:
+            return random.choice(known_good)
+
+        unknown = [c for c in candidates if knowledge.get(c.id) is not True]
+        scores = self.get_suspicion_scores(player, game_state)
+        return self._pick_least(unknown, scores)
+
+    def decide_sheriff_candidacy(self, player: 'Player', game_state: 'GameState') -> bool:
+        """只有预言家竞选警长（有信息的人拿警徽收益最大）"""
+        return player.role.role_type == RoleType.SEER
+
+    def choose_sheriff_vote(
+        self,
+        player: 'Player',
+        game_state: 'GameState',
+        candidates: List['Player']
+    ) -> Optional['Player']:
+        """
+        选择警长投票对象
+
+        - 狼人：投狼队友候选人，没有则投可疑度最高的好人
+        - 好人：投查验过的好人，否则投可疑度最低的候选人
+        """
+        if not candidates:
+            return None
+
+        scores = self.get_suspicion_scores(player, game_state)
+        if player.role.camp == RoleCamp.WEREWOLF:
+            teammates = [c for c in candidates if c.role.camp == RoleCamp.WEREWOLF]
+            return random.choice(teammates) if teammates else self._pick_most(candidates, scores)
+
+        knowledge = self.get_seer_knowledge(player, game_state)
+        known_good = [c for c in candidates if knowledge.get(c.id) is False]
+        if known_good:
+            return random.choice(known_good)
+        unknown = [c for c in candidates if knowledge.get(c.id) is not True]
+        return self._pick_least(unknown or candidates, scores)
+
+    # ---------- 模板化发言 ----------
+
+    def generate_speech(self, player: 'Player', game_state: 'GameState') -> str:
+        """生成模板化的白天发言"""
+        candidates = [p for p in game_state.alive_players if p.id != player.id]
+
+        if player.role.role_type == RoleType.SEER:
+            knowledge = self.get_seer_knowledge(player, game_state)
+            if knowledge:
+                last_id = list(knowledge.keys())[-1]
+                result = "狼人" if knowledge[last_id] else "好人"
+                if knowledge[last_id]:
+                    return f"我是预言家，我查验了{last_id}号，是{result}，请大家跟我一起投{last_id}号。"
+                return f"我是预言家，我查验了{last_id}号，是{result}，大家可以相信{last_id}号。"
+
+        target = self.choose_vote_target(player, game_state, candidates)
+        if target is None:
+            return "我是好人，目前信息不多，先听听大家的发言。"
+        return f"我是好人，目前我觉得{target.id}号比较可疑，建议大家重点关注{target.id}号。"
+
+    def generate_campaign_speech(self, player: 'Player', game_state: 'GameState') -> str:
+        """生成模板化的警长竞选宣言"""
+        if player.role.role_type == RoleType.SEER:
+            return f"我是{player.name}，我是预言家，请把警徽交给我，我会带领好人找出狼人。"
+        return f"我是{player.name}，我会认真分析每个人的发言，请大家支持我当警长。"
+
+    def generate_werewolf_discussion(self, player: 'Player', game_state: 'GameState') -> str:
+        """生成模板化的狼人频道发言"""
+        target = self.choose_kill_target(player, game_state, game_state.alive_players)
+        if target is None:
+            return "我没意见，听大家的。"
+        return f"我建议今晚刀{target.id}号。"
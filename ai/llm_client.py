@@ -1,12 +1,29 @@
 """
 LLM客户端 - 封装DeepSeek API调用
+
+langchain_openai / openai / httpx 导入很慢，只在首次创建客户端或发起调用时导入；
+导入本模块本身不会创建客户端，通过 get_llm_client() 获取全局实例
 """
-import os
+import time
+import importlib.util
+import random
+import asyncio
+import threading
+import traceback
 import warnings
-from typing import Optional
-from langchain_openai import ChatOpenAI
+from typing import Optional, Dict, Any, Tuple, List, TYPE_CHECKING
 from config.settings import settings
-import httpx
+from config.llm_config import LLMConfig
+from ai.llm_router import LLMRouter, LLMRoute
+from ai.backend_pool import Backend
+from ai.circuit_breaker import CircuitBreaker
+from ai.cassette import Cassette
+from ai.telemetry import telemetry
+from utils.tracing import span
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_openai import ChatOpenAI
 
 # 抑制SSL验证警告
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
@@ -17,62 +34,682 @@ class LLMClient:
     LLM客户端
 
     封装对DeepSeek API的调用
+    按调用类型（profile）选择模型、温度、最大输出长度和停止序列，
+    并通过路由器把调用分发到不同的模型/后端池
+
+    容错策略：
+    - 可重试错误（超时、连接错误、限流、5xx）按带抖动的指数退避重试，优先换到其他后端
+    - 请求耗时超过路由的p95延迟时，向另一个后端发出对冲请求，取先返回的结果
+    - 每次调用有总时限（默认由调用类型对应的阶段时间预算推出），超时直接放弃
+    - 连续多次调用失败后熔断，熔断期间调用立即返回空字符串，由调用方使用启发式策略；
+      一段时间后放行少量探测请求，成功即恢复
+    - 可设置同时进行的调用数上限（多房间服务器），超出的调用排队，排到时限仍未轮到同样返回空字符串
+    - 对局的LLM预算（见 telemetry.set_budget）用完后，该局的调用同样直接返回空字符串
+
+    录制/回放（LLM_CASSETTE_MODE）：录制模式记录每次调用；回放模式只从录制文件返回响应
+
+    每次调用按调用点标签（tag）记录遥测：总耗时、首token延迟（流式）、token用量、错误
     """
 
     def __init__(self):
         """初始化LLM客户端"""
-        # 创建一个禁用SSL验证的httpx客户端
-        # 注意：这是为了解决SSL证书验证问题，生产环境应该使用正确的证书
-        http_client = httpx.AsyncClient(verify=False)
-
-        self.llm = ChatOpenAI(
-            model="deepseek-chat",
-            api_key=settings.DEEPSEEK_API_KEY,
-            base_url=settings.DEEPSEEK_BASE_URL,
-            temperature=0.1,  # 较低的温度使输出更确定
-            http_async_client=http_client,  # 使用自定义的http客户端
+        # 同步/异步调用各一个共享连接池，所有后端和模型实例复用其中的保活连接
+        self.sync_http_client, self.http_client = self._create_http_clients()
+
+        # 按调用类型选择路由（模型 + 后端）
+        self.router = LLMRouter.from_settings()
+
+        # 熔断器：以整次调用（含重试）为单位统计成败
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_BREAKER_RESET_TIMEOUT,
+            half_open_max_calls=settings.LLM_BREAKER_HALF_OPEN_PROBES,
+        )
+
+        # 录制/回放
+        self.cassette: Optional[Cassette] = None
+        if settings.LLM_CASSETTE_MODE != "off":
+            self.cassette = Cassette(
+                settings.LLM_CASSETTE_PATH,
+                settings.LLM_CASSETTE_MODE,
+                settings.LLM_CASSETTE_MATCH,
+            )
+
+        # 同时进行的调用数上限（默认不限，见 set_max_in_flight）
+        self.max_in_flight = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.saturated = 0  # 排队超过时限而放弃的调用
+
+        # 按 (后端, model, temperature, max_tokens) 缓存的模型实例，所有实例共享http客户端
+        self._llms: Dict[Tuple[str, str, float, Optional[int]], 'ChatOpenAI'] = {}
+
+        # 默认配置的模型实例
+        default_route = self.router.routes[self.router.default_route]
+        self.llm = self._get_llm(
+            LLMConfig.get_profile("default"), default_route, default_route.pool.backends[0]
+        )
+
+    @staticmethod
+    def _create_http_clients() -> Tuple['httpx.Client', 'httpx.AsyncClient']:
+        """
+        创建共享的同步和异步httpx客户端
+
+        连接数、保活连接数和保活时长取自配置；配置启用且安装了h2时使用HTTP/2
+        注意：禁用SSL验证是为了解决SSL证书验证问题，生产环境应该使用正确的证书
+
+        Returns:
+            Tuple[httpx.Client, httpx.AsyncClient]: (同步客户端, 异步客户端)
+        """
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        )
+        http2 = settings.LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+        return (
+            httpx.Client(verify=False, limits=limits, http2=http2),
+            httpx.AsyncClient(verify=False, limits=limits, http2=http2),
+        )
+
+    async def warm_up(self) -> None:
+        """
+        预先与所有后端建立连接（TCP + TLS），放入异步连接池
+
+        向每个后端的 /models 发送一个轻量请求，响应内容和错误都忽略；
+        在游戏设置阶段等待玩家输入时后台执行，避免首批调用承担握手延迟
+        """
+        if not settings.LLM_WARM_UP or self._replaying():
+            return
+
+        backends: Dict[str, Backend] = {}
+        for route in self.router.routes.values():
+            for backend in route.pool.backends:
+                backends[backend.name] = backend
+
+        async def touch(backend: Backend) -> None:
+            try:
+                await self.http_client.get(
+                    backend.base_url.rstrip("/") + "/models",
+                    headers={"Authorization": f"Bearer {backend.api_key}"},
+                    timeout=5.0,
+                )
+            except Exception:
+                pass
+
+        await asyncio.gather(*(touch(b) for b in backends.values()))
+
+    def _replaying(self) -> bool:
+        """是否处于回放模式"""
+        return self.cassette is not None and self.cassette.mode == "replay"
+
+    def _play(self, prompt: str, tag: str) -> Tuple[str, float]:
+        """
+        从录制文件取出一次调用的响应
+
+        Returns:
+            Tuple[str, float]: (响应, 录制时的耗时秒数)；没有匹配的记录时返回空响应，由调用方兜底
+        """
+        played = self.cassette.play(tag, prompt)
+        if played is None:
+            print(f"LLM回放未命中（{tag}），返回空响应")
+            return "", 0.0
+        response, latency_ms = played
+        return response, latency_ms / 1000
+
+    def _finish_call(
+        self,
+        tag: str,
+        prompt: str,
+        content: str,
+        usage: Optional[Dict[str, Any]],
+        start: float,
+        short_circuited: bool
+    ) -> None:
+        """
+        记录一次调用的遥测和录制
+
+        Args:
+            tag: 调用点标签
+            prompt: 提示词
+            content: 返回的文本
+            usage: 成功时的用量信息（ttft_ms / prompt_tokens / completion_tokens），失败为None
+            start: 调用开始时间（perf_counter）
+            short_circuited: 是否被熔断器直接拒绝
+        """
+        wall_ms = (time.perf_counter() - start) * 1000
+        usage = usage or {}
+        telemetry.record(
+            tag,
+            wall_ms,
+            success=not short_circuited and bool(usage),
+            ttft_ms=usage.get("ttft_ms"),
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            short_circuited=short_circuited,
         )
+        if self.cassette is not None:
+            self.cassette.record(tag, prompt, content, wall_ms)
+
+    @staticmethod
+    def _usage(response: Any, ttft_ms: Optional[float] = None) -> Dict[str, Any]:
+        """从响应元数据中提取token用量"""
+        token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        return {
+            "ttft_ms": ttft_ms,
+            "prompt_tokens": token_usage.get("prompt_tokens"),
+            "completion_tokens": token_usage.get("completion_tokens"),
+        }
+
+    def is_degraded(self) -> bool:
+        """
+        LLM服务是否处于熔断状态
+
+        调用方可据此跳过提示词构建，直接使用启发式策略
+
+        Returns:
+            bool: True表示熔断中
+        """
+        return self.breaker.is_open()
 
-    async def generate(self, prompt: str) -> str:
+    def _get_llm(self, profile: Dict[str, Any], route: LLMRoute, backend: Backend) -> 'ChatOpenAI':
+        """
+        获取（或创建）符合生成参数的模型实例
+
+        Args:
+            profile: 生成参数
+            route: 路由（决定默认模型）
+            backend: 后端（决定接口地址和密钥）
+
+        Returns:
+            ChatOpenAI: 模型实例
+        """
+        model = profile["model"] or route.model
+        key = (backend.name, model, profile["temperature"], profile["max_tokens"])
+        llm = self._llms.get(key)
+        if llm is None:
+            from langchain_openai import ChatOpenAI
+            llm = ChatOpenAI(
+                model=model,
+                api_key=backend.api_key,
+                base_url=backend.base_url,
+                temperature=profile["temperature"],
+                max_tokens=profile["max_tokens"],
+                max_retries=0,  # 重试由LLMClient统一处理
+                http_client=self.sync_http_client,   # 共享同步连接池
+                http_async_client=self.http_client,  # 共享异步连接池
+            )
+            self._llms[key] = llm
+        return llm
+
+    async def generate(
+        self,
+        prompt: str,
+        profile: str = "default",
+        deadline: Optional[float] = None,
+        tag: Optional[str] = None
+    ) -> str:
         """
         生成文本
 
         Args:
             prompt: 提示词
+            profile: 调用类型（见 config/llm_config.py）
+            deadline: 本次调用的总时限（秒，含重试），None表示使用调用类型的默认时限
+            tag: 调用点标签（用于遥测和录制），None表示使用调用类型
 
         Returns:
-            str: 生成的文本
+            str: 生成的文本，失败、超时、熔断或本局预算用完时返回空字符串
+        """
+        tag = tag or profile
+        if self._replaying():
+            content, latency = self._play(prompt, tag)
+            if settings.LLM_CASSETTE_REPLAY_LATENCY:
+                await asyncio.sleep(latency)
+            return content
+
+        with span(tag, "llm", profile=profile) as span_args:
+            start = time.perf_counter()
+            usage = None
+            budget = deadline if deadline is not None else LLMConfig.get_profile(profile)["deadline"]
+            if telemetry.over_budget():
+                # 本局的LLM预算已用完：剩余决策由调用方的启发式策略完成
+                content = ""
+                short_circuited = True
+                span_args["over_budget"] = True
+            elif not await self._acquire_slot(budget):
+                # 排队超过时限：不占用熔断器的统计，直接返回空字符串
+                content = ""
+                short_circuited = True
+                span_args["saturated"] = True
+            else:
+                try:
+                    short_circuited = not self.breaker.allow_request()
+                    if short_circuited:
+                        content = ""
+                    else:
+                        remaining = budget - (time.perf_counter() - start)
+                        try:
+                            content, usage = await self._generate(prompt, profile, remaining)
+                        except asyncio.CancelledError:
+                            self.breaker.record_cancel()
+                            raise
+                finally:
+                    self._release_slot()
+
+            self._finish_call(tag, prompt, content, usage, start, short_circuited)
+            span_args["ok"] = usage is not None
+            if short_circuited:
+                span_args["short_circuited"] = True
+            if usage:
+                span_args.update({k: v for k, v in usage.items() if v is not None})
+        return content
+
+    def set_max_in_flight(self, limit: int) -> None:
+        """
+        设置同时进行的调用数上限（异步调用）
+
+        多房间服务器用来限制整个进程对后端的并发；排队时间计入每次调用的时限
+
+        Args:
+            limit: 上限，0表示不限
         """
+        self.max_in_flight = limit
+        self._slots = asyncio.Semaphore(limit) if limit > 0 else None
+
+    async def _acquire_slot(self, budget: float) -> bool:
+        """在时限内等待调用名额，返回是否拿到"""
+        if self._slots is None:
+            self.in_flight += 1
+            return True
+        self.waiting += 1
         try:
-            response = await self.llm.ainvoke(prompt)
-            return response.content.strip()
-        except Exception as e:
-            import traceback
-            print(f"LLM生成错误: {type(e).__name__}: {e}")
-            print("完整堆栈跟踪：")
-            traceback.print_exc()
-            return ""
+            await asyncio.wait_for(self._slots.acquire(), timeout=max(budget, 0))
+        except asyncio.TimeoutError:
+            self.saturated += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return True
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    async def _generate(
+        self,
+        prompt: str,
+        profile: str,
+        deadline: Optional[float]
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """generate的重试循环（熔断器已放行），返回 (文本, 用量)，失败时用量为None"""
+        config = LLMConfig.get_profile(profile)
+        route = self.router.select(profile)
+        budget = deadline if deadline is not None else config["deadline"]
+        start = time.perf_counter()
+        deadline_at = time.monotonic() + budget
+        failed: List[Backend] = []
+        last_error: Optional[BaseException] = None
 
-    def generate_sync(self, prompt: str) -> str:
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                content, usage = await asyncio.wait_for(
+                    self._hedged_invoke(prompt, config, route, failed),
+                    timeout=remaining
+                )
+            except asyncio.TimeoutError as e:
+                last_error = e
+                break
+            except Exception as e:
+                last_error = e
+                if not self._is_retryable(e) and len(set(map(id, failed))) >= len(route.pool):
+                    # 不可重试的错误且没有其他后端可换
+                    break
+            else:
+                self.router.record(route, (time.perf_counter() - start) * 1000, True)
+                self.breaker.record_success()
+                return content, usage
+
+            if attempt < settings.LLM_MAX_RETRIES:
+                delay = self._backoff_delay(attempt)
+                if delay >= deadline_at - time.monotonic():
+                    break
+                await asyncio.sleep(delay)
+
+        self.router.record(route, (time.perf_counter() - start) * 1000, False)
+        self.breaker.record_failure()
+        self._report_error(profile, budget, last_error, failed)
+        return "", None
+
+    async def _hedged_invoke(
+        self,
+        prompt: str,
+        config: Dict[str, Any],
+        route: LLMRoute,
+        failed: List[Backend]
+    ) -> Tuple[str, Dict[str, Any]]:
         """
-        同步生成文本
+        发起一次调用，超过对冲阈值仍未返回时再发一个对冲请求
 
         Args:
             prompt: 提示词
+            config: 生成参数
+            route: 路由
+            failed: 本次调用中失败过的后端（会被追加）
 
         Returns:
-            str: 生成的文本
+            Tuple[str, Dict]: 先成功返回的 (文本, 用量)
         """
+        in_use: List[Backend] = []
+        tasks = [asyncio.ensure_future(self._invoke(prompt, config, route, failed, in_use))]
         try:
-            response = self.llm.invoke(prompt)
-            return response.content.strip()
-        except Exception as e:
-            import traceback
-            print(f"LLM生成错误: {type(e).__name__}: {e}")
+            hedge_delay = self._hedge_delay(route)
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done:
+                    tasks.append(asyncio.ensure_future(
+                        self._invoke(prompt, config, route, failed, in_use)
+                    ))
+
+            pending = set(tasks)
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _invoke(
+        self,
+        prompt: str,
+        config: Dict[str, Any],
+        route: LLMRoute,
+        failed: List[Backend],
+        in_use: List[Backend]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        在一个后端上执行一次调用
+
+        优先选择未失败且未被本次调用占用的后端；启用流式调用时测量首token延迟
+
+        Args:
+            prompt: 提示词
+            config: 生成参数
+            route: 路由
+            failed: 本次调用中失败过的后端（失败时追加）
+            in_use: 本次调用正在使用的后端（选中时追加）
+
+        Returns:
+            Tuple[str, Dict]: (生成的文本, 用量)
+        """
+        backend = (
+            route.pool.acquire(exclude=failed + in_use)
+            or route.pool.acquire(exclude=failed)
+            or route.pool.acquire()
+        )
+        in_use.append(backend)
+        attempt_start = time.perf_counter()
+        try:
+            llm = self._get_llm(config, route, backend)
+            if settings.LLM_STREAM:
+                chunks = []
+                ttft_ms = None
+                async for chunk in llm.astream(prompt, stop=config["stop"]):
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - attempt_start) * 1000
+                    chunks.append(chunk.content)
+                content = "".join(chunks)
+                usage = self._usage(None, ttft_ms)
+            else:
+                response = await llm.ainvoke(prompt, stop=config["stop"])
+                content = response.content
+                usage = self._usage(response)
+        except asyncio.CancelledError:
+            route.pool.cancel(backend)
+            raise
+        except Exception:
+            route.pool.release(backend, (time.perf_counter() - attempt_start) * 1000, False)
+            failed.append(backend)
+            raise
+        route.pool.release(backend, (time.perf_counter() - attempt_start) * 1000, True)
+        return content.strip(), usage
+
+    def _hedge_delay(self, route: LLMRoute) -> Optional[float]:
+        """
+        计算对冲请求的触发延迟
+
+        Returns:
+            Optional[float]: 秒数；未启用对冲或样本不足时返回None
+        """
+        if not settings.LLM_HEDGE_ENABLED:
+            return None
+        if len(route.stats.latencies_ms) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        threshold_ms = route.stats.percentile(settings.LLM_HEDGE_PERCENTILE)
+        return threshold_ms / 1000 if threshold_ms is not None else None
+
+    @staticmethod
+    def _is_retryable(error: BaseException) -> bool:
+        """判断错误是否值得重试"""
+        import httpx
+        import openai
+
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in (408, 409, 429) or error.status_code >= 500
+        return isinstance(error, httpx.TransportError)
+
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """
+        带完全抖动的指数退避时长
+
+        Args:
+            attempt: 已失败的次数（从0开始）
+
+        Returns:
+            float: 秒数，在 [0, min(上限, 基准 × 2^attempt)] 内均匀分布
+        """
+        cap = min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def generate_sync(
+        self,
+        prompt: str,
+        profile: str = "default",
+        deadline: Optional[float] = None,
+        tag: Optional[str] = None
+    ) -> str:
+        """
+        同步生成文本
+
+        与generate使用相同的重试和时限策略，但不发出对冲请求；
+        时限只在两次尝试之间检查
+
+        Args:
+            prompt: 提示词
+            profile: 调用类型（见 config/llm_config.py）
+            deadline: 本次调用的总时限（秒，含重试），None表示使用调用类型的默认时限
+            tag: 调用点标签（用于遥测和录制），None表示使用调用类型
+
+        Returns:
+            str: 生成的文本，失败、超时、熔断或本局预算用完时返回空字符串
+        """
+        tag = tag or profile
+        if self._replaying():
+            content, latency = self._play(prompt, tag)
+            if settings.LLM_CASSETTE_REPLAY_LATENCY:
+                time.sleep(latency)
+            return content
+
+        start = time.perf_counter()
+        usage = None
+        short_circuited = telemetry.over_budget() or not self.breaker.allow_request()
+        if short_circuited:
+            content = ""
+        else:
+            content, usage = self._generate_sync(prompt, profile, deadline)
+
+        self._finish_call(tag, prompt, content, usage, start, short_circuited)
+        return content
+
+    def _generate_sync(
+        self,
+        prompt: str,
+        profile: str,
+        deadline: Optional[float]
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """generate_sync的重试循环（熔断器已放行），返回 (文本, 用量)，失败时用量为None"""
+        config = LLMConfig.get_profile(profile)
+        route = self.router.select(profile)
+        budget = deadline if deadline is not None else config["deadline"]
+        start = time.perf_counter()
+        deadline_at = time.monotonic() + budget
+        failed: List[Backend] = []
+        last_error: Optional[BaseException] = None
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            if time.monotonic() >= deadline_at:
+                break
+            backend = route.pool.acquire(exclude=failed) or route.pool.acquire()
+            attempt_start = time.perf_counter()
+            try:
+                llm = self._get_llm(config, route, backend)
+                response = llm.invoke(prompt, stop=config["stop"])
+            except Exception as e:
+                route.pool.release(backend, (time.perf_counter() - attempt_start) * 1000, False)
+                failed.append(backend)
+                last_error = e
+                if not self._is_retryable(e) and len(set(map(id, failed))) >= len(route.pool):
+                    break
+            else:
+                route.pool.release(backend, (time.perf_counter() - attempt_start) * 1000, True)
+                self.router.record(route, (time.perf_counter() - start) * 1000, True)
+                self.breaker.record_success()
+                return response.content.strip(), self._usage(response)
+
+            if attempt < settings.LLM_MAX_RETRIES:
+                delay = self._backoff_delay(attempt)
+                if delay >= deadline_at - time.monotonic():
+                    break
+                time.sleep(delay)
+
+        self.router.record(route, (time.perf_counter() - start) * 1000, False)
+        self.breaker.record_failure()
+        self._report_error(profile, budget, last_error, failed)
+        return "", None
+
+    def _report_error(
+        self,
+        profile: str,
+        budget: float,
+        error: Optional[BaseException],
+        failed: List[Backend]
+    ) -> None:
+        """
+        打印调用最终失败的原因
+
+        可预期的错误（超时、可重试错误）只打印一行，其他错误附带完整堆栈
+
+        Args:
+            profile: 调用类型
+            budget: 调用时限（秒）
+            error: 最后一次失败的异常
+            failed: 失败过的后端
+        """
+        if error is None or isinstance(error, asyncio.TimeoutError):
+            print(f"LLM调用超时（{profile}，时限{budget:g}秒）")
+            return
+
+        backend_names = ", ".join(dict.fromkeys(b.name for b in failed)) or "无"
+        print(f"LLM生成错误（{profile}，已尝试后端：{backend_names}）: {type(error).__name__}: {error}")
+        if not self._is_retryable(error):
             print("完整堆栈跟踪：")
-            traceback.print_exc()
-            return ""
+            traceback.print_exception(error)
+
+    def get_route_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取每条路由的调用统计
 
+        Returns:
+            Dict[str, Dict]: 路由名称 -> 统计数据（调用数、错误数、延迟分位数、SLO状态）
+        """
+        return self.router.get_stats()
 
-# 创建全局LLM客户端实例
-llm_client = LLMClient()
+    def get_backend_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取每个后端的统计数据
+
+        Returns:
+            Dict[str, Dict]: 后端名称 -> 统计数据（健康状态、延迟EWMA、在途请求数、调用数、错误数）
+        """
+        return self.router.get_backend_stats()
+
+    def get_cassette_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        获取录制/回放统计
+
+        Returns:
+            Optional[Dict]: 模式、调用数、命中/未命中数；未启用时返回None
+        """
+        return self.cassette.get_stats() if self.cassette is not None else None
+
+    def get_in_flight_stats(self) -> Dict[str, Any]:
+        """
+        获取并发统计
+
+        Returns:
+            Dict: 上限（0表示不限）、进行中、排队中、排队超时放弃的调用数
+        """
+        return {
+            "limit": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "saturated": self.saturated,
+        }
+
+    def get_breaker_stats(self) -> Dict[str, Any]:
+        """
+        获取熔断器状态
+
+        Returns:
+            Dict: 状态、连续失败次数、累计熔断次数
+        """
+        return self.breaker.to_dict()
+
+
+# 全局LLM客户端实例（首次使用时创建）
+_llm_client: Optional[LLMClient] = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """
+    获取全局LLM客户端，首次调用时创建
+
+    可以在线程中调用（如 asyncio.to_thread），以免首次导入langchain阻塞事件循环
+
+    Returns:
+        LLMClient: 全局客户端实例
+    """
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient()
+    return _llm_client
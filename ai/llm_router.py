@@ -0,0 +1,254 @@
+"""
+LLM路由 - 按调用类型和延迟SLO选择模型与后端
+"""
+import math
+from collections import deque
+from typing import Optional, Dict, Any, Deque, List, Tuple
+from urllib.parse import urlparse
+from config.settings import settings
+from ai.backend_pool import Backend, BackendPool
+
+
+class RouteStats:
+    """
+    单条路由的调用统计
+
+    只保留最近 window 次调用的延迟用于计算分位数
+    """
+
+    def __init__(self, window: Optional[int] = None):
+        """
+        Args:
+            window: 保留的最近调用数，None表示使用 LLM_ROUTE_STATS_WINDOW
+        """
+        window = window if window is not None else settings.LLM_ROUTE_STATS_WINDOW
+        self.calls = 0
+        self.errors = 0
+        self.total_latency_ms = 0.0
+        self.latencies_ms: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency_ms: float, success: bool) -> None:
+        """记录一次调用"""
+        self.calls += 1
+        if not success:
+            self.errors += 1
+        self.total_latency_ms += latency_ms
+        self.latencies_ms.append(latency_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        计算最近调用延迟的分位数
+
+        Args:
+            p: 分位数（0-100）
+
+        Returns:
+            Optional[float]: 延迟毫秒数，没有数据时返回None
+        """
+        if not self.latencies_ms:
+            return None
+        ordered = sorted(self.latencies_ms)
+        index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计数据"""
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_latency_ms / self.calls, 1) if self.calls else None,
+            "p50_ms": round(p50, 1) if p50 is not None else None,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+        }
+
+
+class LLMRoute:
+    """
+    一条LLM路由：模型 + 后端池 + 延迟SLO
+
+    最近调用的p95延迟超出SLO时进入降级状态；降级期间只看探测调用，
+    连续 RECOVERY_PROBES 次探测都满足SLO即恢复（不必等延迟窗口里的尖峰被挤出）
+    """
+
+    # 恢复需要的连续达标探测次数
+    RECOVERY_PROBES = 3
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        pool: BackendPool,
+        slo_ms: int,
+        fallback: Optional[str] = None
+    ):
+        """
+        Args:
+            name: 路由名称
+            model: 模型名称
+            pool: 后端池
+            slo_ms: 延迟SLO（p95，毫秒）
+            fallback: 超出SLO时降级到的路由名称
+        """
+        self.name = name
+        self.model = model
+        self.pool = pool
+        self.slo_ms = slo_ms
+        self.fallback = fallback
+        self.stats = RouteStats()
+        self.degraded = False
+        self._probes_ms: Deque[float] = deque(maxlen=self.RECOVERY_PROBES)  # 降级期间最近的探测延迟
+
+    def is_within_slo(self) -> bool:
+        """是否满足SLO（未处于降级状态）"""
+        return not self.degraded
+
+    def record(self, latency_ms: float, success: bool) -> None:
+        """
+        记录一次调用，并更新降级状态
+
+        Args:
+            latency_ms: 延迟（毫秒）
+            success: 是否成功（失败的探测视为不达标）
+        """
+        self.stats.record(latency_ms, success)
+        if not self.degraded:
+            p95 = self.stats.percentile(95)
+            if p95 is not None and p95 > self.slo_ms:
+                self.degraded = True
+                self._probes_ms.clear()
+            return
+
+        self._probes_ms.append(latency_ms if success else math.inf)
+        if len(self._probes_ms) == self.RECOVERY_PROBES and max(self._probes_ms) <= self.slo_ms:
+            # 恢复：延迟窗口从达标的探测重新开始，旧的尖峰不再拖高p95
+            self.degraded = False
+            self.stats.latencies_ms.clear()
+            self.stats.latencies_ms.extend(self._probes_ms)
+
+    def __repr__(self) -> str:
+        return f"<LLMRoute(name={self.name}, model={self.model}, slo={self.slo_ms}ms)>"
+
+
+class LLMRouter:
+    """
+    LLM路由器
+
+    职责：
+    - 按调用类型（profile）选择路由
+    - 路由p95延迟超出SLO时降级到备用路由
+    - 记录每条路由的调用统计
+    """
+
+    # 降级期间每隔多少次调用仍向原路由发送一次探测请求，以便恢复
+    SLO_PROBE_INTERVAL = 10
+
+    def __init__(
+        self,
+        routes: Dict[str, LLMRoute],
+        profile_routes: Dict[str, str],
+        default_route: str
+    ):
+        """
+        Args:
+            routes: 路由名称 -> 路由
+            profile_routes: 调用类型 -> 路由名称
+            default_route: 未配置调用类型使用的路由名称
+        """
+        if default_route not in routes:
+            raise ValueError(f"Unknown default route: {default_route}")
+        self.routes = routes
+        self.profile_routes = profile_routes
+        self.default_route = default_route
+        self._degraded_calls: Dict[str, int] = {}
+
+    @classmethod
+    def from_settings(cls) -> 'LLMRouter':
+        """根据 config/settings.py 创建路由器"""
+        # 相同地址和密钥的后端在各路由间共享，健康状态和延迟统计也随之共享
+        backends: Dict[Tuple[str, str], Backend] = {}
+
+        def build_pool(endpoints: List[Dict[str, str]]) -> BackendPool:
+            pool_backends = []
+            for endpoint in endpoints:
+                key = (endpoint["base_url"], endpoint["api_key"])
+                if key not in backends:
+                    host = urlparse(endpoint["base_url"]).netloc or endpoint["base_url"]
+                    backends[key] = Backend(f"{host}#{len(backends)}", *key)
+                pool_backends.append(backends[key])
+            return BackendPool(pool_backends)
+
+        routes = {
+            "fast": LLMRoute(
+                name="fast",
+                model=settings.LLM_FAST_MODEL,
+                pool=build_pool(settings.LLM_FAST_ENDPOINTS),
+                slo_ms=settings.LLM_FAST_SLO_MS,
+            ),
+            "strong": LLMRoute(
+                name="strong",
+                model=settings.LLM_STRONG_MODEL,
+                pool=build_pool(settings.LLM_STRONG_ENDPOINTS),
+                slo_ms=settings.LLM_STRONG_SLO_MS,
+                fallback="fast",
+            ),
+        }
+        return cls(routes, settings.LLM_PROFILE_ROUTES, settings.LLM_DEFAULT_ROUTE)
+
+    def select(self, profile: str) -> LLMRoute:
+        """
+        为调用类型选择路由
+
+        Args:
+            profile: 调用类型
+
+        Returns:
+            LLMRoute: 选中的路由
+        """
+        route = self.routes.get(self.profile_routes.get(profile, self.default_route))
+        if route is None:
+            route = self.routes[self.default_route]
+
+        if route.fallback and route.fallback in self.routes and not route.is_within_slo():
+            # 超出SLO：大部分调用降级，少量调用继续探测原路由
+            count = self._degraded_calls.get(route.name, 0) + 1
+            self._degraded_calls[route.name] = count
+            if count % self.SLO_PROBE_INTERVAL != 0:
+                return self.routes[route.fallback]
+        else:
+            self._degraded_calls.pop(route.name, None)
+
+        return route
+
+    def record(self, route: LLMRoute, latency_ms: float, success: bool) -> None:
+        """记录一次调用结果"""
+        route.record(latency_ms, success)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取所有路由的统计数据
+
+        Returns:
+            Dict[str, Dict]: 路由名称 -> 统计数据
+        """
+        stats = {}
+        for name, route in self.routes.items():
+            data = route.stats.to_dict()
+            data["model"] = route.model
+            data["slo_ms"] = route.slo_ms
+            data["within_slo"] = route.is_within_slo()
+            stats[name] = data
+        return stats
+
+    def get_backend_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取所有后端的统计数据（跨路由去重）
+
+        Returns:
+            Dict[str, Dict]: 后端名称 -> 统计数据
+        """
+        stats = {}
+        for route in self.routes.values():
+            stats.update(route.pool.get_stats())
+        return stats
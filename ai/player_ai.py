@@ -3,8 +3,9 @@
 """
 import re
 from typing import Optional, List, Tuple, TYPE_CHECKING
-from ai.llm_client import llm_client
+from ai.llm_client import LLMClient, get_llm_client
 from ai.prompts import player_prompts
+from ai.heuristic_policy import HeuristicPolicy
 from roles.base_role import RoleType, RoleCamp
 from config.game_config import GameConfig, ROLE_COMPOSITIONS
 
@@ -21,10 +22,17 @@ class PlayerAI:
     - 生成发言
     - 做出投票决策
     - 选择行动目标
+
+    LLM熔断时跳过提示词构建，直接使用启发式策略；LLM调用失败时也由启发式策略兜底
     """
 
     def __init__(self):
-        self.llm = llm_client
+        self.heuristics = HeuristicPolicy()
+
+    @property
+    def llm(self) -> LLMClient:
+        """LLM客户端（首次访问时创建）"""
+        return get_llm_client()
 
     def _get_board_info(self, board_config: str) -> str:
         """
@@ -103,6 +111,9 @@ class PlayerAI:
         Returns:
             str: 发言内容
         """
+        if self.llm.is_degraded():
+            return self.heuristics.generate_speech(player, game_state)
+
         # 根据阵营决定可见历史（权限控制）
         if player.role.camp == RoleCamp.WEREWOLF:
             # 狼人能看到公开对话 + 狼人私聊
@@ -164,10 +175,10 @@ class PlayerAI:
 
         prompt = prompt_template.format(**prompt_data)
 
-        speech = await self.llm.generate(prompt)
+        speech = await self.llm.generate(prompt, profile="speech", tag="player.generate_speech")
 
         if not speech:
-            speech = "我没什么要说的。"
+            speech = self.heuristics.generate_speech(player, game_state)
 
         return speech
 
@@ -186,6 +197,9 @@ class PlayerAI:
         Returns:
             str: 竞选演讲内容
         """
+        if self.llm.is_degraded():
+            return self.heuristics.generate_campaign_speech(player, game_state)
+
         # 获取玩家的历史发言
         player_history = game_state.get_player_speech_summary(player.id)
 
@@ -202,10 +216,10 @@ class PlayerAI:
             your_previous_speeches=player_history or "暂无历史发言"
         )
 
-        speech = await self.llm.generate(prompt)
+        speech = await self.llm.generate(prompt, profile="campaign", tag="player.generate_sheriff_campaign_speech")
 
         if not speech:
-            speech = f"我是{player.name}，我想竞选警长，请大家支持我。"
+            speech = self.heuristics.generate_campaign_speech(player, game_state)
 
         return speech
 
@@ -226,6 +240,9 @@ class PlayerAI:
         Returns:
             str: 讨论内容
         """
+        if self.llm.is_degraded():
+            return self.heuristics.generate_werewolf_discussion(player, game_state)
+
         # 获取狼人能看到的完整历史（公开+私密）
         combined_history = game_state.get_combined_history_for_werewolf(player.id)
 
@@ -251,10 +268,10 @@ class PlayerAI:
             private_history=game_state.get_private_conversation_history("werewolf")
         )
 
-        speech = await self.llm.generate(prompt)
+        speech = await self.llm.generate(prompt, profile="werewolf_discussion", tag="player.generate_werewolf_discussion")
 
         if not speech:
-            speech = "我建议我们杀掉最可疑的玩家。"
+            speech = self.heuristics.generate_werewolf_discussion(player, game_state)
 
         return speech
 
@@ -277,6 +294,9 @@ class PlayerAI:
         if not alive_players:
             return None
 
+        if self.llm.is_degraded():
+            return self.heuristics.choose_vote_target(player, game_state, alive_players)
+
         # 根据阵营决定可见历史（权限控制）
         if player.role.camp == RoleCamp.WEREWOLF:
             full_history = game_state.get_combined_history_for_werewolf(player.id)
@@ -295,7 +315,7 @@ class PlayerAI:
             alive_players=alive_list
         )
 
-        response = await self.llm.generate(prompt)
+        response = await self.llm.generate(prompt, profile="decision", tag="player.make_vote_decision")
 
         # 解析返回的玩家ID
         target_id = self._extract_player_id(response, alive_players)
@@ -305,9 +325,8 @@ class PlayerAI:
                 if p.id == target_id:
                     return p
 
-        # 默认随机选择
-        import random
-        return random.choice(alive_players) if alive_players else None
+        # 解析失败时使用启发式策略
+        return self.heuristics.choose_vote_target(player, game_state, alive_players)
 
     async def choose_action_target(
         self,
@@ -331,6 +350,9 @@ class PlayerAI:
         if not available_targets:
             return None
 
+        if self.llm.is_degraded() or action_type not in ("kill", "check"):
+            return self._heuristic_action_target(player, game_state, available_targets, action_type)
+
         # 根据行动类型选择提示词
         if action_type == "kill":
             prompt_template = player_prompts.WEREWOLF_KILL_DECISION
@@ -363,13 +385,8 @@ class PlayerAI:
                 "full_conversation_history": game_state.get_full_conversation_history() or "暂无"
             }
 
-        else:
-            # 其他行动类型简化处理
-            import random
-            return random.choice(available_targets) if available_targets else None
-
         prompt = prompt_template.format(**prompt_data)
-        response = await self.llm.generate(prompt)
+        response = await self.llm.generate(prompt, profile="decision", tag=f"player.choose_action_target.{action_type}")
 
         # 解析目标ID
         target_id = self._extract_player_id(response, available_targets)
@@ -382,9 +399,22 @@ class PlayerAI:
                 if t.id == target_id:
                     return t
 
-        # 默认随机选择
-        import random
-        return random.choice(available_targets) if available_targets else None
+        # 解析失败时使用启发式策略
+        return self._heuristic_action_target(player, game_state, available_targets, action_type)
+
+    def _heuristic_action_target(
+        self,
+        player: 'Player',
+        game_state: 'GameState',
+        available_targets: List['Player'],
+        action_type: str
+    ) -> Optional['Player']:
+        """按行动类型使用启发式策略选择目标"""
+        if action_type == "kill":
+            return self.heuristics.choose_kill_target(player, game_state, available_targets)
+        if action_type == "check":
+            return self.heuristics.choose_check_target(player, game_state, available_targets)
+        return self.heuristics.choose_shoot_target(player, game_state, available_targets)
 
     async def choose_witch_action(
         self,
@@ -403,29 +433,8 @@ class PlayerAI:
         Returns:
             Optional[Tuple[str, Player]]: (行动类型, 目标)
         """
-        # 简化实现：随机决策
-        import random
-
-        actions = []
-
-        # 女巫不能救自己
-        if witch_role.has_antidote and game_state.tonight_victim:
-            if game_state.tonight_victim.id != player.id:
-                actions.append(("save", game_state.tonight_victim))
-
-        if witch_role.has_poison:
-            alive = [p for p in game_state.alive_players if p.id != player.id]
-            if alive:
-                actions.append(("poison", random.choice(alive)))
-
-        if not actions:
-            return None
-
-        # 30%概率跳过
-        if random.random() < 0.3:
-            return None
-
-        return random.choice(actions)
+        # 本地启发式决策：有解药先救人，有明显可疑目标才用毒
+        return self.heuristics.choose_witch_action(player, game_state, witch_role)
 
     async def choose_sheriff_successor_strategically(
         self,
@@ -452,6 +461,9 @@ class PlayerAI:
         if not candidates:
             return None
 
+        if self.llm.is_degraded():
+            return self.heuristics.choose_sheriff_successor(player, game_state, candidates)
+
         # 获取狼人能看到的完整历史
         combined_history = game_state.get_combined_history_for_werewolf(player.id)
 
@@ -476,7 +488,7 @@ class PlayerAI:
             round=game_state.round_number
         )
 
-        response = await self.llm.generate(prompt)
+        response = await self.llm.generate(prompt, profile="decision", tag="player.choose_sheriff_successor_strategically")
 
         # 解析目标ID
         target_id = self._extract_player_id(response, candidates)
@@ -489,16 +501,8 @@ class PlayerAI:
                 if c.id == target_id:
                     return c
 
-        # 默认策略：优先传给狼队友，否则随机
-        import random
-        if werewolf_candidates:
-            return random.choice(werewolf_candidates)
-        else:
-            # 没有狼队友时，有50%概率撕毁警徽，50%概率传给好人
-            if random.random() < 0.5:
-                return None
-            else:
-                return random.choice(candidates)
+        # 默认策略：优先传给狼队友，没有队友则撕毁警徽
+        return self.heuristics.choose_sheriff_successor(player, game_state, candidates)
 
     def _extract_player_id(self, text: str, available_players: List['Player']) -> Optional[int]:
         """
@@ -542,6 +546,9 @@ class PlayerAI:
         Returns:
             bool: 是否竞选警长
         """
+        if self.llm.is_degraded():
+            return self.heuristics.decide_sheriff_candidacy(player, game_state)
+
         # 获取历史记录
         if player.role.camp == RoleCamp.WEREWOLF:
             full_history = game_state.get_combined_history_for_werewolf(player.id)
@@ -563,13 +570,13 @@ class PlayerAI:
             role_analysis=role_analysis
         )
 
-        response = await self.llm.generate(prompt)
+        response = await self.llm.generate(prompt, profile="candidacy", tag="player.decide_sheriff_candidacy")
+
+        if not response:
+            return self.heuristics.decide_sheriff_candidacy(player, game_state)
 
         # 解析返回结果
-        if response and "yes" in response.lower():
-            return True
-        else:
-            return False
+        return "yes" in response.lower()
 
     async def choose_sheriff_successor_for_good(
         self,
@@ -591,6 +598,9 @@ class PlayerAI:
         if not candidates:
             return None
 
+        if self.llm.is_degraded():
+            return self.heuristics.choose_sheriff_successor(player, game_state, candidates)
+
         # 获取历史记录
         full_history = game_state.get_full_conversation_history()
 
@@ -623,7 +633,7 @@ class PlayerAI:
             round=game_state.round_number
         )
 
-        response = await self.llm.generate(prompt)
+        response = await self.llm.generate(prompt, profile="decision", tag="player.choose_sheriff_successor_for_good")
 
         # 解析目标ID
         target_id = self._extract_player_id(response, candidates)
@@ -636,9 +646,8 @@ class PlayerAI:
                 if c.id == target_id:
                     return c
 
-        # 默认随机选择
-        import random
-        return random.choice(candidates) if candidates else None
+        # 解析失败时使用启发式策略
+        return self.heuristics.choose_sheriff_successor(player, game_state, candidates)
 
     async def update_role_beliefs(
         self,
@@ -656,6 +665,10 @@ class PlayerAI:
             recent_speaker_id: 最近发言的玩家ID
             recent_speech: 最近的发言内容
         """
+        # 熔断时保持原有推理不变
+        if self.llm.is_degraded():
+            return
+
         # 获取历史记录
         if player.role.camp == RoleCamp.WEREWOLF:
             full_history = game_state.get_combined_history_for_werewolf(player.id)
@@ -683,7 +696,7 @@ class PlayerAI:
             visible_info=visible_info
         )
 
-        response = await self.llm.generate(prompt)
+        response = await self.llm.generate(prompt, profile="beliefs", tag="player.update_role_beliefs")
 
         # 解析JSON并更新player的role_beliefs
         try:
@@ -0,0 +1,305 @@
+"""
+LLM调用遥测 - 按调用点统计耗时、首token延迟、token用量、错误和费用
+
+统计分两层：
+- 进程级：进程启动以来的所有调用
+- 对局级：按 current_game_id（contextvar）归档，主程序在创建游戏ID后设置
+
+对局级统计同时用于预算：设置了调用次数或token上限的对局用完后，LLMClient 不再发出调用
+"""
+import math
+import unicodedata
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Deque, Tuple
+from config.settings import settings
+
+# 当前对局ID（由主程序设置，LLM调用时读取）
+current_game_id: ContextVar[Optional[str]] = ContextVar("current_game_id", default=None)
+
+
+class LatencyHistogram:
+    """
+    延迟直方图
+
+    固定的对数分桶用于导出分布；同时保留最近 window 个样本用于计算分位数
+    """
+
+    # 分桶上界（毫秒），最后一个桶收集所有更慢的样本
+    BUCKETS_MS = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, math.inf)
+
+    def __init__(self, window: int = 1000):
+        self.counts: List[int] = [0] * len(self.BUCKETS_MS)
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.total_ms = 0.0
+
+    def record(self, value_ms: float) -> None:
+        """记录一个样本"""
+        for index, upper in enumerate(self.BUCKETS_MS):
+            if value_ms <= upper:
+                self.counts[index] += 1
+                break
+        self.samples.append(value_ms)
+        self.total_ms += value_ms
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        计算最近样本的分位数
+
+        Args:
+            p: 分位数（0-100）
+
+        Returns:
+            Optional[float]: 毫秒数，没有样本时返回None
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出分位数和分桶计数"""
+        count = self.count
+
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 1) if value is not None else None
+
+        return {
+            "count": count,
+            "avg_ms": rounded(self.total_ms / count) if count else None,
+            "p50_ms": rounded(self.percentile(50)),
+            "p90_ms": rounded(self.percentile(90)),
+            "p99_ms": rounded(self.percentile(99)),
+            "max_ms": rounded(max(self.samples)) if self.samples else None,
+            "buckets": {
+                ("+inf" if math.isinf(upper) else f"<={upper}ms"): n
+                for upper, n in zip(self.BUCKETS_MS, self.counts)
+            },
+        }
+
+
+class CallSiteStats:
+    """单个调用点的统计"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.short_circuited = 0  # 熔断期间被直接拒绝的调用
+        self.wall = LatencyHistogram()
+        self.ttft = LatencyHistogram()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(
+        self,
+        wall_ms: float,
+        success: bool,
+        ttft_ms: Optional[float] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        short_circuited: bool = False
+    ) -> None:
+        """记录一次调用"""
+        self.calls += 1
+        if short_circuited:
+            self.short_circuited += 1
+            return
+        if not success:
+            self.errors += 1
+        self.wall.record(wall_ms)
+        if ttft_ms is not None:
+            self.ttft.record(ttft_ms)
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+
+    @property
+    def cost(self) -> float:
+        """按配置的单价估算的费用"""
+        return (
+            self.prompt_tokens * settings.LLM_PRICE_INPUT_PER_M
+            + self.completion_tokens * settings.LLM_PRICE_OUTPUT_PER_M
+        ) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计数据"""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "short_circuited": self.short_circuited,
+            "wall": self.wall.to_dict(),
+            "ttft": self.ttft.to_dict(),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": round(self.cost, 6),
+        }
+
+
+class LLMTelemetry:
+    """
+    LLM遥测
+
+    职责：
+    - 按调用点（tag）汇总进程级和对局级统计
+    - 生成可读的汇总表
+    """
+
+    def __init__(self):
+        self.process: Dict[str, CallSiteStats] = {}
+        self.games: Dict[str, Dict[str, CallSiteStats]] = {}
+        self.budgets: Dict[str, Tuple[int, int]] = {}  # 对局ID -> (调用次数上限, token上限)
+
+    def record(
+        self,
+        tag: str,
+        wall_ms: float,
+        success: bool,
+        ttft_ms: Optional[float] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        short_circuited: bool = False
+    ) -> None:
+        """
+        记录一次调用（同时计入进程级和当前对局）
+
+        Args:
+            tag: 调用点标签
+            wall_ms: 调用总耗时（含重试）
+            success: 是否成功
+            ttft_ms: 首token延迟（仅流式调用）
+            prompt_tokens: 提示词token数
+            completion_tokens: 生成token数
+            short_circuited: 是否被熔断器直接拒绝
+        """
+        targets = [self.process]
+        game_id = current_game_id.get()
+        if game_id is not None:
+            targets.append(self.games.setdefault(game_id, {}))
+
+        for stats_by_tag in targets:
+            stats = stats_by_tag.get(tag)
+            if stats is None:
+                stats = stats_by_tag[tag] = CallSiteStats()
+            stats.record(wall_ms, success, ttft_ms, prompt_tokens, completion_tokens, short_circuited)
+
+    def _select(self, game_id: Optional[str]) -> Dict[str, CallSiteStats]:
+        return self.process if game_id is None else self.games.get(game_id, {})
+
+    def get_stats(self, game_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        获取按调用点汇总的统计
+
+        Args:
+            game_id: 对局ID，None表示进程级
+
+        Returns:
+            Dict[str, Dict]: 调用点标签 -> 统计数据
+        """
+        return {tag: stats.to_dict() for tag, stats in self._select(game_id).items()}
+
+    def set_budget(self, game_id: str, max_calls: int = 0, max_tokens: int = 0) -> None:
+        """
+        设置一局的LLM预算
+
+        Args:
+            game_id: 对局ID
+            max_calls: 实际发出的调用次数上限，0表示不限
+            max_tokens: 输入+输出token总数上限，0表示不限
+        """
+        if max_calls > 0 or max_tokens > 0:
+            self.budgets[game_id] = (max_calls, max_tokens)
+        else:
+            self.budgets.pop(game_id, None)
+
+    def over_budget(self, game_id: Optional[str] = None) -> bool:
+        """
+        对局的LLM预算是否已用完（熔断或排队放弃的调用不计入）
+
+        Args:
+            game_id: 对局ID，None表示当前对局（current_game_id）
+
+        Returns:
+            bool: 已达到调用次数或token上限；没有设置预算时为False
+        """
+        game_id = game_id if game_id is not None else current_game_id.get()
+        budget = self.budgets.get(game_id) if game_id is not None else None
+        if budget is None:
+            return False
+        max_calls, max_tokens = budget
+        stats = self.games.get(game_id, {}).values()
+        if max_calls > 0 and sum(s.calls - s.short_circuited for s in stats) >= max_calls:
+            return True
+        return max_tokens > 0 and sum(s.prompt_tokens + s.completion_tokens for s in stats) >= max_tokens
+
+    def discard(self, game_id: str) -> None:
+        """丢弃一局的统计和预算（长期运行的服务器在对局结束、取走统计后调用）"""
+        self.games.pop(game_id, None)
+        self.budgets.pop(game_id, None)
+
+    def format_summary(self, game_id: Optional[str] = None) -> str:
+        """
+        生成汇总表（按总耗时降序）
+
+        Args:
+            game_id: 对局ID，None表示进程级
+
+        Returns:
+            str: 多行文本
+        """
+        stats_by_tag = self._select(game_id)
+        if not stats_by_tag:
+            return "暂无LLM调用"
+
+        header = self._pad("调用点", 44, left=True) + "".join(
+            self._pad(title, width) for title, width in self.COLUMNS
+        )
+        rule = "-" * (44 + sum(width for _, width in self.COLUMNS))
+        lines = [header, rule]
+        total = CallSiteStats()
+        ordered = sorted(stats_by_tag.items(), key=lambda item: item[1].wall.total_ms, reverse=True)
+        for tag, stats in ordered:
+            lines.append(self._format_row(tag, stats))
+            total.calls += stats.calls
+            total.errors += stats.errors
+            total.short_circuited += stats.short_circuited
+            total.prompt_tokens += stats.prompt_tokens
+            total.completion_tokens += stats.completion_tokens
+            for sample in stats.wall.samples:
+                total.wall.record(sample)
+        total.wall.total_ms = sum(stats.wall.total_ms for stats in stats_by_tag.values())
+        lines.append(rule)
+        lines.append(self._format_row("合计", total))
+        return "\n".join(lines)
+
+    # 汇总表数值列（标题, 宽度）
+    COLUMNS = (
+        ("次数", 6), ("错误", 6), ("熔断", 6), ("总耗时s", 10), ("p50ms", 9),
+        ("p90ms", 9), ("p99ms", 9), ("输入tok", 10), ("输出tok", 9), ("费用", 10),
+    )
+
+    @staticmethod
+    def _pad(text: str, width: int, left: bool = False) -> str:
+        """按终端显示宽度（中文占两格）对齐"""
+        display = sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+        padding = " " * max(0, width - display)
+        return text + padding if left else padding + text
+
+    @staticmethod
+    def _format_row(tag: str, stats: CallSiteStats) -> str:
+        def ms(value: Optional[float]) -> str:
+            return f"{value:.0f}" if value is not None else "-"
+
+        return (
+            f"{LLMTelemetry._pad(tag, 44, left=True)}{stats.calls:>6}{stats.errors:>6}{stats.short_circuited:>6}"
+            f"{stats.wall.total_ms / 1000:>10.1f}{ms(stats.wall.percentile(50)):>9}"
+            f"{ms(stats.wall.percentile(90)):>9}{ms(stats.wall.percentile(99)):>9}"
+            f"{stats.prompt_tokens:>10}{stats.completion_tokens:>9}{stats.cost:>10.4f}"
+        )
+
+
+# 创建全局遥测实例
+telemetry = LLMTelemetry()
@@ -0,0 +1,95 @@
+"""
+启动耗时基准 - 基于 python -X importtime 测量模块导入时间
+
+用法：
+    python -m benchmarks.import_time                 # 测量 main 的导入耗时
+    python -m benchmarks.import_time core.game_state --budget-ms 150
+
+检查项：
+- 导入目标模块时不应加载 LLM 相关的重量级依赖（langchain_openai / openai / httpx）
+- 多次测量取最小值，超过耗时预算时以非零状态码退出
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# 导入时不允许出现的重量级模块（只能在首次调用LLM时导入）
+FORBIDDEN_MODULES = ("langchain_openai", "langchain_core", "openai", "httpx")
+
+# 项目根目录（子进程的工作目录）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -X importtime 输出格式：import time: self [us] | cumulative | imported package
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(module: str) -> Dict[str, Tuple[int, int]]:
+    """
+    在新的解释器中导入模块并解析 -X importtime 输出
+
+    Args:
+        module: 要导入的模块名
+
+    Returns:
+        Dict[str, Tuple[int, int]]: 模块名 -> (自身耗时us, 累计耗时us)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败：\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def find_forbidden(timings: Dict[str, Tuple[int, int]]) -> List[str]:
+    """找出被导入的重量级顶层模块"""
+    loaded = {name.split(".")[0] for name in timings}
+    return [name for name in FORBIDDEN_MODULES if name in loaded]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="测量模块导入耗时并检查重量级依赖")
+    parser.add_argument("module", nargs="?", default="main", help="要导入的模块（默认 main）")
+    parser.add_argument("--repeat", type=int, default=5, help="测量次数，取最小值（默认5）")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="导入耗时预算（毫秒，默认300）")
+    parser.add_argument("--top", type=int, default=10, help="显示自身耗时最高的模块数（默认10）")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(max(1, args.repeat))]
+    best = min(runs, key=lambda t: t.get(args.module, (0, 0))[1])
+    total_ms = best.get(args.module, (0, 0))[1] / 1000
+
+    print(f"导入 {args.module}：{total_ms:.1f} ms（{len(runs)}次取最小值，预算 {args.budget_ms:g} ms）")
+    print(f"\n自身耗时最高的{args.top}个模块：")
+    slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000:8.1f} ms  (累计 {cumulative_us / 1000:8.1f} ms)  {name}")
+
+    failed = False
+    forbidden = find_forbidden(best)
+    if forbidden:
+        print(f"\n❌ 导入时加载了重量级依赖：{', '.join(forbidden)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"\n❌ 导入耗时超出预算：{total_ms:.1f} ms > {args.budget_ms:g} ms")
+        failed = True
+    if not failed:
+        print("\n✅ 通过")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
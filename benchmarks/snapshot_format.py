@@ -0,0 +1,180 @@
+"""
+检查点编码基准 - 比较二进制快照与JSON的大小和编解码耗时
+
+用法：
+    python -m benchmarks.snapshot_format                    # 合成一局6轮的检查点
+    python -m benchmarks.snapshot_format --rounds 12 --repeat 500
+    python -m benchmarks.snapshot_format storage/checkpoints/game_3f2a1b4c.ckpt
+
+检查项：
+- 往返一致：decode(encode(x)) 与 JSON 往返结果完全相同，并能用 GameState.from_dict 恢复
+- 输出各格式的字节数和每次编码/解码的耗时
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.game_state import GameState
+from core.snapshot import encode_snapshot, decode_snapshot
+from core.state_store import StateStore
+from players.human_player import HumanPlayer
+from players.ai_player import AIPlayer
+from roles.role_factory import RoleFactory
+from storage.analytics_db import display_width
+
+
+SPEECH = "我觉得{}号昨天的发言有问题，他在警上说自己是好人，但是投票的时候却跟着狼人走，我建议今天出{}号。"
+
+
+def synthetic_checkpoint(rounds: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    合成一局进行到第rounds轮的检查点（9人局，每轮有发言、投票、狼人私聊、女巫用药和AI推理）
+
+    Args:
+        rounds: 轮数
+        seed: 随机种子
+
+    Returns:
+        Dict: 与 WolfkillGame.checkpoint 相同结构的检查点
+    """
+    rng = random.Random(seed)
+    state = GameState()
+    state.game_id = "bench001"
+    state.board_config = "basic"
+
+    roles = RoleFactory.distribute_roles("basic")
+    players = [HumanPlayer(1, "玩家", roles[0])]
+    players += [AIPlayer(i, f"AI-{i}", roles[i - 1], None) for i in range(2, len(roles) + 1)]
+    state.all_players = players
+    state.alive_players = players.copy()
+
+    clock = datetime(2025, 1, 1, 20, 0, 0)
+    for round_num in range(1, rounds + 1):
+        state.round_number = round_num
+        wolves = [p for p in players if p.role.role_type.name == "WEREWOLF"]
+        for wolf in wolves:
+            state.add_private_speech("werewolf", round_num, wolf, f"今晚刀{rng.randint(1, 9)}号，他像预言家")
+        state.record_witch_action(round_num, rng.choice(["save", "poison", "skip"]), rng.choice(players), False, True)
+
+        state.current_phase = "day"
+        for player in players:
+            a, b = rng.randint(1, 9), rng.randint(1, 9)
+            state.add_speech(round_num, player, SPEECH.format(a, b))
+            player.speech_history.append(SPEECH.format(a, b))
+        state.current_phase = "vote"
+        for player in players:
+            state.add_vote(round_num, player, rng.choice(players))
+
+        for player in players:
+            if isinstance(player, AIPlayer):
+                player.role_beliefs = {
+                    str(other.id): {
+                        "suspected_roles": [rng.choice(["狼人", "预言家", "村民", "女巫"])],
+                        "camp_belief": rng.choice(["好人", "狼人", "未知"]),
+                        "confidence": rng.choice(["高", "中", "低"]),
+                        "reasoning": SPEECH.format(other.id, other.id)[:30],
+                    }
+                    for other in players if other is not player
+                }
+        for entry in state.conversation_history[-2 * len(players):]:
+            clock += timedelta(seconds=rng.randint(5, 40))
+            entry["timestamp"] = clock.isoformat()
+
+    return {
+        "version": 2,
+        "game_id": state.game_id,
+        "round": state.round_number,
+        "phase": "vote",
+        "next_phase": "night",
+        "saved_at": clock.isoformat(),
+        "rng_state": random.Random(seed).getstate(),
+        "state": state.to_dict(),
+    }
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    """读取检查点文件（二进制或JSON）"""
+    with open(path, 'rb') as f:
+        return StateStore.decode(f.read())
+
+
+def timed(func: Callable[[], Any], repeat: int) -> float:
+    """多次执行取最小耗时（微秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def check_round_trip(checkpoint: Dict[str, Any]) -> List[str]:
+    """往返一致性检查，返回失败原因"""
+    problems = []
+    expected = json.loads(json.dumps(checkpoint, ensure_ascii=False))
+    decoded = decode_snapshot(encode_snapshot(checkpoint))
+    if decoded != expected:
+        problems.append("二进制快照往返结果与JSON往返不一致")
+
+    def create_player(record, role):
+        if record["kind"] == "human":
+            return HumanPlayer(record["id"], record["name"], role)
+        return AIPlayer(record["id"], record["name"], role, None)
+
+    restored = GameState.from_dict(decoded["state"], create_player)
+    if json.loads(json.dumps(restored.to_dict(), ensure_ascii=False)) != expected["state"]:
+        problems.append("GameState.from_dict 恢复后再导出与原状态不一致")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="比较检查点的二进制快照与JSON编码")
+    parser.add_argument("checkpoint", nargs="?", help="检查点文件（默认合成）")
+    parser.add_argument("--rounds", type=int, default=6, help="合成检查点的轮数（默认6）")
+    parser.add_argument("--repeat", type=int, default=200, help="测量次数，取最小值（默认200）")
+    args = parser.parse_args()
+
+    checkpoint = load_checkpoint(args.checkpoint) if args.checkpoint else synthetic_checkpoint(args.rounds)
+
+    problems = check_round_trip(checkpoint)
+
+    pretty = json.dumps(checkpoint, ensure_ascii=False, indent=2).encode('utf-8')
+    compact = json.dumps(checkpoint, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+    binary = encode_snapshot(checkpoint)
+
+    formats: List[Tuple[str, bytes, Callable[[], Any], Callable[[], Any]]] = [
+        ("JSON（缩进）", pretty,
+         lambda: json.dumps(checkpoint, ensure_ascii=False, indent=2).encode('utf-8'),
+         lambda: json.loads(pretty)),
+        ("JSON（紧凑）", compact,
+         lambda: json.dumps(checkpoint, ensure_ascii=False, separators=(",", ":")).encode('utf-8'),
+         lambda: json.loads(compact)),
+        ("二进制快照", binary,
+         lambda: encode_snapshot(checkpoint),
+         lambda: decode_snapshot(binary)),
+    ]
+
+    source = args.checkpoint or f"合成检查点（{args.rounds}轮）"
+    print(f"{source}：{len(checkpoint['state']['players'])}名玩家，"
+          f"{len(checkpoint['state']['conversation_history'])}条历史记录")
+    print(f"\n  格式{' ' * 10}{' ' * 4}字节数{' ' * 2}相对缩进JSON{'编码 us':>12}{'解码 us':>12}")
+    for name, data, encode, decode in formats:
+        encode_us = timed(encode, args.repeat)
+        decode_us = timed(decode, args.repeat)
+        name_pad = name + " " * (14 - display_width(name))
+        print(f"  {name_pad}{len(data):>10}{len(data) / len(pretty):>14.2f}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+    if problems:
+        for problem in problems:
+            print(f"\n❌ {problem}")
+        return 1
+    print("\n✅ 往返一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
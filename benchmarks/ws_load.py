@@ -0,0 +1,297 @@
+"""
+多人在线服务器压测 - 本地启动大量房间，机器人玩家自动回复输入请求
+
+用法：
+    # 另开终端启动服务器（离线压测可使用录制回放和零停顿，不访问LLM）
+    GAME_PACING=zero LLM_CASSETTE_MODE=replay LLM_CASSETTE_MATCH=sequence python -m server.ws_server
+
+    python -m benchmarks.ws_load                                    # 50个房间，每房间1个真人
+    python -m benchmarks.ws_load --rooms 300 --humans 3 --spectators 2 --think-ms 200
+    python -m server.ws_server --max-games 20 ...; python -m benchmarks.ws_load --rooms 100   # 检查满载排队
+
+检查项：
+- 每个房间：创建、真人机器人入座并开始对局，观战连接旁观；机器人随机回复每个输入请求
+- 状态同步连续：每条增量的起始版本等于该连接上次收到的版本（不丢、不重）
+- 观战连接收不到私密事件
+- 房间迁移（多进程部署时工作进程退出或排空，收到 closed/moved）后用原凭证和状态版本重连并继续检查
+- 输出完成/失败的对局数、排队次数、对局耗时、回复输入请求后服务器的响应延迟和收到的消息量
+- 结束后查询服务器统计：并发LLM调用、最近对局的LLM调用/token/耗时/近似内存
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+
+class ClientStats:
+    """单个连接的统计"""
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.events = 0
+        self.prompts = 0
+        self.expired = 0  # 超时后才回复的输入请求（已由AI代为决策）
+        self.queued = 0
+        self.moves = 0
+        self.response_latency: List[float] = []  # 回复输入请求后到收到服务器下一条消息的时间
+        self.version: Optional[int] = None
+        self.epoch: Optional[str] = None
+        self.seat: Optional[Dict[str, Any]] = None  # 入座后的重连凭证
+        self.problems: List[str] = []
+
+    def check_sync(self, message: Dict[str, Any]) -> None:
+        """检查状态同步的版本连续性"""
+        if message["type"] == "delta" and (message["from"] != self.version or message["epoch"] != self.epoch):
+            self.problems.append(f"增量起始版本 {message['from']} 与已收到的版本 {self.version} 不连续")
+        self.version = message["version"]
+        self.epoch = message["epoch"]
+
+
+async def run_client(
+    websockets,
+    url: str,
+    room_id: str,
+    name: Optional[str],
+    stats: ClientStats,
+    think_ms: float,
+    ready: asyncio.Event,
+    start: bool = False
+) -> str:
+    """
+    运行一个连接直到对局结束
+
+    Args:
+        websockets: websockets 模块
+        url: 服务器地址
+        room_id: 房间ID
+        name: 玩家名字，None表示观战
+        stats: 统计
+        think_ms: 机器人回复前的思考时间（毫秒）
+        ready: 入座完成后设置
+        start: 入座后开始对局（座位已坐满时服务器会自动开始）
+
+    Returns:
+        str: 结束原因（closed消息的reason）
+    """
+    while True:
+        reason = await _run_connection(websockets, url, room_id, name, stats.seat, stats, think_ms, ready, start)
+        if reason != "moved":
+            return reason
+        # 房间迁移到其他工作进程：用原凭证和已收到的状态版本重连
+        stats.moves += 1
+        start = False
+
+
+async def _run_connection(
+    websockets,
+    url: str,
+    room_id: str,
+    name: Optional[str],
+    seat: Optional[Dict[str, Any]],
+    stats: ClientStats,
+    think_ms: float,
+    ready: asyncio.Event,
+    start: bool
+) -> str:
+    """一次连接：入座/重连/观战后处理消息直到房间关闭"""
+    async with websockets.connect(url, max_size=None) as ws:
+        if name is None:
+            await ws.send(json.dumps({"type": "spectate", "room": room_id, "version": stats.version, "epoch": stats.epoch}))
+        elif seat is not None:
+            await ws.send(json.dumps({
+                "type": "rejoin", "room": room_id, "version": stats.version, "epoch": stats.epoch, **seat
+            }))
+        else:
+            await ws.send(json.dumps({"type": "join", "room": room_id, "name": name}, ensure_ascii=False))
+        ready.set()
+
+        answered_at: Optional[float] = None
+        async for raw in ws:
+            if answered_at is not None:
+                stats.response_latency.append(time.perf_counter() - answered_at)
+                answered_at = None
+            stats.messages += 1
+            stats.bytes += len(raw)
+            message = json.loads(raw)
+            kind = message["type"]
+
+            if kind == "joined":
+                stats.seat = {"player_id": message["player_id"], "token": message["token"]}
+            elif kind == "lobby" and start:
+                if len(message["seats"]) < message["total_seats"]:
+                    await ws.send(json.dumps({"type": "start"}))
+                start = False
+            elif kind == "queued":
+                stats.queued += 1
+            elif kind == "event":
+                stats.events += 1
+                if name is None and message["event"]["visible_to"] is not None:
+                    stats.problems.append(f"观战连接收到私密事件：{message['event']['text'][:30]}")
+            elif kind in ("delta", "snapshot"):
+                stats.check_sync(message)
+            elif kind == "prompt":
+                stats.prompts += 1
+                if think_ms:
+                    await asyncio.sleep(random.uniform(0, think_ms) / 1000)
+                if message["kind"] == "choice":
+                    value: Any = random.randrange(len(message["options"]))
+                else:
+                    value = random.choice(["过", "我是好人", "我觉得3号有问题"])
+                await ws.send(json.dumps({"type": "answer", "request_id": message["request_id"], "value": value}, ensure_ascii=False))
+                answered_at = time.perf_counter()
+            elif kind == "prompt_expired":
+                stats.expired += 1
+            elif kind == "error":
+                stats.problems.append(f"服务器返回错误：{message['message']}")
+            elif kind == "closed":
+                return message["reason"]
+    return "disconnected"
+
+
+async def run_room(websockets, url: str, index: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """创建一个房间并运行到对局结束"""
+    started = time.perf_counter()
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"type": "create", "board": "basic"}))
+        created = json.loads(await ws.recv())
+    if created["type"] != "created":
+        return {"reason": "create_failed", "seconds": 0.0, "clients": [], "problems": [created.get("message", "")]}
+    room_id = created["room"]
+
+    clients = [ClientStats() for _ in range(args.humans + args.spectators)]
+    tasks = []
+    # 观战和前面的真人先连上，最后一个真人入座后开始对局
+    for i in range(args.spectators):
+        ready = asyncio.Event()
+        tasks.append(asyncio.create_task(run_client(websockets, url, room_id, None, clients[args.humans + i], 0, ready)))
+        await ready.wait()
+    for i in range(args.humans):
+        ready = asyncio.Event()
+        last = i == args.humans - 1
+        tasks.append(asyncio.create_task(run_client(
+            websockets, url, room_id, f"bot{index}-{i + 1}", clients[i], args.think_ms, ready, start=last
+        )))
+        await ready.wait()
+
+    try:
+        reasons = await asyncio.wait_for(asyncio.gather(*tasks), args.timeout)
+        reason = reasons[0]
+    except asyncio.TimeoutError:
+        reason = "timeout"
+        for task in tasks:
+            task.cancel()
+    return {
+        "reason": reason,
+        "seconds": time.perf_counter() - started,
+        "clients": clients,
+        "problems": [p for c in clients for p in c.problems],
+    }
+
+
+async def print_server_stats(websockets, url: str) -> None:
+    """查询并输出服务器的资源统计"""
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.send(json.dumps({"type": "stats"}))
+        stats = json.loads(await ws.recv())
+    llm = stats["llm"]
+    print(f"  服务器：对局中 {stats['playing']}，排队 {stats['queued']}，已完成 {stats['games_finished']} 局，"
+          f"拒绝 {stats['rejected']} 次；LLM并发上限 {llm['limit'] or '不限'}，排队超时放弃 {llm['saturated']} 次")
+    rooms = [r for r in stats["room_stats"] if r["status"] == "finished" and r["reason"] == "game_over"]
+    if rooms:
+        def avg(key: str) -> float:
+            return sum(r[key] for r in rooms) / len(rooms)
+        print(f"  最近{len(rooms)}局平均：LLM调用 {avg('llm_calls'):.0f}次，token {avg('llm_tokens'):.0f}，"
+              f"排队 {avg('queued_s'):.1f}s，耗时 {avg('wall_time_s'):.1f}s，内存约 {avg('memory_kb'):.0f} KB，"
+              f"决策超时 {avg('timeouts'):.1f}次")
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        import websockets
+    except ImportError:
+        print("需要安装 websockets：pip install websockets")
+        return 2
+
+    semaphore = asyncio.Semaphore(args.concurrency or args.rooms)
+
+    async def limited(index: int) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await run_room(websockets, args.url, index, args)
+            except (OSError, websockets.WebSocketException) as e:
+                return {"reason": "connect_failed", "seconds": 0.0, "clients": [], "problems": [f"{type(e).__name__}: {e}"]}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(limited(i) for i in range(args.rooms)))
+    elapsed = time.perf_counter() - started
+
+    reasons: Dict[str, int] = {}
+    for result in results:
+        reasons[result["reason"]] = reasons.get(result["reason"], 0) + 1
+    clients = [c for r in results for c in r["clients"]]
+    durations = [r["seconds"] for r in results if r["reason"] == "game_over"]
+    latencies = [x * 1000 for c in clients for x in c.response_latency]
+    problems = [p for r in results for p in r["problems"]]
+
+    print(f"{args.rooms}个房间（每房间{args.humans}名真人、{args.spectators}名观战），总耗时 {elapsed:.1f}s")
+    print(f"  结束原因：{', '.join(f'{k} {v}' for k, v in sorted(reasons.items()))}")
+    queued = sum(1 for r in results if any(c.queued for c in r["clients"]))
+    if queued:
+        print(f"  排队开始的对局：{queued}")
+    moves = sum(c.moves for c in clients)
+    if moves:
+        print(f"  房间迁移后重连：{moves}次")
+    if durations:
+        print(f"  对局耗时：p50 {percentile(durations, 0.5):.1f}s  p95 {percentile(durations, 0.95):.1f}s  max {max(durations):.1f}s")
+    print(f"  输入请求：{sum(c.prompts for c in clients)}次，回复后服务器响应 p50 {percentile(latencies, 0.5):.1f}ms  p95 {percentile(latencies, 0.95):.1f}ms")
+    expired = sum(c.expired for c in clients)
+    if expired:
+        print(f"  超时后才回复（已由AI代为决策）：{expired}次")
+    print(f"  收到消息：{sum(c.messages for c in clients)}条，{sum(c.bytes for c in clients) / 1024:.0f} KB"
+          f"（事件 {sum(c.events for c in clients)}条）")
+    try:
+        await print_server_stats(websockets, args.url)
+    except (OSError, websockets.WebSocketException, KeyError):
+        pass
+
+    if problems:
+        for problem in problems[:10]:
+            print(f"\n❌ {problem}")
+        if len(problems) > 10:
+            print(f"\n……共 {len(problems)} 个问题")
+        return 1
+    if reasons.get("game_over", 0) != args.rooms:
+        print("\n❌ 部分对局未正常结束")
+        return 1
+    print("\n✅ 全部对局正常结束，状态同步连续")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="多人在线服务器压测")
+    parser.add_argument("--url", default="ws://127.0.0.1:8765", help="服务器地址（默认 ws://127.0.0.1:8765）")
+    parser.add_argument("--rooms", type=int, default=50, help="房间数（默认50）")
+    parser.add_argument("--humans", type=int, default=1, help="每个房间的真人机器人数（默认1）")
+    parser.add_argument("--spectators", type=int, default=0, help="每个房间的观战连接数（默认0）")
+    parser.add_argument("--think-ms", type=float, default=0, help="机器人回复前的最长思考时间（毫秒，默认0）")
+    parser.add_argument("--concurrency", type=int, default=0, help="同时进行的房间数上限（默认全部同时）")
+    parser.add_argument("--timeout", type=float, default=600, help="单个房间的超时（秒，默认600）")
+    args = parser.parse_args()
+    if args.humans < 1:
+        parser.error("--humans 至少为1（由真人开始对局）")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
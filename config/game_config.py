@@ -54,6 +54,8 @@ class GameConfig:
     ENABLE_FIRST_NIGHT = True  # 是否启用第一夜（所有角色认识身份）
     SPEECH_TIME_LIMIT = 60     # 发言时间限制（秒）
     VOTE_TIME_LIMIT = 30       # 投票时间限制（秒）
+    NARRATION_TIME_LIMIT = 10  # 主持人旁白时间限制（秒）
+    FALLBACK_TIME_LIMIT = 10   # 从发言/投票时限中预留给代为决策的时间（秒）：真人超时后AI代为决策，AI的LLM调用在此之前结束
 
     # AI配置
     AI_NAME_PREFIX = "AI-"     # AI玩家名称前缀
@@ -62,6 +64,16 @@ class GameConfig:
     # Redis配置
     GAME_KEY_PREFIX = "game:"  # Redis键前缀
 
+    # 节奏配置：各类停顿的时长（秒）
+    # tick: 逐条播报之间（如逐个唱票）
+    # line: 一名玩家发言或行动之后
+    # pause: 宣布结果、切换环节时的段落停顿
+    PACING_PROFILES: Dict[str, Dict[str, float]] = {
+        "interactive": {"tick": 0.3, "line": 0.5, "pause": 1.0},  # 真人对局
+        "fast": {"tick": 0.05, "line": 0.1, "pause": 0.2},        # 观战/调试
+        "zero": {"tick": 0.0, "line": 0.0, "pause": 0.0},         # 纯AI对局、模拟
+    }
+
     # 胜利判断配置
     victory_check_config = {
         # 是否允许已分胜负时猎人开枪（可能逆转结果）
@@ -0,0 +1,91 @@
+"""
+LLM生成配置模块 - 按调用类型划分的生成参数
+"""
+from typing import Dict, Any
+from config.game_config import GameConfig
+
+
+# 不同调用类型的生成参数
+# - max_tokens: 最大输出token数（None表示不限制）
+# - stop: 停止序列（None表示不设置）
+# - temperature: 生成温度
+# - model: 使用的模型（None表示使用路由配置的模型，见 config/settings.py）
+# - deadline: 单次调用的总时限（秒，含重试），由对应阶段的时间预算推出
+#   玩家决策的预算从发言/投票时限中扣除 FALLBACK_TIME_LIMIT，LLM调用失败后的启发式兜底在决策时限之前完成
+SPEECH_BUDGET = GameConfig.SPEECH_TIME_LIMIT - GameConfig.FALLBACK_TIME_LIMIT
+VOTE_BUDGET = GameConfig.VOTE_TIME_LIMIT - GameConfig.FALLBACK_TIME_LIMIT
+
+GENERATION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "max_tokens": None,
+        "stop": None,
+        "temperature": GameConfig.AI_TEMPERATURE,
+        "model": None,
+        "deadline": GameConfig.SPEECH_TIME_LIMIT,
+    },
+    # 白天发言（50-100字）
+    # 发言前还要更新角色推理，两者平分一次发言的时间预算
+    "speech": {
+        "max_tokens": 256,
+        "deadline": SPEECH_BUDGET / 2,
+    },
+    # 警长竞选演讲（80-150字）
+    "campaign": {
+        "max_tokens": 320,
+        "deadline": SPEECH_BUDGET,
+    },
+    # 狼人频道讨论（30-80字）
+    "werewolf_discussion": {
+        "max_tokens": 200,
+        "deadline": SPEECH_BUDGET,
+    },
+    # 单个玩家ID的决策（投票、杀人、查验、警徽传递）
+    "decision": {
+        "max_tokens": 16,
+        "stop": ["\n"],
+        "deadline": VOTE_BUDGET,
+    },
+    # yes/no 决策（是否竞选警长）
+    "candidacy": {
+        "max_tokens": 8,
+        "stop": ["\n"],
+        "deadline": VOTE_BUDGET,
+    },
+    # 角色推理JSON
+    "beliefs": {
+        "max_tokens": 1536,
+        "deadline": SPEECH_BUDGET / 2,
+    },
+    # 主持人旁白（1-3句话）
+    "narration": {
+        "max_tokens": 200,
+        "temperature": 0.7,
+        "deadline": GameConfig.NARRATION_TIME_LIMIT,
+    },
+}
+
+
+class LLMConfig:
+    """LLM生成配置类"""
+
+    @staticmethod
+    def get_profile(name: str) -> Dict[str, Any]:
+        """
+        获取指定调用类型的生成参数
+
+        未设置的字段使用default配置补齐，未知类型返回default配置
+
+        Args:
+            name: 调用类型名称（如 "speech", "decision"）
+
+        Returns:
+            Dict[str, Any]: 完整的生成参数
+        """
+        profile = dict(GENERATION_PROFILES["default"])
+        profile.update(GENERATION_PROFILES.get(name, {}))
+        return profile
+
+    @staticmethod
+    def validate_profile(name: str) -> bool:
+        """验证调用类型是否存在"""
+        return name in GENERATION_PROFILES
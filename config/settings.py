@@ -2,12 +2,38 @@
 配置管理模块 - 从环境变量加载配置
 """
 import os
+from typing import Dict, List
 from dotenv import load_dotenv
 
 # 加载.env文件
 load_dotenv()
 
 
+def _parse_endpoints(value: str) -> List[Dict[str, str]]:
+    """
+    解析LLM后端列表
+
+    格式："地址|密钥;地址|密钥"，密钥省略时使用DEEPSEEK_API_KEY
+
+    Args:
+        value: 环境变量值
+
+    Returns:
+        List[Dict[str, str]]: [{"base_url": ..., "api_key": ...}, ...]
+    """
+    endpoints = []
+    for item in value.split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        base_url, _, api_key = item.partition("|")
+        endpoints.append({
+            "base_url": base_url.strip(),
+            "api_key": api_key.strip() or os.getenv("DEEPSEEK_API_KEY", ""),
+        })
+    return endpoints
+
+
 class Settings:
     """全局配置类"""
 
@@ -15,6 +41,88 @@ class Settings:
     DEEPSEEK_API_KEY: str = os.getenv("DEEPSEEK_API_KEY", "")
     DEEPSEEK_BASE_URL: str = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
 
+    # LLM后端池：多个OpenAI兼容接口（格式见 _parse_endpoints），未配置时只使用DeepSeek
+    LLM_ENDPOINTS: List[Dict[str, str]] = _parse_endpoints(os.getenv("LLM_ENDPOINTS", "")) or [
+        {"base_url": DEEPSEEK_BASE_URL, "api_key": DEEPSEEK_API_KEY}
+    ]
+    LLM_BACKEND_FAILURE_THRESHOLD: int = int(os.getenv("LLM_BACKEND_FAILURE_THRESHOLD", "3"))  # 连续失败几次后摘除
+    LLM_BACKEND_COOLDOWN: float = float(os.getenv("LLM_BACKEND_COOLDOWN", "30"))  # 摘除后多久重新探测（秒）
+
+    # LLM重试与对冲请求配置
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))                 # 可重试错误的最大重试次数
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # 退避基准时长（秒）
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "4"))      # 单次退避上限（秒）
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))  # 超过该分位延迟后发出对冲请求
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))    # 样本不足时不对冲
+
+    # LLM熔断配置：连续失败后直接走本地启发式策略，不再等待网络
+    LLM_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "3"))  # 连续失败几次后熔断
+    LLM_BREAKER_RESET_TIMEOUT: float = float(os.getenv("LLM_BREAKER_RESET_TIMEOUT", "30"))    # 熔断后多久发出探测（秒）
+    LLM_BREAKER_HALF_OPEN_PROBES: int = int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", "1"))    # 半开状态同时放行的探测数
+
+    # LLM HTTP连接池配置（同步和异步调用各一个连接池，所有后端和模型实例共享）
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))     # 最大连接数
+    LLM_HTTP_MAX_KEEPALIVE: int = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))         # 最大空闲保活连接数
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))  # 空闲连接保活时长（秒）
+    LLM_HTTP2: bool = os.getenv("LLM_HTTP2", "true").lower() == "true"                   # 启用HTTP/2（需要安装h2）
+    LLM_WARM_UP: bool = os.getenv("LLM_WARM_UP", "true").lower() == "true"               # 游戏设置阶段预先建立连接
+
+    # LLM录制/回放配置
+    # LLM_CASSETTE_MODE: off（默认）/ record（录制每次调用）/ replay（只从录制文件返回响应，不访问网络）
+    # LLM_CASSETTE_MATCH: hash（按调用标签+提示词匹配）/ sequence（按调用顺序）
+    LLM_CASSETTE_MODE: str = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+    LLM_CASSETTE_PATH: str = os.getenv("LLM_CASSETTE_PATH", "storage/cassettes/llm_cassette.jsonl")
+    LLM_CASSETTE_MATCH: str = os.getenv("LLM_CASSETTE_MATCH", "hash").lower()
+    LLM_CASSETTE_REPLAY_LATENCY: bool = os.getenv("LLM_CASSETTE_REPLAY_LATENCY", "false").lower() == "true"  # 回放时模拟录制的耗时
+
+    # LLM遥测配置
+    # 流式调用可以测量首token延迟，但当前版本的langchain_openai流式响应不含token用量
+    LLM_STREAM: bool = os.getenv("LLM_STREAM", "false").lower() == "true"
+    LLM_PRICE_INPUT_PER_M: float = float(os.getenv("LLM_PRICE_INPUT_PER_M", "2"))    # 输入单价（元/百万token）
+    LLM_PRICE_OUTPUT_PER_M: float = float(os.getenv("LLM_PRICE_OUTPUT_PER_M", "8"))  # 输出单价（元/百万token）
+
+    # 追踪配置：每局导出Chrome trace格式的阶段/决策/LLM调用时间线
+    TRACE_ENABLED: bool = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+    TRACE_DIR: str = os.getenv("TRACE_DIR", "storage/traces")
+
+    # 游戏节奏配置（见 GameConfig.PACING_PROFILES）
+    GAME_PACING: str = os.getenv("GAME_PACING", "interactive").lower()
+    GAME_PACING_VIRTUAL: bool = os.getenv("GAME_PACING_VIRTUAL", "false").lower() == "true"  # 虚拟时间：停顿只推进虚拟时钟，不真正等待
+
+    # 游戏日志配置
+    GAME_LOG_DIR: str = os.getenv("GAME_LOG_DIR", "storage/game_logs")
+    GAME_ARCHIVE_DIR: str = os.getenv("GAME_ARCHIVE_DIR", "storage/archive")  # 压缩归档（python -m storage.log_archive）
+    ANALYTICS_DB_PATH: str = os.getenv("ANALYTICS_DB_PATH", "storage/analytics.db")  # 分析库（python -m storage.analytics_db）
+    GAME_EVENT_LOG: bool = os.getenv("GAME_EVENT_LOG", "true").lower() == "true"  # 游戏进行中写入JSONL事件流
+    GAME_EVENT_LOG_FLUSH_INTERVAL: float = float(os.getenv("GAME_EVENT_LOG_FLUSH_INTERVAL", "1.0"))  # 秒
+
+    # LLM路由配置
+    # fast: 小而快的模型，用于决策、推理更新和主持人旁白
+    # strong: 能力更强的模型，用于发言
+    # 未单独配置后端的路由使用 LLM_ENDPOINTS
+    LLM_FAST_MODEL: str = os.getenv("LLM_FAST_MODEL", "deepseek-chat")
+    LLM_FAST_ENDPOINTS: List[Dict[str, str]] = _parse_endpoints(os.getenv("LLM_FAST_ENDPOINTS", "")) or LLM_ENDPOINTS
+    LLM_FAST_SLO_MS: int = int(os.getenv("LLM_FAST_SLO_MS", "3000"))
+
+    LLM_STRONG_MODEL: str = os.getenv("LLM_STRONG_MODEL", "deepseek-chat")
+    LLM_STRONG_ENDPOINTS: List[Dict[str, str]] = _parse_endpoints(os.getenv("LLM_STRONG_ENDPOINTS", "")) or LLM_ENDPOINTS
+    LLM_STRONG_SLO_MS: int = int(os.getenv("LLM_STRONG_SLO_MS", "8000"))
+    # 每条路由计算p95延迟时保留的最近调用数（窗口越小，对延迟变化的反应越快）
+    LLM_ROUTE_STATS_WINDOW: int = int(os.getenv("LLM_ROUTE_STATS_WINDOW", "200"))
+
+    # 调用类型 -> 路由名称（未列出的调用类型走 LLM_DEFAULT_ROUTE）
+    LLM_DEFAULT_ROUTE: str = os.getenv("LLM_DEFAULT_ROUTE", "strong")
+    LLM_PROFILE_ROUTES: Dict[str, str] = {
+        "speech": "strong",
+        "campaign": "strong",
+        "werewolf_discussion": "strong",
+        "decision": "fast",
+        "candidacy": "fast",
+        "beliefs": "fast",
+        "narration": "fast",
+    }
+
     # Redis配置
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
@@ -22,14 +130,49 @@ class Settings:
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
     REDIS_EXPIRE_TIME: int = int(os.getenv("REDIS_EXPIRE_TIME", "86400"))
 
+    # 游戏检查点存储：redis / file / memory / off（键为 GAME_KEY_PREFIX + 游戏ID，过期时间 REDIS_EXPIRE_TIME）
+    # file 后端单机可用，进程重启后可用 python main.py --resume <游戏ID> 继续
+    STATE_STORE: str = os.getenv("STATE_STORE", "file").lower()
+    STATE_STORE_DIR: str = os.getenv("STATE_STORE_DIR", "storage/checkpoints")
+    # 检查点编码：binary（紧凑二进制快照）/ json（便于人工查看）
+    CHECKPOINT_FORMAT: str = os.getenv("CHECKPOINT_FORMAT", "binary").lower()
+    # 状态事件日志每隔多少条事件保存一次快照
+    STATE_SNAPSHOT_INTERVAL: int = int(os.getenv("STATE_SNAPSHOT_INTERVAL", "50"))
+    # 客户端增量同步：落后超过多少条事件时改发完整状态
+    STATE_SYNC_MAX_DELTA: int = int(os.getenv("STATE_SYNC_MAX_DELTA", "200"))
+
+    # 多人在线服务器（python -m server.ws_server）
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8765"))
+    SERVER_MAX_ROOMS: int = int(os.getenv("SERVER_MAX_ROOMS", "500"))
+    # 同时进行的对局上限（超过后排队），排队上限
+    SERVER_MAX_GAMES: int = int(os.getenv("SERVER_MAX_GAMES", "200"))
+    SERVER_MAX_QUEUE: int = int(os.getenv("SERVER_MAX_QUEUE", "500"))
+    # 所有对局同时进行的LLM调用上限（0表示不限）
+    SERVER_MAX_LLM_IN_FLIGHT: int = int(os.getenv("SERVER_MAX_LLM_IN_FLIGHT", "64"))
+    # 单个对局的时长上限（秒，0表示不限）
+    SERVER_ROOM_MAX_SECONDS: float = float(os.getenv("SERVER_ROOM_MAX_SECONDS", "3600"))
+    # 单个对局的LLM预算：实际发出的调用次数和输入+输出token总数（0表示不限），用完后剩余决策使用启发式策略
+    SERVER_ROOM_MAX_LLM_CALLS: int = int(os.getenv("SERVER_ROOM_MAX_LLM_CALLS", "1000"))
+    SERVER_ROOM_MAX_LLM_TOKENS: int = int(os.getenv("SERVER_ROOM_MAX_LLM_TOKENS", "3000000"))
+    # 向一个连接发送消息的时限（秒）：不读取消息的慢连接超时后丢弃这条消息，房间结束时不再等待其积压
+    SERVER_SEND_TIMEOUT: float = float(os.getenv("SERVER_SEND_TIMEOUT", "5"))
+    # 断线重连凭证的签名密钥（多进程部署时各工作进程必须相同，留空时每次启动随机生成）
+    SERVER_SECRET: str = os.getenv("SERVER_SECRET", "")
+    # 多进程部署（python -m server.supervisor）：工作进程数（0表示CPU核数），
+    # 排空工作进程时等待房间迁移的时限（秒）
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))
+    SERVER_DRAIN_TIMEOUT: float = float(os.getenv("SERVER_DRAIN_TIMEOUT", "120"))
+    # 工作进程的控制连接凭证（由 supervisor 生成并传给工作进程，无需手动设置）
+    SERVER_CONTROL_TOKEN: str = os.getenv("SERVER_CONTROL_TOKEN", "")
+
     @classmethod
     def validate(cls) -> bool:
         """验证配置是否完整"""
         if not cls.DEEPSEEK_API_KEY:
             raise ValueError("DEEPSEEK_API_KEY is required in .env file")
-        # Redis配置验证已禁用，因为当前版本不使用Redis
-        # if not cls.REDIS_HOST:
-        #     raise ValueError("REDIS_HOST is required in .env file")
+        if cls.STATE_STORE == "redis" and not cls.REDIS_HOST:
+            raise ValueError("REDIS_HOST is required when STATE_STORE=redis")
         return True
 
 
@@ -0,0 +1,336 @@
+"""
+游戏事件总线 - 引擎只发布事件，由订阅者负责输出
+
+订阅者（终端渲染、日志、统计、网络广播等）各自拥有独立的队列和消费任务，
+发布事件不会等待任何订阅者；慢订阅者的积压按策略缓冲或丢弃，不影响游戏进程
+"""
+import json
+import time
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Optional, Dict, Any, List, Deque, FrozenSet, Iterable, Callable, Awaitable
+
+
+class GameEventType(Enum):
+    """游戏事件类型"""
+    MESSAGE = "message"            # 普通提示/系统消息
+    PHASE_CHANGE = "phase_change"  # 阶段切换（夜晚、白天、投票、警长竞选）
+    NARRATION = "narration"        # 上帝旁白
+    SPEECH = "speech"              # 玩家发言（白天、竞选、狼人频道）
+    VOTE = "vote"                  # 投票（放逐、警长选举）
+    DEATH = "death"                # 死亡（夜晚死亡、放逐、猎人开枪）
+    SHERIFF = "sheriff"            # 警长相关（竞选、当选、传递、撕毁）
+    NIGHT_ACTION = "night_action"  # 夜间行动结果（仅行动者可见）
+    GAME_END = "game_end"          # 游戏结束
+
+
+class GameEvent:
+    """
+    游戏事件
+
+    text 是终端渲染用的文本；data 是结构化字段，供日志、统计和网络客户端使用
+    """
+
+    def __init__(
+        self,
+        event_type: GameEventType,
+        text: str = "",
+        data: Optional[Dict[str, Any]] = None,
+        visible_to: Optional[Iterable[int]] = None,
+        game_id: Optional[str] = None,
+        round_number: int = 0,
+        phase: str = ""
+    ):
+        """
+        Args:
+            event_type: 事件类型
+            text: 渲染文本
+            data: 结构化数据
+            visible_to: 可见玩家ID，None表示公开
+            game_id: 游戏ID
+            round_number: 回合数
+            phase: 当前阶段
+        """
+        self.type = event_type
+        self.text = text
+        self.data = data or {}
+        self.visible_to: Optional[FrozenSet[int]] = frozenset(visible_to) if visible_to is not None else None
+        self.game_id = game_id
+        self.round_number = round_number
+        self.phase = phase
+        self.seq = 0  # 发布时由总线分配
+        self.timestamp = time.time()
+        self._json: Optional[str] = None
+
+    def is_visible_to(self, player_id: Optional[int]) -> bool:
+        """
+        判断事件对某个观察者是否可见
+
+        Args:
+            player_id: 玩家ID，None表示上帝视角（全部可见）
+        """
+        return self.visible_to is None or player_id is None or player_id in self.visible_to
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于日志和网络传输）"""
+        return {
+            "seq": self.seq,
+            "type": self.type.value,
+            "game_id": self.game_id,
+            "round": self.round_number,
+            "phase": self.phase,
+            "timestamp": round(self.timestamp, 3),
+            "text": self.text,
+            "data": self.data,
+            "visible_to": sorted(self.visible_to) if self.visible_to is not None else None,
+        }
+
+    def to_json(self) -> str:
+        """序列化为JSON（结果缓存，同一事件发给多个连接时只序列化一次）"""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), ensure_ascii=False)
+        return self._json
+
+
+# 订阅者：接收一个事件的异步函数（或实现了 async __call__ 的对象）
+EventHandler = Callable[[GameEvent], Awaitable[None]]
+
+
+class Subscription:
+    """
+    单个订阅者的队列和消费任务
+
+    溢出策略：
+    - buffer：无上限缓冲，不丢事件（终端、日志）
+    - drop：队列满时丢弃最旧的事件（统计、网络广播）
+    """
+
+    OVERFLOW_POLICIES = ("buffer", "drop")
+
+    def __init__(self, name: str, handler: EventHandler, max_queue: int = 1000, overflow: str = "drop"):
+        """
+        Args:
+            name: 订阅者名称
+            handler: 事件处理函数
+            max_queue: drop策略下的队列上限
+            overflow: 溢出策略 buffer / drop
+        """
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.name = name
+        self.handler = handler
+        self.overflow = overflow
+        self.queue: Deque[GameEvent] = deque(maxlen=max_queue if overflow == "drop" else None)
+
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_backlog = 0
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def offer(self, event: GameEvent) -> None:
+        """放入一个事件（不等待）"""
+        if self._closed:
+            return
+        if self.queue.maxlen is not None and len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        self.max_backlog = max(self.max_backlog, len(self.queue))
+        self._ensure_task()
+        self._idle.clear()
+        self._wakeup.set()
+
+    def _ensure_task(self) -> None:
+        """首次有事件时在当前事件循环中启动消费任务"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run(), name=f"event-{self.name}")
+
+    async def _run(self) -> None:
+        """消费循环"""
+        while True:
+            while not self.queue:
+                self._idle.set()
+                if self._closed:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            event = self.queue.popleft()
+            try:
+                await self.handler(event)
+                self.delivered += 1
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"事件订阅者 {self.name} 处理失败: {type(e).__name__}: {e}")
+
+    async def drain(self) -> None:
+        """等待队列中已有的事件全部处理完"""
+        if self._task is not None and not self._task.done():
+            await self._idle.wait()
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """
+        处理完剩余事件后停止消费任务（订阅者有 aclose() 时一并调用）
+
+        Args:
+            timeout: 等待剩余事件处理完的时限（秒），超时后丢弃剩余事件并取消消费任务；None表示一直等待
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            done, _ = await asyncio.wait({self._task}, timeout=timeout)
+            if not done:
+                self.dropped += len(self.queue)
+                self.queue.clear()
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+        closer = getattr(self.handler, "aclose", None)
+        if closer is not None:
+            await closer()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取订阅者统计"""
+        return {
+            "overflow": self.overflow,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "backlog": len(self.queue),
+            "max_backlog": self.max_backlog,
+        }
+
+
+class EventBus:
+    """
+    事件总线
+
+    职责：
+    - 为事件分配序号并分发给所有订阅者（同步、不阻塞）
+    - 在需要同步输出时（如等待真人输入前）等待订阅者处理完积压
+    """
+
+    def __init__(self):
+        self.subscriptions: List[Subscription] = []
+        self._seq = 0
+
+    def subscribe(
+        self,
+        handler: EventHandler,
+        name: Optional[str] = None,
+        max_queue: int = 1000,
+        overflow: str = "drop"
+    ) -> Subscription:
+        """
+        添加订阅者
+
+        Args:
+            handler: 事件处理函数
+            name: 订阅者名称（默认使用处理函数的类名/函数名）
+            max_queue: drop策略下的队列上限
+            overflow: 溢出策略 buffer / drop
+
+        Returns:
+            Subscription: 订阅（可用于取消订阅和查看统计）
+        """
+        if name is None:
+            name = getattr(handler, "__name__", type(handler).__name__)
+        subscription = Subscription(name, handler, max_queue, overflow)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        """取消订阅（处理完已排队的事件）"""
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        await subscription.close()
+
+    def publish(self, event: GameEvent) -> GameEvent:
+        """
+        发布事件
+
+        Args:
+            event: 事件
+
+        Returns:
+            GameEvent: 已分配序号的事件
+        """
+        self._seq += 1
+        event.seq = self._seq
+        for subscription in self.subscriptions:
+            subscription.offer(event)
+        return event
+
+    async def drain(self, overflow: Optional[str] = None) -> None:
+        """
+        等待订阅者处理完已发布的事件
+
+        Args:
+            overflow: 只等待该溢出策略的订阅者（如 buffer：终端和日志，不等待网络连接），None表示全部
+        """
+        for subscription in list(self.subscriptions):
+            if overflow is None or subscription.overflow == overflow:
+                await subscription.drain()
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """
+        处理完剩余事件后关闭所有订阅者
+
+        Args:
+            timeout: drop策略订阅者（网络连接等）处理剩余事件的时限（秒），None表示一直等待；
+                buffer策略的订阅者（终端、日志）总是处理完全部事件
+        """
+        await asyncio.gather(*(
+            subscription.close(timeout if subscription.overflow == "drop" else None)
+            for subscription in list(self.subscriptions)
+        ))
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各订阅者统计"""
+        return {s.name: s.get_stats() for s in self.subscriptions}
+
+
+class EventMetrics:
+    """统计订阅者：按类型计数，并记录事件从发布到被处理的延迟"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.max_lag_ms = 0.0
+
+    async def __call__(self, event: GameEvent) -> None:
+        self.counts[event.type.value] = self.counts.get(event.type.value, 0) + 1
+        self.max_lag_ms = max(self.max_lag_ms, (time.time() - event.timestamp) * 1000)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"counts": dict(self.counts), "max_lag_ms": round(self.max_lag_ms, 1)}
+
+
+class BroadcastSubscriber:
+    """
+    网络广播订阅者：把观察者可见的事件发送给一个远程连接
+
+    每个连接单独订阅（drop策略），一个慢连接不会拖住其他连接
+    """
+
+    def __init__(self, send: Callable[[Dict[str, Any]], Awaitable[None]], viewer_id: Optional[int] = None):
+        """
+        Args:
+            send: 发送函数（接收事件字典）
+            viewer_id: 观察者玩家ID，None表示上帝视角
+        """
+        self.send = send
+        self.viewer_id = viewer_id
+
+    async def __call__(self, event: GameEvent) -> None:
+        if event.is_visible_to(self.viewer_id):
+            await self.send(event.to_dict())
@@ -1,10 +1,13 @@
 """
 游戏状态管理
+
+规则状态的修改都通过 apply() 提交一条状态事件（见 core.state_events），由统一的归约函数执行
 """
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable
 from players.player import Player
-from roles.base_role import RoleCamp
+from roles.base_role import BaseRole, RoleCamp
+from roles.role_factory import RoleFactory
+from core.state_events import StateEvent, StateEventType, StateJournal, reduce
 
 
 class GameState:
@@ -36,7 +39,7 @@ class GameState:
 
         # 历史记录
         self.conversation_history: List[Dict[str, Any]] = []
-        self.action_history: List[Dict[str, Any]] = []
+        self.action_history: List[Dict[str, Any]] = []  # 决策超时等行动记录（见 StateEventType.DECISION_TIMEOUT）
 
         # 私密对话系统（阵营内部对话）
         self.private_conversations: Dict[str, List[Dict]] = {
@@ -72,42 +75,68 @@ class GameState:
         #   }
         # ]
 
-    def add_speech(self, round_num: int, player: Player, content: str):
-        """记录玩家发言"""
-        self.conversation_history.append({
-            "round": round_num,
-            "phase": self.current_phase,
-            "player_id": player.id,
-            "player_name": player.name,
-            "action_type": "speech",
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        })
+        # 状态事件日志（开局后由游戏主类设置，None时只应用不记录）
+        self.journal: Optional[StateJournal] = None
+
+    def apply(self, event_type: StateEventType, **data) -> Any:
+        """
+        提交一条状态事件：应用到当前状态并追加到状态日志
+
+        Args:
+            event_type: 事件类型
+            **data: 事件数据（只包含玩家ID等可序列化的值）
+
+        Returns:
+            归约结果（见 core.state_events.reduce）
+        """
+        event = StateEvent(event_type, data)
+        result = reduce(self, event)
+        if self.journal is not None:
+            self.journal.record(self, event)
+        return result
+
+    def add_speech(self, round_num: int, player: Player, content: str, channel: str = "day"):
+        """
+        记录玩家发言
+
+        Args:
+            round_num: 轮次
+            player: 发言玩家
+            content: 发言内容
+            channel: day（白天发言，同时计入玩家的发言历史）/ campaign（警长竞选）
+        """
+        self.apply(StateEventType.SPEECH, round=round_num, player_id=player.id, content=content, channel=channel)
 
     def add_vote(self, round_num: int, voter: Player, target: Player):
         """记录投票"""
-        self.conversation_history.append({
-            "round": round_num,
-            "phase": "vote",
-            "player_id": voter.id,
-            "player_name": voter.name,
-            "action_type": "vote",
-            "content": f"投票给{target.name}",
-            "target_id": target.id,
-            "timestamp": datetime.now().isoformat()
-        })
+        self.apply(StateEventType.VOTE, round=round_num, voter_id=voter.id, target_id=target.id)
 
     def add_announcement(self, round_num: int, content: str):
         """记录系统公告（夜晚死亡、投票结果等）"""
-        self.conversation_history.append({
-            "round": round_num,
-            "phase": self.current_phase,
-            "player_id": 0,  # 0表示系统
-            "player_name": "系统",
-            "action_type": "announcement",
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        })
+        self.apply(StateEventType.ANNOUNCEMENT, round=round_num, content=content)
+
+    def add_timeout(self, player: Player, decision: str, fallback: str, limit: float, public: bool = True):
+        """
+        记录决策超时
+
+        Args:
+            player: 超时的玩家
+            decision: 决策名称（如 make_speech、vote）
+            fallback: 代为决策的方式（ai / heuristic）
+            limit: 超时前可用的时间（秒）
+            public: 是否公开（夜晚决策的超时只有本人可见）
+        """
+        self.apply(
+            StateEventType.DECISION_TIMEOUT, round=self.round_number, player_id=player.id,
+            decision=decision, fallback=fallback, limit=limit, public=public
+        )
+
+    def get_timeouts(self, player_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """获取决策超时记录（可按玩家过滤）"""
+        return [
+            r for r in self.action_history
+            if r['action_type'] == 'timeout' and (player_id is None or r['player_id'] == player_id)
+        ]
 
     def get_full_conversation_history(self) -> str:
         """获取格式化的完整对话历史"""
@@ -206,38 +235,12 @@ class GameState:
 
     def process_night_deaths(self) -> List[Player]:
         """
-        处理夜晚的死亡
+        处理夜晚的死亡（狼人击杀、女巫解药和毒药），并重置夜晚状态
 
         Returns:
             List[Player]: 死亡的玩家列表
         """
-        deaths = []
-
-        # 处理狼人杀人
-        if self.tonight_victim and not self.saved_tonight:
-            self.tonight_victim.is_alive = False
-            deaths.append(self.tonight_victim)
-            self.last_night_victim_name = self.tonight_victim.name
-
-        # 处理女巫毒人
-        if self.poisoned_tonight:
-            for victim in self.poisoned_tonight:
-                if victim.is_alive:
-                    victim.is_alive = False
-                    deaths.append(victim)
-
-        # 更新存活/死亡列表
-        for dead_player in deaths:
-            if dead_player in self.alive_players:
-                self.alive_players.remove(dead_player)
-                self.dead_players.append(dead_player)
-
-        # 重置夜晚状态
-        self.tonight_victim = None
-        self.poisoned_tonight = []
-        self.saved_tonight = False
-
-        return deaths
+        return self.apply(StateEventType.NIGHT_RESOLVED)
 
     def add_private_speech(
         self,
@@ -247,15 +250,7 @@ class GameState:
         content: str
     ):
         """记录私密对话（只对同阵营可见）"""
-        self.private_conversations[camp].append({
-            "round": round_num,
-            "phase": "night_private",
-            "player_id": player.id,
-            "player_name": player.name,
-            "action_type": "private_speech",
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        })
+        self.apply(StateEventType.PRIVATE_SPEECH, camp=camp, round=round_num, player_id=player.id, content=content)
 
     def get_private_conversation_history(
         self,
@@ -295,8 +290,7 @@ class GameState:
 
     def reset_votes(self):
         """重置所有玩家的投票数"""
-        for player in self.all_players:
-            player.reset_votes()
+        self.apply(StateEventType.VOTES_RESET)
 
     def set_sheriff(self, player_id: Optional[int]) -> None:
         """
@@ -305,16 +299,7 @@ class GameState:
         Args:
             player_id: 警长玩家ID，None表示清除警长
         """
-        # 清除旧警长标记
-        for p in self.all_players:
-            p.is_sheriff = False
-
-        # 设置新警长
-        self.sheriff_player_id = player_id
-        if player_id:
-            player = next((p for p in self.all_players if p.id == player_id), None)
-            if player:
-                player.is_sheriff = True
+        self.apply(StateEventType.SHERIFF_CHANGED, player_id=player_id)
 
     def get_sheriff(self) -> Optional[Player]:
         """
@@ -414,30 +399,24 @@ class GameState:
     def record_witch_action(
         self,
         round_num: int,
+        witch: Player,
         action_type: str,  # "save"/"poison"/"skip"
-        target: Optional['Player'],
-        remaining_antidote: bool,
-        remaining_poison: bool
+        target: Optional['Player']
     ) -> None:
         """
-        记录女巫用药历史
+        女巫行动：使用解药或毒药（跳过则不用药），并记录用药历史
 
         Args:
             round_num: 轮次
+            witch: 女巫玩家
             action_type: 行动类型（save/poison/skip）
             target: 目标玩家（如果是skip则为None）
-            remaining_antidote: 剩余解药
-            remaining_poison: 剩余毒药
-        """
-        self.witch_action_history.append({
-            "round": round_num,
-            "action_type": action_type,
-            "target_name": target.name if target else "无",
-            "target_id": target.id if target else 0,
-            "remaining_antidote": remaining_antidote,
-            "remaining_poison": remaining_poison,
-            "timestamp": datetime.now().isoformat()
-        })
+        """
+        self.apply(
+            StateEventType.WITCH_ACTION,
+            round=round_num, witch_id=witch.id, action=action_type,
+            target_id=target.id if target else None
+        )
 
     def get_witch_action_summary(self) -> str:
         """
@@ -518,6 +497,130 @@ class GameState:
 
         return ""
 
+    # 角色对象上需要随检查点保存的状态字段
+    ROLE_STATE_FIELDS = ("checked_players", "has_antidote", "has_poison", "used_antidote_on_self", "can_shoot")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出为可JSON序列化的字典（用于检查点）
+
+        玩家对象按ID引用；角色的可变状态（查验记录、药水、开枪权）和AI的角色推理一并保存
+
+        Returns:
+            Dict[str, Any]: 状态字典
+        """
+        def ids(players: List[Player]) -> List[int]:
+            return [p.id for p in players]
+
+        def player_id(player: Optional[Player]) -> Optional[int]:
+            return player.id if player else None
+
+        players = []
+        for p in self.all_players:
+            players.append({
+                "id": p.id,
+                "name": p.name,
+                "kind": "ai" if hasattr(p, "role_beliefs") else "human",
+                "role": p.role.role_type.name,
+                "is_alive": p.is_alive,
+                "is_sheriff": p.is_sheriff,
+                "seat_number": p.seat_number,
+                "votes_received": p.votes_received,
+                "speech_history": list(p.speech_history),
+                "role_state": {
+                    field: getattr(p.role, field) for field in self.ROLE_STATE_FIELDS
+                    if hasattr(p.role, field)
+                },
+                "role_beliefs": getattr(p, "role_beliefs", None),
+            })
+
+        return {
+            "game_id": self.game_id,
+            "round_number": self.round_number,
+            "current_phase": self.current_phase,
+            "board_config": self.board_config,
+            "players": players,
+            "alive_players": ids(self.alive_players),
+            "dead_players": ids(self.dead_players),
+            "tonight_victim": player_id(self.tonight_victim),
+            "poisoned_tonight": ids(self.poisoned_tonight),
+            "saved_tonight": self.saved_tonight,
+            "today_voted_out": player_id(self.today_voted_out),
+            "conversation_history": self.conversation_history,
+            "action_history": self.action_history,
+            "private_conversations": self.private_conversations,
+            "werewolf_discussion_round": self.werewolf_discussion_round,
+            "werewolf_kill_votes": [[k, v] for k, v in self.werewolf_kill_votes.items()],
+            "last_werewolf_target": self.last_werewolf_target,
+            "last_night_victim_name": self.last_night_victim_name,
+            "seer_check_results": [[k, v] for k, v in self.seer_check_results.items()],
+            "sheriff_player_id": self.sheriff_player_id,
+            "sheriff_election_done": self.sheriff_election_done,
+            "speaking_order_direction": self.speaking_order_direction,
+            "last_death_seat": self.last_death_seat,
+            "witch_action_history": self.witch_action_history,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], create_player: Callable[[Dict[str, Any], BaseRole], Player]) -> 'GameState':
+        """
+        从检查点字典恢复（to_dict 的逆操作）
+
+        Args:
+            data: to_dict 导出的状态字典
+            create_player: 玩家构造函数，接收玩家记录和已恢复状态的角色，返回玩家对象
+                          （真人/AI玩家的构造依赖游戏实例，由调用方提供）
+
+        Returns:
+            GameState: 恢复后的游戏状态
+        """
+        state = cls()
+
+        players: Dict[int, Player] = {}
+        for record in data["players"]:
+            role = RoleFactory.create_role(record["role"].lower())
+            for field, value in record.get("role_state", {}).items():
+                setattr(role, field, value)
+
+            player = create_player(record, role)
+            player.is_alive = record["is_alive"]
+            player.is_sheriff = record["is_sheriff"]
+            player.seat_number = record["seat_number"]
+            player.votes_received = record["votes_received"]
+            player.speech_history = list(record["speech_history"])
+            if record.get("role_beliefs") is not None and hasattr(player, "role_beliefs"):
+                player.role_beliefs = record["role_beliefs"]
+            players[player.id] = player
+
+        def lookup(player_id: Optional[int]) -> Optional[Player]:
+            return players[player_id] if player_id is not None else None
+
+        state.game_id = data["game_id"]
+        state.round_number = data["round_number"]
+        state.current_phase = data["current_phase"]
+        state.board_config = data["board_config"]
+        state.all_players = list(players.values())
+        state.alive_players = [players[pid] for pid in data["alive_players"]]
+        state.dead_players = [players[pid] for pid in data["dead_players"]]
+        state.tonight_victim = lookup(data["tonight_victim"])
+        state.poisoned_tonight = [players[pid] for pid in data["poisoned_tonight"]]
+        state.saved_tonight = data["saved_tonight"]
+        state.today_voted_out = lookup(data["today_voted_out"])
+        state.conversation_history = data["conversation_history"]
+        state.action_history = data["action_history"]
+        state.private_conversations = data["private_conversations"]
+        state.werewolf_discussion_round = data["werewolf_discussion_round"]
+        state.werewolf_kill_votes = {k: v for k, v in data["werewolf_kill_votes"]}
+        state.last_werewolf_target = data["last_werewolf_target"]
+        state.last_night_victim_name = data["last_night_victim_name"]
+        state.seer_check_results = {k: v for k, v in data["seer_check_results"]}
+        state.sheriff_player_id = data["sheriff_player_id"]
+        state.sheriff_election_done = data["sheriff_election_done"]
+        state.speaking_order_direction = data["speaking_order_direction"]
+        state.last_death_seat = data["last_death_seat"]
+        state.witch_action_history = data["witch_action_history"]
+        return state
+
     def __repr__(self) -> str:
         return (
             f"<GameState(round={self.round_number}, "
@@ -0,0 +1,92 @@
+"""
+游戏节奏 - 统一管理流程中的停顿
+
+主流程不直接调用 asyncio.sleep，而是声明停顿的类型（节拍），
+由节奏配置决定实际等待多久：
+- interactive：真人对局，给玩家留出阅读时间
+- fast：观战/调试
+- zero：纯AI对局和模拟，不等待
+虚拟时间模式下停顿只推进虚拟时钟，不真正等待，用于测试和离线重跑
+"""
+import time
+import asyncio
+from enum import Enum
+from typing import Dict, Any
+from config.game_config import GameConfig
+from config.settings import settings
+from utils.tracing import span
+
+
+class Beat(Enum):
+    """节拍类型"""
+    TICK = "tick"    # 逐条播报之间（如逐个唱票）
+    LINE = "line"    # 一名玩家发言或行动之后
+    PAUSE = "pause"  # 宣布结果、切换环节时的段落停顿
+
+
+class Pacer:
+    """
+    节奏控制器
+
+    职责：
+    - 按节奏配置把节拍换算成等待时间
+    - 虚拟时间模式下推进虚拟时钟
+    - 统计各类节拍的次数和累计停顿时间（停顿在追踪中记为 pacing 区间）
+    """
+
+    def __init__(self, profile: str = "interactive", virtual: bool = False):
+        """
+        Args:
+            profile: 节奏配置名（见 GameConfig.PACING_PROFILES）
+            virtual: 是否使用虚拟时间
+        """
+        if profile not in GameConfig.PACING_PROFILES:
+            raise ValueError(f"Unknown pacing profile: {profile}")
+
+        self.profile = profile
+        self.virtual = virtual
+        self.delays: Dict[Beat, float] = {
+            Beat(name): delay for name, delay in GameConfig.PACING_PROFILES[profile].items()
+        }
+        self.virtual_elapsed = 0.0
+        self.counts: Dict[Beat, int] = {beat: 0 for beat in Beat}
+        self.total_delay = 0.0
+
+    @classmethod
+    def from_settings(cls) -> 'Pacer':
+        """按配置创建节奏控制器"""
+        return cls(settings.GAME_PACING, settings.GAME_PACING_VIRTUAL)
+
+    async def beat(self, beat: Beat) -> None:
+        """
+        停顿一个节拍
+
+        即使不等待也会让出一次事件循环，保证后台任务（预热、日志等）有机会运行
+
+        Args:
+            beat: 节拍类型
+        """
+        delay = self.delays[beat]
+        self.counts[beat] += 1
+        self.total_delay += delay
+
+        if self.virtual or delay <= 0:
+            self.virtual_elapsed += delay
+            await asyncio.sleep(0)
+            return
+
+        with span(beat.value, "pacing"):
+            await asyncio.sleep(delay)
+
+    def now(self) -> float:
+        """当前时间（秒，单调时钟 + 虚拟时间偏移）"""
+        return time.monotonic() + self.virtual_elapsed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取节奏统计"""
+        return {
+            "profile": self.profile,
+            "virtual": self.virtual,
+            "beats": {beat.value: count for beat, count in self.counts.items()},
+            "total_delay_s": round(self.total_delay, 2),
+        }
@@ -0,0 +1,366 @@
+"""
+游戏状态二进制快照 - 检查点和状态同步使用的紧凑编码
+
+编码对象是 GameState.to_dict()（或包含它的检查点字典）这类可JSON序列化的值，
+解码结果与 json.loads(json.dumps(value)) 完全一致，可以直接替换JSON
+
+格式（版本1）：
+    头部        b"WKSN" + 版本号（1字节）
+    字符串表    字符串个数，然后每个字符串：UTF-8字节长度 + 内容
+    正文        一个带类型标记的值
+
+所有字符串（包括字典键）只在字符串表中出现一次，正文中用序号引用；整数使用变长编码。
+玩家列表按列编码（ID、座位、角色、类型、存活/警长标记、得票各占一个字节），
+发言、投票等历史记录逐条带字节长度前缀，读取时可以整条跳过
+"""
+import sys
+import struct
+from array import array
+from typing import Any, Dict, List, Tuple
+
+from roles.base_role import RoleType
+
+
+MAGIC = b"WKSN"
+VERSION = 1
+
+# 值类型标记
+TAG_NONE = 0x00
+TAG_FALSE = 0x01
+TAG_TRUE = 0x02
+TAG_INT = 0x03       # zigzag变长整数
+TAG_FLOAT = 0x04     # 8字节双精度
+TAG_STR = 0x05       # 字符串表序号
+TAG_LIST = 0x06      # 个数 + 元素
+TAG_DICT = 0x07      # 个数 + (键序号, 值)
+TAG_RECORDS = 0x08   # 个数 + 每条（字节长度 + 字典正文），元素全是字典的列表
+TAG_INTS = 0x09      # 类型码 + 个数 + 原始字节（小端），元素全是非负整数的列表
+TAG_PLAYERS = 0x0A   # 玩家表（按列编码）
+
+# 玩家表：整数列和逐个玩家编码的字段（与 GameState.to_dict 的玩家记录一致）
+PLAYER_KEYS = frozenset((
+    "id", "name", "kind", "role", "is_alive", "is_sheriff", "seat_number",
+    "votes_received", "speech_history", "role_state", "role_beliefs",
+))
+ROLE_CODES = tuple(role.name for role in RoleType)
+KIND_CODES = ("human", "ai")
+
+# 整数数组类型码（按取值范围选最小的）
+INT_TYPECODES = (("B", 0xFF), ("H", 0xFFFF), ("I", 0xFFFFFFFF))
+
+
+class SnapshotError(ValueError):
+    """快照格式错误（魔数、版本不匹配或数据截断）"""
+    pass
+
+
+def is_snapshot(data: bytes) -> bool:
+    """判断数据是否是二进制快照（用于与JSON区分）"""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def _is_bool(value: Any) -> bool:
+    return value is True or value is False
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not _is_bool(value)
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _Writer:
+    """编码器：正文写入缓冲区，同时收集字符串表"""
+
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.out = bytearray()
+
+    def varint(self, value: int, out: bytearray = None) -> None:
+        out = self.out if out is None else out
+        if value < 0x80:
+            out.append(value)
+            return
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    def string(self, value: str) -> None:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        if index < 0x80:
+            self.out.append(index)
+        else:
+            self.varint(index)
+
+    def value(self, value: Any) -> None:
+        if value is None:
+            self.out.append(TAG_NONE)
+        elif value is False:
+            self.out.append(TAG_FALSE)
+        elif value is True:
+            self.out.append(TAG_TRUE)
+        elif isinstance(value, int):
+            self.out.append(TAG_INT)
+            self.varint(value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            self.out.append(TAG_FLOAT)
+            self.out += struct.pack("<d", value)
+        elif isinstance(value, str):
+            self.out.append(TAG_STR)
+            self.string(value)
+        elif isinstance(value, dict):
+            self.out.append(TAG_DICT)
+            self.dict_body(value)
+        elif isinstance(value, (list, tuple)):
+            self.sequence(value)
+        else:
+            raise TypeError(f"Object of type {type(value).__name__} is not snapshot serializable")
+
+    def dict_body(self, value: Dict[str, Any]) -> None:
+        self.varint(len(value))
+        for key, item in value.items():
+            if _is_int(key):
+                key = str(key)  # 与JSON一致：整数键解码为字符串
+            elif not isinstance(key, str):
+                raise TypeError(f"Snapshot dict keys must be str or int, not {type(key).__name__}")
+            self.string(key)
+            self.value(item)
+
+    def sequence(self, values: List[Any]) -> None:
+        if values and all(isinstance(v, dict) for v in values):
+            if self._is_player_table(values):
+                self.players(values)
+            else:
+                self.records(values)
+            return
+
+        if values and all(_is_int(v) and v >= 0 for v in values):
+            largest = max(values)
+            for typecode, limit in INT_TYPECODES:
+                if largest <= limit:
+                    self.out.append(TAG_INTS)
+                    self.out += typecode.encode("ascii")
+                    self.varint(len(values))
+                    self.out += _little_endian(array(typecode, values))
+                    return
+
+        self.out.append(TAG_LIST)
+        self.varint(len(values))
+        for item in values:
+            self.value(item)
+
+    def records(self, values: List[Dict[str, Any]]) -> None:
+        """字典列表：每条记录带字节长度前缀"""
+        self.out.append(TAG_RECORDS)
+        self.varint(len(values))
+        for record in values:
+            body, self.out = self.out, bytearray()
+            self.dict_body(record)
+            record_bytes, self.out = self.out, body
+            self.varint(len(record_bytes))
+            self.out += record_bytes
+
+    @staticmethod
+    def _is_player_table(values: List[Dict[str, Any]]) -> bool:
+        for p in values:
+            if p.keys() != PLAYER_KEYS:
+                return False
+            if p["role"] not in ROLE_CODES or p["kind"] not in KIND_CODES:
+                return False
+            if not (_is_bool(p["is_alive"]) and _is_bool(p["is_sheriff"])):
+                return False
+            for key in ("id", "seat_number", "votes_received"):
+                if not (_is_int(p[key]) and 0 <= p[key] <= 0xFF):
+                    return False
+        return True
+
+    def players(self, values: List[Dict[str, Any]]) -> None:
+        """玩家表：整数字段按列编码，其余字段逐个玩家编码"""
+        self.out.append(TAG_PLAYERS)
+        self.varint(len(values))
+        self.out += bytes(p["id"] for p in values)
+        self.out += bytes(p["seat_number"] for p in values)
+        self.out += bytes(ROLE_CODES.index(p["role"]) for p in values)
+        self.out += bytes(KIND_CODES.index(p["kind"]) for p in values)
+        self.out += bytes(int(p["is_alive"]) | int(p["is_sheriff"]) << 1 for p in values)
+        self.out += bytes(p["votes_received"] for p in values)
+        for p in values:
+            self.string(p["name"])
+            self.value(p["speech_history"])
+            self.value(p["role_state"])
+            self.value(p["role_beliefs"])
+
+    def finish(self) -> bytes:
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        self.varint(len(self.strings), header)
+        for string in self.strings:
+            encoded = string.encode("utf-8")
+            self.varint(len(encoded), header)
+            header += encoded
+        return bytes(header + self.out)
+
+
+class _Reader:
+    """解码器（越界读取由 decode_snapshot 统一转换为 SnapshotError）"""
+
+    def __init__(self, data: bytes):
+        self.data = bytes(data)
+        self.pos = 0
+        self.strings: List[str] = []
+
+    def byte(self) -> int:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def take(self, length: int) -> bytes:
+        end = self.pos + length
+        if end > len(self.data):
+            raise SnapshotError("Truncated snapshot")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def varint(self) -> int:
+        data, pos = self.data, self.pos
+        b = data[pos]
+        pos += 1
+        if b < 0x80:
+            self.pos = pos
+            return b
+        result, shift = b & 0x7F, 7
+        while True:
+            b = data[pos]
+            pos += 1
+            result |= (b & 0x7F) << shift
+            if b < 0x80:
+                self.pos = pos
+                return result
+            shift += 7
+
+    def string(self) -> str:
+        index = self.varint()
+        try:
+            return self.strings[index]
+        except IndexError:
+            raise SnapshotError(f"Invalid string index: {index}")
+
+    def header(self) -> None:
+        if bytes(self.take(len(MAGIC))) != MAGIC:
+            raise SnapshotError("Not a game state snapshot")
+        version = self.byte()
+        if version != VERSION:
+            raise SnapshotError(f"Unsupported snapshot version: {version}")
+        self.strings = [self.take(self.varint()).decode("utf-8") for _ in range(self.varint())]
+
+    def value(self) -> Any:
+        tag = self.byte()
+        if tag == TAG_NONE:
+            return None
+        if tag == TAG_FALSE:
+            return False
+        if tag == TAG_TRUE:
+            return True
+        if tag == TAG_INT:
+            value = self.varint()
+            return value >> 1 if not value & 1 else -((value + 1) >> 1)
+        if tag == TAG_FLOAT:
+            return struct.unpack("<d", self.take(8))[0]
+        if tag == TAG_STR:
+            return self.string()
+        if tag == TAG_LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == TAG_DICT:
+            return self.dict_body()
+        if tag == TAG_RECORDS:
+            records = []
+            for _ in range(self.varint()):
+                self.varint()  # 记录长度（顺序读取时不需要）
+                records.append(self.dict_body())
+            return records
+        if tag == TAG_INTS:
+            typecode = chr(self.byte())
+            values = array(typecode)
+            count = self.varint()
+            values.frombytes(self.take(count * values.itemsize))
+            if sys.byteorder == "big" and values.itemsize > 1:
+                values.byteswap()
+            return values.tolist()
+        if tag == TAG_PLAYERS:
+            return self.players()
+        raise SnapshotError(f"Unknown tag: {tag:#04x}")
+
+    def dict_body(self) -> Dict[str, Any]:
+        result = {}
+        for _ in range(self.varint()):
+            key = self.string()
+            result[key] = self.value()
+        return result
+
+    def players(self) -> List[Dict[str, Any]]:
+        count = self.varint()
+        ids, seats, roles, kinds, flags, votes = (bytes(self.take(count)) for _ in range(6))
+        players = []
+        for i in range(count):
+            players.append({
+                "id": ids[i],
+                "name": self.string(),
+                "kind": KIND_CODES[kinds[i]],
+                "role": ROLE_CODES[roles[i]],
+                "is_alive": bool(flags[i] & 1),
+                "is_sheriff": bool(flags[i] & 2),
+                "seat_number": seats[i],
+                "votes_received": votes[i],
+                "speech_history": self.value(),
+                "role_state": self.value(),
+                "role_beliefs": self.value(),
+            })
+        return players
+
+
+def encode_snapshot(value: Any) -> bytes:
+    """
+    编码为二进制快照
+
+    Args:
+        value: 可JSON序列化的值（通常是 GameState.to_dict() 或检查点字典）
+
+    Returns:
+        bytes: 快照数据
+    """
+    writer = _Writer()
+    writer.value(value)
+    return writer.finish()
+
+
+def decode_snapshot(data: bytes) -> Any:
+    """
+    解码二进制快照
+
+    Args:
+        data: encode_snapshot 的输出
+
+    Returns:
+        解码后的值（与JSON往返的结果一致：元组变为列表）
+
+    Raises:
+        SnapshotError: 格式错误或数据截断
+    """
+    reader = _Reader(data)
+    try:
+        reader.header()
+        value = reader.value()
+    except IndexError:
+        raise SnapshotError("Truncated snapshot")
+    if reader.pos != len(reader.data):
+        raise SnapshotError("Trailing bytes after snapshot")
+    return value
@@ -0,0 +1,396 @@
+"""
+游戏状态事件 - 所有规则状态的变化都是一条事件，由同一个归约函数应用到 GameState
+
+    game_state.apply(StateEventType.HUNTER_SHOT, hunter_id=3, target_id=7)
+
+事件按顺序追加到状态日志（StateJournal），每隔N条事件保存一次快照；
+任意时刻的状态 = 最近的快照 + 之后的事件，检查点、回放、客户端增量同步和审计都只需要事件后缀
+
+不由事件驱动的只有AI玩家的角色推理（role_beliefs），它是AI自己的记忆而不是游戏规则状态，回放时沿用快照中的值
+"""
+from datetime import datetime
+from enum import Enum
+from typing import Optional, Dict, Any, List, Tuple, Callable, TYPE_CHECKING
+
+from core.snapshot import encode_snapshot, decode_snapshot
+
+if TYPE_CHECKING:
+    from core.game_state import GameState
+    from players.player import Player
+    from roles.base_role import BaseRole
+
+
+class StateEventType(Enum):
+    """状态事件类型"""
+    ROUND_STARTED = "round_started"                # round
+    PHASE_CHANGED = "phase_changed"                # phase
+    WEREWOLF_DISCUSSION = "werewolf_discussion"    # round（狼人讨论轮次）
+    PRIVATE_SPEECH = "private_speech"              # camp, round, player_id, content
+    NIGHT_TARGET = "night_target"                  # target_id（None表示空刀）
+    SEER_CHECKED = "seer_checked"                  # seer_id, target_id, result
+    WITCH_ACTION = "witch_action"                  # witch_id, action(save/poison/skip), target_id, round
+    NIGHT_RESOLVED = "night_resolved"              # 结算夜晚死亡并清空夜晚状态（结算后写入dead_ids）
+    HUNTER_SHOT = "hunter_shot"                    # hunter_id, target_id
+    PLAYER_EXILED = "player_exiled"                # player_id
+    SHERIFF_CHANGED = "sheriff_changed"            # player_id（None表示无警长）
+    SHERIFF_ELECTION_DONE = "sheriff_election_done"
+    SPEAKING_DIRECTION = "speaking_direction"      # direction
+    SPEECH = "speech"                              # round, player_id, content, channel(day/campaign)
+    VOTE = "vote"                                  # round, voter_id, target_id
+    ANNOUNCEMENT = "announcement"                  # round, content
+    VOTES_RESET = "votes_reset"
+    DECISION_TIMEOUT = "decision_timeout"          # round, player_id, decision, fallback(ai/heuristic), limit, public
+
+
+class StateEvent:
+    """
+    状态事件
+
+    数据中只引用玩家ID（不引用对象），事件可以序列化、跨进程传输和回放；
+    时间戳在创建时确定，回放生成的历史记录与原始记录完全一致
+    """
+
+    def __init__(
+        self,
+        event_type: StateEventType,
+        data: Optional[Dict[str, Any]] = None,
+        seq: int = 0,
+        timestamp: Optional[str] = None
+    ):
+        """
+        Args:
+            event_type: 事件类型
+            data: 事件数据
+            seq: 序号（由状态日志分配）
+            timestamp: ISO格式时间戳，默认当前时间
+        """
+        self.type = event_type
+        self.data = data or {}
+        self.seq = seq
+        self.timestamp = timestamp or datetime.now().isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于持久化和网络传输）"""
+        return {"seq": self.seq, "type": self.type.value, "timestamp": self.timestamp, "data": self.data}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StateEvent':
+        """从字典恢复"""
+        return cls(StateEventType(data["type"]), data["data"], data["seq"], data["timestamp"])
+
+    def __repr__(self) -> str:
+        return f"<StateEvent(#{self.seq} {self.type.value} {self.data})>"
+
+
+# ==================== 归约函数 ====================
+
+def _player(state: 'GameState', player_id: Optional[int]) -> Optional['Player']:
+    if player_id is None:
+        return None
+    return next(p for p in state.all_players if p.id == player_id)
+
+
+def _kill(state: 'GameState', player: 'Player') -> None:
+    """玩家死亡：更新存活标记和存活/死亡列表"""
+    player.is_alive = False
+    if player in state.alive_players:
+        state.alive_players.remove(player)
+        state.dead_players.append(player)
+
+
+def _history_record(state: 'GameState', event: StateEvent, player: Optional['Player'], action_type: str, **extra) -> Dict[str, Any]:
+    record = {
+        "round": event.data["round"],
+        "phase": state.current_phase,
+        "player_id": player.id if player else 0,
+        "player_name": player.name if player else "系统",
+        "action_type": action_type,
+    }
+    record.update(extra)
+    record["timestamp"] = event.timestamp
+    return record
+
+
+def _round_started(state: 'GameState', event: StateEvent) -> None:
+    state.round_number = event.data["round"]
+
+
+def _phase_changed(state: 'GameState', event: StateEvent) -> None:
+    state.current_phase = event.data["phase"]
+
+
+def _werewolf_discussion(state: 'GameState', event: StateEvent) -> None:
+    state.werewolf_discussion_round = event.data["round"]
+
+
+def _private_speech(state: 'GameState', event: StateEvent) -> None:
+    player = _player(state, event.data["player_id"])
+    record = _history_record(state, event, player, "private_speech", content=event.data["content"])
+    record["phase"] = "night_private"
+    state.private_conversations[event.data["camp"]].append(record)
+
+
+def _night_target(state: 'GameState', event: StateEvent) -> None:
+    target = _player(state, event.data["target_id"])
+    state.tonight_victim = target
+    state.last_werewolf_target = target.name if target else "空刀"
+
+
+def _seer_checked(state: 'GameState', event: StateEvent) -> None:
+    target = _player(state, event.data["target_id"])
+    # 查验记录保存在预言家角色上（随角色状态进入检查点），AI和启发式策略据此判断已知身份
+    seer_role = _player(state, event.data["seer_id"]).role
+    if target.id not in seer_role.checked_players:
+        seer_role.checked_players.append(target.id)
+    state.seer_check_results.setdefault(event.data["seer_id"], []).append(
+        f"{target.name}（{target.id}号）是{event.data['result']}"
+    )
+
+
+def _witch_action(state: 'GameState', event: StateEvent) -> None:
+    witch_role = _player(state, event.data["witch_id"]).role
+    target = _player(state, event.data["target_id"])
+    action = event.data["action"]
+
+    if action == "save":
+        state.saved_tonight = True
+        witch_role.has_antidote = False
+    elif action == "poison":
+        state.poisoned_tonight.append(target)
+        witch_role.has_poison = False
+
+    state.witch_action_history.append({
+        "round": event.data["round"],
+        "action_type": action,
+        "target_name": target.name if target else "无",
+        "target_id": target.id if target else 0,
+        "remaining_antidote": witch_role.has_antidote,
+        "remaining_poison": witch_role.has_poison,
+        "timestamp": event.timestamp
+    })
+
+
+def _night_resolved(state: 'GameState', event: StateEvent) -> List['Player']:
+    deaths = []
+
+    # 狼人杀人（被女巫救下则不死）
+    if state.tonight_victim and not state.saved_tonight:
+        deaths.append(state.tonight_victim)
+        state.last_night_victim_name = state.tonight_victim.name
+
+    # 女巫毒人
+    for victim in state.poisoned_tonight:
+        if victim.is_alive and victim not in deaths:
+            deaths.append(victim)
+
+    for dead_player in deaths:
+        _kill(state, dead_player)
+
+    # 最近死者座位号（取最小，决定发言起点）
+    if deaths:
+        state.last_death_seat = min(d.seat_number for d in deaths)
+
+    # 结算结果写回事件，同步给客户端时不需要夜晚的私密状态就能知道谁死了（回放时写入相同的值）
+    event.data["dead_ids"] = [d.id for d in deaths]
+
+    # 重置夜晚状态
+    state.tonight_victim = None
+    state.poisoned_tonight = []
+    state.saved_tonight = False
+    return deaths
+
+
+def _hunter_shot(state: 'GameState', event: StateEvent) -> None:
+    _kill(state, _player(state, event.data["target_id"]))
+    _player(state, event.data["hunter_id"]).role.can_shoot = False
+
+
+def _player_exiled(state: 'GameState', event: StateEvent) -> None:
+    exiled = _player(state, event.data["player_id"])
+    _kill(state, exiled)
+    state.today_voted_out = exiled
+
+
+def _sheriff_changed(state: 'GameState', event: StateEvent) -> None:
+    player_id = event.data["player_id"]
+    for p in state.all_players:
+        p.is_sheriff = p.id == player_id if player_id else False
+    state.sheriff_player_id = player_id
+
+
+def _sheriff_election_done(state: 'GameState', event: StateEvent) -> None:
+    state.sheriff_election_done = True
+
+
+def _speaking_direction(state: 'GameState', event: StateEvent) -> None:
+    state.speaking_order_direction = event.data["direction"]
+
+
+def _speech(state: 'GameState', event: StateEvent) -> None:
+    player = _player(state, event.data["player_id"])
+    state.conversation_history.append(
+        _history_record(state, event, player, "speech", content=event.data["content"])
+    )
+    if event.data.get("channel", "day") == "day":
+        player.add_speech(event.data["content"])
+
+
+def _vote(state: 'GameState', event: StateEvent) -> None:
+    voter = _player(state, event.data["voter_id"])
+    target = _player(state, event.data["target_id"])
+    record = _history_record(
+        state, event, voter, "vote",
+        content=f"投票给{target.name}", target_id=target.id
+    )
+    record["phase"] = "vote"
+    state.conversation_history.append(record)
+
+
+def _announcement(state: 'GameState', event: StateEvent) -> None:
+    state.conversation_history.append(
+        _history_record(state, event, None, "announcement", content=event.data["content"])
+    )
+
+
+def _votes_reset(state: 'GameState', event: StateEvent) -> None:
+    for player in state.all_players:
+        player.reset_votes()
+
+
+def _decision_timeout(state: 'GameState', event: StateEvent) -> None:
+    player = _player(state, event.data["player_id"])
+    state.action_history.append(_history_record(
+        state, event, player, "timeout",
+        decision=event.data["decision"], fallback=event.data["fallback"],
+        limit=event.data["limit"], public=event.data["public"]
+    ))
+
+
+REDUCERS: Dict[StateEventType, Callable[['GameState', StateEvent], Any]] = {
+    StateEventType.ROUND_STARTED: _round_started,
+    StateEventType.PHASE_CHANGED: _phase_changed,
+    StateEventType.WEREWOLF_DISCUSSION: _werewolf_discussion,
+    StateEventType.PRIVATE_SPEECH: _private_speech,
+    StateEventType.NIGHT_TARGET: _night_target,
+    StateEventType.SEER_CHECKED: _seer_checked,
+    StateEventType.WITCH_ACTION: _witch_action,
+    StateEventType.NIGHT_RESOLVED: _night_resolved,
+    StateEventType.HUNTER_SHOT: _hunter_shot,
+    StateEventType.PLAYER_EXILED: _player_exiled,
+    StateEventType.SHERIFF_CHANGED: _sheriff_changed,
+    StateEventType.SHERIFF_ELECTION_DONE: _sheriff_election_done,
+    StateEventType.SPEAKING_DIRECTION: _speaking_direction,
+    StateEventType.SPEECH: _speech,
+    StateEventType.VOTE: _vote,
+    StateEventType.ANNOUNCEMENT: _announcement,
+    StateEventType.VOTES_RESET: _votes_reset,
+    StateEventType.DECISION_TIMEOUT: _decision_timeout,
+}
+
+
+def reduce(state: 'GameState', event: StateEvent) -> Any:
+    """
+    把一条事件应用到游戏状态（唯一修改规则状态的地方）
+
+    Args:
+        state: 游戏状态（原地修改）
+        event: 事件
+
+    Returns:
+        归约结果（NIGHT_RESOLVED 返回死亡玩家列表，其余为None）
+    """
+    return REDUCERS[event.type](state, event)
+
+
+# ==================== 状态日志 ====================
+
+class StateJournal:
+    """
+    状态事件日志
+
+    职责：
+    - 为事件分配序号并按顺序保存
+    - 每隔 snapshot_interval 条事件保存一次状态快照（二进制）
+    - 从快照和事件后缀回放出任意序号时的状态
+    """
+
+    def __init__(self, snapshot_interval: int = 50):
+        """
+        Args:
+            snapshot_interval: 快照间隔（事件数）
+        """
+        self.snapshot_interval = snapshot_interval
+        self.events: List[StateEvent] = []
+        self.snapshots: List[Tuple[int, bytes]] = []  # [(序号, 快照)]
+        self.seq = 0
+
+    def start(self, state: 'GameState', seq: int = 0) -> None:
+        """
+        以当前状态为基准快照开始记录（开局或从检查点恢复后调用）
+
+        Args:
+            state: 游戏状态
+            seq: 基准序号（恢复时沿用检查点的序号）
+        """
+        self.events = []
+        self.seq = seq
+        self.snapshots = [(seq, encode_snapshot(state.to_dict()))]
+
+    def record(self, state: 'GameState', event: StateEvent) -> None:
+        """
+        记录一条已应用的事件（到达快照间隔时保存快照）
+
+        Args:
+            state: 应用事件后的状态
+            event: 事件
+        """
+        self.seq += 1
+        event.seq = self.seq
+        self.events.append(event)
+        if self.snapshot_interval > 0 and self.seq % self.snapshot_interval == 0:
+            self.snapshots.append((self.seq, encode_snapshot(state.to_dict())))
+
+    def events_since(self, seq: int) -> List[StateEvent]:
+        """
+        获取序号大于seq的事件（事件后缀）
+
+        Args:
+            seq: 起始序号（不含）
+        """
+        base = self.events[0].seq - 1 if self.events else self.seq
+        return self.events[max(0, seq - base):]
+
+    def replay(
+        self,
+        create_player: Callable[[Dict[str, Any], 'BaseRole'], 'Player'],
+        upto: Optional[int] = None
+    ) -> 'GameState':
+        """
+        回放出某个序号时的状态（最近的快照 + 之后的事件）
+
+        Args:
+            create_player: 玩家构造函数（同 GameState.from_dict）
+            upto: 目标序号，默认最新
+
+        Returns:
+            GameState: 回放得到的状态（不带状态日志）
+        """
+        from core.game_state import GameState
+
+        upto = self.seq if upto is None else upto
+        snapshot_seq, snapshot = next((s, data) for s, data in reversed(self.snapshots) if s <= upto)
+        state = GameState.from_dict(decode_snapshot(snapshot), create_player)
+        for event in self.events_since(snapshot_seq):
+            if event.seq > upto:
+                break
+            reduce(state, event)
+        return state
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计"""
+        return {
+            "events": len(self.events),
+            "seq": self.seq,
+            "snapshots": len(self.snapshots),
+            "snapshot_bytes": sum(len(data) for _, data in self.snapshots),
+        }
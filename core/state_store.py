@@ -0,0 +1,251 @@
+"""
+游戏状态存储 - 在阶段边界保存游戏检查点
+
+键：GameConfig.GAME_KEY_PREFIX + game_id（如 "game:3f2a1b4c"），只保留最新的检查点，带过期时间
+
+后端：
+- redis：多进程共享，进程重启后可恢复，游戏可以迁移到其他工作进程
+- file：每局一个JSON文件，单机运行时进程重启后可恢复
+- memory：进程内字典（模拟Redis的过期语义），用于测试
+
+编码：binary（core.snapshot 二进制快照，默认）或 json；读取时按内容自动识别，切换格式后旧检查点仍可读取
+"""
+import os
+import json
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List, Tuple
+
+from config.game_config import GameConfig
+from config.settings import settings
+from core.snapshot import encode_snapshot, decode_snapshot, is_snapshot
+
+
+class StateStore(ABC):
+    """检查点存储接口"""
+
+    persistent = True  # 检查点是否在进程退出后仍然保留
+
+    FORMATS = ("binary", "json")
+
+    def __init__(self, ttl: int = 86400, prefix: str = GameConfig.GAME_KEY_PREFIX, format: str = "binary"):
+        """
+        Args:
+            ttl: 过期时间（秒）
+            prefix: 键前缀
+            format: 编码格式 binary / json
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown checkpoint format: {format}")
+        self.ttl = ttl
+        self.prefix = prefix
+        self.format = format
+
+    def key(self, game_id: str) -> str:
+        """游戏ID对应的键"""
+        return f"{self.prefix}{game_id}"
+
+    def encode(self, checkpoint: Dict[str, Any]) -> bytes:
+        if self.format == "binary":
+            return encode_snapshot(checkpoint)
+        return json.dumps(checkpoint, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+    @staticmethod
+    def decode(data: bytes) -> Dict[str, Any]:
+        if is_snapshot(data):
+            return decode_snapshot(data)
+        return json.loads(data)
+
+    @abstractmethod
+    async def save(self, game_id: str, checkpoint: Dict[str, Any]) -> None:
+        """保存检查点（覆盖旧的并刷新过期时间）"""
+        pass
+
+    @abstractmethod
+    async def load(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """读取检查点，不存在或已过期返回None"""
+        pass
+
+    @abstractmethod
+    async def delete(self, game_id: str) -> None:
+        """删除检查点"""
+        pass
+
+    @abstractmethod
+    async def list_games(self) -> List[str]:
+        """列出有检查点的游戏ID"""
+        pass
+
+    async def close(self) -> None:
+        """释放连接"""
+        pass
+
+
+class MemoryStateStore(StateStore):
+    """进程内存储（行为与Redis后端一致，包括过期）"""
+
+    persistent = False
+
+    def __init__(self, ttl: int = 86400, prefix: str = GameConfig.GAME_KEY_PREFIX, format: str = "binary"):
+        super().__init__(ttl, prefix, format)
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (_, expires_at) in self._data.items() if expires_at <= now]:
+            del self._data[key]
+
+    async def save(self, game_id: str, checkpoint: Dict[str, Any]) -> None:
+        self._data[self.key(game_id)] = (self.encode(checkpoint), time.monotonic() + self.ttl)
+
+    async def load(self, game_id: str) -> Optional[Dict[str, Any]]:
+        self._purge()
+        entry = self._data.get(self.key(game_id))
+        return self.decode(entry[0]) if entry else None
+
+    async def delete(self, game_id: str) -> None:
+        self._data.pop(self.key(game_id), None)
+
+    async def list_games(self) -> List[str]:
+        self._purge()
+        return [key[len(self.prefix):] for key in self._data]
+
+
+class FileStateStore(StateStore):
+    """文件存储（先写临时文件再替换，中途退出不会留下写了一半的检查点；按修改时间判断过期）"""
+
+    SUFFIX = ".ckpt"
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: int = 86400,
+        prefix: str = GameConfig.GAME_KEY_PREFIX,
+        format: str = "binary"
+    ):
+        """
+        Args:
+            directory: 检查点目录
+            ttl: 过期时间（秒）
+            prefix: 键前缀（文件名中的冒号替换为下划线）
+            format: 编码格式 binary / json
+        """
+        super().__init__(ttl, prefix, format)
+        self.directory = directory
+
+    def path(self, game_id: str) -> str:
+        """游戏ID对应的文件路径"""
+        return os.path.join(self.directory, self.key(game_id).replace(":", "_") + self.SUFFIX)
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            if os.path.getmtime(path) + self.ttl <= time.time():
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def save(self, game_id: str, checkpoint: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._write, self.path(game_id), self.encode(checkpoint))
+
+    async def load(self, game_id: str) -> Optional[Dict[str, Any]]:
+        data = await asyncio.to_thread(self._read, self.path(game_id))
+        return self.decode(data) if data is not None else None
+
+    async def delete(self, game_id: str) -> None:
+        try:
+            os.remove(self.path(game_id))
+        except FileNotFoundError:
+            pass
+
+    async def list_games(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        file_prefix = self.prefix.replace(":", "_")
+        games = []
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith(file_prefix) and name.endswith(self.SUFFIX)):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.directory, name)) + self.ttl > time.time():
+                    games.append(name[len(file_prefix):-len(self.SUFFIX)])
+            except FileNotFoundError:
+                pass
+        return games
+
+
+class RedisStateStore(StateStore):
+    """Redis存储（使用 redis.asyncio，首次使用时才连接）"""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: str = "",
+        ttl: int = 86400,
+        prefix: str = GameConfig.GAME_KEY_PREFIX,
+        format: str = "binary"
+    ):
+        super().__init__(ttl, prefix, format)
+        import redis.asyncio as redis
+
+        self.client = redis.Redis(host=host, port=port, db=db, password=password or None)
+
+    async def save(self, game_id: str, checkpoint: Dict[str, Any]) -> None:
+        await self.client.set(self.key(game_id), self.encode(checkpoint), ex=self.ttl)
+
+    async def load(self, game_id: str) -> Optional[Dict[str, Any]]:
+        data = await self.client.get(self.key(game_id))
+        return self.decode(data) if data is not None else None
+
+    async def delete(self, game_id: str) -> None:
+        await self.client.delete(self.key(game_id))
+
+    async def list_games(self) -> List[str]:
+        games = []
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            games.append(key.decode('utf-8')[len(self.prefix):])
+        return games
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_state_store(backend: Optional[str] = None) -> Optional[StateStore]:
+    """
+    按配置创建状态存储
+
+    Args:
+        backend: redis / file / memory / off，默认取 settings.STATE_STORE
+
+    Returns:
+        Optional[StateStore]: 存储实例，off时返回None
+    """
+    backend = backend or settings.STATE_STORE
+    if backend == "off":
+        return None
+    if backend == "file":
+        return FileStateStore(settings.STATE_STORE_DIR, ttl=settings.REDIS_EXPIRE_TIME, format=settings.CHECKPOINT_FORMAT)
+    if backend == "memory":
+        return MemoryStateStore(ttl=settings.REDIS_EXPIRE_TIME, format=settings.CHECKPOINT_FORMAT)
+    if backend == "redis":
+        return RedisStateStore(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            ttl=settings.REDIS_EXPIRE_TIME,
+            format=settings.CHECKPOINT_FORMAT,
+        )
+    raise ValueError(f"Unknown state store backend: {backend}")
@@ -0,0 +1,277 @@
+"""
+状态增量同步 - 远程玩家和观战者只接收自己可见的、自上次确认版本以来的状态事件
+
+版本号就是状态日志（StateJournal）的事件序号。客户端带着已确认的版本拉取：
+- 版本仍在状态日志中：返回之后的事件里对该观察者可见的部分（delta）
+- 首次连接、落后太多或早于日志起点（如从检查点恢复前）：返回按可见性裁剪后的完整状态（snapshot）
+
+对局从检查点恢复后，检查点之后的事件会重新产生、序号与恢复前重复，因此每个订阅源有自己的纪元（epoch），
+客户端重连时带上纪元，纪元不同时只能发完整状态
+
+可见性：
+- 狼人频道发言、狼人讨论轮次、夜晚刀人目标：只有狼人可见
+- 预言家查验：只有该预言家可见
+- 女巫用药：只有该女巫可见
+- 夜晚决策的超时记录：只有该玩家可见（白天决策的超时公开）
+- 其余事件公开（夜晚结算事件带有死亡玩家ID，不暴露死因）
+
+每条事件只序列化一次，按可见性缓存后由各客户端的消息直接拼接，连接数增加时序列化开销不变
+"""
+import json
+import secrets
+from typing import Optional, Dict, Any, FrozenSet, Tuple, TYPE_CHECKING
+
+from core.state_events import StateEvent, StateEventType
+from roles.base_role import RoleType
+
+if TYPE_CHECKING:
+    from core.game_state import GameState
+
+
+# 观察者ID：None为上帝视角（全部可见），PUBLIC_VIEWER为普通观战者（只看公开信息）
+PUBLIC_VIEWER = 0
+
+# 只有狼人可见的事件
+WEREWOLF_EVENTS = frozenset((
+    StateEventType.PRIVATE_SPEECH,
+    StateEventType.WEREWOLF_DISCUSSION,
+    StateEventType.NIGHT_TARGET,
+))
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class StateFeed:
+    """
+    一局游戏的状态变更订阅源
+
+    职责：
+    - 判断每条状态事件的可见范围
+    - 缓存事件的序列化结果，按观察者拼接增量消息
+    - 为新连接或落后太多的连接生成裁剪后的完整状态
+    """
+
+    def __init__(self, state: 'GameState', max_delta: int = 200):
+        """
+        Args:
+            state: 游戏状态（需已开始记录状态日志）
+            max_delta: 单次增量最多包含的事件数，落后更多时改发完整状态
+        """
+        self.state = state
+        self.max_delta = max_delta
+        self.epoch = secrets.token_hex(4)  # 版本号只在同一纪元内可比较
+        self._encoded: Dict[int, Tuple[Optional[FrozenSet[int]], bytes]] = {}  # {序号: (可见范围, 序列化结果)}
+        self._werewolf_ids: Optional[FrozenSet[int]] = None
+
+        self.deltas = 0
+        self.snapshots = 0
+        self.bytes_sent = 0
+
+    @property
+    def version(self) -> int:
+        """当前版本（最新事件序号）"""
+        return self.state.journal.seq
+
+    @property
+    def werewolf_ids(self) -> FrozenSet[int]:
+        """狼人玩家ID（身份在开局后不再变化）"""
+        if self._werewolf_ids is None:
+            self._werewolf_ids = frozenset(
+                p.id for p in self.state.all_players if p.role.role_type == RoleType.WEREWOLF
+            )
+        return self._werewolf_ids
+
+    def audience(self, event: StateEvent) -> Optional[FrozenSet[int]]:
+        """
+        事件的可见范围
+
+        Args:
+            event: 状态事件
+
+        Returns:
+            可见玩家ID集合，None表示公开
+        """
+        if event.type in WEREWOLF_EVENTS:
+            return self.werewolf_ids
+        if event.type == StateEventType.SEER_CHECKED:
+            return frozenset((event.data["seer_id"],))
+        if event.type == StateEventType.WITCH_ACTION:
+            return frozenset((event.data["witch_id"],))
+        if event.type == StateEventType.DECISION_TIMEOUT and not event.data["public"]:
+            return frozenset((event.data["player_id"],))
+        return None
+
+    def _entry(self, event: StateEvent) -> Tuple[Optional[FrozenSet[int]], bytes]:
+        entry = self._encoded.get(event.seq)
+        if entry is None:
+            entry = self._encoded[event.seq] = (self.audience(event), _dumps(event.to_dict()))
+        return entry
+
+    def delta(self, viewer_id: Optional[int], since: int) -> Optional[bytes]:
+        """
+        增量消息：since 之后对观察者可见的事件
+
+        Args:
+            viewer_id: 观察者玩家ID（None为上帝视角，PUBLIC_VIEWER为观战者）
+            since: 客户端已确认的版本
+
+        Returns:
+            bytes: JSON消息；版本已不在状态日志中或落后超过 max_delta 时返回None（应改发完整状态）
+        """
+        journal = self.state.journal
+        base = journal.snapshots[0][0]
+        if since < base or since > journal.seq or journal.seq - since > self.max_delta:
+            return None
+
+        parts = []
+        for event in journal.events_since(since):
+            audience, encoded = self._entry(event)
+            if audience is None or viewer_id is None or viewer_id in audience:
+                parts.append(encoded)
+
+        message = b'{"type":"delta","epoch":"%s","from":%d,"version":%d,"events":[%s]}' % (
+            self.epoch.encode("ascii"), since, journal.seq, b",".join(parts)
+        )
+        self.deltas += 1
+        self.bytes_sent += len(message)
+        return message
+
+    def visible_state(self, viewer_id: Optional[int]) -> Dict[str, Any]:
+        """
+        按观察者裁剪的完整状态（结构同 GameState.to_dict）
+
+        隐藏其他玩家的身份、角色状态和AI推理；狼人能看到狼队友身份和狼人频道，
+        预言家只能看到自己的查验结果，女巫只能看到自己的用药记录
+
+        Args:
+            viewer_id: 观察者玩家ID（None为上帝视角，PUBLIC_VIEWER为观战者）
+        """
+        data = self.state.to_dict()
+        if viewer_id is None:
+            return data
+
+        is_werewolf = viewer_id in self.werewolf_ids
+        for record in data["players"]:
+            if record["id"] == viewer_id:
+                continue
+            if not (is_werewolf and record["id"] in self.werewolf_ids):
+                record["role"] = None
+            record["role_state"] = {}
+            record["role_beliefs"] = None
+
+        if not is_werewolf:
+            data["private_conversations"] = {camp: [] for camp in data["private_conversations"]}
+            data["werewolf_discussion_round"] = 0
+            data["werewolf_kill_votes"] = []
+            data["tonight_victim"] = None
+            data["last_werewolf_target"] = None
+
+        viewer = next((p for p in self.state.all_players if p.id == viewer_id), None)
+        if viewer is None or viewer.role.role_type != RoleType.WITCH:
+            data["poisoned_tonight"] = []
+            data["saved_tonight"] = False
+            data["witch_action_history"] = []
+
+        data["seer_check_results"] = [[k, v] for k, v in data["seer_check_results"] if k == viewer_id]
+        data["action_history"] = [
+            r for r in data["action_history"] if r.get("public", True) or r["player_id"] == viewer_id
+        ]
+        return data
+
+    def snapshot(self, viewer_id: Optional[int]) -> bytes:
+        """
+        完整状态消息
+
+        Args:
+            viewer_id: 观察者玩家ID
+
+        Returns:
+            bytes: JSON消息
+        """
+        message = _dumps({
+            "type": "snapshot", "epoch": self.epoch, "version": self.version, "state": self.visible_state(viewer_id)
+        })
+        self.snapshots += 1
+        self.bytes_sent += len(message)
+        return message
+
+    def sync(self, viewer_id: Optional[int], since: Optional[int] = None) -> bytes:
+        """
+        同步消息：能发增量就发增量，否则发完整状态
+
+        Args:
+            viewer_id: 观察者玩家ID
+            since: 客户端已确认的版本，None表示首次连接
+
+        Returns:
+            bytes: JSON消息（delta 或 snapshot，都带有 epoch 和 version 字段，客户端确认该版本）
+        """
+        if since is not None:
+            message = self.delta(viewer_id, since)
+            if message is not None:
+                return message
+        return self.snapshot(viewer_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计"""
+        return {
+            "version": self.version,
+            "deltas": self.deltas,
+            "snapshots": self.snapshots,
+            "bytes_sent": self.bytes_sent,
+            "encoded_events": len(self._encoded),
+            "encoded_bytes": sum(len(encoded) for _, encoded in self._encoded.values()),
+        }
+
+
+class SyncCursor:
+    """
+    单个客户端的同步游标（记录已确认的版本）
+
+    典型用法：连接建立后 pull() 发送消息，收到客户端确认后 ack(version)；
+    未确认时再次 pull() 会从上次确认的版本重发，丢包不会丢事件
+    """
+
+    def __init__(self, feed: StateFeed, viewer_id: Optional[int] = PUBLIC_VIEWER):
+        """
+        Args:
+            feed: 状态订阅源
+            viewer_id: 观察者玩家ID（None为上帝视角，默认普通观战者）
+        """
+        self.feed = feed
+        self.viewer_id = viewer_id
+        self.acked: Optional[int] = None
+
+    @property
+    def pending(self) -> bool:
+        """是否有未确认的新版本"""
+        return self.acked is None or self.acked < self.feed.version
+
+    def pull(self) -> bytes:
+        """生成从已确认版本开始的同步消息"""
+        return self.feed.sync(self.viewer_id, self.acked)
+
+    def restore(self, version: int, epoch: Optional[str] = None) -> None:
+        """
+        客户端重连时恢复已确认的版本
+
+        纪元不同（对局已从检查点恢复）或版本超出当前版本时忽略，下次 pull() 发送完整状态
+
+        Args:
+            version: 客户端已收到的版本
+            epoch: 该版本所属的纪元，None表示不检查
+        """
+        if (epoch is None or epoch == self.feed.epoch) and version <= self.feed.version:
+            self.ack(version)
+
+    def ack(self, version: int) -> None:
+        """
+        确认已收到某个版本
+
+        Args:
+            version: 消息中的 version 字段
+        """
+        if self.acked is None or version > self.acked:
+            self.acked = min(version, self.feed.version)
@@ -1,48 +1,102 @@
 """
 狼人杀游戏 - 主程序入口
 """
+import os
+import json
+import random
 import asyncio
+import argparse
 import uuid
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Iterable, Awaitable, Callable, TypeVar, Dict, Any
 
 from config.settings import settings
 from config.game_config import game_config, GameConfig
 from core.game_state import GameState
+from core.pacing import Pacer, Beat
+from core.events import EventBus, GameEvent, GameEventType, EventMetrics
+from core.state_events import StateEventType, StateJournal
+from core.state_store import create_state_store
+from core.state_sync import StateFeed
 from roles.role_factory import RoleFactory
-from roles.base_role import RoleCamp
+from roles.base_role import BaseRole, RoleCamp
 from players.player import Player
 from players.human_player import HumanPlayer
 from players.ai_player import AIPlayer
+from players.heuristic_player import HeuristicPlayer
 from ai.god_ai import GodAI
 from ai.player_ai import PlayerAI
+from ai.llm_client import get_llm_client
+from ai.telemetry import telemetry, current_game_id
 from ui.cli import CLI
 from ui.display import Display
+from ui.terminal import TerminalRenderer
+from storage.event_log import EventLogWriter, event_log_path
+from utils.tracing import start_trace, get_tracer, span, traced
+
+T = TypeVar("T")
+
+# 使用发言时限的决策，其余决策使用投票时限
+SPEECH_DECISIONS = frozenset(("make_speech", "make_werewolf_discussion", "make_sheriff_campaign_speech"))
+# 超时提示只对本人可见的决策（公开会暴露身份）
+PRIVATE_DECISIONS = frozenset((
+    "make_werewolf_discussion", "choose_target.kill", "choose_target.check",
+    "choose_target.shoot", "choose_witch_action",
+))
 
 
 class WolfkillGame:
     """狼人杀游戏主类"""
 
-    def __init__(self):
+    def __init__(self, interactive: bool = True):
+        """
+        Args:
+            interactive: 是否在本地终端对局（服务器托管的房间为False：不输出到终端，事件只发给远程连接）
+        """
         self.game_state = GameState()
         self.god_ai = GodAI()
         self.player_ai = PlayerAI()
+        self._warm_up_task = None  # LLM连接预热任务（setup_game中创建）
+        self.pacer = Pacer.from_settings()
+
+        # 输出事件总线：终端必须完整输出（buffer），统计允许丢弃（drop）
+        self.events = EventBus()
+        self.terminal = TerminalRenderer()
+        self.event_metrics = EventMetrics()
+        if interactive:
+            self.events.subscribe(self.terminal, name="terminal", overflow="buffer")
+        self.events.subscribe(self.event_metrics, name="metrics", overflow="drop")
+        self.event_log = None  # JSONL事件流（setup_game中创建游戏ID后开启）
+        self._event_log_summarized = False
+        self.state_store = create_state_store()  # 阶段边界检查点
+        self.last_checkpoint: Optional[Dict[str, Any]] = None  # 最近一次保存的检查点（轮次和阶段）
+        self._game_over = False
+        self.state_feed: Optional[StateFeed] = None  # 远程客户端的状态增量同步（状态日志开始记录后创建）
 
         # 调试信息：确认每次都创建新实例
-        import random
         self.instance_id = random.randint(10000, 99999)
-        print(f"[DEBUG] 创建新游戏实例 ID: {self.instance_id}")
+        self.emit(f"[DEBUG] 创建新游戏实例 ID: {self.instance_id}")
+
+    async def _warm_up_llm(self):
+        """后台创建LLM客户端（在线程中导入langchain）并预先建立连接"""
+        llm = await asyncio.to_thread(get_llm_client)
+        await llm.warm_up()
 
     async def setup_game(self):
         """设置游戏"""
-        CLI.print_header("狼人杀游戏")
+        # 等待玩家输入期间在后台创建LLM客户端并预先建立连接
+        self._warm_up_task = asyncio.create_task(self._warm_up_llm())
 
-        print("欢迎来到狼人杀游戏！")
-        print("\n请选择游戏板子：")
-        print("1. 基础版（9人局）")
-        print("   - 狼人x3, 村民x3, 预言家x1, 女巫x1, 猎人x1")
-        print("2. 标准版（12人局）[暂未实现守卫角色]")
-        print("   - 狼人x4, 村民x4, 预言家x1, 女巫x1, 猎人x1, 守卫x1")
+        self.emit(CLI.format_header("狼人杀游戏"))
 
+        self.emit("欢迎来到狼人杀游戏！")
+        self.emit("\n请选择游戏板子：")
+        self.emit("1. 基础版（9人局）")
+        self.emit("   - 狼人x3, 村民x3, 预言家x1, 女巫x1, 猎人x1")
+        self.emit("2. 标准版（12人局）[暂未实现守卫角色]")
+        self.emit("   - 狼人x4, 村民x4, 预言家x1, 女巫x1, 猎人x1, 守卫x1")
+
+        await self.drain_output()
         choice = await CLI.get_number_input("\n请输入选择（1-2）: ", min_val=1, max_val=2)
 
         # 根据选择确定配置
@@ -50,24 +104,21 @@ class WolfkillGame:
             board_config = "basic"
             board_name = "基础版（9人局）"
         else:
-            print("\n⚠️  警告：守卫角色暂未实现，将使用基础版配置")
+            self.emit("\n⚠️  警告：守卫角色暂未实现，将使用基础版配置")
             board_config = "basic"
             board_name = "基础版（9人局）"
 
-        print(f"\n已选择：{board_name}")
-        print("- 模式：单人 vs AI\n")
-
-        # 创建游戏ID
-        self.game_state.game_id = str(uuid.uuid4())[:8]
+        self.emit(f"\n已选择：{board_name}")
+        self.emit("- 模式：单人 vs AI\n")
 
-        # 设置板子配置
-        self.game_state.board_config = board_config
+        self._create_game(board_config)
 
         # 分配角色
         roles = RoleFactory.distribute_roles(board_config)
         total_players = len(roles)
 
         # 获取玩家名字
+        await self.drain_output()
         human_name = await CLI.get_input("请输入你的名字: ")
 
         # 创建玩家
@@ -76,6 +127,7 @@ class WolfkillGame:
         # 创建真人玩家（1号玩家）
         human_player = HumanPlayer(1, human_name, roles[0])
         players.append(human_player)
+        self.terminal.viewer_id = human_player.id
 
         # 创建AI玩家（2到total_players号）
         for i in range(2, total_players + 1):
@@ -83,18 +135,248 @@ class WolfkillGame:
             ai_player = AIPlayer(i, ai_name, roles[i-1], self.player_ai)
             players.append(ai_player)
 
+        await self._seat_players(players)
+
+        # 显示你的角色
+        self.announce_role(human_player)
+
+        await self.drain_output()
+        await CLI.get_input("\n按回车键开始游戏...", allow_empty=True)
+
+    def _create_game(self, board_config: str, game_id: Optional[str] = None) -> None:
+        """
+        创建新对局：分配游戏ID并开始追踪
+
+        Args:
+            board_config: 板子配置
+            game_id: 游戏ID，默认随机生成
+        """
+        self.game_state.game_id = game_id or str(uuid.uuid4())[:8]
+        current_game_id.set(self.game_state.game_id)  # LLM遥测按对局归档
+        if settings.TRACE_ENABLED:
+            start_trace(self.game_state.game_id)
+        self.game_state.board_config = board_config
+
+    async def _seat_players(self, players: List[Player]) -> None:
+        """
+        玩家入座，开始记录状态事件并开启事件流日志
+
+        Args:
+            players: 全部玩家（按座位顺序）
+        """
         self.game_state.all_players = players
         self.game_state.alive_players = players.copy()
         self.game_state.dead_players = []
 
-        # 显示你的角色
-        CLI.print_section("角色分配")
-        print(f"你的角色是：{human_player.role.role_type.value}")
-        print(f"阵营：{human_player.role.camp.value}")
-        print(f"\n角色描述：")
-        print(human_player.role.get_role_description())
+        # 之后的状态变化都记录为状态事件
+        self.game_state.journal = StateJournal(settings.STATE_SNAPSHOT_INTERVAL)
+        self.game_state.journal.start(self.game_state)
+        self.state_feed = StateFeed(self.game_state, settings.STATE_SYNC_MAX_DELTA)
+
+        if settings.GAME_EVENT_LOG:
+            await self._open_event_log()
+
+    def announce_role(self, player: Player) -> None:
+        """向真人玩家私下公布身份"""
+        private = [player.id]
+        self.emit(CLI.format_section("角色分配"), visible_to=private)
+        self.emit(f"你的角色是：{player.role.role_type.value}", visible_to=private)
+        self.emit(f"阵营：{player.role.camp.value}", visible_to=private)
+        self.emit(f"\n角色描述：", visible_to=private)
+        self.emit(player.role.get_role_description(), visible_to=private)
 
-        input("\n按回车键开始游戏...")
+    async def resume_game(self, game_id: str) -> str:
+        """
+        从最近的检查点恢复游戏（代替 setup_game）
+
+        恢复游戏状态、玩家对象（含AI角色推理、预言家查验记录、女巫药水、猎人开枪权）和随机数状态
+
+        Args:
+            game_id: 游戏ID
+
+        Returns:
+            str: 下一个要执行的阶段（night/day/vote），传给 run_game
+
+        Raises:
+            ValueError: 没有该游戏的检查点
+        """
+        checkpoint = await self.state_store.load(game_id) if self.state_store is not None else None
+        if checkpoint is None:
+            raise ValueError(f"未找到游戏 {game_id} 的检查点（可能已结束或已过期）")
+        if checkpoint.get("version", 1) < 2:
+            raise ValueError(f"游戏 {game_id} 的检查点版本过旧（缺少阶段游标和随机数状态），无法恢复")
+
+        self._warm_up_task = asyncio.create_task(self._warm_up_llm())
+
+        # 角色构造时会消耗随机数，恢复随机数状态放在重建玩家之后
+        self.game_state = GameState.from_dict(checkpoint["state"], self._restore_player)
+        self.game_state.journal = StateJournal(settings.STATE_SNAPSHOT_INTERVAL)
+        self.game_state.journal.start(self.game_state, seq=checkpoint.get("event_seq", 0))
+        self.state_feed = StateFeed(self.game_state, settings.STATE_SYNC_MAX_DELTA)
+        version, internal, gauss_next = checkpoint["rng_state"]
+        random.setstate((version, tuple(internal), gauss_next))
+        self.last_checkpoint = {"round": checkpoint["round"], "phase": checkpoint["phase"]}
+
+        current_game_id.set(game_id)
+        if settings.TRACE_ENABLED:
+            start_trace(game_id)
+
+        human_player = self.get_human_player()
+        if human_player is not None:
+            self.terminal.viewer_id = human_player.id
+
+        if settings.GAME_EVENT_LOG:
+            await self._open_event_log(resumed_from=self.last_checkpoint)
+
+        self.emit(CLI.format_header("狼人杀游戏"))
+        self.emit(
+            f"已恢复游戏 {game_id}：第{checkpoint['round']}轮{self.PHASE_NAMES[checkpoint['phase']]}阶段结束时的检查点"
+            f"（保存于 {checkpoint['saved_at']}）"
+        )
+        # 本地终端和远程真人都只看到自己的身份
+        for player in self.game_state.all_players:
+            if player.is_human:
+                self.emit(f"你是 {player.id}号 {player.name}，角色：{player.role.role_type.value}", visible_to=[player.id])
+
+        await self.drain_output()
+        return checkpoint["next_phase"]
+
+    def _restore_player(self, record: Dict[str, Any], role: BaseRole) -> Player:
+        """按检查点中的玩家记录创建玩家对象（GameState.from_dict 的回调）"""
+        if record["kind"] == "human":
+            return HumanPlayer(record["id"], record["name"], role)
+        return AIPlayer(record["id"], record["name"], role, self.player_ai)
+
+    async def _open_event_log(self, resumed_from: Optional[Dict[str, Any]] = None):
+        """
+        开启JSONL事件流日志，先写入开局信息，之后的事件由总线逐条写入
+
+        Args:
+            resumed_from: 从检查点恢复时的轮次和阶段（写入开局信息）
+        """
+        self.event_log = EventLogWriter(
+            event_log_path(settings.GAME_LOG_DIR, self.game_state.game_id),
+            flush_interval=settings.GAME_EVENT_LOG_FLUSH_INTERVAL
+        )
+        header = {
+            "type": "header",
+            "game_id": self.game_state.game_id,
+            "board_config": self.game_state.board_config,
+            "start_time": datetime.now().isoformat(),
+            "players": self._player_records(),
+        }
+        if resumed_from is not None:
+            header["resumed_from"] = resumed_from
+        await self.event_log.write(header)
+        self.events.subscribe(self.event_log, name="event_log", overflow="buffer")
+
+    def _player_records(self) -> List[dict]:
+        """玩家身份列表（日志用）"""
+        return [
+            {
+                "id": p.id,
+                "name": p.name,
+                "role": p.role.role_type.value,
+                "camp": p.role.camp.value,
+                "is_alive": p.is_alive,
+                "is_sheriff": (p.id == self.game_state.sheriff_player_id)
+            }
+            for p in self.game_state.all_players
+        ]
+
+    def emit(
+        self,
+        text: str,
+        event_type: GameEventType = GameEventType.MESSAGE,
+        visible_to: Optional[Iterable[int]] = None,
+        **data
+    ) -> None:
+        """
+        发布一条游戏事件（不等待输出）
+
+        Args:
+            text: 终端渲染文本
+            event_type: 事件类型
+            visible_to: 可见玩家ID，None表示公开
+            **data: 结构化数据
+        """
+        self.events.publish(GameEvent(
+            event_type, text, data, visible_to,
+            game_id=self.game_state.game_id or None,
+            round_number=self.game_state.round_number,
+            phase=self.game_state.current_phase
+        ))
+
+    async def drain_output(self) -> None:
+        """
+        等待终端和事件日志输出完已发布的事件
+
+        只等待buffer策略的本地订阅者；远程连接（drop策略）各自消费，不读取消息的慢连接不会拖住对局
+        """
+        await self.events.drain("buffer")
+
+    async def _decide(self, player: Player, name: str, decide: Callable[[Player], Awaitable[T]]) -> T:
+        """
+        等待一次玩家决策（发言、投票、选择目标等），并记录追踪区间
+
+        真人决策前先等待终端输出完积压的消息，保证提示出现在最新消息之后（不等待远程连接）。
+        整个决策在时限内完成（发言类 SPEECH_TIME_LIMIT，其余 VOTE_TIME_LIMIT）：
+        - 真人可用时限减去 FALLBACK_TIME_LIMIT，超时后由AI在剩余时间内代为决策，AI再超时由启发式策略决策
+        - AI的LLM调用时限已预留 FALLBACK_TIME_LIMIT（见 config.llm_config），仍超时则由启发式策略决策
+        超时记入行动历史
+
+        Args:
+            player: 做决策的玩家
+            name: 决策名称
+            decide: 决策函数，以做决策的玩家（本人或替身）为参数
+
+        Returns:
+            决策结果
+        """
+        limit = GameConfig.SPEECH_TIME_LIMIT if name in SPEECH_DECISIONS else GameConfig.VOTE_TIME_LIMIT
+        loop = asyncio.get_running_loop()
+        with span(
+            name, "decision",
+            player_id=player.id,
+            role=player.role.role_type.value,
+            human=player.is_human
+        ) as span_args:
+            if player.is_human:
+                await self.drain_output()
+            deadline = loop.time() + limit
+            own_limit = max(limit - GameConfig.FALLBACK_TIME_LIMIT, 0) if player.is_human else limit
+            try:
+                return await asyncio.wait_for(decide(player), own_limit)
+            except asyncio.TimeoutError:
+                pass
+
+            public = name not in PRIVATE_DECISIONS
+            if player.is_human:
+                span_args["timeout"] = "ai"
+                self.game_state.add_timeout(player, name, "ai", own_limit, public)
+                self.emit(
+                    f"\n⏰ {player.name}（{player.id}号）{own_limit:g}秒内未操作，由AI代为决策",
+                    visible_to=None if public else [player.id],
+                    action="timeout", player_id=player.id, decision=name
+                )
+                remaining = max(deadline - loop.time(), 0)
+                try:
+                    return await asyncio.wait_for(decide(self._ai_stand_in(player)), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                own_limit = round(remaining, 1)
+
+            span_args["timeout"] = "heuristic"
+            self.game_state.add_timeout(player, name, "heuristic", own_limit, public)
+            return await decide(HeuristicPlayer.stand_in(player, self.player_ai.heuristics))
+
+    def _ai_stand_in(self, player: Player) -> AIPlayer:
+        """代替超时真人做这一次决策的AI玩家（共享角色对象）"""
+        stand_in = AIPlayer(player.id, player.name, player.role, self.player_ai)
+        stand_in.seat_number = player.seat_number
+        stand_in.is_sheriff = player.is_sheriff
+        stand_in.speech_history = player.speech_history
+        return stand_in
 
     def get_human_player(self) -> Player:
         """获取真人玩家"""
@@ -116,49 +398,98 @@ class WolfkillGame:
         winner = self.game_state.is_game_over()
         if winner:
             if context:
-                print(f"\n[游戏结束] 在{context}后判定胜利")
+                self.emit(f"\n[游戏结束] 在{context}后判定胜利")
             await self.end_game(winner)
             return True
         return False
 
-    async def run_game(self):
-        """运行游戏主循环"""
-        print("\n" + "="*50)
-        print("游戏开始！")
-        print("="*50)
-
-        while True:
-            self.game_state.round_number += 1
+    # 每轮的阶段顺序（检查点记录刚结束的阶段，恢复时从下一阶段继续）
+    PHASES = ("night", "day", "vote")
+    PHASE_NAMES = {"night": "夜晚", "day": "白天", "vote": "投票"}
 
-            # 夜晚阶段
-            await self.night_phase()
+    async def run_game(self, start_phase: str = "night"):
+        """
+        运行游戏主循环
 
-            # 白天阶段
-            await self.day_phase()
+        Args:
+            start_phase: 从哪个阶段开始（新游戏为night；恢复时为 resume_game 的返回值，night表示进入新的一轮）
+        """
+        self.emit("\n" + "="*50)
+        self.emit("游戏开始！" if self.game_state.round_number == 0 else "游戏继续！")
+        self.emit("="*50)
+
+        phase = start_phase
+        while not self._game_over:
+            if phase == "night":
+                self.game_state.apply(StateEventType.ROUND_STARTED, round=self.game_state.round_number + 1)
+
+            with span(f"round {self.game_state.round_number}", "round"):
+                # 夜晚阶段
+                if phase == "night":
+                    await self.night_phase()
+                    await self.checkpoint("night")
+
+                # 白天阶段
+                if phase in ("night", "day"):
+                    await self.day_phase()
+                    await self.checkpoint("day")
+
+                # 完整检查胜负（兜底检查）
+                winner = self.game_state.is_game_over()
+                if not winner:
+                    # 投票阶段
+                    await self.vote_phase()
+                    await self.checkpoint("vote")
+                    winner = self.game_state.is_game_over()
 
-            # 完整检查胜负（兜底检查）
-            winner = self.game_state.is_game_over()
             if winner:
                 await self.end_game(winner)
                 break
+            phase = "night"
 
-            # 投票阶段
-            await self.vote_phase()
+    async def checkpoint(self, phase: str):
+        """
+        在阶段边界保存检查点（游戏已分出胜负时不保存）
 
+        同时保存下一阶段和随机数状态，恢复后的随机选择（平票、随机目标）与中断前一致
+
+        Args:
+            phase: 刚结束的阶段
+        """
+        if self.state_store is None or self.game_state.is_game_over():
+            return
+        checkpoint = {
+            "version": 2,
+            "game_id": self.game_state.game_id,
+            "round": self.game_state.round_number,
+            "phase": phase,
+            "next_phase": self.PHASES[(self.PHASES.index(phase) + 1) % len(self.PHASES)],
+            "saved_at": datetime.now().isoformat(),
+            "event_seq": self.game_state.journal.seq if self.game_state.journal else 0,
+            "rng_state": random.getstate(),
+            "state": self.game_state.to_dict(),
+        }
+        with span("checkpoint", "storage", phase=phase):
+            try:
+                await self.state_store.save(self.game_state.game_id, checkpoint)
+                self.last_checkpoint = {"round": checkpoint["round"], "phase": phase}
+            except Exception as e:
+                self.emit(f"[系统] 保存检查点失败：{type(e).__name__}: {e}")
+
+    @traced()
     async def night_phase(self):
         """夜晚阶段 - 完整实现"""
         # 显示轮次信息
         self.show_round_info()
 
-        CLI.print_header(f"第{self.game_state.round_number}轮 - 夜晚")
-
-        self.game_state.current_phase = "night"
+        self.game_state.apply(StateEventType.PHASE_CHANGED, phase="night")
+        self.emit(CLI.format_header(f"第{self.game_state.round_number}轮 - 夜晚"), GameEventType.PHASE_CHANGE)
 
         # 上帝宣布
         message = await self.god_ai.announce_night_start(self.game_state.round_number)
-        print(f"\n{message}\n")
+        self.emit(f"\n{message}\n", GameEventType.NARRATION)
 
-        await asyncio.sleep(1)
+        await self.pacer.beat(Beat.PAUSE)
 
         # 1. 狼人协商阶段（优先级1）
         await self.werewolf_discussion_phase()
@@ -169,6 +500,7 @@ class WolfkillGame:
         # 3. 女巫用药（优先级3）
         await self.witch_action_phase()
 
+    @traced()
     async def werewolf_discussion_phase(self):
         """狼人协商阶段"""
         werewolves = self.game_state.get_alive_werewolves()
@@ -177,31 +509,28 @@ class WolfkillGame:
             return
 
         # 判断是否显示狼人频道给真人玩家
-        human_player = self.get_human_player()
-        is_human_werewolf = (
-            human_player and
-            human_player.role.camp == RoleCamp.WEREWOLF and
-            human_player.is_alive
-        )
+        is_human_werewolf = any(w.is_human for w in werewolves)
+
+        wolf_ids = [w.id for w in werewolves]
 
         if is_human_werewolf:
-            CLI.print_section("🐺 狼人频道（只有你能看到）")
-            print(f"存活狼人：{', '.join([w.name for w in werewolves])}\n")
+            self.emit(CLI.format_section("🐺 狼人频道（只有你能看到）"), visible_to=wolf_ids)
+            self.emit(f"存活狼人：{', '.join([w.name for w in werewolves])}\n", visible_to=wolf_ids)
 
         # 3轮讨论
         MAX_DISCUSSION_ROUNDS = 3
 
         for round_idx in range(1, MAX_DISCUSSION_ROUNDS + 1):
             if is_human_werewolf:
-                print(f"\n--- 第{round_idx}轮讨论 ---\n")
+                self.emit(f"\n--- 第{round_idx}轮讨论 ---\n", visible_to=wolf_ids)
 
-            self.game_state.werewolf_discussion_round = round_idx
+            self.game_state.apply(StateEventType.WEREWOLF_DISCUSSION, round=round_idx)
 
             for werewolf in werewolves:
                 # 生成狼人的讨论内容
-                speech = await werewolf.make_werewolf_discussion(
-                    self.game_state,
-                    round_idx
+                speech = await self._decide(
+                    werewolf, "make_werewolf_discussion",
+                    lambda p: p.make_werewolf_discussion(self.game_state, round_idx)
                 )
 
                 # 记录到私密对话
@@ -215,14 +544,17 @@ class WolfkillGame:
                 # 只对真人狼人显示
                 if is_human_werewolf:
                     formatted = f"[狼人频道] {werewolf.name}（{werewolf.id}号）: {speech}"
-                    print(formatted)
+                    self.emit(
+                        formatted, GameEventType.SPEECH, visible_to=wolf_ids,
+                        channel="werewolf", player_id=werewolf.id, content=speech
+                    )
 
-                await asyncio.sleep(0.5)
+                await self.pacer.beat(Beat.LINE)
 
         # 讨论结束，每个狼人选择目标
         if is_human_werewolf:
-            print(f"\n--- 讨论结束，请选择杀人目标 ---\n")
-            print("提示：可以选择空刀(不杀人)，也可以自刀(杀死狼人)")
+            self.emit(f"\n--- 讨论结束，请选择杀人目标 ---\n", visible_to=wolf_ids)
+            self.emit("提示：可以选择空刀(不杀人)，也可以自刀(杀死狼人)", visible_to=wolf_ids)
 
         # 狼人可以杀任何存活玩家，包括自己和其他狼人
         available_targets = self.game_state.alive_players.copy()
@@ -233,10 +565,9 @@ class WolfkillGame:
         # 收集投票
         votes = {}
         for werewolf in werewolves:
-            target = await werewolf.choose_target(
-                self.game_state,
-                available_targets,
-                "kill"
+            target = await self._decide(
+                werewolf, "choose_target.kill",
+                lambda p: p.choose_target(self.game_state, available_targets, "kill")
             )
 
             if target:
@@ -245,19 +576,24 @@ class WolfkillGame:
                 if is_human_werewolf:
                     # 标注是否自刀
                     if target.role.camp == RoleCamp.WEREWOLF:
-                        print(f"{werewolf.name} 选择自刀 {target.name}")
+                        self.emit(
+                            f"{werewolf.name} 选择自刀 {target.name}", GameEventType.NIGHT_ACTION,
+                            visible_to=wolf_ids, action="kill_vote", player_id=werewolf.id, target_id=target.id
+                        )
                     else:
-                        print(f"{werewolf.name} 选择杀死 {target.name}")
+                        self.emit(
+                            f"{werewolf.name} 选择杀死 {target.name}", GameEventType.NIGHT_ACTION,
+                            visible_to=wolf_ids, action="kill_vote", player_id=werewolf.id, target_id=target.id
+                        )
 
         # 统计票数
         if not votes:
             if is_human_werewolf:
-                print("\n狼人选择空刀。")
+                self.emit("\n狼人选择空刀。", GameEventType.NIGHT_ACTION, visible_to=wolf_ids, action="kill", target_id=None)
             else:
-                print("\n[系统] 狼人今夜未行动")
+                self.emit("\n[系统] 狼人今夜未行动")
             # 空刀，不设置受害者
-            self.game_state.tonight_victim = None
-            self.game_state.last_werewolf_target = "空刀"
+            self.game_state.apply(StateEventType.NIGHT_TARGET, target_id=None)
             return
 
         from collections import Counter
@@ -274,22 +610,31 @@ class WolfkillGame:
 
         if is_human_werewolf:
             if len(candidates) > 1:
-                print(f"\n平票！随机选择了 {target.name}")
+                self.emit(
+                    f"\n平票！随机选择了 {target.name}", GameEventType.NIGHT_ACTION,
+                    visible_to=wolf_ids, action="kill", target_id=target.id
+                )
             else:
                 # 标注是否自刀
                 if target.role.camp == RoleCamp.WEREWOLF:
-                    print(f"\n最终决定：自刀 {target.name}")
+                    self.emit(
+                        f"\n最终决定：自刀 {target.name}", GameEventType.NIGHT_ACTION,
+                        visible_to=wolf_ids, action="kill", target_id=target.id
+                    )
                 else:
-                    print(f"\n最终决定：杀死 {target.name}")
+                    self.emit(
+                        f"\n最终决定：杀死 {target.name}", GameEventType.NIGHT_ACTION,
+                        visible_to=wolf_ids, action="kill", target_id=target.id
+                    )
 
         # 设置今晚的受害者
-        self.game_state.tonight_victim = target
-        self.game_state.last_werewolf_target = target.name
+        self.game_state.apply(StateEventType.NIGHT_TARGET, target_id=target.id)
 
         # 系统提示（新增）
         if not is_human_werewolf:
-            print("\n[系统] 狼人已确定今夜目标")
+            self.emit("\n[系统] 狼人已确定今夜目标")
 
+    @traced()
     async def seer_check_phase(self):
         """预言家查验阶段"""
         from roles.base_role import RoleType
@@ -302,19 +647,14 @@ class WolfkillGame:
                 break
 
         if not seer:
-            await asyncio.sleep(0.5)
+            await self.pacer.beat(Beat.LINE)
             return
 
         # 判断是否是真人预言家
-        human_player = self.get_human_player()
-        is_human_seer = (
-            human_player and
-            human_player.id == seer.id and
-            human_player.is_alive
-        )
+        is_human_seer = seer.is_human and seer.is_alive
 
         if is_human_seer:
-            CLI.print_section("🔮 预言家查验")
+            self.emit(CLI.format_section("🔮 预言家查验"), visible_to=[seer.id])
 
         # 获取可查验的目标
         available_targets = [p for p in self.game_state.alive_players if p.id != seer.id]
@@ -323,10 +663,9 @@ class WolfkillGame:
             return
 
         # 预言家选择查验目标
-        target = await seer.choose_target(
-            self.game_state,
-            available_targets,
-            "check"
+        target = await self._decide(
+            seer, "choose_target.check",
+            lambda p: p.choose_target(self.game_state, available_targets, "check")
         )
 
         if target:
@@ -334,25 +673,25 @@ class WolfkillGame:
             result = "狼人" if target.role.camp == RoleCamp.WEREWOLF else "好人"
 
             if is_human_seer:
-                print(f"\n你查验了 {target.name}（{target.id}号），TA 是：{result}")
+                self.emit(
+                    f"\n你查验了 {target.name}（{target.id}号），TA 是：{result}", GameEventType.NIGHT_ACTION,
+                    visible_to=[seer.id], action="check", target_id=target.id, result=result
+                )
 
             # 记录查验结果
-            if seer.id not in self.game_state.seer_check_results:
-                self.game_state.seer_check_results[seer.id] = []
-            self.game_state.seer_check_results[seer.id].append(
-                f"{target.name}（{target.id}号）是{result}"
-            )
+            self.game_state.apply(StateEventType.SEER_CHECKED, seer_id=seer.id, target_id=target.id, result=result)
 
             # 系统提示（新增）
             if not is_human_seer:
-                print("\n[系统] 预言家已完成查验")
+                self.emit("\n[系统] 预言家已完成查验")
         else:
             # 系统提示（新增）
             if not is_human_seer:
-                print("\n[系统] 预言家未查验")
+                self.emit("\n[系统] 预言家未查验")
 
-        await asyncio.sleep(0.5)
+        await self.pacer.beat(Beat.LINE)
 
+    @traced()
     async def witch_action_phase(self):
         """女巫用药阶段"""
         from roles.base_role import RoleType
@@ -365,92 +704,67 @@ class WolfkillGame:
                 break
 
         if not witch_player:
-            await asyncio.sleep(0.5)
+            await self.pacer.beat(Beat.LINE)
             return
 
         # 检查女巫是否还有药
         witch_role = witch_player.role
         if not witch_role.has_antidote and not witch_role.has_poison:
-            await asyncio.sleep(0.5)
+            await self.pacer.beat(Beat.LINE)
             return
 
         # 判断是否是真人女巫
-        human_player = self.get_human_player()
-        is_human_witch = (
-            human_player and
-            human_player.id == witch_player.id and
-            human_player.is_alive
-        )
+        is_human_witch = witch_player.is_human and witch_player.is_alive
 
         if is_human_witch:
-            CLI.print_section("💊 女巫行动")
-            print(f"剩余药水：{witch_role.get_remaining_potions()}")
+            self.emit(CLI.format_section("💊 女巫行动"), visible_to=[witch_player.id])
+            self.emit(f"剩余药水：{witch_role.get_remaining_potions()}", visible_to=[witch_player.id])
 
         # 女巫选择行动
-        action_result = await witch_player.choose_witch_action(
-            self.game_state,
-            witch_role
+        action_result = await self._decide(
+            witch_player, "choose_witch_action",
+            lambda p: p.choose_witch_action(self.game_state, witch_role)
         )
 
         if action_result:
             action_type, target = action_result
 
             if action_type == "save":
-                # 使用解药
-                self.game_state.saved_tonight = True
-                witch_role.has_antidote = False
+                # 使用解药（并记录到历史）
+                self.game_state.record_witch_action(self.game_state.round_number, witch_player, "save", target)
                 if is_human_witch:
-                    print(f"\n你使用了解药，救了 {target.name}")
-
-                # 记录到历史
-                self.game_state.record_witch_action(
-                    round_num=self.game_state.round_number,
-                    action_type="save",
-                    target=target,
-                    remaining_antidote=witch_role.has_antidote,
-                    remaining_poison=witch_role.has_poison
-                )
+                    self.emit(
+                        f"\n你使用了解药，救了 {target.name}", GameEventType.NIGHT_ACTION,
+                        visible_to=[witch_player.id], action="save", target_id=target.id
+                    )
 
                 # 系统提示（新增）
                 if not is_human_witch:
-                    print("\n[系统] 女巫已使用药物")
+                    self.emit("\n[系统] 女巫已使用药物")
 
             elif action_type == "poison":
-                # 使用毒药
-                self.game_state.poisoned_tonight.append(target)
-                witch_role.has_poison = False
+                # 使用毒药（并记录到历史）
+                self.game_state.record_witch_action(self.game_state.round_number, witch_player, "poison", target)
                 if is_human_witch:
-                    print(f"\n你使用了毒药，毒死了 {target.name}")
-
-                # 记录到历史
-                self.game_state.record_witch_action(
-                    round_num=self.game_state.round_number,
-                    action_type="poison",
-                    target=target,
-                    remaining_antidote=witch_role.has_antidote,
-                    remaining_poison=witch_role.has_poison
-                )
+                    self.emit(
+                        f"\n你使用了毒药，毒死了 {target.name}", GameEventType.NIGHT_ACTION,
+                        visible_to=[witch_player.id], action="poison", target_id=target.id
+                    )
 
                 # 系统提示（新增）
                 if not is_human_witch:
-                    print("\n[系统] 女巫已使用药物")
+                    self.emit("\n[系统] 女巫已使用药物")
         else:
             # 跳过
-            self.game_state.record_witch_action(
-                round_num=self.game_state.round_number,
-                action_type="skip",
-                target=None,
-                remaining_antidote=witch_role.has_antidote,
-                remaining_poison=witch_role.has_poison
-            )
+            self.game_state.record_witch_action(self.game_state.round_number, witch_player, "skip", None)
 
             if is_human_witch:
-                print("\n你选择跳过。")
+                self.emit("\n你选择跳过。", GameEventType.NIGHT_ACTION, visible_to=[witch_player.id], action="skip")
             else:
                 # 系统提示（新增）
-                print("\n[系统] 女巫未使用药物")
+                self.emit("\n[系统] 女巫未使用药物")
 
-        await asyncio.sleep(0.5)
+        await self.pacer.beat(Beat.LINE)
 
     async def handle_hunter_shoot(self, deaths: List[Player]):
         """处理猎人开枪"""
@@ -469,28 +783,24 @@ class WolfkillGame:
 
         if not hunter or was_poisoned:
             if hunter and was_poisoned:
-                print(f"\n{hunter.name} 是猎人，但因为被女巫毒死，无法发动技能。")
+                self.emit(f"\n{hunter.name} 是猎人，但因为被女巫毒死，无法发动技能。")
             return
 
         # 猎人可以开枪
         hunter_role = hunter.role
 
         if not hunter_role.can_shoot:
-            print(f"\n{hunter.name} 是猎人，但已经开过枪，无法再次发动技能。")
+            self.emit(f"\n{hunter.name} 是猎人，但已经开过枪，无法再次发动技能。")
             return
 
         # 判断是否是真人猎人
-        human_player = self.get_human_player()
-        is_human_hunter = (
-            human_player and
-            human_player.id == hunter.id
-        )
+        is_human_hunter = hunter.is_human
 
         if is_human_hunter:
-            CLI.print_section("🔫 猎人开枪")
-            print(f"你是猎人，已经死亡，可以选择开枪带走一名玩家。")
+            self.emit(CLI.format_section("🔫 猎人开枪"), visible_to=[hunter.id])
+            self.emit(f"你是猎人，已经死亡，可以选择开枪带走一名玩家。", visible_to=[hunter.id])
         else:
-            print(f"\n{hunter.name} 是猎人，可以开枪...")
+            self.emit(f"\n{hunter.name} 是猎人，可以开枪...")
 
         # 获取可选目标
         available_targets = self.game_state.alive_players.copy()
@@ -499,21 +809,19 @@ class WolfkillGame:
             return
 
         # 猎人选择目标
-        target = await hunter.choose_target(
-            self.game_state,
-            available_targets,
-            "shoot"
+        target = await self._decide(
+            hunter, "choose_target.shoot",
+            lambda p: p.choose_target(self.game_state, available_targets, "shoot")
         )
 
         if target:
             # 开枪带走目标
-            print(f"\n{hunter.name} 开枪带走了 {target.name}！")
-
-            target.is_alive = False
-            self.game_state.alive_players.remove(target)
-            self.game_state.dead_players.append(target)
+            self.emit(
+                f"\n{hunter.name} 开枪带走了 {target.name}！", GameEventType.DEATH,
+                cause="hunter", player_ids=[target.id], shooter_id=hunter.id
+            )
 
-            hunter_role.can_shoot = False
+            self.game_state.apply(StateEventType.HUNTER_SHOT, hunter_id=hunter.id, target_id=target.id)
 
             # 记录猎人开枪到对话历史
             self.game_state.add_announcement(
@@ -521,7 +829,7 @@ class WolfkillGame:
                 f"{hunter.name}（{hunter.id}号）发动猎人技能，开枪带走了{target.name}（{target.id}号）"
             )
 
-            await asyncio.sleep(1)
+            await self.pacer.beat(Beat.PAUSE)
 
             # 如果是immediate模式，立即检查胜利
             config = game_config.victory_check_config
@@ -532,7 +840,7 @@ class WolfkillGame:
             # 检查被枪杀的是否是警长，如果是可以传递警徽
             await self.handle_sheriff_death(target)
         else:
-            print(f"\n{hunter.name} 选择不开枪。")
+            self.emit(f"\n{hunter.name} 选择不开枪。")
 
             # 记录猎人放弃开枪
             self.game_state.add_announcement(
@@ -557,17 +865,13 @@ class WolfkillGame:
             return
 
         # 判断是否是真人猎人
-        human_player = self.get_human_player()
-        is_human_hunter = (
-            human_player and
-            human_player.id == exiled_player.id
-        )
+        is_human_hunter = exiled_player.is_human
 
         if is_human_hunter:
-            CLI.print_section("🔫 猎人开枪")
-            print(f"你是猎人，已被放逐，可以选择开枪带走一名玩家。")
+            self.emit(CLI.format_section("🔫 猎人开枪"), visible_to=[exiled_player.id])
+            self.emit(f"你是猎人，已被放逐，可以选择开枪带走一名玩家。", visible_to=[exiled_player.id])
         else:
-            print(f"\n{exiled_player.name} 是猎人，可以开枪...")
+            self.emit(f"\n{exiled_player.name} 是猎人，可以开枪...")
 
         # 获取可选目标
         available_targets = self.game_state.alive_players.copy()
@@ -576,21 +880,19 @@ class WolfkillGame:
             return
 
         # 猎人选择目标
-        target = await exiled_player.choose_target(
-            self.game_state,
-            available_targets,
-            "shoot"
+        target = await self._decide(
+            exiled_player, "choose_target.shoot",
+            lambda p: p.choose_target(self.game_state, available_targets, "shoot")
         )
 
         if target:
             # 开枪带走目标
-            print(f"\n{exiled_player.name} 开枪带走了 {target.name}！")
-
-            target.is_alive = False
-            self.game_state.alive_players.remove(target)
-            self.game_state.dead_players.append(target)
+            self.emit(
+                f"\n{exiled_player.name} 开枪带走了 {target.name}！", GameEventType.DEATH,
+                cause="hunter", player_ids=[target.id], shooter_id=exiled_player.id
+            )
 
-            hunter_role.can_shoot = False
+            self.game_state.apply(StateEventType.HUNTER_SHOT, hunter_id=exiled_player.id, target_id=target.id)
 
             # 记录猎人开枪到对话历史
             self.game_state.add_announcement(
@@ -598,7 +900,7 @@ class WolfkillGame:
                 f"{exiled_player.name}（{exiled_player.id}号）发动猎人技能，开枪带走了{target.name}（{target.id}号）"
             )
 
-            await asyncio.sleep(1)
+            await self.pacer.beat(Beat.PAUSE)
 
             # 如果是immediate模式，立即检查胜利
             config = game_config.victory_check_config
@@ -609,7 +911,7 @@ class WolfkillGame:
             # 检查被枪杀的是否是警长，如果是可以传递警徽
             await self.handle_sheriff_death(target)
         else:
-            print(f"\n{exiled_player.name} 选择不开枪。")
+            self.emit(f"\n{exiled_player.name} 选择不开枪。")
 
             # 记录猎人放弃开枪
             self.game_state.add_announcement(
@@ -617,18 +919,18 @@ class WolfkillGame:
                 f"{exiled_player.name}（{exiled_player.id}号）放弃开枪"
             )
 
+    @traced()
     async def day_phase(self):
         """白天阶段"""
         # 处理夜晚死亡
         deaths = self.game_state.process_night_deaths()
 
-        CLI.print_header(f"第{self.game_state.round_number}轮 - 白天")
-
-        self.game_state.current_phase = "day"
+        self.game_state.apply(StateEventType.PHASE_CHANGED, phase="day")
+        self.emit(CLI.format_header(f"第{self.game_state.round_number}轮 - 白天"), GameEventType.PHASE_CHANGE)
 
         # 宣布死讯
         death_message = await self.god_ai.announce_death(deaths)
-        print(f"\n{death_message}\n")
+        self.emit(f"\n{death_message}\n", GameEventType.DEATH, cause="night", player_ids=[d.id for d in deaths])
 
         # 记录夜晚死亡到对话历史（让所有玩家都能看到）
         if deaths:
@@ -638,25 +940,27 @@ class WolfkillGame:
                 f"昨晚死亡：{death_names}"
             )
 
-            # 更新最后死者座位号（取最小座位号）
-            death_seats = [d.seat_number for d in deaths]
-            self.game_state.last_death_seat = min(death_seats)
-
             # 警长决定发言方向（只在有警长且警长存活时）
             sheriff = self.game_state.get_sheriff()
             if sheriff and sheriff.is_alive:
-                direction = await sheriff.choose_speaking_direction(self.game_state)
-                self.game_state.speaking_order_direction = direction
+                direction = await self._decide(
+                    sheriff, "choose_speaking_direction",
+                    lambda p: p.choose_speaking_direction(self.game_state)
+                )
+                self.game_state.apply(StateEventType.SPEAKING_DIRECTION, direction=direction)
 
                 direction_name = "死者右边（座位号增加方向）" if direction == "clockwise" else "死者左边（座位号减少方向）"
-                print(f"\n警长 {sheriff.name} 决定从{direction_name}开始发言。\n")
+                self.emit(
+                    f"\n警长 {sheriff.name} 决定从{direction_name}开始发言。\n", GameEventType.SHERIFF,
+                    action="direction", player_id=sheriff.id, direction=direction
+                )
         else:
             self.game_state.add_announcement(
                 self.game_state.round_number,
                 "昨晚平安夜，无人死亡"
             )
 
-        await asyncio.sleep(1)
+        await self.pacer.beat(Beat.PAUSE)
 
         # 如果是immediate模式且配置要求在警长传递前检查
         config = game_config.victory_check_config
@@ -680,29 +984,29 @@ class WolfkillGame:
         if await self.check_and_handle_victory("夜晚死亡连锁处理完成"):
             return
 
-        await asyncio.sleep(1)
+        await self.pacer.beat(Beat.PAUSE)
 
         # 发言阶段
-        CLI.print_section("发言阶段")
+        self.emit(CLI.format_section("发言阶段"))
 
         # 计算发言顺序
         speaking_order = self.game_state.calculate_speaking_order()
 
         for player in speaking_order:
-            print(f"\n轮到 {player.name}（{player.id}号）发言...")
+            self.emit(f"\n轮到 {player.name}（{player.id}号）发言...")
 
-            speech = await player.make_speech(self.game_state)
+            speech = await self._decide(player, "make_speech", lambda p: p.make_speech(self.game_state))
 
             formatted_speech = Display.format_speech(player, speech)
-            print(formatted_speech)
+            self.emit(formatted_speech, GameEventType.SPEECH, channel="day", player_id=player.id, content=speech)
 
             self.game_state.add_speech(self.game_state.round_number, player, speech)
 
-            await asyncio.sleep(0.5)
+            await self.pacer.beat(Beat.LINE)
 
         # 第一轮发言后进行警长竞选
         if self.game_state.round_number == 1 and not self.game_state.sheriff_election_done:
-            await asyncio.sleep(1)
+            await self.pacer.beat(Beat.PAUSE)
             await self.sheriff_election_phase()
 
     async def handle_sheriff_death(self, dead_player: Player):
@@ -710,21 +1014,27 @@ class WolfkillGame:
         if not dead_player.is_sheriff:
             return
 
-        print(f"\n警长 {dead_player.name} 已死亡，可以传递警徽...")
+        self.emit(f"\n警长 {dead_player.name} 已死亡，可以传递警徽...")
 
         # 获取可选继承人
         candidates = [p for p in self.game_state.alive_players if p.id != dead_player.id]
 
         if not candidates:
-            print("没有存活玩家可以继承警徽。")
+            self.emit("没有存活玩家可以继承警徽。")
             self.game_state.set_sheriff(None)
             return
 
         # 警长选择继承人
-        successor = await dead_player.choose_sheriff_successor(self.game_state)
+        successor = await self._decide(
+            dead_player, "choose_sheriff_successor",
+            lambda p: p.choose_sheriff_successor(self.game_state)
+        )
 
         if successor:
-            print(f"\n{dead_player.name} 将警徽传递给 {successor.name}（{successor.id}号）")
+            self.emit(
+                f"\n{dead_player.name} 将警徽传递给 {successor.name}（{successor.id}号）", GameEventType.SHERIFF,
+                action="transfer", player_id=dead_player.id, target_id=successor.id
+            )
             self.game_state.transfer_sheriff(dead_player.id, successor.id)
 
             self.game_state.add_announcement(
@@ -732,7 +1042,10 @@ class WolfkillGame:
                 f"{dead_player.name}（{dead_player.id}号）将警徽传递给{successor.name}（{successor.id}号）"
             )
         else:
-            print(f"\n{dead_player.name} 选择撕毁警徽。")
+            self.emit(
+                f"\n{dead_player.name} 选择撕毁警徽。", GameEventType.SHERIFF,
+                action="destroy", player_id=dead_player.id
+            )
             self.game_state.set_sheriff(None)
 
             self.game_state.add_announcement(
@@ -740,67 +1053,84 @@ class WolfkillGame:
                 f"{dead_player.name}（{dead_player.id}号）撕毁警徽"
             )
 
+    @traced()
     async def sheriff_election_phase(self):
         """警长竞选阶段"""
         # 检查是否已竞选过
         if self.game_state.sheriff_election_done:
             return
 
-        CLI.print_header("警长竞选")
+        self.emit(CLI.format_header("警长竞选"), GameEventType.PHASE_CHANGE, stage="sheriff_election")
 
-        print("\n现在开始警长竞选！")
-        print("警长权利：")
-        print("  1. 投票时票数为1.5票")
-        print("  2. 决定后续轮次的发言顺序（从死者左边或右边开始）")
-        print("  3. 死亡时可以传递警徽或撕毁警徽\n")
+        self.emit("\n现在开始警长竞选！")
+        self.emit("警长权利：")
+        self.emit("  1. 投票时票数为1.5票")
+        self.emit("  2. 决定后续轮次的发言顺序（从死者左边或右边开始）")
+        self.emit("  3. 死亡时可以传递警徽或撕毁警徽\n")
 
-        await asyncio.sleep(1)
+        await self.pacer.beat(Beat.PAUSE)
 
         # 收集竞选意愿
-        print("询问所有玩家是否竞选警长...\n")
+        self.emit("询问所有玩家是否竞选警长...\n")
         candidates = []
 
         for player in self.game_state.alive_players:
-            will_run = await player.decide_sheriff_candidacy(self.game_state)
+            will_run = await self._decide(
+                player, "decide_sheriff_candidacy",
+                lambda p: p.decide_sheriff_candidacy(self.game_state)
+            )
 
             if will_run:
                 candidates.append(player)
-                print(f"{player.name}（{player.id}号）宣布竞选警长")
+                self.emit(
+                    f"{player.name}（{player.id}号）宣布竞选警长", GameEventType.SHERIFF,
+                    action="candidacy", player_id=player.id
+                )
 
-            await asyncio.sleep(0.3)
+            await self.pacer.beat(Beat.TICK)
 
         # 无人竞选
         if not candidates:
-            print("\n无人竞选警长，本轮无警长。")
-            self.game_state.sheriff_election_done = True
+            self.emit("\n无人竞选警长，本轮无警长。")
+            self.game_state.apply(StateEventType.SHERIFF_ELECTION_DONE)
             return
 
-        print(f"\n共有 {len(candidates)} 位候选人。\n")
-        await asyncio.sleep(1)
+        self.emit(f"\n共有 {len(candidates)} 位候选人。\n")
+        await self.pacer.beat(Beat.PAUSE)
 
         # 候选人发表竞选宣言
-        CLI.print_section("竞选宣言")
+        self.emit(CLI.format_section("竞选宣言"))
 
         for candidate in candidates:
-            speech = await candidate.make_sheriff_campaign_speech(self.game_state)
-            print(f"\n{candidate.name}（{candidate.id}号）：{speech}")
+            speech = await self._decide(
+                candidate, "make_sheriff_campaign_speech",
+                lambda p: p.make_sheriff_campaign_speech(self.game_state)
+            )
+            self.emit(
+                f"\n{candidate.name}（{candidate.id}号）：{speech}", GameEventType.SPEECH,
+                channel="campaign", player_id=candidate.id, content=speech
+            )
 
             # 记录竞选宣言到对话历史
             self.game_state.add_speech(
                 self.game_state.round_number,
                 candidate,
-                f"[竞选宣言] {speech}"
+                f"[竞选宣言] {speech}",
+                channel="campaign"
             )
 
-            await asyncio.sleep(0.5)
+            await self.pacer.beat(Beat.LINE)
 
         # 单候选人直接当选
         if len(candidates) == 1:
             winner = candidates[0]
-            print(f"\n只有一位候选人，{winner.name}（{winner.id}号）自动当选警长！")
+            self.emit(
+                f"\n只有一位候选人，{winner.name}（{winner.id}号）自动当选警长！", GameEventType.SHERIFF,
+                action="elected", player_id=winner.id
+            )
 
             self.game_state.set_sheriff(winner.id)
-            self.game_state.sheriff_election_done = True
+            self.game_state.apply(StateEventType.SHERIFF_ELECTION_DONE)
 
             # 记录到对话历史
             self.game_state.add_announcement(
@@ -816,11 +1146,11 @@ class WolfkillGame:
     async def _conduct_sheriff_voting(self, candidates: List[Player], is_pk_round: bool = False):
         """进行警长投票"""
         if is_pk_round:
-            print("\n进入PK轮投票...\n")
+            self.emit("\n进入PK轮投票...\n")
         else:
-            print("\n开始投票选举警长...\n")
+            self.emit("\n开始投票选举警长...\n")
 
-        print("注意：候选人不参与投票\n")
+        self.emit("注意：候选人不参与投票\n")
 
         # 收集投票
         votes = {}  # {candidate_id: vote_count}
@@ -832,28 +1162,37 @@ class WolfkillGame:
         voters = [p for p in self.game_state.alive_players if p not in candidates]
 
         for player in voters:
-            choice = await player.vote_for_sheriff(self.game_state, candidates)
+            choice = await self._decide(
+                player, "vote_for_sheriff",
+                lambda p: p.vote_for_sheriff(self.game_state, candidates)
+            )
 
             if choice and choice in candidates:
                 votes[choice.id] += 1
-                print(f"{player.name}（{player.id}号）投给 {choice.name}（{choice.id}号）")
+                self.emit(
+                    f"{player.name}（{player.id}号）投给 {choice.name}（{choice.id}号）", GameEventType.VOTE,
+                    kind="sheriff", voter_id=player.id, target_id=choice.id, weight=1.0
+                )
             else:
-                print(f"{player.name}（{player.id}号）弃票")
+                self.emit(
+                    f"{player.name}（{player.id}号）弃票", GameEventType.VOTE,
+                    kind="sheriff", voter_id=player.id, target_id=None, weight=0
+                )
 
-            await asyncio.sleep(0.3)
+            await self.pacer.beat(Beat.TICK)
 
         # 统计结果
-        print(f"\n投票结果：")
+        self.emit(f"\n投票结果：")
         for candidate in candidates:
             vote_count = votes.get(candidate.id, 0)
-            print(f"  {candidate.name}（{candidate.id}号）：{vote_count}票")
+            self.emit(f"  {candidate.name}（{candidate.id}号）：{vote_count}票")
 
         # 找出最高票
         max_votes = max(votes.values()) if votes else 0
 
         if max_votes == 0:
-            print("\n所有人都弃票，本轮无警长。")
-            self.game_state.sheriff_election_done = True
+            self.emit("\n所有人都弃票，本轮无警长。")
+            self.game_state.apply(StateEventType.SHERIFF_ELECTION_DONE)
             return
 
         winners = [c for c in candidates if votes.get(c.id, 0) == max_votes]
@@ -864,31 +1203,43 @@ class WolfkillGame:
                 # PK轮仍平票，随机选择
                 import random
                 winner = random.choice(winners)
-                print(f"\nPK轮仍然平票！随机选择 {winner.name}（{winner.id}号）当选警长。")
+                self.emit(
+                    f"\nPK轮仍然平票！随机选择 {winner.name}（{winner.id}号）当选警长。", GameEventType.SHERIFF,
+                    action="elected", player_id=winner.id
+                )
             else:
                 # 首轮平票，进入PK
-                print(f"\n平票！{', '.join([w.name for w in winners])} 进入PK环节。")
-                await asyncio.sleep(1)
+                self.emit(f"\n平票！{', '.join([w.name for w in winners])} 进入PK环节。")
+                await self.pacer.beat(Beat.PAUSE)
 
                 # PK发言
-                CLI.print_section("PK发言")
+                self.emit(CLI.format_section("PK发言"))
 
                 for candidate in winners:
-                    speech = await candidate.make_sheriff_campaign_speech(self.game_state)
-                    print(f"\n{candidate.name}（{candidate.id}号）：{speech}")
+                    speech = await self._decide(
+                        candidate, "make_sheriff_campaign_speech",
+                        lambda p: p.make_sheriff_campaign_speech(self.game_state)
+                    )
+                    self.emit(
+                        f"\n{candidate.name}（{candidate.id}号）：{speech}", GameEventType.SPEECH,
+                        channel="campaign_pk", player_id=candidate.id, content=speech
+                    )
 
-                    await asyncio.sleep(0.5)
+                    await self.pacer.beat(Beat.LINE)
 
                 # 重新投票
                 await self._conduct_sheriff_voting(winners, is_pk_round=True)
                 return
         else:
             winner = winners[0]
-            print(f"\n{winner.name}（{winner.id}号）当选警长！")
+            self.emit(
+                f"\n{winner.name}（{winner.id}号）当选警长！", GameEventType.SHERIFF,
+                action="elected", player_id=winner.id
+            )
 
         # 设置警长
         self.game_state.set_sheriff(winner.id)
-        self.game_state.sheriff_election_done = True
+        self.game_state.apply(StateEventType.SHERIFF_ELECTION_DONE)
 
         # 记录到对话历史
         self.game_state.add_announcement(
@@ -896,14 +1247,14 @@ class WolfkillGame:
             f"{winner.name}（{winner.id}号）当选警长"
         )
 
+    @traced()
     async def vote_phase(self):
         """投票阶段"""
-        CLI.print_header(f"第{self.game_state.round_number}轮 - 投票")
-
-        self.game_state.current_phase = "vote"
+        self.game_state.apply(StateEventType.PHASE_CHANGED, phase="vote")
+        self.emit(CLI.format_header(f"第{self.game_state.round_number}轮 - 投票"), GameEventType.PHASE_CHANGE)
         self.game_state.reset_votes()
 
-        print("开始投票...\n")
+        self.emit("开始投票...\n")
 
         # 获取警长
         sheriff = self.game_state.get_sheriff()
@@ -915,7 +1266,7 @@ class WolfkillGame:
 
         # 收集投票
         for player in self.game_state.alive_players:
-            target = await player.vote(self.game_state)
+            target = await self._decide(player, "vote", lambda p: p.vote(self.game_state))
 
             if target:
                 # 警长1.5票，普通玩家1票
@@ -931,60 +1282,64 @@ class WolfkillGame:
                 self.game_state.add_vote(self.game_state.round_number, player, target)
 
                 if player.id == sheriff_id:
-                    print(f"{player.name}（警长，1.5票） 投票给 {target.name}")
+                    text = f"{player.name}（警长，1.5票） 投票给 {target.name}"
                 else:
-                    print(f"{player.name} 投票给 {target.name}")
+                    text = f"{player.name} 投票给 {target.name}"
+                self.emit(
+                    text, GameEventType.VOTE,
+                    kind="exile", voter_id=player.id, target_id=target.id, weight=weight
+                )
             else:
                 vote_details.append((player, None, 0))
-                print(f"{player.name} 弃票")
+                self.emit(
+                    f"{player.name} 弃票", GameEventType.VOTE,
+                    kind="exile", voter_id=player.id, target_id=None, weight=0
+                )
 
-            await asyncio.sleep(0.3)
+            await self.pacer.beat(Beat.TICK)
 
         # 统计结果
         if not vote_weights:
-            print("\n所有人都弃票，无人被放逐。")
+            self.emit("\n所有人都弃票，无人被放逐。")
             return
 
         # 显示投票结果（保留1位小数）
-        print(f"\n投票结果：")
+        self.emit(f"\n投票结果：")
         for player_id, votes in vote_weights.items():
             player = next(p for p in self.game_state.all_players if p.id == player_id)
-            print(f"  {player.name}（{player.id}号）：{votes:.1f}票")
+            self.emit(f"  {player.name}（{player.id}号）：{votes:.1f}票")
 
         # 显示投票明细
-        print(f"\n投票明细：")
+        self.emit(f"\n投票明细：")
         for voter, target, weight in vote_details:
             if target:
                 if weight == 1.5:
-                    print(f"  {voter.name}（{voter.id}号，警长） → {target.name}（{target.id}号）")
+                    self.emit(f"  {voter.name}（{voter.id}号，警长） → {target.name}（{target.id}号）")
                 else:
-                    print(f"  {voter.name}（{voter.id}号） → {target.name}（{target.id}号）")
+                    self.emit(f"  {voter.name}（{voter.id}号） → {target.name}（{target.id}号）")
             else:
-                print(f"  {voter.name}（{voter.id}号） → 弃票")
+                self.emit(f"  {voter.name}（{voter.id}号） → 弃票")
 
         # 找出得票最高的（使用浮点权重）
         max_votes = max(vote_weights.values())
         candidates = [p for p in self.game_state.alive_players if vote_weights.get(p.id, 0) == max_votes]
 
         if len(candidates) > 1:
-            print(f"\n平票！{', '.join([c.name for c in candidates])} 都获得{max_votes:.1f}票。")
-            print("本轮无人被放逐。")
+            self.emit(f"\n平票！{', '.join([c.name for c in candidates])} 都获得{max_votes:.1f}票。")
+            self.emit("本轮无人被放逐。")
             return
 
         exiled = candidates[0]
 
         # 宣布结果
         vote_message = await self.god_ai.announce_vote_result(exiled, max_votes)
-        print(f"\n{vote_message}")
+        self.emit(f"\n{vote_message}", GameEventType.NARRATION)
 
         # 放逐玩家
-        exiled.is_alive = False
-        self.game_state.alive_players.remove(exiled)
-        self.game_state.dead_players.append(exiled)
-        self.game_state.today_voted_out = exiled
+        self.game_state.apply(StateEventType.PLAYER_EXILED, player_id=exiled.id)
 
         # 暗牌模式：不公开身份
-        print(f"\n{exiled.name} 已被放逐。")
+        self.emit(f"\n{exiled.name} 已被放逐。", GameEventType.DEATH, cause="exile", player_ids=[exiled.id], votes=max_votes)
 
         # 记录投票结果到对话历史（让所有玩家都能看到）
         self.game_state.add_announcement(
@@ -992,7 +1347,7 @@ class WolfkillGame:
             f"{exiled.name}（{exiled.id}号）被投票放逐，获得{max_votes:.1f}票"
         )
 
-        await asyncio.sleep(1)
+        await self.pacer.beat(Beat.PAUSE)
 
         # 如果是immediate模式且配置要求在猎人开枪前检查
         config = game_config.victory_check_config
@@ -1017,34 +1372,31 @@ class WolfkillGame:
         good_guys = [p for p in self.game_state.alive_players
                      if p.role.camp == RoleCamp.VILLAGER]
 
-        print(f"\n【第{self.game_state.round_number}轮】 存活：{len(werewolves)}狼 vs {len(good_guys)}好人")
+        self.emit(f"\n【第{self.game_state.round_number}轮】 存活：{len(werewolves)}狼 vs {len(good_guys)}好人")
         if self.game_state.sheriff_player_id:
             sheriff = next((p for p in self.game_state.all_players if p.id == self.game_state.sheriff_player_id), None)
             if sheriff:
-                print(f"当前警长：{sheriff.name}（{sheriff.id}号）")
+                self.emit(f"当前警长：{sheriff.name}（{sheriff.id}号）")
 
-    async def save_game_log(self, winner: str):
+    async def save_game_log(self, winner: str) -> dict:
         """
         保存游戏日志到JSON文件
 
         Args:
             winner: 获胜阵营
-        """
-        import json
-        from datetime import datetime
-        import os
-
-        # 创建存储目录
-        storage_dir = "storage/game_logs"
-        os.makedirs(storage_dir, exist_ok=True)
 
-        # 生成文件名（时间戳）
+        Returns:
+            dict: 游戏日志数据
+        """
+        # 生成文件名（时间戳 + 游戏ID，同一秒结束的多局不会互相覆盖）
+        storage_dir = settings.GAME_LOG_DIR
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{storage_dir}/game_{timestamp}.json"
+        filename = f"{storage_dir}/game_{timestamp}_{self.game_state.game_id}.json"
 
         # 构建游戏日志数据
         game_log = {
             "game_info": {
+                "game_id": self.game_state.game_id,
                 "end_time": datetime.now().isoformat(),
                 "winner": winner,
                 "total_rounds": self.game_state.round_number,
@@ -1053,72 +1405,130 @@ class WolfkillGame:
                 "alive_count": len(self.game_state.alive_players),
                 "dead_count": len(self.game_state.dead_players)
             },
-            "players": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "role": p.role.role_type.value,
-                    "camp": p.role.camp.value,
-                    "is_alive": p.is_alive,
-                    "is_sheriff": (p.id == self.game_state.sheriff_player_id)
-                }
-                for p in self.game_state.all_players
-            ],
+            "players": self._player_records(),
             "conversation_history": self.game_state.conversation_history,
             "witch_actions": self.game_state.witch_action_history,
+            "timeouts": self.game_state.get_timeouts(),
             "seer_checks": {
                 str(player_id): results
                 for player_id, results in self.game_state.seer_check_results.items()
             },
-            "victory_reason": self.game_state.get_victory_reason(winner)
+            "victory_reason": self.game_state.get_victory_reason(winner),
+            "llm_telemetry": telemetry.get_stats(self.game_state.game_id),
+            "pacing": self.pacer.get_stats(),
+            "events": self.event_metrics.get_stats(),
+            "state_events": self.game_state.journal.get_stats() if self.game_state.journal else None,
+            "state_sync": self.state_feed.get_stats() if self.state_feed else None
         }
 
-        # 保存到文件
+        # 保存到文件（序列化和写入在线程中进行，不阻塞事件循环）
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(game_log, f, ensure_ascii=False, indent=2)
-            print(f"\n✓ 游戏日志已保存：{filename}")
+            await asyncio.to_thread(self._write_game_log, filename, game_log)
+            self.emit(f"\n✓ 游戏日志已保存：{filename}")
         except Exception as e:
-            print(f"\n✗ 保存游戏日志失败：{e}")
+            self.emit(f"\n✗ 保存游戏日志失败：{e}")
+
+        return game_log
+
+    @staticmethod
+    def _write_game_log(filename: str, game_log: dict):
+        """写入完整游戏日志（在线程中执行）"""
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(game_log, f, ensure_ascii=False, indent=2)
+
+    async def _write_event_log_summary(self, game_log: dict):
+        """
+        在事件流末尾写入紧凑汇总（不含已逐条写入的对话历史）
+
+        Args:
+            game_log: 完整游戏日志
+        """
+        calls = sum(s["calls"] for s in game_log["llm_telemetry"].values())
+        cost = sum(s["cost"] for s in game_log["llm_telemetry"].values())
+
+        self._event_log_summarized = True
+        await self.event_log.write({
+            "type": "summary",
+            "game_id": self.game_state.game_id,
+            "game_info": game_log["game_info"],
+            "players": game_log["players"],
+            "victory_reason": game_log["victory_reason"],
+            "witch_actions": game_log["witch_actions"],
+            "seer_checks": game_log["seer_checks"],
+            "llm": {"calls": calls, "cost": round(cost, 6)},
+            "pacing": game_log["pacing"],
+        })
+        await self.event_log.flush()
 
     async def end_game(self, winner: str):
-        """游戏结束，显示详细总结"""
+        """游戏结束，显示详细总结（只执行一次）"""
+        if self._game_over:
+            return
+        self._game_over = True
 
-        print(f"\n[DEBUG] 游戏实例 ID: {self.instance_id} 结束")
-        print("\n" + "=" * 50)
-        print("  游戏结束")
-        print("=" * 50)
+        self.emit(f"\n[DEBUG] 游戏实例 ID: {self.instance_id} 结束")
+        self.emit("\n" + "=" * 50)
+        self.emit("  游戏结束")
+        self.emit("=" * 50)
 
         # 显示胜利方
-        print(f"\n🎉 {winner} 获得胜利！\n")
+        self.emit(f"\n🎉 {winner} 获得胜利！\n", GameEventType.GAME_END, winner=winner)
 
         # 显示详细的胜利原因
         victory_reason = self.game_state.get_victory_reason(winner)
-        print(victory_reason)
+        self.emit(victory_reason)
 
         # 显示游戏统计
-        print("\n【游戏统计】")
-        print(f"游戏轮数：{self.game_state.round_number}轮")
-        print(f"总玩家数：{len(self.game_state.all_players)}人")
-        print(f"存活人数：{len(self.game_state.alive_players)}人")
-        print(f"死亡人数：{len(self.game_state.dead_players)}人")
+        self.emit("\n【游戏统计】")
+        self.emit(f"游戏轮数：{self.game_state.round_number}轮")
+        self.emit(f"总玩家数：{len(self.game_state.all_players)}人")
+        self.emit(f"存活人数：{len(self.game_state.alive_players)}人")
+        self.emit(f"死亡人数：{len(self.game_state.dead_players)}人")
 
         # 显示玩家身份揭晓
-        print("\n【玩家身份揭晓】")
+        self.emit("\n【玩家身份揭晓】")
         from roles.base_role import RoleCamp
         for player in self.game_state.all_players:
             status = "✓存活" if player.is_alive else "✗死亡"
             camp_emoji = "🐺" if player.role.camp == RoleCamp.WEREWOLF else "👤"
-            print(f"{player.id}号 {player.name} [{status}] - {camp_emoji} {player.role.role_type.value}")
+            self.emit(f"{player.id}号 {player.name} [{status}] - {camp_emoji} {player.role.role_type.value}")
+
+        # 显示LLM调用统计
+        self.emit("\n【LLM调用统计】")
+        self.emit(telemetry.format_summary(self.game_state.game_id))
 
         # 保存游戏日志（新增）
-        await self.save_game_log(winner)
+        game_log = await self.save_game_log(winner)
+
+        # 游戏已结束，不再需要检查点
+        if self.state_store is not None:
+            try:
+                await self.state_store.delete(self.game_state.game_id)
+            except Exception as e:
+                self.emit(f"[系统] 删除检查点失败：{type(e).__name__}: {e}")
+
+        # 导出追踪文件
+        tracer = get_tracer()
+        if tracer is not None:
+            trace_path = tracer.export(settings.TRACE_DIR)
+            self.emit(f"\n追踪文件已保存：{trace_path}（可用 chrome://tracing 或 ui.perfetto.dev 打开）")
 
-        print("\n" + "=" * 50)
+        self.emit("\n" + "=" * 50)
+        await self.drain_output()
 
+        if self.event_log is not None and not self._event_log_summarized:
+            await self._write_event_log_summary(game_log)
 
-async def main():
-    """主函数"""
+
+async def main(resume_game_id: Optional[str] = None):
+    """
+    主函数
+
+    Args:
+        resume_game_id: 要恢复的游戏ID，None表示开始新游戏
+    """
+    game = None
     try:
         # 验证配置
         settings.validate()
@@ -1126,24 +1536,69 @@ async def main():
         # 创建游戏
         game = WolfkillGame()
 
-        # 设置游戏
-        await game.setup_game()
+        if resume_game_id:
+            # 从检查点恢复
+            start_phase = await game.resume_game(resume_game_id)
+        else:
+            # 设置游戏
+            await game.setup_game()
+            start_phase = "night"
 
         # 运行游戏
-        await game.run_game()
+        await game.run_game(start_phase)
 
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("\n\n游戏被中断。")
     except Exception as e:
         print(f"\n游戏出错：{e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # 输出剩余消息并写出事件流缓冲（中途出错时日志也能保留到出错前）
+        if game is not None:
+            await game.events.close()
+            if game.state_store is not None:
+                await game.state_store.close()
+            # 游戏未结束且有可恢复的检查点时提示恢复方式
+            if not game._game_over and game.last_checkpoint and game.state_store.persistent:
+                print(
+                    f"\n进度已保存（第{game.last_checkpoint['round']}轮"
+                    f"{WolfkillGame.PHASE_NAMES[game.last_checkpoint['phase']]}阶段结束时），"
+                    f"可使用 python main.py --resume {game.game_state.game_id} 继续"
+                )
 
 
-if __name__ == "__main__":
-    print("\n" + "="*60)
-    print(" "*15 + "狼人杀游戏 v1.0")
-    print(" "*10 + "Powered by DeepSeek AI")
-    print("="*60 + "\n")
+async def list_checkpoints():
+    """列出可恢复的游戏"""
+    state_store = create_state_store()
+    if state_store is None:
+        print("检查点已关闭（STATE_STORE=off）")
+        return
+    try:
+        game_ids = await state_store.list_games()
+        if not game_ids:
+            print("没有可恢复的游戏")
+        for game_id in game_ids:
+            checkpoint = await state_store.load(game_id)
+            if checkpoint is not None:
+                phase_name = WolfkillGame.PHASE_NAMES.get(checkpoint["phase"], checkpoint["phase"])
+                print(f"{game_id}  第{checkpoint['round']}轮{phase_name}阶段后  保存于 {checkpoint['saved_at']}")
+    finally:
+        await state_store.close()
 
-    asyncio.run(main())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="狼人杀游戏")
+    parser.add_argument("--resume", metavar="GAME_ID", help="从最近的检查点恢复中断的游戏")
+    parser.add_argument("--list", action="store_true", help="列出可恢复的游戏")
+    args = parser.parse_args()
+
+    if args.list:
+        asyncio.run(list_checkpoints())
+    else:
+        print("\n" + "="*60)
+        print(" "*15 + "狼人杀游戏 v1.0")
+        print(" "*10 + "Powered by DeepSeek AI")
+        print("="*60 + "\n")
+
+        asyncio.run(main(args.resume))
@@ -30,7 +30,6 @@ class AIPlayer(Player):
         await self._update_role_beliefs_before_speech(game_state)
 
         speech = await self.ai.generate_speech(self, game_state)
-        self.add_speech(speech)
         return speech
 
     async def _update_role_beliefs_before_speech(self, game_state: 'GameState'):
@@ -0,0 +1,88 @@
+"""
+启发式玩家实现 - 决策超时时的快速替身
+"""
+from typing import Optional, List, Tuple, TYPE_CHECKING
+from players.player import Player
+
+if TYPE_CHECKING:
+    from roles.base_role import BaseRole
+    from core.game_state import GameState
+    from ai.heuristic_policy import HeuristicPolicy
+
+
+class HeuristicPlayer(Player):
+    """
+    启发式玩家
+
+    只使用HeuristicPolicy在本地决策，不调用LLM、不等待输入，
+    用于玩家（真人或AI）决策超时后代为完成这一次决策
+    """
+
+    def __init__(self, player_id: int, name: str, role: 'BaseRole', policy: 'HeuristicPolicy'):
+        super().__init__(player_id, name, role)
+        self.policy = policy
+        self.role_beliefs = {}
+
+    @classmethod
+    def stand_in(cls, player: Player, policy: 'HeuristicPolicy') -> 'HeuristicPlayer':
+        """
+        创建某个玩家的替身（共享角色对象和AI角色推理）
+
+        Args:
+            player: 被代替的玩家
+            policy: 启发式策略
+        """
+        stand_in = cls(player.id, player.name, player.role, policy)
+        stand_in.seat_number = player.seat_number
+        stand_in.is_sheriff = player.is_sheriff
+        stand_in.role_beliefs = getattr(player, 'role_beliefs', None) or {}
+        return stand_in
+
+    async def make_speech(self, game_state: 'GameState') -> str:
+        return self.policy.generate_speech(self, game_state)
+
+    async def vote(self, game_state: 'GameState') -> Optional['Player']:
+        candidates = [p for p in game_state.alive_players if p.id != self.id]
+        return self.policy.choose_vote_target(self, game_state, candidates)
+
+    async def choose_target(
+        self,
+        game_state: 'GameState',
+        available_targets: List['Player'],
+        action_type: str
+    ) -> Optional['Player']:
+        if action_type == "kill":
+            return self.policy.choose_kill_target(self, game_state, available_targets)
+        if action_type == "check":
+            return self.policy.choose_check_target(self, game_state, available_targets)
+        return self.policy.choose_shoot_target(self, game_state, available_targets)
+
+    async def make_werewolf_discussion(self, game_state: 'GameState', round_idx: int) -> str:
+        return self.policy.generate_werewolf_discussion(self, game_state)
+
+    async def choose_witch_action(
+        self,
+        game_state: 'GameState',
+        witch_role: 'BaseRole'
+    ) -> Optional[Tuple[str, 'Player']]:
+        return self.policy.choose_witch_action(self, game_state, witch_role)
+
+    async def decide_sheriff_candidacy(self, game_state: 'GameState') -> bool:
+        return self.policy.decide_sheriff_candidacy(self, game_state)
+
+    async def make_sheriff_campaign_speech(self, game_state: 'GameState') -> str:
+        return self.policy.generate_campaign_speech(self, game_state)
+
+    async def vote_for_sheriff(
+        self,
+        game_state: 'GameState',
+        candidates: List['Player']
+    ) -> Optional['Player']:
+        return self.policy.choose_sheriff_vote(self, game_state, candidates)
+
+    async def choose_speaking_direction(self, game_state: 'GameState') -> str:
+        return "clockwise"
+
+    async def choose_sheriff_successor(self, game_state: 'GameState') -> Optional['Player']:
+        candidates = [p for p in game_state.alive_players if p.id != self.id]
+        return self.policy.choose_sheriff_successor(self, game_state, candidates)
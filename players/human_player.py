@@ -16,6 +16,8 @@ class HumanPlayer(Player):
     通过CLI获取输入
     """
 
+    is_human = True
+
     def __init__(self, player_id: int, name: str, role: 'BaseRole'):
         super().__init__(player_id, name, role)
 
@@ -34,7 +36,6 @@ class HumanPlayer(Player):
         if not speech:
             speech = "我没什么要说的。"
 
-        self.add_speech(speech)
         return speech
 
     async def vote(self, game_state: 'GameState') -> Optional['Player']:
@@ -16,6 +16,9 @@ class Player(ABC):
     所有玩家（真人和AI）都继承此类
     """
 
+    # 是否由真人操作（真人决策前先输出积压的消息，只对真人显示的提示据此判断）
+    is_human: bool = False
+
     def __init__(self, player_id: int, name: str, role: 'BaseRole'):
         """
         初始化玩家
@@ -0,0 +1,138 @@
+"""
+远程真人玩家实现（多人在线模式）
+"""
+from typing import Optional, List, Tuple, TYPE_CHECKING
+from players.player import Player
+from config.game_config import GameConfig
+
+if TYPE_CHECKING:
+    from roles.base_role import BaseRole
+    from core.game_state import GameState
+    from server.room import Seat
+
+
+class RemotePlayer(Player):
+    """
+    远程真人玩家
+
+    通过座位会话向客户端发出输入请求并等待回复；回复为空或无效时按跳过处理：发言用默认内容、投票弃票、目标跳过。
+    超过时限没有回复（包括连接断开）时由AI代为决策（见 WolfkillGame._decide）
+    """
+
+    is_human = True
+
+    def __init__(self, player_id: int, name: str, role: 'BaseRole', seat: 'Seat'):
+        super().__init__(player_id, name, role)
+        self.seat = seat
+
+    async def _ask_text(self, prompt: str, default: str) -> str:
+        """请求文本输入，为空时使用默认内容"""
+        text = await self.seat.ask("text", prompt, timeout=GameConfig.SPEECH_TIME_LIMIT - GameConfig.FALLBACK_TIME_LIMIT)
+        text = str(text).strip() if text is not None else ""
+        return text or default
+
+    async def _ask_choice(self, prompt: str, options: List[str]) -> Optional[int]:
+        """请求选择，返回选项序号（从0开始），回复无效时返回None"""
+        choice = await self.seat.ask("choice", prompt, options, timeout=GameConfig.VOTE_TIME_LIMIT - GameConfig.FALLBACK_TIME_LIMIT)
+        return choice if isinstance(choice, int) and 0 <= choice < len(options) else None
+
+    async def _ask_player(self, prompt: str, candidates: List['Player'], skip_label: str) -> Optional['Player']:
+        """从候选玩家中选择一名，最后一项为跳过/弃票"""
+        options = [f"{p.name}（{p.id}号）" for p in candidates] + [skip_label]
+        choice = await self._ask_choice(prompt, options)
+        if choice is None or choice == len(candidates):
+            return None
+        return candidates[choice]
+
+    async def make_speech(self, game_state: 'GameState') -> str:
+        """远程玩家发言"""
+        return await self._ask_text("轮到你发言了", "我没什么要说的。")
+
+    async def vote(self, game_state: 'GameState') -> Optional['Player']:
+        """远程玩家投票"""
+        candidates = [p for p in game_state.alive_players if p.id != self.id]
+        return await self._ask_player("请选择你要投票放逐的玩家", candidates, "弃票")
+
+    async def choose_target(
+        self,
+        game_state: 'GameState',
+        available_targets: List['Player'],
+        action_type: str
+    ) -> Optional['Player']:
+        """远程玩家选择夜晚行动目标"""
+        action_names = {
+            "kill": "杀死",
+            "check": "查验",
+            "poison": "毒死",
+            "shoot": "射击"
+        }
+        action_name = action_names.get(action_type, action_type)
+        return await self._ask_player(f"请选择{action_name}的目标", available_targets, "跳过")
+
+    async def make_werewolf_discussion(
+        self,
+        game_state: 'GameState',
+        round_idx: int
+    ) -> str:
+        """远程狼人在狼人频道发言"""
+        return await self._ask_text(f"轮到你在狼人频道发言（第{round_idx}轮）", "我没意见，听大家的。")
+
+    async def choose_witch_action(
+        self,
+        game_state: 'GameState',
+        witch_role: 'BaseRole'
+    ) -> Optional[Tuple[str, 'Player']]:
+        """女巫选择行动（每晚只能用一种药，不能救自己）"""
+        options = ["跳过"]
+        actions: List[str] = [""]
+
+        victim = game_state.tonight_victim
+        if witch_role.has_antidote and victim and victim.id != self.id:
+            options.append(f"使用解药救 {victim.name}（{victim.id}号）")
+            actions.append("save")
+        if witch_role.has_poison:
+            options.append("使用毒药")
+            actions.append("poison")
+
+        choice = await self._ask_choice(f"女巫行动（剩余药水：{witch_role.get_remaining_potions()}）", options)
+        if not choice:
+            return None
+
+        if actions[choice] == "save":
+            return ("save", victim)
+
+        candidates = [p for p in game_state.alive_players if p.id != self.id]
+        target = await self._ask_player("请选择毒人目标", candidates, "放弃用毒")
+        return ("poison", target) if target else None
+
+    async def decide_sheriff_candidacy(self, game_state: 'GameState') -> bool:
+        """远程玩家决定是否竞选警长"""
+        return await self._ask_choice("是否竞选警长？", ["竞选", "不竞选"]) == 0
+
+    async def make_sheriff_campaign_speech(self, game_state: 'GameState') -> str:
+        """远程玩家竞选宣言"""
+        return await self._ask_text("请发表你的竞选宣言", "我希望成为警长，带领大家找出狼人。")
+
+    async def vote_for_sheriff(
+        self,
+        game_state: 'GameState',
+        candidates: List['Player']
+    ) -> Optional['Player']:
+        """远程玩家投票选举警长"""
+        return await self._ask_player("警长选举投票", candidates, "弃票")
+
+    async def choose_speaking_direction(self, game_state: 'GameState') -> str:
+        """远程警长选择发言方向（超时按顺时针）"""
+        choice = await self._ask_choice(
+            "警长决定发言顺序",
+            ["从死者右边开始（座位号增加方向）", "从死者左边开始（座位号减少方向）"]
+        )
+        return "counterclockwise" if choice == 1 else "clockwise"
+
+    async def choose_sheriff_successor(
+        self,
+        game_state: 'GameState'
+    ) -> Optional['Player']:
+        """远程警长选择警徽继承人"""
+        candidates = [p for p in game_state.alive_players if p.id != self.id]
+        return await self._ask_player("请选择警徽继承人", candidates, "撕毁警徽")
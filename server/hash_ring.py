@@ -0,0 +1,61 @@
+"""
+一致性哈希环 - 按房间ID把房间分配到工作进程
+
+每个节点在环上放置多个虚拟节点，增删节点时只有相邻区间的键改变归属
+"""
+import bisect
+import hashlib
+from typing import Dict, List
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """一致性哈希环"""
+
+    def __init__(self, replicas: int = 100):
+        """
+        Args:
+            replicas: 每个节点的虚拟节点数（越多分布越均匀）
+        """
+        self.replicas = replicas
+        self._points: List[int] = []  # 有序的虚拟节点哈希值
+        self._owners: Dict[int, str] = {}  # 虚拟节点哈希值 -> 节点名
+
+    def __len__(self) -> int:
+        return len(self._points) // self.replicas
+
+    def __contains__(self, node: str) -> bool:
+        return _hash(f"{node}#0") in self._owners
+
+    def add(self, node: str) -> None:
+        """加入节点（已存在时忽略）"""
+        if node in self:
+            return
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove(self, node: str) -> None:
+        """移除节点（不存在时忽略）"""
+        if node not in self:
+            return
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            del self._owners[point]
+            self._points.remove(point)
+
+    def get(self, key: str) -> str:
+        """
+        键所属的节点
+
+        Raises:
+            LookupError: 环上没有节点
+        """
+        if not self._points:
+            raise LookupError("哈希环上没有节点")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
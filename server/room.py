@@ -0,0 +1,488 @@
+"""
+多人在线房间 - 座位、连接和服务器托管的对局
+
+一个房间对应一局游戏：真人通过连接入座（RemotePlayer），开始时空座位由AI补齐；
+每个连接单独订阅游戏事件总线，只收到自己可见的事件和状态增量，慢连接不会拖住游戏
+"""
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import secrets
+import traceback
+from typing import Optional, Dict, Any, List, Callable, Awaitable, TYPE_CHECKING
+
+from ai.telemetry import telemetry
+from config.game_config import GameConfig
+from config.settings import settings
+from core.events import GameEvent, Subscription
+from core.snapshot import encode_snapshot
+from core.state_sync import SyncCursor, PUBLIC_VIEWER
+from main import WolfkillGame
+from players.player import Player
+from players.ai_player import AIPlayer
+from players.remote_player import RemotePlayer
+from roles.base_role import BaseRole
+from roles.role_factory import RoleFactory
+from utils.exceptions import RoomException, RoomMovedException
+
+if TYPE_CHECKING:
+    from core.state_store import StateStore
+
+
+# 发送一条文本消息（连接已断开时由发送方忽略）
+SendFunc = Callable[[str], Awaitable[None]]
+
+# 重连凭证签名密钥：凭证由房间ID和座位号推出，房间迁移到其他工作进程后原凭证仍然有效
+_SEAT_SECRET = (settings.SERVER_SECRET or secrets.token_hex(16)).encode("utf-8")
+
+
+class ClientStream:
+    """
+    推送给一个连接的消息流
+
+    游戏事件按观察者可见性过滤后发送，每条事件之后补发状态增量（见 core.state_sync）
+    """
+
+    def __init__(
+        self,
+        send: SendFunc,
+        viewer_id: int = PUBLIC_VIEWER,
+        since: Optional[int] = None,
+        epoch: Optional[str] = None
+    ):
+        """
+        Args:
+            send: 发送函数
+            viewer_id: 观察者玩家ID（观战者为 PUBLIC_VIEWER）
+            since: 客户端已有的状态版本（断线重连时），None表示从完整状态开始
+            epoch: 该版本所属的纪元（见 core.state_sync）
+        """
+        self.send = send
+        self.viewer_id = viewer_id
+        self.since = since
+        self.epoch = epoch
+        self.cursor: Optional[SyncCursor] = None
+        self.subscription: Optional[Subscription] = None
+
+    def attach(self, game: WolfkillGame) -> None:
+        """订阅游戏事件（游戏开始后调用）"""
+        self.cursor = SyncCursor(game.state_feed, self.viewer_id)
+        if self.since is not None:
+            self.cursor.restore(self.since, self.epoch)
+        self.subscription = game.events.subscribe(self, name=f"client-{self.viewer_id}", overflow="drop")
+
+    async def __call__(self, event: GameEvent) -> None:
+        if event.is_visible_to(self.viewer_id):
+            await self.send('{"type":"event","event":%s}' % event.to_json())
+        await self.push_state()
+
+    async def push_state(self) -> None:
+        """发送尚未发送的状态变化"""
+        if self.cursor is not None and self.cursor.pending:
+            version = self.cursor.feed.version
+            await self.send(self.cursor.pull().decode("utf-8"))
+            self.cursor.ack(version)
+
+
+class Seat:
+    """
+    座位会话：游戏通过 ask() 向座位上的连接发出输入请求
+
+    连接断开期间请求保留，重新连接后重发；时限由游戏的决策时限执行（见 WolfkillGame._decide），
+    超时后等待被取消，之后到达的回复按过期处理
+    """
+
+    def __init__(self, player_id: int, name: str, token: str):
+        """
+        Args:
+            player_id: 玩家ID（座位号）
+            name: 玩家名字
+            token: 断线重连凭证（见 Room.seat_token）
+        """
+        self.player_id = player_id
+        self.name = name
+        self.token = token
+        self.stream: Optional[ClientStream] = None
+
+        self._request: Optional[Dict[str, Any]] = None
+        self._future: Optional[asyncio.Future] = None
+        self._next_request_id = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.stream is not None
+
+    @property
+    def last_request_id(self) -> int:
+        """最近一次发出的请求ID（不大于它且不是当前请求的回复已过期）"""
+        return self._next_request_id
+
+    async def ask(
+        self,
+        kind: str,
+        prompt: str,
+        options: Optional[List[str]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        发出输入请求并等待回复
+
+        Args:
+            kind: text（文本）/ choice（选项）
+            prompt: 提示文本
+            options: 选项列表（choice）
+            timeout: 时限（秒，发给客户端显示倒计时）
+
+        Returns:
+            回复值（text为字符串，choice为选项序号）
+        """
+        self._next_request_id += 1
+        self._request = {
+            "type": "prompt",
+            "request_id": self._next_request_id,
+            "kind": kind,
+            "prompt": prompt,
+            "options": options,
+            "timeout": timeout,
+        }
+        self._future = asyncio.get_running_loop().create_future()
+        try:
+            await self._send_request()
+            return await self._future
+        finally:
+            self._request = None
+            self._future = None
+
+    async def _send_request(self) -> None:
+        if self.stream is not None and self._request is not None:
+            await self.stream.push_state()
+            await self.stream.send(json.dumps(self._request, ensure_ascii=False))
+
+    def answer(self, request_id: int, value: Any) -> bool:
+        """
+        提交回复
+
+        Returns:
+            bool: 是否对应当前的请求（过期或重复的回复返回False）
+        """
+        if self._future is None or self._future.done() or request_id != self._request["request_id"]:
+            return False
+        self._future.set_result(value)
+        return True
+
+    async def attach(self, stream: ClientStream) -> None:
+        """连接入座（重连时替换旧连接并重发未回复的请求）"""
+        self.stream = stream
+        await self._send_request()
+
+    def detach(self, stream: ClientStream) -> None:
+        """连接离开"""
+        if self.stream is stream:
+            self.stream = None
+
+
+class RoomGame(WolfkillGame):
+    """服务器托管的对局：远程真人入座，其余座位由AI补齐，不使用本地终端"""
+
+    def __init__(self, room: 'Room'):
+        super().__init__(interactive=False)
+        self.room = room
+        if room.state_store is not None:
+            self.state_store = room.state_store
+
+    async def setup_game(self):
+        """按房间座位创建玩家（游戏ID即房间ID）"""
+        self._create_game(self.room.board_config, game_id=self.room.room_id)
+
+        players: List[Player] = []
+        for player_id, role in enumerate(RoleFactory.distribute_roles(self.room.board_config), 1):
+            players.append(self._create_player(player_id, role))
+        await self._seat_players(players)
+
+        # 先接入连接再公布身份，私密的身份消息不会漏发
+        self.room.attach_streams(self)
+        for player in players:
+            if player.is_human:
+                self.announce_role(player)
+
+        # 开局检查点：第一晚结束前房间也能迁移到其他工作进程
+        await self.checkpoint("vote")
+
+    async def resume_game(self, game_id: str) -> str:
+        """从检查点恢复房间的对局（房间迁移后由新的工作进程调用）"""
+        next_phase = await super().resume_game(game_id)
+        self.room.attach_streams(self)
+        return next_phase
+
+    async def checkpoint(self, phase: str):
+        """
+        保存检查点；房间需要迁移时，检查点保存成功后停止对局
+
+        Raises:
+            RoomMovedException: 已保存检查点，对局交给其他工作进程继续
+        """
+        await super().checkpoint(phase)
+        saved = self.last_checkpoint == {"round": self.game_state.round_number, "phase": phase}
+        if self.room.move_requested and saved:
+            raise RoomMovedException(f"房间 {self.room.room_id} 迁移")
+
+    def _create_player(self, player_id: int, role: BaseRole) -> Player:
+        seat = self.room.seats.get(player_id)
+        if seat is not None:
+            return RemotePlayer(player_id, seat.name, role, seat)
+        return AIPlayer(player_id, f"{GameConfig.AI_NAME_PREFIX}{player_id}", role, self.player_ai)
+
+    def _restore_player(self, record: Dict[str, Any], role: BaseRole) -> Player:
+        """从检查点恢复时按座位重建玩家（座位上没有连接的真人由远程会话等待重连）"""
+        seat = self.room.seats.get(record["id"])
+        if record["kind"] == "human" and seat is None:
+            seat = self.room.seats[record["id"]] = Seat(record["id"], record["name"], self.room.seat_token(record["id"]))
+        if seat is not None:
+            return RemotePlayer(record["id"], record["name"], role, seat)
+        return AIPlayer(record["id"], record["name"], role, self.player_ai)
+
+
+class Room:
+    """
+    房间
+
+    状态：waiting（等待入座）→ queued（服务器满载，排队等待开始）→ playing（对局中）→ finished（已结束）
+
+    多进程部署时对局中的房间可以迁移：原工作进程在阶段边界保存检查点后停止（结束原因 moved），
+    新的工作进程用同一个房间ID从检查点恢复，客户端用原来的凭证和状态版本重连
+    """
+
+    def __init__(
+        self,
+        room_id: str,
+        board_config: str = GameConfig.DEFAULT_ROLE_CONFIG,
+        state_store: Optional['StateStore'] = None,
+        on_finished: Optional[Callable[['Room'], Awaitable[None]]] = None,
+        max_seconds: float = 0,
+        max_llm_calls: int = 0,
+        max_llm_tokens: int = 0
+    ):
+        """
+        Args:
+            room_id: 房间ID（同时作为游戏ID）
+            board_config: 板子配置
+            state_store: 检查点存储（服务器内所有房间共用）
+            on_finished: 对局结束后的回调
+            max_seconds: 对局时长上限（秒），超过后取消对局，0表示不限
+            max_llm_calls: 本局LLM调用次数上限，用完后AI改用启发式策略，0表示不限
+            max_llm_tokens: 本局LLM token总数上限，0表示不限
+        """
+        if not GameConfig.validate_config(board_config):
+            raise RoomException(f"未知的板子配置：{board_config}")
+        self.room_id = room_id
+        self.board_config = board_config
+        self.total_seats = GameConfig.get_total_players(board_config)
+        self.state_store = state_store
+        self.on_finished = on_finished
+        self.max_seconds = max_seconds
+        self.max_llm_calls = max_llm_calls
+        self.max_llm_tokens = max_llm_tokens
+
+        self.seats: Dict[int, Seat] = {}
+        self.streams: List[ClientStream] = []
+        self.status = "waiting"
+        self.game: Optional[RoomGame] = None
+        self.task: Optional[asyncio.Task] = None
+        self.resume = False  # 从检查点恢复对局（房间迁移）
+        self.move_requested = False  # 在下一个阶段边界停止对局，交给其他工作进程
+        self.close_reason: Optional[str] = None
+        self.created_at = time.time()
+        self.queued_at: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._snapshot_size = (-1, 0)  # (状态日志序号, 当前状态快照字节数)，状态不变时不重新编码
+
+    def join(self, name: str) -> Seat:
+        """
+        入座（按加入顺序占用最小的空座位）
+
+        Raises:
+            RoomException: 对局已开始或座位已满
+        """
+        if self.status != "waiting":
+            raise RoomException("对局已开始，只能观战")
+        free = [i for i in range(1, self.total_seats + 1) if i not in self.seats]
+        if not free:
+            raise RoomException("座位已满")
+        seat = self.seats[free[0]] = Seat(free[0], name or f"玩家{free[0]}", self.seat_token(free[0]))
+        return seat
+
+    def seat_token(self, player_id: int) -> str:
+        """座位的重连凭证（由房间ID和座位号签名得到）"""
+        message = f"{self.room_id}:{player_id}".encode("utf-8")
+        return hmac.new(_SEAT_SECRET, message, hashlib.sha256).hexdigest()[:16]
+
+    def get_seat(self, player_id: int, token: str) -> Seat:
+        """
+        按重连凭证取回座位
+
+        Raises:
+            RoomException: 座位不存在或凭证不匹配
+        """
+        seat = self.seats.get(player_id)
+        if seat is None or not secrets.compare_digest(seat.token, token):
+            raise RoomException("座位不存在或凭证无效")
+        return seat
+
+    async def connect(self, stream: ClientStream, seat: Optional[Seat] = None) -> None:
+        """
+        接入一个连接（对局已开始时立即订阅游戏事件）
+
+        Args:
+            stream: 连接的消息流
+            seat: 玩家座位，观战为None
+        """
+        self.streams.append(stream)
+        if self.game is not None and self.game.state_feed is not None:
+            stream.attach(self.game)
+        if seat is not None:
+            await seat.attach(stream)
+        if self.status == "waiting":
+            await self.broadcast(self.lobby())
+
+    async def disconnect(self, stream: ClientStream, seat: Optional[Seat] = None) -> None:
+        """连接断开：取消订阅；等待中的房间同时释放座位"""
+        if stream in self.streams:
+            self.streams.remove(stream)
+        if stream.subscription is not None and self.game is not None:
+            await self.game.events.unsubscribe(stream.subscription)
+        if seat is not None:
+            seat.detach(stream)
+            if self.status in ("waiting", "queued"):
+                self.seats.pop(seat.player_id, None)
+                await self.broadcast(self.lobby())
+
+    def attach_streams(self, game: RoomGame) -> None:
+        """游戏开始时为已接入的连接订阅事件（由 RoomGame.setup_game 调用）"""
+        for stream in self.streams:
+            if stream.subscription is None:
+                stream.attach(game)
+
+    def lobby(self) -> Dict[str, Any]:
+        """等待中的房间信息"""
+        return {
+            "type": "lobby",
+            "room": self.room_id,
+            "board": self.board_config,
+            "total_seats": self.total_seats,
+            "seats": [{"player_id": s.player_id, "name": s.name} for s in self.seats.values()],
+        }
+
+    async def broadcast(self, message: Dict[str, Any]) -> None:
+        """向房间内所有连接发送一条消息（不读取消息的慢连接超过 SERVER_SEND_TIMEOUT 后放弃）"""
+        text = json.dumps(message, ensure_ascii=False)
+
+        async def send(stream: ClientStream) -> None:
+            try:
+                await asyncio.wait_for(stream.send(text), settings.SERVER_SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+
+        await asyncio.gather(*(send(stream) for stream in list(self.streams)))
+
+    def start(self, resume: bool = False) -> asyncio.Task:
+        """
+        开始对局（空座位由AI补齐）；是否允许开始由 RoomManager 决定
+
+        Args:
+            resume: 从检查点恢复（房间从其他工作进程迁移过来）
+
+        Raises:
+            RoomException: 对局已开始
+        """
+        if self.status not in ("waiting", "queued"):
+            raise RoomException("对局已开始")
+        self.resume = resume
+        self.status = "playing"
+        self.started_at = time.time()
+        telemetry.set_budget(self.room_id, self.max_llm_calls, self.max_llm_tokens)
+        self.game = RoomGame(self)
+        self.task = asyncio.create_task(self._run(), name=f"room-{self.room_id}")
+        return self.task
+
+    async def _run(self) -> None:
+        """对局任务：设置、运行，结束后通知所有连接"""
+        reason = "game_over"
+        try:
+            if self.max_seconds > 0:
+                await asyncio.wait_for(self._play(), self.max_seconds)
+            else:
+                await self._play()
+        except asyncio.TimeoutError:
+            reason = "time_limit"
+        except RoomMovedException:
+            reason = "moved"
+        except asyncio.CancelledError:
+            reason = "cancelled"
+        except Exception as e:
+            reason = "error"
+            print(f"房间 {self.room_id} 出错：{type(e).__name__}: {e}")
+            traceback.print_exc()
+        finally:
+            self.status = "finished"
+            self.close_reason = reason
+            self.finished_at = time.time()
+            await self.game.events.close(timeout=settings.SERVER_SEND_TIMEOUT)
+            await self.broadcast({"type": "closed", "room": self.room_id, "reason": reason})
+            if self.on_finished is not None:
+                await self.on_finished(self)
+
+    async def _play(self) -> None:
+        if self.resume:
+            await self.game.run_game(await self.game.resume_game(self.room_id))
+        else:
+            await self.game.setup_game()
+            await self.game.run_game()
+
+    async def close(self) -> None:
+        """取消进行中的对局"""
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def memory_bytes(self) -> int:
+        """
+        房间保留数据的近似内存占用（字节）
+
+        按数据量估算：当前状态的二进制快照 + 状态日志保存的快照 + 同步用的事件序列化缓存；
+        状态的每次变化都会写入状态日志，快照大小按日志序号缓存
+        """
+        if self.game is None or self.game.game_state.journal is None:
+            return 0
+        journal = self.game.game_state.journal
+        seq, size = self._snapshot_size
+        if seq != journal.seq:
+            size = len(encode_snapshot(self.game.game_state.to_dict()))
+            self._snapshot_size = (journal.seq, size)
+        total = size + journal.get_stats()["snapshot_bytes"]
+        if self.game.state_feed is not None:
+            total += self.game.state_feed.get_stats()["encoded_bytes"]
+        return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """房间统计（含本局的LLM调用、token用量、预算是否用完、耗时和近似内存占用）"""
+        end = self.finished_at or time.time()
+        llm = telemetry.get_stats(self.room_id)
+        return {
+            "room": self.room_id,
+            "status": self.status,
+            "reason": self.close_reason,
+            "humans": len(self.seats),
+            "connections": len(self.streams),
+            "round": self.game.game_state.round_number if self.game else 0,
+            "queued_s": round((self.started_at or end) - self.queued_at, 1) if self.queued_at else 0.0,
+            "wall_time_s": round(end - self.started_at, 1) if self.started_at else 0.0,
+            "timeouts": len(self.game.game_state.get_timeouts()) if self.game else 0,
+            "llm_calls": sum(s["calls"] for s in llm.values()),
+            "llm_tokens": sum(s["prompt_tokens"] + s["completion_tokens"] for s in llm.values()),
+            "llm_cost": round(sum(s["cost"] for s in llm.values()), 6),
+            "llm_over_budget": telemetry.over_budget(self.room_id),
+            "memory_kb": round(self.memory_bytes() / 1024, 1),
+        }
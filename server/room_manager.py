@@ -0,0 +1,248 @@
+"""
+房间管理 - 创建/销毁房间、准入控制和每个房间的资源预算
+
+一个进程内的所有对局共用一个事件循环和LLM客户端，负载由三个上限控制：
+- 房间数上限：超过后拒绝创建新房间
+- 同时进行的对局数上限：超过后新开始的对局进入排队，有对局结束时按先后顺序开始
+- 同时进行的LLM调用数上限：超过后调用在自己的时限内排队（见 LLMClient.set_max_in_flight）
+
+每个对局另有时长上限和LLM预算（调用次数、token总数，用完后AI改用启发式策略）；
+对局结束后保留最近若干局的统计（LLM调用、token、耗时、近似内存）
+
+多进程部署（见 server.supervisor）时，管理器还负责排空（drain）和接管（adopt）迁移的房间
+"""
+import time
+import uuid
+from collections import deque
+from typing import Optional, Dict, Any, List, Deque, Callable, Awaitable
+
+from ai.llm_client import get_llm_client
+from ai.telemetry import telemetry
+from config.game_config import GameConfig
+from core.state_store import create_state_store
+from server.room import Room, Seat
+from utils.exceptions import RoomException
+
+
+class RoomManager:
+    """
+    房间管理器
+
+    职责：
+    - 创建、查找和销毁房间
+    - 对局开始时的准入控制（满载时排队）
+    - 排空：各房间在下一个阶段边界保存检查点后停止；接管：从检查点恢复迁移来的房间
+    - 汇总服务器和各房间的资源统计
+    """
+
+    def __init__(
+        self,
+        max_rooms: int = 500,
+        max_games: int = 200,
+        max_queue: int = 500,
+        max_llm_in_flight: int = 64,
+        room_max_seconds: float = 3600,
+        room_max_llm_calls: int = 1000,
+        room_max_llm_tokens: int = 3000000,
+        history_size: int = 100
+    ):
+        """
+        Args:
+            max_rooms: 同时存在的房间上限（含等待、排队和对局中）
+            max_games: 同时进行的对局上限
+            max_queue: 排队等待开始的对局上限
+            max_llm_in_flight: 同时进行的LLM调用上限，0表示不限
+            room_max_seconds: 单个对局的时长上限（秒），0表示不限
+            room_max_llm_calls: 单个对局的LLM调用次数上限，0表示不限
+            room_max_llm_tokens: 单个对局的LLM token总数上限，0表示不限
+            history_size: 保留最近结束对局统计的数量
+        """
+        self.max_rooms = max_rooms
+        self.max_games = max_games
+        self.max_queue = max_queue
+        self.room_max_seconds = room_max_seconds
+        self.room_max_llm_calls = room_max_llm_calls
+        self.room_max_llm_tokens = room_max_llm_tokens
+
+        self.rooms: Dict[str, Room] = {}
+        self.queue: Deque[Room] = deque()
+        self.state_store = create_state_store()
+        self.llm = get_llm_client()
+        self.llm.set_max_in_flight(max_llm_in_flight)
+
+        self.finished: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.games_finished = 0
+        self.rejected = 0
+        self.draining = False
+        self.moved_out = 0
+        self.adopted = 0
+        # 房间关闭（结束、迁移或无人后销毁）后的回调，close_reason 为关闭原因
+        self.on_room_closed: Optional[Callable[[Room], Awaitable[None]]] = None
+
+    @property
+    def playing(self) -> int:
+        """对局中的房间数"""
+        return sum(1 for room in self.rooms.values() if room.status == "playing")
+
+    def create_room(self, board_config: str = GameConfig.DEFAULT_ROLE_CONFIG, room_id: Optional[str] = None) -> Room:
+        """
+        创建房间
+
+        Args:
+            board_config: 板子配置
+            room_id: 房间ID，默认随机生成（多进程部署时由 supervisor 分配）
+
+        Raises:
+            RoomException: 房间数已达上限、正在排空、房间ID已存在或板子配置无效
+        """
+        if self.draining:
+            raise RoomException("服务器正在维护，请稍后再试")
+        if len(self.rooms) >= self.max_rooms:
+            self.rejected += 1
+            raise RoomException("服务器房间已满，请稍后再试")
+        if room_id in self.rooms:
+            raise RoomException(f"房间 {room_id} 已存在")
+        room_id = room_id or uuid.uuid4().hex[:8]
+        room = Room(
+            room_id, board_config, self.state_store,
+            on_finished=self._room_finished, max_seconds=self.room_max_seconds,
+            max_llm_calls=self.room_max_llm_calls, max_llm_tokens=self.room_max_llm_tokens
+        )
+        self.rooms[room_id] = room
+        return room
+
+    def get_room(self, room_id: str) -> Room:
+        """
+        Raises:
+            RoomException: 房间不存在
+        """
+        room = self.rooms.get(room_id)
+        if room is None:
+            raise RoomException(f"房间 {room_id} 不存在")
+        return room
+
+    async def start(self, room: Room) -> None:
+        """
+        请求开始对局：未满载时立即开始，否则进入排队
+
+        Raises:
+            RoomException: 对局已开始或已在排队、排队已满
+        """
+        if room.status != "waiting":
+            raise RoomException("对局已开始" if room.status != "queued" else "对局正在排队")
+        if self.playing < self.max_games:
+            room.start()
+            return
+        if len(self.queue) >= self.max_queue:
+            self.rejected += 1
+            raise RoomException("服务器繁忙，请稍后再试")
+
+        room.status = "queued"
+        room.queued_at = time.time()
+        self.queue.append(room)
+        await room.broadcast({"type": "queued", "position": len(self.queue)})
+
+    async def _room_finished(self, room: Room) -> None:
+        """对局结束：保留统计、释放LLM统计，按排队顺序开始等待中的对局"""
+        self.rooms.pop(room.room_id, None)
+        if room.close_reason == "moved":
+            self.moved_out += 1
+        else:
+            self.games_finished += 1
+        self.finished.append(room.get_stats())
+        telemetry.discard(room.room_id)
+        while self.queue and self.playing < self.max_games:
+            self.queue.popleft().start()
+        if self.on_room_closed is not None:
+            await self.on_room_closed(room)
+
+    async def destroy(self, room: Room, reason: str = "abandoned") -> None:
+        """
+        销毁房间（对局中的房间会取消对局）
+
+        Args:
+            room: 房间
+            reason: 未开始对局的房间的关闭原因
+        """
+        if room in self.queue:
+            self.queue.remove(room)
+        if room.task is not None:
+            await room.close()  # 对局任务结束时经 _room_finished 移除
+            return
+        self.rooms.pop(room.room_id, None)
+        room.status = "finished"
+        room.close_reason = reason
+        if self.on_room_closed is not None:
+            await self.on_room_closed(room)
+
+    async def adopt(self, room_id: str) -> Room:
+        """
+        接管迁移来的房间：从检查点恢复对局，真人座位等待原来的玩家用原凭证重连
+
+        Args:
+            room_id: 房间ID
+
+        Raises:
+            RoomException: 没有该房间的检查点或房间已存在
+        """
+        if room_id in self.rooms:
+            raise RoomException(f"房间 {room_id} 已存在")
+        checkpoint = await self.state_store.load(room_id) if self.state_store is not None else None
+        if checkpoint is None:
+            raise RoomException(f"房间 {room_id} 没有检查点，无法迁移")
+
+        room = Room(
+            room_id, checkpoint["state"]["board_config"], self.state_store,
+            on_finished=self._room_finished, max_seconds=self.room_max_seconds,
+            max_llm_calls=self.room_max_llm_calls, max_llm_tokens=self.room_max_llm_tokens
+        )
+        for record in checkpoint["state"]["players"]:
+            if record["kind"] == "human":
+                room.seats[record["id"]] = Seat(record["id"], record["name"], room.seat_token(record["id"]))
+        self.rooms[room_id] = room
+        self.adopted += 1
+        room.start(resume=True)  # 已开始的对局不再经过准入排队
+        return room
+
+    async def drain(self) -> int:
+        """
+        开始排空：不再创建新房间，对局中的房间在下一个阶段边界保存检查点后停止（结束原因 moved）；
+        等待和排队中的房间没有检查点、无法迁移，直接关闭（结束原因 drained），客户端重新创建房间
+
+        Returns:
+            int: 尚未停止的房间数
+        """
+        self.draining = True
+        for room in list(self.rooms.values()):
+            if room.status in ("waiting", "queued"):
+                await room.broadcast({"type": "closed", "room": room.room_id, "reason": "drained"})
+                await self.destroy(room, reason="drained")
+            else:
+                room.move_requested = True
+        return len(self.rooms)
+
+    async def close(self) -> None:
+        """取消所有对局并关闭检查点存储"""
+        self.queue.clear()
+        for room in list(self.rooms.values()):
+            await room.close()
+        if self.state_store is not None:
+            await self.state_store.close()
+
+    def get_room_stats(self) -> List[Dict[str, Any]]:
+        """各房间的统计（对局中和排队中的房间，以及最近结束的对局）"""
+        active = [room.get_stats() for room in self.rooms.values() if room.status in ("playing", "queued")]
+        return active + list(self.finished)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """服务器统计"""
+        return {
+            "rooms": len(self.rooms),
+            "playing": self.playing,
+            "queued": len(self.queue),
+            "games_finished": self.games_finished,
+            "rejected": self.rejected,
+            "moved_out": self.moved_out,
+            "adopted": self.adopted,
+            "llm": self.llm.get_in_flight_stats(),
+        }
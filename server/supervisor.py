@@ -0,0 +1,588 @@
+"""
+多进程部署 - supervisor 启动多个工作进程，按房间ID一致性哈希把房间分到各进程
+
+一个 Python 进程只能用一个核做序列化、构造提示词和写日志等CPU工作。supervisor 启动 N 个工作进程
+（各自运行 server.ws_server 和自己的事件循环），自己只监听对外端口并按房间ID转发连接：
+- 创建房间：由 supervisor 分配房间ID，按一致性哈希（见 server.hash_ring）选择工作进程
+- 入座、重连、观战：转发到房间所在的工作进程，之后的消息原样双向转发
+- 工作进程退出：其上的房间交给哈希环上的其他工作进程，从最近的检查点恢复，然后重启该工作进程
+- 排空（SIGHUP 逐个排空并重启所有工作进程）：对局在下一个阶段边界保存检查点后迁移，再重启工作进程；
+  尚未开始对局的房间没有检查点，直接关闭（closed，reason 为 drained），客户端重新创建房间
+
+房间迁移后客户端收到 closed（reason 为 moved），用原凭证和已收到的状态版本重连即可继续。
+检查点必须保存在各进程共享的存储中（STATE_STORE=file 或 redis）
+
+用法：
+    python -m server.supervisor                        # 工作进程数为CPU核数，监听 0.0.0.0:8765
+    python -m server.supervisor --workers 4 --port 8765
+    kill -HUP <supervisor进程号>                       # 滚动重启工作进程（房间迁移，对局不中断）
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import signal
+import asyncio
+import secrets
+import argparse
+from typing import Optional, Dict, Any, List, Set
+
+from config.settings import settings
+from core.state_store import create_state_store
+from server.hash_ring import HashRing
+
+
+class Worker:
+    """一个工作进程及其控制连接"""
+
+    def __init__(self, index: int, port: int):
+        """
+        Args:
+            index: 工作进程序号
+            port: 工作进程的监听端口（只监听 127.0.0.1）
+        """
+        self.index = index
+        self.name = f"worker-{index}"
+        self.url = f"ws://127.0.0.1:{port}"
+        self.port = port
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.control = None  # 控制连接
+        self.status = "stopped"  # starting → ready → draining → stopped
+        self.ready = asyncio.Event()
+        self.rooms: Set[str] = set()
+        self.restarts = 0
+        self._replies: Dict[str, asyncio.Future] = {}  # 等待中的控制回复（键为 回复类型:房间ID）
+
+    async def request(self, message: Dict[str, Any], reply_key: str, timeout: float = 30) -> Dict[str, Any]:
+        """
+        通过控制连接发送请求并等待回复
+
+        Raises:
+            asyncio.TimeoutError: 超时未回复
+            ConnectionError: 控制连接不可用
+        """
+        if self.control is None:
+            raise ConnectionError(f"{self.name} 控制连接不可用")
+        future = asyncio.get_running_loop().create_future()
+        self._replies[reply_key] = future
+        try:
+            await self.control.send(json.dumps(message, ensure_ascii=False))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._replies.pop(reply_key, None)
+
+    def dispatch(self, message: Dict[str, Any]) -> None:
+        """把控制连接收到的回复交给等待中的请求"""
+        future = self._replies.get(f"{message['type']}:{message.get('room', '')}")
+        if future is not None and not future.done():
+            future.set_result(message)
+
+
+class ClientProxy:
+    """
+    一个客户端连接的转发
+
+    解析客户端发来的消息（用于选择工作进程）；工作进程发来的消息解析后原样转发，
+    只识别 error（创建失败）和 closed（房间迁移）消息
+    """
+
+    def __init__(self, supervisor: 'Supervisor', websocket):
+        self.supervisor = supervisor
+        self.websocket = websocket
+        self.worker: Optional[Worker] = None
+        self.upstream = None
+        self.room_id: Optional[str] = None  # 已入座或观战的房间
+        self.pending_create: Optional[str] = None  # 等待回复的创建请求的房间ID
+        self._pump: Optional[asyncio.Task] = None
+        self._closed_seen = False
+
+    async def run(self) -> None:
+        try:
+            async for raw in self.websocket:
+                try:
+                    await self._forward(raw)
+                except (ValueError, KeyError, TypeError, LookupError, OSError) as e:
+                    await self._reply({"type": "error", "message": str(e) or type(e).__name__})
+        except self.supervisor.websockets.ConnectionClosed:
+            pass
+        finally:
+            await self._close_upstream()
+
+    async def _reply(self, message: Dict[str, Any]) -> None:
+        await self.websocket.send(json.dumps(message, ensure_ascii=False))
+
+    async def _forward(self, raw: str) -> None:
+        message = json.loads(raw)
+        kind = message["type"]
+        supervisor = self.supervisor
+
+        if kind == "stats":
+            await self._reply({"type": "stats", **await supervisor.get_stats()})
+            return
+
+        if kind in ("create", "join", "rejoin", "spectate"):
+            if self.room_id is not None:
+                raise ValueError("该连接已在房间中")
+            if kind == "create":
+                room_id = uuid.uuid4().hex[:8]
+                message["room"] = room_id
+                raw = json.dumps(message, ensure_ascii=False)
+                worker = supervisor.place(room_id)
+                if worker is not self.worker:
+                    await self._open(worker)
+                self.pending_create = room_id
+            else:
+                room_id = str(message["room"])
+                await self._open_room(room_id)
+                self.room_id = room_id
+        elif self.upstream is None:
+            raise ValueError("请先创建、加入或观战房间")
+
+        try:
+            await self.upstream.send(raw)
+        except supervisor.websockets.ConnectionClosed:
+            # 工作进程断开：已在房间中的连接由转发任务通知重连，创建请求直接失败
+            if self.room_id is None:
+                if self.pending_create is not None:
+                    supervisor.unplace(self.pending_create, self.worker)
+                    self.pending_create = None
+                raise OSError("工作进程不可用，请重试")
+
+    async def _open_room(self, room_id: str) -> None:
+        """连接房间所在的工作进程（房间正在迁移或工作进程正在重启时等待）"""
+        supervisor = self.supervisor
+        deadline = time.monotonic() + supervisor.connect_timeout
+        while True:
+            await supervisor.settled(room_id)
+            worker = supervisor.route(room_id)
+            if worker is self.worker and self.upstream is not None:
+                return
+            try:
+                await self._open(worker)
+                return
+            except (OSError, supervisor.websockets.WebSocketException):
+                if time.monotonic() > deadline:
+                    raise OSError(f"房间 {room_id} 所在的工作进程不可用")
+                await asyncio.sleep(0.2)
+
+    async def _open(self, worker: Worker) -> None:
+        await self._close_upstream()
+        self.upstream = await self.supervisor.websockets.connect(worker.url, max_size=None)
+        self.worker = worker
+        self._pump = asyncio.create_task(self._pump_upstream(worker, self.upstream))
+
+    async def _close_upstream(self) -> None:
+        upstream, self.upstream = self.upstream, None
+        if upstream is not None:
+            await upstream.close()
+        if self._pump is not None:
+            await asyncio.gather(self._pump, return_exceptions=True)
+            self._pump = None
+
+    async def _pump_upstream(self, worker: Worker, upstream) -> None:
+        """把工作进程的消息转发给客户端"""
+        websockets = self.supervisor.websockets
+        try:
+            async for text in upstream:
+                message = json.loads(text)
+                kind = message.get("type")
+                if self.pending_create is not None:
+                    if kind == "error":
+                        self.supervisor.unplace(self.pending_create, worker)
+                    self.pending_create = None
+                if kind == "closed":
+                    self._closed_seen = True
+                    if message.get("reason") == "moved":
+                        self.supervisor.mark_moving(message["room"], worker)
+                await self.websocket.send(text)
+        except websockets.ConnectionClosed:
+            pass
+
+        # 工作进程断开（例如进程退出）而不是本连接主动关闭：通知客户端重连
+        if self.upstream is upstream and self.room_id is not None and not self._closed_seen:
+            try:
+                await self._reply({"type": "closed", "room": self.room_id, "reason": "moved"})
+                await self.websocket.close()
+            except websockets.ConnectionClosed:
+                pass
+
+
+class Supervisor:
+    """
+    工作进程管理和连接路由
+
+    职责：
+    - 启动工作进程，退出后迁移其上的房间并重启
+    - 按一致性哈希分配新房间，记录每个房间所在的工作进程
+    - 排空工作进程（滚动重启）
+    - 汇总各工作进程的统计
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        port: int,
+        worker_args: Optional[List[str]] = None,
+        drain_timeout: float = 120,
+        connect_timeout: float = 30
+    ):
+        """
+        Args:
+            workers: 工作进程数
+            port: 对外端口（工作进程依次使用之后的端口）
+            worker_args: 传给每个工作进程的额外命令行参数（各项上限）
+            drain_timeout: 排空时等待房间迁移的时限（秒），超时后剩余的房间从最近的检查点恢复
+            connect_timeout: 客户端连接等待房间迁移或工作进程重启的时限（秒）
+        """
+        import websockets
+        self.websockets = websockets
+
+        self.workers = [Worker(i, port + 1 + i) for i in range(workers)]
+        self.by_name = {worker.name: worker for worker in self.workers}
+        self.worker_args = worker_args or []
+        self.drain_timeout = drain_timeout
+        self.connect_timeout = connect_timeout
+        self.ring = HashRing()
+        self.placement: Dict[str, Worker] = {}  # 房间ID -> 所在的工作进程
+        self.moving: Dict[str, asyncio.Event] = {}  # 迁移中的房间，迁移完成后 set
+        self.control_token = secrets.token_hex(16)
+        self.secret = settings.SERVER_SECRET or secrets.token_hex(16)
+
+        self.connections = 0
+        self.moved = 0
+        self.lost = 0
+        self.closing = False
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats_lock = asyncio.Lock()
+        self._restarting = False  # 滚动重启进行中（重复的 SIGHUP 忽略）
+
+    # ==================== 路由 ====================
+
+    def place(self, room_id: str) -> Worker:
+        """
+        为新房间选择工作进程
+
+        Raises:
+            LookupError: 没有可用的工作进程
+        """
+        worker = self.by_name[self.ring.get(room_id)]
+        self.placement[room_id] = worker
+        worker.rooms.add(room_id)
+        return worker
+
+    def unplace(self, room_id: str, worker: Worker) -> None:
+        """房间已不在该工作进程上（创建失败、结束或无人后销毁）"""
+        worker.rooms.discard(room_id)
+        if self.placement.get(room_id) is worker:
+            del self.placement[room_id]
+
+    def route(self, room_id: str) -> Worker:
+        """
+        房间所在的工作进程（未记录的房间按哈希环）
+
+        Raises:
+            LookupError: 没有可用的工作进程
+        """
+        worker = self.placement.get(room_id)
+        return worker if worker is not None else self.by_name[self.ring.get(room_id)]
+
+    def mark_moving(self, room_id: str, worker: Worker) -> None:
+        """转发时看到房间迁出（还未开始接管时记为迁移中，之后的重连等待接管完成）"""
+        if self.placement.get(room_id) is worker:
+            self.moving.setdefault(room_id, asyncio.Event())
+
+    async def settled(self, room_id: str) -> None:
+        """等待房间迁移完成（超时后按当前记录路由）"""
+        event = self.moving.get(room_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), self.connect_timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # ==================== 工作进程 ====================
+
+    def _spawn_task(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def start_worker(self, worker: Worker) -> None:
+        """
+        启动工作进程，建立控制连接后加入哈希环
+
+        Raises:
+            RuntimeError: 工作进程启动失败
+        """
+        env = dict(os.environ, SERVER_CONTROL_TOKEN=self.control_token, SERVER_SECRET=self.secret)
+        worker.status = "starting"
+        worker.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "server.ws_server",
+            "--host", "127.0.0.1", "--port", str(worker.port), *self.worker_args,
+            env=env
+        )
+
+        # 工作进程导入依赖需要一些时间，等它开始监听
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                worker.control = await self.websockets.connect(worker.url, max_size=None)
+                break
+            except (OSError, self.websockets.WebSocketException):
+                if worker.process.returncode is not None or time.monotonic() > deadline:
+                    worker.status = "stopped"
+                    raise RuntimeError(f"{worker.name} 启动失败")
+                await asyncio.sleep(0.2)
+        await worker.control.send(json.dumps({"type": "control", "token": self.control_token}))
+
+        worker.status = "ready"
+        worker.ready.set()
+        self.ring.add(worker.name)
+        self._spawn_task(self._read_control(worker, worker.control))
+        self._spawn_task(self._watch(worker, worker.process))
+
+    async def _read_control(self, worker: Worker, control) -> None:
+        """处理工作进程的控制消息：请求的回复和房间关闭通知"""
+        try:
+            async for raw in control:
+                message = json.loads(raw)
+                if message["type"] == "room_closed":
+                    room_id = message["room"]
+                    if message["reason"] == "moved" and self.placement.get(room_id) is worker:
+                        worker.rooms.discard(room_id)
+                        self._spawn_task(self.move(room_id))
+                    else:
+                        self.unplace(room_id, worker)
+                else:
+                    worker.dispatch(message)
+        except self.websockets.ConnectionClosed:
+            pass
+
+    async def _watch(self, worker: Worker, process: asyncio.subprocess.Process) -> None:
+        """工作进程退出后：从哈希环移除，迁移其上的房间，然后重启"""
+        await process.wait()
+        worker.status = "stopped"
+        worker.ready.clear()
+        worker.control = None
+        self.ring.remove(worker.name)
+        if self.closing:
+            return
+
+        rooms = [room_id for room_id in worker.rooms if self.placement.get(room_id) is worker]
+        worker.rooms.clear()
+        print(f"[supervisor] {worker.name} 已退出（退出码 {process.returncode}），迁移 {len(rooms)} 个房间")
+        for room_id in rooms:
+            self._spawn_task(self.move(room_id))
+
+        worker.restarts += 1
+        await asyncio.sleep(1)
+        try:
+            await self.start_worker(worker)
+        except RuntimeError as e:
+            print(f"[supervisor] {e}")
+
+    async def move(self, room_id: str) -> None:
+        """把房间交给哈希环上的工作进程，从最近的检查点恢复"""
+        event = self.moving.setdefault(room_id, asyncio.Event())
+        target: Optional[Worker] = None
+        try:
+            target = self.place(room_id)
+            reply = await target.request({"type": "adopt", "room": room_id}, f"adopted:{room_id}")
+            if not reply["ok"]:
+                raise RuntimeError(reply["message"])
+            self.moved += 1
+        except (LookupError, RuntimeError, ConnectionError, asyncio.TimeoutError, self.websockets.ConnectionClosed) as e:
+            print(f"[supervisor] 房间 {room_id} 迁移失败：{type(e).__name__}: {e}")
+            self.lost += 1
+            if target is not None:
+                self.unplace(room_id, target)
+        finally:
+            event.set()
+            if self.moving.get(room_id) is event:
+                del self.moving[room_id]
+
+    async def drain(self, worker: Worker) -> None:
+        """
+        排空并重启工作进程：新房间不再分给它，对局中的房间在下一个阶段边界迁移走，
+        超时后停止进程，剩余房间从最近的检查点恢复
+        """
+        if worker.status != "ready":
+            return
+        worker.status = "draining"
+        self.ring.remove(worker.name)
+        try:
+            await worker.request({"type": "drain"}, "draining:")
+        except (ConnectionError, asyncio.TimeoutError, self.websockets.ConnectionClosed):
+            pass
+
+        deadline = time.monotonic() + self.drain_timeout
+        while worker.rooms and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+        if worker.process.returncode is None:
+            worker.process.terminate()
+        # 进程退出后由 _watch 迁移剩余房间并重启
+
+    async def rolling_restart(self) -> None:
+        """逐个排空并重启所有工作进程（已在进行时忽略）"""
+        if self._restarting:
+            print("[supervisor] 滚动重启已在进行中，忽略")
+            return
+        self._restarting = True
+        try:
+            print(f"[supervisor] 开始滚动重启 {len(self.workers)} 个工作进程")
+            for worker in self.workers:
+                await self.drain(worker)
+                await asyncio.sleep(0.1)
+                try:
+                    await asyncio.wait_for(worker.ready.wait(), self.drain_timeout)
+                except asyncio.TimeoutError:
+                    print(f"[supervisor] {worker.name} 未能重启")
+            print("[supervisor] 滚动重启完成")
+        finally:
+            self._restarting = False
+
+    async def close(self) -> None:
+        """停止所有工作进程"""
+        self.closing = True
+        for worker in self.workers:
+            if worker.process is not None and worker.process.returncode is None:
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is not None:
+                await worker.process.wait()
+
+    # ==================== 客户端连接和统计 ====================
+
+    async def handle(self, websocket) -> None:
+        """转发一个客户端连接"""
+        self.connections += 1
+        try:
+            await ClientProxy(self, websocket).run()
+        finally:
+            self.connections -= 1
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """汇总各工作进程的统计（数值相加，房间统计合并）"""
+        totals: Dict[str, Any] = {"llm": {}}
+        room_stats: List[Dict[str, Any]] = []
+        workers: List[Dict[str, Any]] = []
+        async with self._stats_lock:
+            for worker in self.workers:
+                info = {
+                    "worker": worker.index,
+                    "status": worker.status,
+                    "pid": worker.process.pid if worker.process is not None else None,
+                    "rooms": len(worker.rooms),
+                    "restarts": worker.restarts,
+                }
+                workers.append(info)
+                if worker.status not in ("ready", "draining"):
+                    continue
+                try:
+                    stats = await worker.request({"type": "stats"}, "stats:", timeout=5)
+                except (ConnectionError, asyncio.TimeoutError, self.websockets.ConnectionClosed):
+                    continue
+                room_stats.extend(stats.pop("room_stats"))
+                stats.pop("type")
+                info["playing"] = stats["playing"]
+                for key, value in stats.items():
+                    if key == "llm":
+                        for llm_key, llm_value in value.items():
+                            totals["llm"][llm_key] = totals["llm"].get(llm_key, 0) + llm_value
+                    else:
+                        totals[key] = totals.get(key, 0) + value
+        return {
+            **totals,
+            "connections": self.connections,
+            "moved": self.moved,
+            "lost": self.lost,
+            "workers": workers,
+            "room_stats": room_stats,
+        }
+
+
+async def serve(host: str, port: int, supervisor: Supervisor) -> None:
+    """启动工作进程和对外的 WebSocket 服务并一直运行"""
+    store = create_state_store()
+    if store is None or not store.persistent:
+        print("⚠️ 检查点没有保存在进程间共享的存储中（STATE_STORE=file/redis），工作进程退出时房间无法迁移")
+    if store is not None:
+        await store.close()
+
+    await asyncio.gather(*(supervisor.start_worker(worker) for worker in supervisor.workers))
+    loop = asyncio.get_running_loop()
+    if hasattr(signal, "SIGHUP"):
+        loop.add_signal_handler(signal.SIGHUP, lambda: supervisor._spawn_task(supervisor.rolling_restart()))
+
+    try:
+        async with supervisor.websockets.serve(supervisor.handle, host, port, max_size=2 ** 16):
+            print(f"狼人杀服务器已启动：ws://{host}:{port}（{len(supervisor.workers)} 个工作进程）")
+            while True:
+                await asyncio.sleep(60)
+                stats = await supervisor.get_stats()
+                rooms = "、".join(f"{w['worker']}号 {w['rooms']}" for w in stats["workers"])
+                print(f"[supervisor] 连接 {stats['connections']}，各工作进程房间数：{rooms}；"
+                      f"已完成 {stats.get('games_finished', 0)} 局，迁移 {stats['moved']} 个房间，丢失 {stats['lost']} 个")
+    finally:
+        await supervisor.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="狼人杀多人在线服务器（多进程）")
+    parser.add_argument("--host", default=settings.SERVER_HOST, help=f"监听地址（默认 {settings.SERVER_HOST}）")
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT,
+                        help=f"对外端口，工作进程使用之后的端口（默认 {settings.SERVER_PORT}）")
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS or os.cpu_count() or 1,
+                        help="工作进程数（默认 SERVER_WORKERS，未设置时为CPU核数）")
+    parser.add_argument("--max-rooms", type=int, default=settings.SERVER_MAX_ROOMS,
+                        help=f"同时存在的房间上限，平均分给各工作进程（默认 {settings.SERVER_MAX_ROOMS}）")
+    parser.add_argument("--max-games", type=int, default=settings.SERVER_MAX_GAMES,
+                        help=f"同时进行的对局上限，平均分给各工作进程（默认 {settings.SERVER_MAX_GAMES}）")
+    parser.add_argument("--max-queue", type=int, default=settings.SERVER_MAX_QUEUE,
+                        help=f"排队等待开始的对局上限，平均分给各工作进程（默认 {settings.SERVER_MAX_QUEUE}）")
+    parser.add_argument("--max-llm-in-flight", type=int, default=settings.SERVER_MAX_LLM_IN_FLIGHT,
+                        help=f"同时进行的LLM调用上限，平均分给各工作进程，0表示不限（默认 {settings.SERVER_MAX_LLM_IN_FLIGHT}）")
+    parser.add_argument("--room-max-seconds", type=float, default=settings.SERVER_ROOM_MAX_SECONDS,
+                        help=f"单个对局的时长上限（秒），0表示不限（默认 {settings.SERVER_ROOM_MAX_SECONDS:g}）")
+    parser.add_argument("--room-max-llm-calls", type=int, default=settings.SERVER_ROOM_MAX_LLM_CALLS,
+                        help=f"单个对局的LLM调用次数上限，0表示不限（默认 {settings.SERVER_ROOM_MAX_LLM_CALLS}）")
+    parser.add_argument("--room-max-llm-tokens", type=int, default=settings.SERVER_ROOM_MAX_LLM_TOKENS,
+                        help=f"单个对局的LLM token总数上限，0表示不限（默认 {settings.SERVER_ROOM_MAX_LLM_TOKENS}）")
+    parser.add_argument("--drain-timeout", type=float, default=settings.SERVER_DRAIN_TIMEOUT,
+                        help=f"排空工作进程时等待房间迁移的时限（秒，默认 {settings.SERVER_DRAIN_TIMEOUT:g}）")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers 至少为1")
+
+    settings.validate()
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        raise SystemExit("多人在线模式需要安装 websockets：pip install websockets")
+
+    def share(total: int) -> int:
+        return math.ceil(total / args.workers) if total > 0 else 0
+
+    worker_args = [
+        "--max-rooms", str(share(args.max_rooms)),
+        "--max-games", str(share(args.max_games)),
+        "--max-queue", str(share(args.max_queue)),
+        "--max-llm-in-flight", str(share(args.max_llm_in_flight)),
+        "--room-max-seconds", str(args.room_max_seconds),
+        "--room-max-llm-calls", str(args.room_max_llm_calls),
+        "--room-max-llm-tokens", str(args.room_max_llm_tokens),
+    ]
+
+    async def run() -> None:
+        await serve(args.host, args.port, Supervisor(args.workers, args.port, worker_args, args.drain_timeout))
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n服务器已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+多人在线狼人杀服务器（GameMode.MULTIPLAYER）- 基于 asyncio 的 WebSocket 服务
+
+一个进程内的所有房间共用同一个事件循环和LLM客户端，每个房间是一个任务；
+准入控制和资源预算见 server.room_manager，多进程部署见 server.supervisor。
+需要安装 websockets（pip install websockets）
+
+用法：
+    python -m server.ws_server                          # 监听 0.0.0.0:8765
+    python -m server.ws_server --port 9000 --max-rooms 500 --max-games 200 --max-llm-in-flight 64
+
+协议（JSON文本消息）：
+    客户端 → 服务器
+        {"type": "create", "board": "basic"}                        创建房间（可带 "room" 指定房间ID）
+        {"type": "join", "room": "...", "name": "..."}               入座（按加入顺序占用座位）
+        {"type": "rejoin", "room": "...", "player_id": 1, "token": "...", "version": 12, "epoch": "..."}
+                                                                     断线重连（version、epoch为已收到的状态版本和纪元）
+        {"type": "spectate", "room": "...", "version": 12, "epoch": "..."}
+                                                                     观战（只看公开信息）
+        {"type": "start"}                                            开始对局，空座位由AI补齐（座位坐满时自动开始）
+        {"type": "answer", "request_id": 3, "value": 0}              回复输入请求（text为字符串，choice为选项序号）
+        {"type": "stats"}                                            服务器和各房间的资源统计
+    服务器 → 客户端
+        {"type": "created" / "joined" / "lobby" / "error" / "stats", ...}
+        {"type": "queued", "position": 3}                           服务器满载，对局排队等待开始
+        {"type": "event", "event": {...}}                           游戏事件（已按可见性过滤）
+        {"type": "delta" / "snapshot", "epoch": "...", "version": ...}
+                                                                     状态同步（见 core.state_sync）
+        {"type": "prompt", "request_id": 3, "kind": "text" / "choice", "prompt": "...", "options": [...], "timeout": 30}
+        {"type": "prompt_expired", "request_id": 3}                 回复的请求已超时（已由AI代为决策）或已回复过
+        {"type": "closed", "reason": "game_over" / "time_limit" / "cancelled" / "error" / "moved" / "drained"}
+                                                                     moved：房间迁移到其他工作进程，客户端应重连
+                                                                     （rejoin / spectate 带上已收到的状态版本）
+                                                                     drained：工作进程排空时尚未开始的房间被关闭，客户端应重新创建房间
+    控制连接（supervisor → 工作进程，需先发送 {"type": "control", "token": "..."}）
+        {"type": "adopt", "room": "..."}                            接管迁移的房间 → {"type": "adopted", "room": "...", "ok": true}
+        {"type": "drain"}                                            排空 → {"type": "draining", "rooms": 3}
+        工作进程主动通知 {"type": "room_closed", "room": "...", "reason": "..."}
+"""
+import hmac
+import json
+import asyncio
+import argparse
+from typing import Optional, Dict, Any
+
+from config.settings import settings
+from core.state_sync import PUBLIC_VIEWER
+from server.room import Room, Seat, ClientStream, SendFunc
+from server.room_manager import RoomManager
+from utils.exceptions import RoomException
+
+
+class GameServer:
+    """
+    游戏服务器：把连接接入房间（房间的创建、准入和资源预算由 RoomManager 负责）
+
+    传输层只负责收发文本，房间和座位逻辑与 WebSocket 无关
+    """
+
+    def __init__(self, manager: Optional[RoomManager] = None, control_token: str = settings.SERVER_CONTROL_TOKEN):
+        """
+        Args:
+            manager: 房间管理器，None时按配置创建
+            control_token: 控制连接凭证（作为 supervisor 的工作进程运行时设置），空表示不接受控制连接
+        """
+        self.manager = manager or RoomManager(
+            max_rooms=settings.SERVER_MAX_ROOMS,
+            max_games=settings.SERVER_MAX_GAMES,
+            max_queue=settings.SERVER_MAX_QUEUE,
+            max_llm_in_flight=settings.SERVER_MAX_LLM_IN_FLIGHT,
+            room_max_seconds=settings.SERVER_ROOM_MAX_SECONDS
+        )
+        self.manager.on_room_closed = self._room_closed
+        self.connections = 0
+        self.control_token = control_token
+        self._control: Optional[SendFunc] = None
+
+    async def _room_closed(self, room: Room) -> None:
+        """通知 supervisor 房间已关闭（迁移的房间由它交给其他工作进程）"""
+        if self._control is not None:
+            await self._control(json.dumps({"type": "room_closed", "room": room.room_id, "reason": room.close_reason}))
+
+    async def _handle_control(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """处理控制连接的消息，返回回复"""
+        kind = message["type"]
+        if kind == "adopt":
+            try:
+                await self.manager.adopt(message["room"])
+            except RoomException as e:
+                return {"type": "adopted", "room": message["room"], "ok": False, "message": str(e)}
+            return {"type": "adopted", "room": message["room"], "ok": True}
+        if kind == "drain":
+            return {"type": "draining", "rooms": await self.manager.drain()}
+        raise RoomException(f"未知消息类型：{kind}")
+
+    async def handle(self, send: SendFunc, messages) -> None:
+        """
+        处理一个连接的整个生命周期
+
+        Args:
+            send: 发送文本消息的函数
+            messages: 收到的文本消息（异步迭代器，连接关闭时结束）
+        """
+        room: Optional[Room] = None
+        seat: Optional[Seat] = None
+        stream: Optional[ClientStream] = None
+
+        async def reply(message: Dict[str, Any]) -> None:
+            await send(json.dumps(message, ensure_ascii=False))
+
+        control = False
+        self.connections += 1
+        try:
+            async for raw in messages:
+                try:
+                    message = json.loads(raw)
+                    kind = message["type"]
+
+                    if control and kind != "stats":
+                        await reply(await self._handle_control(message))
+
+                    elif kind == "control":
+                        if not self.control_token or not hmac.compare_digest(str(message.get("token", "")), self.control_token):
+                            raise RoomException("控制凭证无效")
+                        control = True
+                        self._control = send
+
+                    elif kind == "create":
+                        created = self.manager.create_room(message.get("board", "basic"), message.get("room"))
+                        await reply({"type": "created", "room": created.room_id, "total_seats": created.total_seats})
+
+                    elif kind in ("join", "rejoin", "spectate"):
+                        if stream is not None:
+                            raise RoomException("该连接已在房间中")
+                        room = self.manager.get_room(message["room"])
+                        if kind == "join":
+                            seat = room.join(message.get("name", ""))
+                        elif kind == "rejoin":
+                            seat = room.get_seat(message["player_id"], message["token"])
+                        viewer_id = seat.player_id if seat is not None else PUBLIC_VIEWER
+                        stream = ClientStream(send, viewer_id, message.get("version"), message.get("epoch"))
+                        if seat is not None:
+                            await reply({
+                                "type": "joined", "room": room.room_id,
+                                "player_id": seat.player_id, "token": seat.token,
+                            })
+                        await room.connect(stream, seat)
+                        if room.status == "waiting" and len(room.seats) == room.total_seats:
+                            await self.manager.start(room)
+
+                    elif kind == "start":
+                        if seat is None:
+                            raise RoomException("入座后才能开始对局")
+                        await self.manager.start(room)
+
+                    elif kind == "answer":
+                        if seat is None:
+                            raise RoomException("没有等待回复的请求")
+                        if not seat.answer(message["request_id"], message.get("value")):
+                            if message["request_id"] > seat.last_request_id:
+                                raise RoomException("没有等待回复的请求")
+                            # 超时后由AI代为决策的请求，回复不再生效
+                            await reply({"type": "prompt_expired", "request_id": message["request_id"]})
+
+                    elif kind == "stats":
+                        await reply({"type": "stats", **self.get_stats(), "room_stats": self.manager.get_room_stats()})
+
+                    else:
+                        raise RoomException(f"未知消息类型：{kind}")
+
+                except (RoomException, ValueError, KeyError, TypeError) as e:
+                    await reply({"type": "error", "message": str(e) or type(e).__name__})
+        finally:
+            self.connections -= 1
+            if control and self._control is send:
+                self._control = None
+            if room is not None and stream is not None:
+                await room.disconnect(stream, seat)
+                if room.status in ("waiting", "queued") and not room.streams:
+                    await self.manager.destroy(room)
+
+    async def close(self) -> None:
+        """取消所有对局并关闭检查点存储"""
+        await self.manager.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """服务器统计"""
+        return {**self.manager.get_stats(), "connections": self.connections}
+
+
+async def serve(host: str, port: int, manager: RoomManager) -> None:
+    """启动 WebSocket 服务并一直运行"""
+    try:
+        import websockets
+    except ImportError:
+        raise SystemExit("多人在线模式需要安装 websockets：pip install websockets")
+
+    server = GameServer(manager)
+
+    async def handler(websocket) -> None:
+        async def send(text: str) -> None:
+            try:
+                await websocket.send(text)
+            except websockets.ConnectionClosed:
+                pass  # 断开的连接由接收循环结束时清理
+
+        async def messages():
+            try:
+                async for raw in websocket:
+                    yield raw
+            except websockets.ConnectionClosed:
+                return
+
+        await server.handle(send, messages())
+
+    async with websockets.serve(handler, host, port, max_size=2 ** 16):
+        print(f"狼人杀服务器已启动：ws://{host}:{port}（房间上限 {manager.max_rooms}，"
+              f"对局上限 {manager.max_games}，LLM并发上限 {manager.llm.max_in_flight or '不限'}）")
+        try:
+            while True:
+                await asyncio.sleep(60)
+                stats = server.get_stats()
+                llm = stats["llm"]
+                print(f"[服务器] 房间 {stats['rooms']}（对局中 {stats['playing']}，排队 {stats['queued']}），"
+                      f"连接 {stats['connections']}，已完成 {stats['games_finished']} 局，拒绝 {stats['rejected']} 次；"
+                      f"LLM调用 {llm['in_flight']} 进行中 / {llm['waiting']} 等待 / {llm['saturated']} 超时放弃")
+        finally:
+            await server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="狼人杀多人在线服务器（WebSocket）")
+    parser.add_argument("--host", default=settings.SERVER_HOST, help=f"监听地址（默认 {settings.SERVER_HOST}）")
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT, help=f"监听端口（默认 {settings.SERVER_PORT}）")
+    parser.add_argument("--max-rooms", type=int, default=settings.SERVER_MAX_ROOMS,
+                        help=f"同时存在的房间上限（默认 {settings.SERVER_MAX_ROOMS}）")
+    parser.add_argument("--max-games", type=int, default=settings.SERVER_MAX_GAMES,
+                        help=f"同时进行的对局上限，超过后排队（默认 {settings.SERVER_MAX_GAMES}）")
+    parser.add_argument("--max-queue", type=int, default=settings.SERVER_MAX_QUEUE,
+                        help=f"排队等待开始的对局上限（默认 {settings.SERVER_MAX_QUEUE}）")
+    parser.add_argument("--max-llm-in-flight", type=int, default=settings.SERVER_MAX_LLM_IN_FLIGHT,
+                        help=f"同时进行的LLM调用上限，0表示不限（默认 {settings.SERVER_MAX_LLM_IN_FLIGHT}）")
+    parser.add_argument("--room-max-seconds", type=float, default=settings.SERVER_ROOM_MAX_SECONDS,
+                        help=f"单个对局的时长上限（秒），0表示不限（默认 {settings.SERVER_ROOM_MAX_SECONDS:g}）")
+    parser.add_argument("--room-max-llm-calls", type=int, default=settings.SERVER_ROOM_MAX_LLM_CALLS,
+                        help=f"单个对局的LLM调用次数上限，0表示不限（默认 {settings.SERVER_ROOM_MAX_LLM_CALLS}）")
+    parser.add_argument("--room-max-llm-tokens", type=int, default=settings.SERVER_ROOM_MAX_LLM_TOKENS,
+                        help=f"单个对局的LLM token总数上限，0表示不限（默认 {settings.SERVER_ROOM_MAX_LLM_TOKENS}）")
+    args = parser.parse_args()
+
+    settings.validate()
+
+    async def run() -> None:
+        manager = RoomManager(
+            max_rooms=args.max_rooms,
+            max_games=args.max_games,
+            max_queue=args.max_queue,
+            max_llm_in_flight=args.max_llm_in_flight,
+            room_max_seconds=args.room_max_seconds,
+            room_max_llm_calls=args.room_max_llm_calls,
+            room_max_llm_tokens=args.room_max_llm_tokens
+        )
+        await serve(args.host, args.port, manager)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n服务器已停止")
+
+
+if __name__ == "__main__":
+    main()
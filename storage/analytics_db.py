@@ -0,0 +1,360 @@
+"""
+游戏日志分析库 - 把游戏日志导入SQLite，用SQL回答统计问题
+
+数据来源：save_game_log 输出的 game_*.json，或 storage.log_archive 的归档
+
+用法：
+    python -m storage.analytics_db ingest                         # 导入 storage/game_logs
+    python -m storage.analytics_db ingest logs_a/ logs_b/x.json --archive storage/archive
+    python -m storage.analytics_db report                         # 输出内置统计报表
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
+
+from config.settings import settings
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    end_time TEXT,
+    winner TEXT,
+    board_config TEXT,
+    total_rounds INTEGER,
+    total_players INTEGER,
+    alive_count INTEGER,
+    dead_count INTEGER,
+    victory_reason TEXT,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS players (
+    game_id TEXT NOT NULL,
+    player_id INTEGER NOT NULL,
+    name TEXT,
+    role TEXT,
+    camp TEXT,
+    is_alive INTEGER,
+    is_sheriff INTEGER,
+    PRIMARY KEY (game_id, player_id)
+);
+CREATE TABLE IF NOT EXISTS speeches (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    round INTEGER,
+    phase TEXT,
+    player_id INTEGER,
+    content TEXT,
+    timestamp TEXT
+);
+CREATE TABLE IF NOT EXISTS votes (
+    game_id TEXT NOT NULL,
+    round INTEGER,
+    voter_id INTEGER,
+    target_id INTEGER,
+    timestamp TEXT
+);
+CREATE TABLE IF NOT EXISTS witch_actions (
+    game_id TEXT NOT NULL,
+    round INTEGER,
+    action_type TEXT,
+    target_id INTEGER,
+    remaining_antidote INTEGER,
+    remaining_poison INTEGER
+);
+CREATE TABLE IF NOT EXISTS seer_checks (
+    game_id TEXT NOT NULL,
+    seer_id INTEGER,
+    check_index INTEGER,
+    target_id INTEGER,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_games_board ON games (board_config);
+CREATE INDEX IF NOT EXISTS idx_players_role ON players (role, camp);
+CREATE INDEX IF NOT EXISTS idx_speeches_game ON speeches (game_id, round);
+CREATE INDEX IF NOT EXISTS idx_votes_game ON votes (game_id, voter_id);
+CREATE INDEX IF NOT EXISTS idx_witch_game ON witch_actions (game_id);
+CREATE INDEX IF NOT EXISTS idx_seer_game ON seer_checks (game_id, seer_id);
+"""
+
+# 预言家查验记录格式："AI-2（2号）是好人"
+SEER_CHECK_PATTERN = re.compile(r'（(\d+)号）是(好人|狼人)')
+
+WEREWOLF_CAMP = "狼人阵营"
+
+
+class AnalyticsDB:
+    """
+    游戏日志分析库
+
+    职责：
+    - 建表和索引
+    - 批量导入游戏日志（每批一个事务）
+    - 内置统计查询
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 数据库文件路径（":memory:" 表示内存库）
+        """
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def has_game(self, game_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM games WHERE game_id = ?", (game_id,)).fetchone() is not None
+
+    # ---------- 导入 ----------
+
+    @staticmethod
+    def _rows(game_id: str, game_log: Dict[str, Any], source: Optional[str]) -> Dict[str, List[Tuple]]:
+        """把一局日志拆成各表的行"""
+        info = game_log.get("game_info", {})
+        rows: Dict[str, List[Tuple]] = {
+            "games": [(
+                game_id, info.get("end_time"), info.get("winner"), info.get("board_config"),
+                info.get("total_rounds"), info.get("total_players"), info.get("alive_count"),
+                info.get("dead_count"), game_log.get("victory_reason"), source,
+            )],
+            "players": [
+                (game_id, p["id"], p.get("name"), p.get("role"), p.get("camp"),
+                 int(bool(p.get("is_alive"))), int(bool(p.get("is_sheriff"))))
+                for p in game_log.get("players", [])
+            ],
+            "speeches": [],
+            "votes": [],
+            "witch_actions": [
+                (game_id, w.get("round"), w.get("action_type"), w.get("target_id") or None,
+                 int(bool(w.get("remaining_antidote"))), int(bool(w.get("remaining_poison"))))
+                for w in game_log.get("witch_actions", [])
+            ],
+            "seer_checks": [],
+        }
+
+        for seq, record in enumerate(game_log.get("conversation_history", [])):
+            action_type = record.get("action_type")
+            if action_type == "speech":
+                rows["speeches"].append((
+                    game_id, seq, record.get("round"), record.get("phase"),
+                    record.get("player_id"), record.get("content"), record.get("timestamp"),
+                ))
+            elif action_type == "vote":
+                rows["votes"].append((
+                    game_id, record.get("round"), record.get("player_id"),
+                    record.get("target_id"), record.get("timestamp"),
+                ))
+
+        for seer_id, results in game_log.get("seer_checks", {}).items():
+            for index, text in enumerate(results):
+                match = SEER_CHECK_PATTERN.search(text)
+                if match:
+                    rows["seer_checks"].append((game_id, int(seer_id), index, int(match.group(1)), match.group(2)))
+
+        return rows
+
+    INSERTS = {
+        "games": "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        "players": "INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?)",
+        "speeches": "INSERT INTO speeches VALUES (?, ?, ?, ?, ?, ?, ?)",
+        "votes": "INSERT INTO votes VALUES (?, ?, ?, ?, ?)",
+        "witch_actions": "INSERT INTO witch_actions VALUES (?, ?, ?, ?, ?, ?)",
+        "seer_checks": "INSERT INTO seer_checks VALUES (?, ?, ?, ?, ?)",
+    }
+
+    def ingest(self, games: Iterable[Tuple[str, Dict[str, Any], Optional[str]]], batch_size: int = 500) -> int:
+        """
+        批量导入（已存在的游戏ID跳过）
+
+        Args:
+            games: (游戏ID, 游戏日志, 来源) 序列
+            batch_size: 每个事务包含的局数
+
+        Returns:
+            int: 新导入的局数
+        """
+        imported = 0
+        batch: Dict[str, List[Tuple]] = {table: [] for table in self.INSERTS}
+        pending = set()
+
+        def commit():
+            with self.conn:
+                for table, sql in self.INSERTS.items():
+                    if batch[table]:
+                        self.conn.executemany(sql, batch[table])
+                        batch[table].clear()
+            pending.clear()
+
+        for game_id, game_log, source in games:
+            if game_id in pending or self.has_game(game_id):
+                continue
+            for table, rows in self._rows(game_id, game_log, source).items():
+                batch[table].extend(rows)
+            pending.add(game_id)
+            imported += 1
+            if len(pending) >= batch_size:
+                commit()
+
+        commit()
+        return imported
+
+    # ---------- 内置查询 ----------
+
+    def query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        """执行查询，返回可按列名访问的行"""
+        self.conn.row_factory = sqlite3.Row
+        try:
+            return self.conn.execute(sql, params).fetchall()
+        finally:
+            self.conn.row_factory = None
+
+    def win_rate_by_role(self) -> List[sqlite3.Row]:
+        """各板子下每个角色的胜率"""
+        return self.query("""
+            SELECT g.board_config AS board, p.role AS role,
+                   COUNT(*) AS games,
+                   SUM(p.camp = g.winner) AS wins,
+                   ROUND(AVG(p.camp = g.winner), 3) AS win_rate
+            FROM players p JOIN games g USING (game_id)
+            GROUP BY g.board_config, p.role
+            ORDER BY g.board_config, win_rate DESC
+        """)
+
+    def average_rounds(self) -> List[sqlite3.Row]:
+        """各板子、各胜方的平均轮数"""
+        return self.query("""
+            SELECT board_config AS board, winner, COUNT(*) AS games,
+                   ROUND(AVG(total_rounds), 2) AS avg_rounds
+            FROM games
+            GROUP BY board_config, winner
+            ORDER BY board_config, winner
+        """)
+
+    def vote_accuracy(self) -> List[sqlite3.Row]:
+        """好人阵营各角色放逐投票投中狼人的比例"""
+        return self.query("""
+            SELECT voter.role AS role, COUNT(*) AS votes,
+                   SUM(target.camp = ?) AS on_werewolf,
+                   ROUND(AVG(target.camp = ?), 3) AS accuracy
+            FROM votes v
+            JOIN players voter ON voter.game_id = v.game_id AND voter.player_id = v.voter_id
+            JOIN players target ON target.game_id = v.game_id AND target.player_id = v.target_id
+            WHERE voter.camp != ?
+            GROUP BY voter.role
+            ORDER BY accuracy DESC
+        """, (WEREWOLF_CAMP, WEREWOLF_CAMP, WEREWOLF_CAMP))
+
+    def seer_hit_rate(self) -> List[sqlite3.Row]:
+        """预言家查验命中狼人的比例（按第几次查验）"""
+        return self.query("""
+            SELECT check_index + 1 AS nth_check, COUNT(*) AS checks,
+                   SUM(result = '狼人') AS hits,
+                   ROUND(AVG(result = '狼人'), 3) AS hit_rate
+            FROM seer_checks
+            GROUP BY check_index
+            ORDER BY check_index
+        """)
+
+    REPORTS = (
+        ("角色胜率", "win_rate_by_role"),
+        ("平均轮数", "average_rounds"),
+        ("放逐投票准确率（好人阵营）", "vote_accuracy"),
+        ("预言家查验命中率", "seer_hit_rate"),
+    )
+
+
+def iter_log_files(paths: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any], Optional[str]]]:
+    """
+    读取日志文件或目录下的 game_*.json
+
+    Yields:
+        (游戏ID, 游戏日志, 来源文件名)
+    """
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "game_*.json"))) if os.path.isdir(path) else [path]
+        for file in files:
+            with open(file, 'r', encoding='utf-8') as f:
+                game_log = json.load(f)
+            source = os.path.basename(file)
+            # 早期日志没有记录游戏ID，使用文件名中的时间戳（与归档一致）
+            game_id = game_log.get("game_info", {}).get("game_id") or source[len("game_"):-len(".json")]
+            yield game_id, game_log, source
+
+
+def iter_archive(directory: str) -> Iterator[Tuple[str, Dict[str, Any], Optional[str]]]:
+    """读取归档中的所有游戏"""
+    from storage.log_archive import LogArchive
+
+    archive = LogArchive(directory)
+    entries = sorted(archive.entries.values(), key=lambda e: (e["segment_index"], e["offset"]))
+    for entry, game_log in zip(entries, archive.iter_games()):
+        yield entry["game_id"], game_log, entry.get("source")
+
+
+def format_rows(rows: List[sqlite3.Row]) -> str:
+    """把查询结果格式化为文本表格"""
+    if not rows:
+        return "  （无数据）"
+    columns = rows[0].keys()
+    cells = [[("-" if row[c] is None else str(row[c])) for c in columns] for row in rows]
+    widths = [max(display_width(c), *(display_width(r[i]) for r in cells)) + 2 for i, c in enumerate(columns)]
+
+    def pad(text: str, width: int) -> str:
+        return text + " " * (width - display_width(text))
+
+    lines = ["".join(pad(c, w) for c, w in zip(columns, widths))]
+    lines += ["".join(pad(v, w) for v, w in zip(r, widths)) for r in cells]
+    return "\n".join("  " + line.rstrip() for line in lines)
+
+
+def display_width(text: str) -> int:
+    """终端显示宽度（中文占两格）"""
+    return sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="游戏日志分析库（SQLite）")
+    parser.add_argument("--db", default=settings.ANALYTICS_DB_PATH, help="数据库文件")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="导入游戏日志")
+    ingest.add_argument("paths", nargs="*", help="日志文件或目录（默认 GAME_LOG_DIR）")
+    ingest.add_argument("--archive", help="同时导入归档目录")
+    ingest.add_argument("--batch-size", type=int, default=500, help="每个事务的局数（默认500）")
+
+    commands.add_parser("report", help="输出内置统计报表")
+
+    args = parser.parse_args()
+    db = AnalyticsDB(args.db)
+    try:
+        if args.command == "ingest":
+            paths = args.paths or ([] if args.archive else [settings.GAME_LOG_DIR])
+            imported = db.ingest(iter_log_files(paths), batch_size=args.batch_size)
+            if args.archive:
+                imported += db.ingest(iter_archive(args.archive), batch_size=args.batch_size)
+            total = db.conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+            print(f"新导入 {imported} 局，库中共 {total} 局：{args.db}")
+        else:
+            for title, method in AnalyticsDB.REPORTS:
+                print(f"\n【{title}】")
+                print(format_rows(getattr(db, method)()))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+游戏事件流日志 - 游戏进行中逐条追加写入JSON Lines
+
+文件格式（每行一条记录，只追加不改写）：
+- {"type": "header", ...}     开局信息（游戏ID、板子、玩家身份）
+- {"seq": 1, "type": "speech", ...}  事件（GameEvent.to_dict()）
+- {"type": "summary", ...}    结束时的紧凑汇总（胜负、统计）
+
+记录先缓冲在内存中，按条数或定时批量写入，写文件在线程中进行，不阻塞事件循环；
+进程崩溃时最多丢失最后一个刷新周期内的记录
+"""
+import os
+import json
+import time
+import asyncio
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.events import GameEvent
+
+
+class EventLogWriter:
+    """
+    事件流日志写入器（事件总线订阅者）
+
+    职责：
+    - 把事件序列化为一行JSON放入缓冲区
+    - 缓冲区满或到达刷新间隔时在线程中追加写入文件
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, max_buffer: int = 256):
+        """
+        Args:
+            path: 日志文件路径
+            flush_interval: 定时刷新间隔（秒）
+            max_buffer: 缓冲区达到多少条时立即刷新
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._buffer: List[str] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+        self.records = 0
+        self.flushes = 0
+        self.bytes_written = 0
+
+    async def __call__(self, event: 'GameEvent') -> None:
+        await self.write(event.to_dict())
+
+    async def write(self, record: Dict[str, Any]) -> None:
+        """
+        追加一条记录
+
+        Args:
+            record: 可JSON序列化的字典
+        """
+        self._buffer.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.records += 1
+
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().create_task(
+                self._flush_periodically(), name="event-log-flush"
+            )
+        if len(self._buffer) >= self.max_buffer:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """把缓冲区写入文件"""
+        async with self._lock:
+            if not self._buffer:
+                return
+            data = "".join(self._buffer)
+            self._buffer = []
+            await asyncio.to_thread(self._append, data)
+            self.flushes += 1
+            self.bytes_written += len(data.encode('utf-8'))
+
+    def _append(self, data: str) -> None:
+        """追加写入（在线程中执行）"""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(data)
+
+    async def _flush_periodically(self) -> None:
+        """定时刷新"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def aclose(self) -> None:
+        """停止定时刷新并写出剩余记录"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取写入统计"""
+        return {
+            "path": self.path,
+            "records": self.records,
+            "flushes": self.flushes,
+            "bytes": self.bytes_written,
+            "buffered": len(self._buffer),
+        }
+
+
+def read_event_log(path: str) -> List[Dict[str, Any]]:
+    """
+    读取事件流日志（忽略崩溃时可能写了一半的最后一行）
+
+    Args:
+        path: 日志文件路径
+
+    Returns:
+        List[Dict]: 记录列表
+    """
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return records
+
+
+def event_log_path(directory: str, game_id: str, started_at: Optional[float] = None) -> str:
+    """
+    生成事件流日志路径：events_YYYYMMDD_HHMMSS_<game_id>.jsonl
+
+    Args:
+        directory: 目录
+        game_id: 游戏ID
+        started_at: 开局时间戳，默认当前时间
+    """
+    stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(started_at))
+    return os.path.join(directory, f"events_{stamp}_{game_id}.jsonl")
@@ -0,0 +1,226 @@
+"""
+游戏日志并行分析 - 多进程扫描日志目录，汇总为统计报表
+
+每个工作进程负责一批日志文件，先在进程内汇总为部分统计（计数器），
+主进程只合并各批的计数器，进程间只传递很小的结果
+
+用法：
+    python -m storage.log_analysis                          # 分析 storage/game_logs
+    python -m storage.log_analysis logs/ --workers 8 --format csv --output report.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Iterable, Tuple
+
+from config.settings import settings
+from storage.analytics_db import display_width
+
+
+# 部分统计：统计项 -> 计数器（键为元组，便于合并和输出）
+Partial = Dict[str, Counter]
+
+SECTIONS = (
+    "camp", "role", "seat", "rounds", "sheriff", "witch", "errors",
+)
+
+
+def _empty() -> Partial:
+    return {section: Counter() for section in SECTIONS}
+
+
+def analyze_log(game_log: dict, partial: Partial) -> None:
+    """
+    把一局日志计入部分统计
+
+    Args:
+        game_log: 游戏日志（save_game_log 的格式）
+        partial: 部分统计（原地更新）
+    """
+    info = game_log.get("game_info", {})
+    winner = info.get("winner")
+    players = game_log.get("players", [])
+
+    partial["camp"][(winner, "wins")] += 1
+    partial["camp"][("*", "games")] += 1
+    partial["rounds"][(info.get("total_rounds"),)] += 1
+
+    for player in players:
+        won = int(player.get("camp") == winner)
+        partial["role"][(player.get("role"), "games")] += 1
+        partial["role"][(player.get("role"), "wins")] += won
+        partial["seat"][(player.get("id"), "games")] += 1
+        partial["seat"][(player.get("id"), "wins")] += won
+
+    # 警长影响：警长所在阵营的胜率（游戏结束时的警长）
+    sheriff = next((p for p in players if p.get("is_sheriff")), None)
+    if sheriff is None:
+        partial["sheriff"][("无警长", "games")] += 1
+    else:
+        partial["sheriff"][(sheriff.get("camp"), "games")] += 1
+        partial["sheriff"][(sheriff.get("camp"), "wins")] += int(sheriff.get("camp") == winner)
+
+    # 女巫用药时机：按轮次统计救人/毒人/跳过
+    for action in game_log.get("witch_actions", []):
+        partial["witch"][(action.get("action_type"), action.get("round"))] += 1
+
+
+def analyze_files(paths: List[str]) -> Partial:
+    """
+    工作进程入口：分析一批日志文件
+
+    Args:
+        paths: 日志文件路径
+
+    Returns:
+        Partial: 这批文件的部分统计
+    """
+    partial = _empty()
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                game_log = json.load(f)
+            analyze_log(game_log, partial)
+        except (OSError, ValueError) as e:
+            partial["errors"][(os.path.basename(path), type(e).__name__)] += 1
+    return partial
+
+
+def merge(partials: Iterable[Partial]) -> Partial:
+    """合并部分统计"""
+    total = _empty()
+    for partial in partials:
+        for section, counter in partial.items():
+            total[section].update(counter)
+    return total
+
+
+def find_logs(paths: Iterable[str]) -> List[str]:
+    """展开目录下的 game_*.json"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "game_*.json"))))
+        else:
+            files.append(path)
+    return files
+
+
+def run(files: List[str], workers: int = 0, chunk_size: int = 200) -> Partial:
+    """
+    并行分析
+
+    Args:
+        files: 日志文件
+        workers: 进程数，0表示CPU核数；1表示在当前进程内执行
+        chunk_size: 每批文件数
+
+    Returns:
+        Partial: 汇总统计
+    """
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        return merge(map(analyze_files, chunks))
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        return merge(executor.map(analyze_files, chunks))
+
+
+def build_report(total: Partial) -> List[Tuple[str, List[str], List[List]]]:
+    """
+    把汇总统计整理为报表
+
+    Returns:
+        List[Tuple[标题, 表头, 行]]
+    """
+    def rate(wins: int, games: int) -> str:
+        return f"{wins / games:.3f}" if games else "-"
+
+    def win_table(counter: Counter) -> List[List]:
+        keys = sorted({key for key, _ in counter}, key=str)
+        return [
+            [key, counter[(key, "games")], counter[(key, "wins")],
+             rate(counter[(key, "wins")], counter[(key, "games")])]
+            for key in keys
+        ]
+
+    games = total["camp"][("*", "games")]
+    camps = sorted({key for key, metric in total["camp"] if metric == "wins"}, key=str)
+    camp_rows = [[camp, games, total["camp"][(camp, "wins")], rate(total["camp"][(camp, "wins")], games)] for camp in camps]
+
+    rounds = total["rounds"]
+    round_rows = [[r, n, rate(n, games)] for (r,), n in sorted(rounds.items(), key=lambda item: (item[0][0] is None, item[0][0] or 0))]
+
+    witch = total["witch"]
+    witch_rounds = sorted({r for _, r in witch}, key=lambda r: (r is None, r or 0))
+    witch_rows = [[r, witch[("save", r)], witch[("poison", r)], witch[("skip", r)]] for r in witch_rounds]
+
+    report = [
+        ("阵营胜率", ["阵营", "局数", "胜场", "胜率"], camp_rows),
+        ("角色胜率", ["角色", "局数", "胜场", "胜率"], win_table(total["role"])),
+        ("座位胜率", ["座位", "局数", "胜场", "胜率"], win_table(total["seat"])),
+        ("游戏轮数分布", ["轮数", "局数", "占比"], round_rows),
+        ("警长阵营胜率", ["警长阵营", "局数", "胜场", "胜率"], win_table(total["sheriff"])),
+        ("女巫用药时机", ["轮次", "救人", "毒人", "跳过"], witch_rows),
+    ]
+    if total["errors"]:
+        report.append(("读取失败", ["文件", "错误", "次数"], [[f, e, n] for (f, e), n in total["errors"].items()]))
+    return report
+
+
+def format_table(title: str, header: List[str], rows: List[List]) -> str:
+    """格式化为终端表格"""
+    cells = [[str(v) for v in row] for row in rows]
+    widths = [max([display_width(h)] + [display_width(r[i]) for r in cells]) + 2 for i, h in enumerate(header)]
+
+    def line(values: List[str]) -> str:
+        return "  " + "".join(v + " " * (w - display_width(v)) for v, w in zip(values, widths)).rstrip()
+
+    return "\n".join([f"\n【{title}】", line(header)] + [line(r) for r in cells])
+
+
+def write_csv(report: List[Tuple[str, List[str], List[List]]], out) -> None:
+    """输出为CSV（长表：报表, 表头..., 每行带报表名）"""
+    writer = csv.writer(out)
+    for title, header, rows in report:
+        writer.writerow(["section"] + header)
+        for row in rows:
+            writer.writerow([title] + row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并行分析游戏日志")
+    parser.add_argument("paths", nargs="*", help="日志文件或目录（默认 GAME_LOG_DIR）")
+    parser.add_argument("--workers", type=int, default=0, help="进程数（默认CPU核数）")
+    parser.add_argument("--chunk-size", type=int, default=200, help="每批文件数（默认200）")
+    parser.add_argument("--format", choices=("table", "csv"), default="table", help="输出格式")
+    parser.add_argument("--output", help="输出文件（默认标准输出）")
+    args = parser.parse_args()
+
+    files = find_logs(args.paths or [settings.GAME_LOG_DIR])
+    if not files:
+        print("没有找到日志文件")
+        sys.exit(1)
+
+    report = build_report(run(files, args.workers, args.chunk_size))
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(report, out)
+        else:
+            out.write(f"共分析 {len(files)} 个日志文件\n")
+            for title, header, rows in report:
+                out.write(format_table(title, header, rows) + "\n")
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
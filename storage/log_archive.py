@@ -0,0 +1,269 @@
+"""
+游戏日志归档 - 把大量单局JSON日志打包为压缩分段文件，并用清单索引随机读取
+
+目录结构：
+    storage/archive/
+        manifest.jsonl          清单，每行一局（游戏ID、胜方、板子、轮数、所在分段、字节偏移）
+        segment_00001.gz        分段文件，每局是一个独立的gzip成员，依次拼接
+        segment_00002.gz
+
+每局单独压缩，读取某一局只需按偏移读出对应字节并解压，不用解压整个分段；
+整个分段文件仍是合法的多成员gzip，可以直接用 zcat 查看
+
+用法：
+    python -m storage.log_archive pack                      # 归档 storage/game_logs 下的日志
+    python -m storage.log_archive pack --remove             # 归档后删除原文件
+    python -m storage.log_archive list --winner 狼人阵营
+    python -m storage.log_archive show <game_id>
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+from typing import Optional, Dict, Any, List, Iterator
+
+from config.settings import settings
+
+
+class LogArchive:
+    """
+    游戏日志归档
+
+    职责：
+    - 追加写入游戏日志到当前分段，分段超过大小上限时换新分段
+    - 维护清单索引，按游戏ID随机读取
+    """
+
+    MANIFEST_NAME = "manifest.jsonl"
+    SEGMENT_PATTERN = "segment_{:05d}.gz"
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024, compresslevel: int = 6):
+        """
+        Args:
+            directory: 归档目录
+            segment_max_bytes: 单个分段的大小上限（字节）
+            compresslevel: gzip压缩级别（1-9）
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.compresslevel = compresslevel
+        self.manifest_path = os.path.join(directory, self.MANIFEST_NAME)
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._sources = set()
+        self._segment_index = 1
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_manifest()
+
+    def _load_manifest(self) -> None:
+        """读取清单（忽略写了一半的最后一行）"""
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self.entries[entry["game_id"]] = entry
+                if entry.get("source"):
+                    self._sources.add(entry["source"])
+                self._segment_index = max(self._segment_index, entry["segment_index"])
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, self.SEGMENT_PATTERN.format(index))
+
+    def _current_segment(self, incoming: int) -> int:
+        """当前可写入的分段号（写入后会超过上限时换新分段）"""
+        path = self._segment_path(self._segment_index)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size > 0 and size + incoming > self.segment_max_bytes:
+            self._segment_index += 1
+        return self._segment_index
+
+    def contains_source(self, source: str) -> bool:
+        """某个原始文件是否已归档"""
+        return source in self._sources
+
+    def add(self, game_log: Dict[str, Any], game_id: Optional[str] = None, source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        归档一局游戏
+
+        Args:
+            game_log: 游戏日志（save_game_log 的格式）
+            game_id: 游戏ID，默认取 game_info.game_id
+            source: 原始文件名（用于避免重复归档）
+
+        Returns:
+            Dict: 清单条目
+        """
+        info = game_log.get("game_info", {})
+        game_id = game_id or info.get("game_id")
+        if not game_id:
+            raise ValueError("game_id is required")
+        if game_id in self.entries:
+            raise ValueError(f"Game already archived: {game_id}")
+
+        payload = json.dumps(game_log, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+        member = gzip.compress(payload, compresslevel=self.compresslevel, mtime=0)
+
+        segment_index = self._current_segment(len(member))
+        segment_path = self._segment_path(segment_index)
+        with open(segment_path, 'ab') as f:
+            offset = f.tell()
+            f.write(member)
+
+        entry = {
+            "game_id": game_id,
+            "winner": info.get("winner"),
+            "board_config": info.get("board_config"),
+            "total_rounds": info.get("total_rounds"),
+            "end_time": info.get("end_time"),
+            "segment_index": segment_index,
+            "segment": os.path.basename(segment_path),
+            "offset": offset,
+            "length": len(member),
+            "raw_length": len(payload),
+            "source": source,
+        }
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+        self.entries[game_id] = entry
+        if source:
+            self._sources.add(source)
+        return entry
+
+    def get(self, game_id: str) -> Dict[str, Any]:
+        """
+        按游戏ID读取一局（只解压这一局的字节）
+
+        Args:
+            game_id: 游戏ID
+
+        Returns:
+            Dict: 游戏日志
+        """
+        entry = self.entries.get(game_id)
+        if entry is None:
+            raise KeyError(game_id)
+        with open(os.path.join(self.directory, entry["segment"]), 'rb') as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        return json.loads(gzip.decompress(member))
+
+    def find(self, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        按清单字段筛选（不读取分段）
+
+        用法：archive.find(winner="狼人阵营", board_config="basic")
+        """
+        return [
+            entry for entry in self.entries.values()
+            if all(entry.get(key) == value for key, value in filters.items())
+        ]
+
+    def iter_games(self) -> Iterator[Dict[str, Any]]:
+        """按分段顺序读出所有游戏（每个分段只打开一次）"""
+        by_segment: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in self.entries.values():
+            by_segment.setdefault(entry["segment"], []).append(entry)
+
+        for segment in sorted(by_segment):
+            with open(os.path.join(self.directory, segment), 'rb') as f:
+                for entry in sorted(by_segment[segment], key=lambda e: e["offset"]):
+                    f.seek(entry["offset"])
+                    yield json.loads(gzip.decompress(f.read(entry["length"])))
+
+    def pack_directory(self, log_dir: str, remove: bool = False) -> int:
+        """
+        归档目录下的 game_*.json 日志
+
+        Args:
+            log_dir: 日志目录
+            remove: 归档成功后删除原文件
+
+        Returns:
+            int: 新归档的局数
+        """
+        packed = 0
+        for path in sorted(glob.glob(os.path.join(log_dir, "game_*.json"))):
+            source = os.path.basename(path)
+            if not self.contains_source(source):
+                with open(path, 'r', encoding='utf-8') as f:
+                    game_log = json.load(f)
+                self.add(game_log, game_id=self._game_id_for(game_log, source), source=source)
+                packed += 1
+            if remove:
+                os.remove(path)
+        return packed
+
+    def _game_id_for(self, game_log: Dict[str, Any], source: str) -> str:
+        """
+        取日志的游戏ID
+
+        早期日志没有记录游戏ID，使用文件名中的时间戳；与已有ID重复时加后缀
+        """
+        game_id = game_log.get("game_info", {}).get("game_id") or source[len("game_"):-len(".json")]
+        candidate, suffix = game_id, 1
+        while candidate in self.entries:
+            suffix += 1
+            candidate = f"{game_id}-{suffix}"
+        return candidate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="游戏日志归档")
+    parser.add_argument("--archive", default=settings.GAME_ARCHIVE_DIR, help="归档目录")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack = commands.add_parser("pack", help="归档日志目录中的 game_*.json")
+    pack.add_argument("log_dir", nargs="?", default=settings.GAME_LOG_DIR, help="日志目录")
+    pack.add_argument("--remove", action="store_true", help="归档后删除原文件")
+    pack.add_argument("--segment-mb", type=float, default=64, help="分段大小上限（MB，默认64）")
+
+    listing = commands.add_parser("list", help="列出清单")
+    listing.add_argument("--winner", help="按胜方筛选")
+    listing.add_argument("--board", help="按板子筛选")
+
+    show = commands.add_parser("show", help="输出一局的完整日志")
+    show.add_argument("game_id")
+
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        archive = LogArchive(args.archive, segment_max_bytes=int(args.segment_mb * 1024 * 1024))
+        packed = archive.pack_directory(args.log_dir, remove=args.remove)
+        print(f"已归档 {packed} 局，归档中共 {len(archive.entries)} 局：{args.archive}")
+
+    elif args.command == "list":
+        archive = LogArchive(args.archive)
+        filters = {}
+        if args.winner:
+            filters["winner"] = args.winner
+        if args.board:
+            filters["board_config"] = args.board
+        for entry in archive.find(**filters):
+            print(
+                f"{entry['game_id']:<20} {entry['winner'] or '-':<8} {entry['board_config'] or '-':<8} "
+                f"{entry['total_rounds'] or 0:>3}轮  {entry['segment']}@{entry['offset']}"
+            )
+
+    elif args.command == "show":
+        archive = LogArchive(args.archive)
+        try:
+            game_log = archive.get(args.game_id)
+        except KeyError:
+            print(f"未找到游戏：{args.game_id}")
+            sys.exit(1)
+        print(json.dumps(game_log, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+测试公共工具：构造带玩家的游戏状态
+"""
+import os
+import sys
+from typing import Sequence
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.game_state import GameState
+from core.state_events import StateJournal
+from players.ai_player import AIPlayer
+from roles.role_factory import RoleFactory
+
+# 默认座位：1-2号狼人，3号预言家，4号女巫，5号猎人，6-9号村民
+DEFAULT_ROLES = ("werewolf", "werewolf", "seer", "witch", "hunter", "villager", "villager", "villager", "villager")
+
+
+def create_player(record, role):
+    """GameState.from_dict / StateJournal.replay 用的玩家构造函数（不调用LLM）"""
+    return AIPlayer(record["id"], record["name"], role, None)
+
+
+def build_state(roles: Sequence[str] = DEFAULT_ROLES, snapshot_interval: int = 0) -> GameState:
+    """
+    构造已入座的游戏状态
+
+    Args:
+        roles: 按座位顺序的角色名
+        snapshot_interval: 大于0时开始记录状态日志（快照间隔）
+    """
+    state = GameState()
+    state.game_id = "test"
+    state.all_players = [
+        AIPlayer(i, f"玩家{i}", RoleFactory.create_role(name), None) for i, name in enumerate(roles, start=1)
+    ]
+    state.alive_players = list(state.all_players)
+    if snapshot_interval > 0:
+        state.journal = StateJournal(snapshot_interval)
+        state.journal.start(state)
+    return state
+
+
+@pytest.fixture
+def state() -> GameState:
+    return build_state()
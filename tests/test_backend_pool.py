@@ -0,0 +1,94 @@
+"""
+LLM后端池：按延迟EWMA与在途请求数选择后端，连续失败摘除
+"""
+import pytest
+
+from ai.backend_pool import Backend, BackendPool
+
+
+def _pool(n=2, **kwargs):
+    backends = [Backend(f"b{i}", f"https://b{i}.example.com/v1", "key") for i in range(n)]
+    return BackendPool(backends, failure_threshold=2, cooldown=60, **kwargs), backends
+
+
+def _call(pool, latency_ms, success=True):
+    backend = pool.acquire()
+    pool.release(backend, latency_ms, success)
+    return backend
+
+
+def test_ewma_update():
+    backend = Backend("b", "https://b.example.com/v1", "key")
+    backend.on_start()
+    backend.on_success(100)
+    assert backend.ewma_ms == 100
+    backend.on_start()
+    backend.on_success(200)
+    assert backend.ewma_ms == pytest.approx(Backend.EWMA_ALPHA * 200 + (1 - Backend.EWMA_ALPHA) * 100)
+    assert backend.outstanding == 0
+
+
+def test_unmeasured_backends_are_tried_first():
+    pool, (b0, b1) = _pool()
+    assert _call(pool, 500) is b0
+    assert _call(pool, 100) is b1  # 未测量的后端评分最低
+
+
+def test_selects_lowest_ewma():
+    pool, (b0, b1) = _pool()
+    pool.release(pool.acquire(), 500, True)
+    pool.release(pool.acquire(), 100, True)
+    assert [_call(pool, 100) for _ in range(3)] == [b1] * 3
+
+
+def test_selection_follows_ewma_when_latency_changes():
+    pool, (b0, b1) = _pool()
+    _call(pool, 100)  # b0
+    _call(pool, 300)  # b1
+    assert _call(pool, 1000) is b0  # b0 变慢：EWMA 0.3*1000 + 0.7*100 = 370
+    assert b0.ewma_ms == pytest.approx(370)
+    assert _call(pool, 300) is b1
+
+
+def test_outstanding_requests_raise_score():
+    pool, (b0, b1) = _pool()
+    _call(pool, 100)  # b0
+    _call(pool, 150)  # b1
+    first = pool.acquire()
+    second = pool.acquire()
+    assert (first, second) == (b0, b1)  # 100*2 > 150*1
+    assert b0.outstanding == b1.outstanding == 1
+    pool.cancel(first)
+    pool.cancel(second)
+    assert b0.outstanding == b1.outstanding == 0
+
+
+def test_consecutive_failures_remove_backend():
+    pool, (b0, b1) = _pool()
+    _call(pool, 100)  # b0
+    _call(pool, 300)  # b1
+    _call(pool, 0, success=False)  # b0
+    assert b0.is_healthy()
+    _call(pool, 0, success=False)  # b0
+    assert not b0.is_healthy()
+    assert [_call(pool, 300) for _ in range(3)] == [b1] * 3
+    assert pool.get_stats()["b0"]["healthy"] is False
+    assert pool.get_stats()["b0"]["errors"] == 2
+
+
+def test_all_unhealthy_picks_earliest_recovery():
+    pool, (b0, b1) = _pool()
+    b0.unhealthy_until = 10 ** 9 + 2
+    b1.unhealthy_until = 10 ** 9 + 1
+    assert pool.acquire() is b1
+
+
+def test_exclude_backends_already_tried():
+    pool, (b0, b1) = _pool()
+    assert pool.acquire(exclude=[b0]) is b1
+    assert pool.acquire(exclude=[b0, b1]) is None
+
+
+def test_requires_backend():
+    with pytest.raises(ValueError):
+        BackendPool([])
@@ -0,0 +1,113 @@
+"""
+LLM录制带：批量写入、按哈希/序号回放
+"""
+import asyncio
+import json
+
+import pytest
+
+from ai.cassette import Cassette
+
+
+CALLS = [
+    ("speech", "提示词A", "发言1"),
+    ("decision", "提示词B", "3"),
+    ("speech", "提示词A", "发言2"),  # 同一提示词的第二次调用
+]
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def _record(path, calls=CALLS, **kwargs):
+    cassette = Cassette(path, "record", **kwargs)
+    for i, (tag, prompt, response) in enumerate(calls):
+        cassette.record(tag, prompt, response, 100.0 + i)
+    await cassette.aclose()
+    return cassette
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = str(tmp_path / "cassettes" / "llm.jsonl")
+    asyncio.run(_record(path))
+    return path
+
+
+def test_record_writes_entries_in_order(recorded):
+    entries = _read(recorded)
+    assert [e["seq"] for e in entries] == [0, 1, 2]
+    assert [e["response"] for e in entries] == ["发言1", "3", "发言2"]
+    assert entries[0]["hash"] == entries[2]["hash"] == Cassette.prompt_hash("speech", "提示词A")
+    assert entries[0]["hash"] != Cassette.prompt_hash("decision", "提示词A")
+
+
+def test_record_buffers_until_flush(tmp_path):
+    path = str(tmp_path / "llm.jsonl")
+
+    async def scenario():
+        cassette = Cassette(path, "record", flush_interval=60, max_buffer=2)
+        cassette.record("speech", "p", "r", 1.0)
+        assert _read(path) == []  # 未达到条数，留在缓冲区
+        cassette.record("speech", "p", "r", 1.0)
+        await cassette.flush()
+        assert len(_read(path)) == 2
+        cassette.record("speech", "p", "r", 1.0)
+        assert cassette.get_stats()["buffered"] == 1
+        await cassette.aclose()
+        assert len(_read(path)) == 3
+        assert cassette.get_stats()["buffered"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_record_without_event_loop_writes_directly(tmp_path):
+    path = str(tmp_path / "llm.jsonl")
+    cassette = Cassette(path, "record")
+    cassette.record("speech", "p", "r", 1.0)
+    assert len(_read(path)) == 1
+    cassette.close()
+
+
+def test_record_appends_with_continuing_seq(recorded):
+    asyncio.run(_record(recorded, calls=[("speech", "提示词C", "发言3")]))
+    assert [e["seq"] for e in _read(recorded)] == [0, 1, 2, 3]
+
+
+def test_replay_by_hash(recorded):
+    cassette = Cassette(recorded, "replay", match="hash")
+    assert cassette.play("decision", "提示词B") == ("3", 101.0)
+    assert cassette.play("speech", "提示词A") == ("发言1", 100.0)
+    assert cassette.play("speech", "提示词A") == ("发言2", 102.0)
+    assert cassette.play("speech", "提示词A") is None  # 录制的调用已用完
+    assert cassette.play("speech", "没录过") is None
+    stats = cassette.get_stats()
+    assert (stats["hits"], stats["misses"]) == (3, 2)
+
+
+def test_replay_by_sequence_ignores_prompt(recorded):
+    cassette = Cassette(recorded, "replay", match="sequence")
+    assert cassette.play("vote", "完全不同的提示词") == ("发言1", 100.0)
+    assert cassette.play("speech", "提示词A") == ("3", 101.0)
+    assert cassette.play("speech", "提示词A") == ("发言2", 102.0)
+    assert cassette.play("speech", "提示词A") is None
+
+
+def test_replay_orders_entries_by_seq(recorded):
+    entries = _read(recorded)
+    with open(recorded, "w", encoding="utf-8") as f:
+        for entry in reversed(entries):
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    cassette = Cassette(recorded, "replay", match="sequence")
+    assert [cassette.play("t", "p")[0] for _ in range(3)] == ["发言1", "3", "发言2"]
+
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "x.jsonl"), "rewind")
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "x.jsonl"), "replay", match="fuzzy")
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "missing.jsonl"), "replay")
@@ -0,0 +1,93 @@
+"""
+熔断器：CLOSED / OPEN / HALF_OPEN 状态转换
+"""
+import pytest
+
+from ai import circuit_breaker
+from ai.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30, half_open_max_calls=1)
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    _fail(breaker, 2)
+    assert breaker.state == CircuitState.CLOSED
+    _fail(breaker, 1)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+    assert breaker.times_opened == 1
+
+
+def test_success_resets_failure_count(breaker):
+    _fail(breaker, 2)
+    breaker.record_success()
+    _fail(breaker, 2)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.to_dict()["consecutive_failures"] == 2
+
+
+def test_half_open_after_reset_timeout(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 29.9
+    assert breaker.state == CircuitState.OPEN
+    clock.now += 0.1
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.is_open()
+
+
+def test_half_open_limits_probes_and_closes_on_success(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # 只放行一个探测
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+    assert breaker.to_dict() == {"state": "closed", "consecutive_failures": 0, "times_opened": 1}
+
+
+def test_half_open_probe_failure_reopens(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
+    clock.now += 29
+    assert breaker.state == CircuitState.OPEN  # 重新计时
+    clock.now += 1
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_cancelled_probe_returns_slot(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_cancel()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,91 @@
+"""
+命令行输入：超时后仍在进行的读取不阻止进程退出，读取结束的异常不报未取走
+"""
+import asyncio
+import builtins
+import gc
+import threading
+import time
+
+import pytest
+
+from ui.cli import CLI
+
+
+class BlockingInput:
+    """在 release() 之前阻塞的 input()，之后返回一行或抛出EOFError"""
+
+    def __init__(self, line=None):
+        self.line = line
+        self.released = threading.Event()
+        self.calls = 0
+
+    def __call__(self, prompt=""):
+        self.calls += 1
+        self.released.wait(5)
+        if self.line is None:
+            raise EOFError("EOF when reading a line")
+        return self.line
+
+    def release(self):
+        self.released.set()
+
+
+@pytest.fixture
+def blocking_input(monkeypatch):
+    fake = BlockingInput()
+    monkeypatch.setattr(builtins, "input", fake)
+    monkeypatch.setattr(CLI, "_pending_read", None)
+    yield fake
+    fake.release()
+
+
+def test_timed_out_read_does_not_block_exit(blocking_input):
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(CLI.read_line("> "), 0.05)
+
+    started = time.monotonic()
+    asyncio.run(scenario())  # 读取线程仍阻塞在 input() 上
+    assert time.monotonic() - started < 1
+    assert blocking_input.calls == 1
+
+
+def test_eof_on_pending_read_is_retrieved(blocking_input):
+    errors = []
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(CLI.read_line("> "), 0.05)
+        pending = CLI._pending_read
+        blocking_input.release()  # 无人等待时输入流关闭
+        while not pending.done():
+            await asyncio.sleep(0.01)
+        CLI._pending_read = None
+        del pending
+        gc.collect()
+
+    asyncio.run(scenario())
+    gc.collect()
+    assert errors == []
+
+
+def test_next_read_reuses_pending_read(blocking_input):
+    blocking_input.line = "3"
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(CLI.read_line("> "), 0.05)
+        blocking_input.release()
+        return await CLI.read_line("> ")
+
+    assert asyncio.run(scenario()) == "3"
+    assert blocking_input.calls == 1
+    assert CLI._pending_read is None
+
+
+def test_get_input_exits_on_eof(blocking_input):
+    blocking_input.release()
+    with pytest.raises(SystemExit):
+        asyncio.run(CLI.get_input("> "))
@@ -0,0 +1,189 @@
+"""
+决策时限：真人超时由AI代为决策，AI超时由启发式策略决策，超时记入行动历史
+"""
+import asyncio
+import time
+
+import pytest
+
+from ai.heuristic_policy import HeuristicPolicy
+from config.game_config import GameConfig
+from core.state_sync import PUBLIC_VIEWER, StateFeed
+from players.ai_player import AIPlayer
+from players.human_player import HumanPlayer
+from server.room import ClientStream
+
+from tests.conftest import build_state
+
+LIMIT = 0.3
+FALLBACK = 0.1
+# 测试缩短时限之前的配置值
+CONFIGURED_LIMITS = (GameConfig.SPEECH_TIME_LIMIT, GameConfig.VOTE_TIME_LIMIT, GameConfig.FALLBACK_TIME_LIMIT)
+
+
+class StuckHuman(HumanPlayer):
+    """一直不回复的真人"""
+
+    async def make_speech(self, game_state):
+        await asyncio.Event().wait()
+
+    async def vote(self, game_state):
+        await asyncio.Event().wait()
+
+
+class FakeAI:
+    """代替 PlayerAI：延迟 delay 秒后给出固定的决策"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.heuristics = HeuristicPolicy()
+        self.calls = 0
+
+    async def generate_speech(self, player, game_state):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return "AI发言"
+
+    async def update_role_beliefs(self, *args):
+        pass
+
+    async def make_vote_decision(self, player, game_state):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return game_state.all_players[0]
+
+    async def choose_action_target(self, player, game_state, targets, action_type):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return targets[0]
+
+
+@pytest.fixture(autouse=True)
+def short_limits(monkeypatch):
+    monkeypatch.setattr(GameConfig, "SPEECH_TIME_LIMIT", LIMIT)
+    monkeypatch.setattr(GameConfig, "VOTE_TIME_LIMIT", LIMIT)
+    monkeypatch.setattr(GameConfig, "FALLBACK_TIME_LIMIT", FALLBACK)
+
+
+async def never_reads(text):
+    """不读取消息的连接：发送永远不完成"""
+    await asyncio.Event().wait()
+
+
+def run_decision(ai_delay: float, human: bool, name: str, make_decide, stalled_viewers=()):
+    """
+    在新游戏中让6号玩家做一次决策
+
+    Args:
+        ai_delay: AI决策的耗时（秒）
+        human: 6号是否为不回复的真人
+        name: 决策名称
+        make_decide: 接收游戏状态、返回决策函数
+        stalled_viewers: 接入不读取消息的远程连接的观察者ID
+
+    Returns:
+        (决策结果, 耗时, 游戏)
+    """
+    async def scenario():
+        from main import WolfkillGame
+
+        game = WolfkillGame(interactive=False)
+        game.player_ai = FakeAI(ai_delay)
+        game.game_state = build_state(snapshot_interval=100)
+        players = game.game_state.all_players
+        seat = players[5]
+        if human:
+            players[5] = StuckHuman(seat.id, seat.name, seat.role)
+        else:
+            players[5] = AIPlayer(seat.id, seat.name, seat.role, game.player_ai)
+        game.game_state.alive_players = list(players)
+        game.state_feed = StateFeed(game.game_state)
+        for viewer_id in stalled_viewers:
+            ClientStream(never_reads, viewer_id).attach(game)
+        for i in range(5):
+            game.emit(f"消息{i}")  # 慢连接积压
+
+        started = time.monotonic()
+        result = await game._decide(players[5], name, make_decide(game.game_state))
+        elapsed = time.monotonic() - started
+        await game.events.close(timeout=0.05)
+        return result, elapsed, game
+
+    return asyncio.run(scenario())
+
+
+def _timeouts(game):
+    return [(r["player_id"], r["decision"], r["fallback"]) for r in game.game_state.get_timeouts()]
+
+
+def speech(state):
+    return lambda p: p.make_speech(state)
+
+
+def vote(state):
+    return lambda p: p.vote(state)
+
+
+def test_fast_decision_records_nothing():
+    result, elapsed, game = run_decision(0, False, "make_speech", speech)
+    assert result == "AI发言"
+    assert _timeouts(game) == []
+
+
+def test_human_timeout_uses_ai_within_limit():
+    result, elapsed, game = run_decision(0.01, True, "make_speech", speech)
+    assert result == "AI发言"
+    assert elapsed < LIMIT + 0.1  # 整个决策不超过时限（AI只用剩余时间）
+    assert _timeouts(game) == [(6, "make_speech", "ai")]
+    assert game.player_ai.calls == 1
+
+
+def test_human_and_ai_timeout_fall_back_to_heuristic():
+    result, elapsed, game = run_decision(5, True, "vote", vote)
+    assert result is None or result.id != 6
+    assert elapsed < LIMIT + 0.1
+    assert _timeouts(game) == [(6, "vote", "ai"), (6, "vote", "heuristic")]
+
+
+def test_stalled_remote_stream_does_not_block_human_decision():
+    """不读取消息的远程连接（玩家本人和观战者）不会让真人决策等待，决策仍在时限内完成"""
+    result, elapsed, game = run_decision(0.01, True, "vote", vote, stalled_viewers=(6, PUBLIC_VIEWER))
+    assert elapsed < LIMIT + 0.1
+    assert _timeouts(game) == [(6, "vote", "ai")]
+
+
+def test_ai_timeout_falls_back_to_heuristic():
+    result, elapsed, game = run_decision(5, False, "make_speech", speech)
+    assert result != "AI发言" and result  # 启发式模板发言
+    assert elapsed < LIMIT + 0.1
+    assert _timeouts(game) == [(6, "make_speech", "heuristic")]
+    record = game.game_state.get_timeouts()[0]
+    assert record["public"] is True
+    assert record["limit"] == LIMIT
+
+
+def test_night_timeout_is_private():
+    result, elapsed, game = run_decision(
+        5, False, "choose_target.check",
+        lambda state: lambda p: p.choose_target(state, state.alive_players[:5], "check")
+    )
+    assert result is not None
+    events = game.game_state.journal.events
+    assert events[-1].type.value == "decision_timeout"
+    assert game.state_feed.audience(events[-1]) == frozenset((6,))
+    assert game.state_feed.visible_state(7)["action_history"] == []
+    assert len(game.state_feed.visible_state(6)["action_history"]) == 1
+
+
+
+def test_llm_deadlines_leave_headroom_before_decision_limit():
+    """AI的LLM调用（发言前的角色推理 + 发言）在决策时限之前结束，慢但成功的调用不会被决策时限打断"""
+    from config.llm_config import GENERATION_PROFILES as profiles
+
+    speech_limit, vote_limit, fallback = CONFIGURED_LIMITS
+    assert fallback > 0
+    assert profiles["beliefs"]["deadline"] + profiles["speech"]["deadline"] <= speech_limit - fallback
+    for name in ("campaign", "werewolf_discussion"):
+        assert profiles[name]["deadline"] <= speech_limit - fallback
+    for name in ("decision", "candidacy"):
+        assert profiles[name]["deadline"] <= vote_limit - fallback
@@ -0,0 +1,175 @@
+"""
+事件总线：订阅者队列的溢出策略（drop丢弃最旧 / buffer不丢事件）
+"""
+import asyncio
+
+import pytest
+
+from core.events import BroadcastSubscriber, EventBus, GameEvent, GameEventType, Subscription
+
+
+class SlowHandler:
+    """在 gate 打开前阻塞的订阅者"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.seen = []
+        self.closed = False
+
+    async def __call__(self, event):
+        await self.gate.wait()
+        self.seen.append(event.seq)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _publish(bus, n):
+    for i in range(n):
+        bus.publish(GameEvent(GameEventType.MESSAGE, f"消息{i}"))
+
+
+def test_drop_policy_keeps_newest_events():
+    async def scenario():
+        bus = EventBus()
+        handler = SlowHandler()
+        subscription = bus.subscribe(handler, "slow", max_queue=3, overflow="drop")
+        _publish(bus, 1)
+        await asyncio.sleep(0)  # 第1条已被取出，阻塞在处理函数中
+        _publish(bus, 6)        # 队列上限3：2..4 被挤掉
+        stats = subscription.get_stats()
+        assert stats["dropped"] == 3
+        assert stats["backlog"] == 3 and stats["max_backlog"] == 3
+
+        handler.gate.set()
+        await bus.drain()
+        assert handler.seen == [1, 5, 6, 7]
+        assert subscription.get_stats()["delivered"] == 4
+        await bus.close()
+        assert handler.closed
+
+    asyncio.run(scenario())
+
+
+def test_buffer_policy_never_drops():
+    async def scenario():
+        bus = EventBus()
+        handler = SlowHandler()
+        subscription = bus.subscribe(handler, "slow", max_queue=3, overflow="buffer")
+        _publish(bus, 50)
+        assert subscription.get_stats()["dropped"] == 0
+        assert subscription.get_stats()["max_backlog"] == 50
+
+        handler.gate.set()
+        await bus.close()
+        assert handler.seen == list(range(1, 51))
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_does_not_block_others():
+    async def scenario():
+        bus = EventBus()
+        slow = SlowHandler()
+        fast = []
+
+        async def record(event):
+            fast.append(event.seq)
+
+        bus.subscribe(slow, "slow", max_queue=2, overflow="drop")
+        bus.subscribe(record, "fast", overflow="buffer")
+        _publish(bus, 10)
+        await bus.subscriptions[1].drain()
+        assert fast == list(range(1, 11))
+        assert slow.seen == []
+        slow.gate.set()
+        await bus.close()
+
+    asyncio.run(scenario())
+
+
+def test_handler_errors_are_counted_and_skipped():
+    async def scenario():
+        bus = EventBus()
+        seen = []
+
+        async def flaky(event):
+            if event.seq == 2:
+                raise RuntimeError("boom")
+            seen.append(event.seq)
+
+        subscription = bus.subscribe(flaky, "flaky")
+        _publish(bus, 3)
+        await bus.close()
+        assert seen == [1, 3]
+        assert subscription.get_stats()["errors"] == 1
+        _publish(bus, 1)  # 关闭后不再接收
+        assert subscription.get_stats()["backlog"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_subscriber_filters_private_events():
+    async def scenario():
+        sent = []
+
+        async def send(data):
+            sent.append(data["seq"])
+
+        bus = EventBus()
+        bus.subscribe(BroadcastSubscriber(send, viewer_id=3), "ws-3")
+        bus.publish(GameEvent(GameEventType.MESSAGE, "公开"))
+        bus.publish(GameEvent(GameEventType.NIGHT_ACTION, "查验结果", visible_to=[3]))
+        bus.publish(GameEvent(GameEventType.SPEECH, "狼人频道", visible_to=[1, 2]))
+        await bus.close()
+        assert sent == [1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_unknown_overflow_policy():
+    async def noop(event):
+        pass
+
+    with pytest.raises(ValueError):
+        Subscription("x", noop, overflow="block")
+
+
+def test_close_timeout_only_cuts_drop_subscribers():
+    async def scenario():
+        bus = EventBus()
+        stalled = SlowHandler()  # 从不放行
+        seen = []
+
+        async def log(event):
+            await asyncio.sleep(0.01)
+            seen.append(event.seq)
+
+        remote = bus.subscribe(stalled, "client", overflow="drop")
+        bus.subscribe(log, "log", overflow="buffer")
+        _publish(bus, 5)
+        await asyncio.wait_for(bus.close(timeout=0.05), 1)
+        assert seen == [1, 2, 3, 4, 5]  # buffer订阅者不受时限影响
+        assert remote.get_stats()["dropped"] == 4 and remote.get_stats()["backlog"] == 0
+        assert stalled.closed
+
+    asyncio.run(scenario())
+
+
+def test_drain_by_overflow_skips_stalled_subscribers():
+    async def scenario():
+        bus = EventBus()
+        stalled = SlowHandler()
+        seen = []
+
+        async def log(event):
+            seen.append(event.seq)
+
+        bus.subscribe(stalled, "client", overflow="drop")
+        bus.subscribe(log, "terminal", overflow="buffer")
+        _publish(bus, 3)
+        await asyncio.wait_for(bus.drain("buffer"), 1)
+        assert seen == [1, 2, 3]
+        await bus.close(timeout=0)
+
+    asyncio.run(scenario())
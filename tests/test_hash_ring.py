@@ -0,0 +1,66 @@
+"""
+一致性哈希环：增删节点时只有少量房间改变归属
+"""
+import pytest
+
+from server.hash_ring import HashRing
+
+KEYS = [f"room-{i}" for i in range(2000)]
+
+
+def _ring(*nodes):
+    ring = HashRing()
+    for node in nodes:
+        ring.add(node)
+    return ring
+
+
+def _assignment(ring):
+    return {key: ring.get(key) for key in KEYS}
+
+
+def test_empty_ring_raises():
+    with pytest.raises(LookupError):
+        HashRing().get("room-1")
+
+
+def test_assignment_is_stable_and_balanced():
+    ring = _ring("w0", "w1", "w2", "w3")
+    assert len(ring) == 4
+    assignment = _assignment(ring)
+    assert assignment == _assignment(_ring("w3", "w1", "w0", "w2"))  # 与加入顺序无关
+    counts = {node: list(assignment.values()).count(node) for node in ("w0", "w1", "w2", "w3")}
+    assert min(counts.values()) > len(KEYS) / 4 * 0.5
+
+
+def test_add_only_moves_keys_to_new_node():
+    ring = _ring("w0", "w1", "w2", "w3")
+    before = _assignment(ring)
+    ring.add("w4")
+    after = _assignment(ring)
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == "w4" for key in moved)
+    assert len(KEYS) / 5 * 0.5 < len(moved) < len(KEYS) / 5 * 1.5
+
+
+def test_remove_only_moves_keys_of_removed_node():
+    ring = _ring("w0", "w1", "w2", "w3")
+    before = _assignment(ring)
+    ring.remove("w2")
+    after = _assignment(ring)
+    assert "w2" not in ring and len(ring) == 3
+    for key in KEYS:
+        if before[key] != "w2":
+            assert after[key] == before[key]
+        else:
+            assert after[key] != "w2"
+
+
+def test_add_then_remove_restores_assignment():
+    ring = _ring("w0", "w1", "w2")
+    before = _assignment(ring)
+    ring.add("w3")
+    ring.add("w3")  # 重复加入忽略
+    ring.remove("w3")
+    ring.remove("missing")  # 不存在时忽略
+    assert _assignment(ring) == before
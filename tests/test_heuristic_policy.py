@@ -0,0 +1,59 @@
+"""
+启发式策略：预言家使用游戏中记录的查验结果
+"""
+from ai.heuristic_policy import HeuristicPolicy
+from core.game_state import GameState
+from core.state_events import StateEventType
+from roles.base_role import RoleCamp
+
+from tests.conftest import build_state, create_player
+
+
+def _check(state, seer_id, target_id):
+    target = state.all_players[target_id - 1]
+    result = "狼人" if target.role.camp == RoleCamp.WEREWOLF else "好人"
+    state.apply(StateEventType.SEER_CHECKED, seer_id=seer_id, target_id=target_id, result=result)
+
+
+def test_seer_check_is_recorded_on_role(state):
+    _check(state, 3, 1)
+    _check(state, 3, 1)
+    assert state.all_players[2].role.checked_players == [1]
+
+
+def test_seer_targets_checked_wolf(state):
+    policy = HeuristicPolicy()
+    seer = state.all_players[2]
+    _check(state, 3, 1)
+
+    assert policy.get_seer_knowledge(seer, state) == {1: True}
+    candidates = [p for p in state.alive_players if p.id != seer.id]
+    for _ in range(20):
+        assert policy.choose_vote_target(seer, state, candidates).id == 1
+        assert policy.choose_check_target(seer, state, candidates).id != 1
+    assert "1号" in policy.generate_speech(seer, state)
+    assert "狼人" in policy.generate_speech(seer, state)
+
+
+def test_seer_trusts_checked_good_player(state):
+    policy = HeuristicPolicy()
+    seer = state.all_players[2]
+    _check(state, 3, 6)
+
+    assert policy.get_seer_knowledge(seer, state) == {6: False}
+    candidates = [p for p in state.alive_players if p.id != seer.id]
+    for _ in range(20):
+        assert policy.choose_vote_target(seer, state, candidates).id != 6
+        assert policy.choose_sheriff_successor(seer, state, candidates).id == 6
+        assert policy.choose_sheriff_vote(seer, state, candidates).id == 6
+
+
+def test_seer_checks_survive_checkpoint_and_replay():
+    state = build_state(snapshot_interval=100)  # 回放时从开局快照重新应用查验事件
+    _check(state, 3, 2)
+
+    restored = GameState.from_dict(state.to_dict(), create_player)
+    assert restored.all_players[2].role.checked_players == [2]
+
+    replayed = state.journal.replay(create_player)
+    assert replayed.all_players[2].role.checked_players == [2]
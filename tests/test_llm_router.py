@@ -0,0 +1,105 @@
+"""
+LLM路由：超出SLO降级，少量探测后恢复
+"""
+import pytest
+
+from ai.backend_pool import Backend, BackendPool
+from ai.llm_router import LLMRoute, LLMRouter, RouteStats
+from config.settings import settings
+
+
+@pytest.fixture
+def router() -> LLMRouter:
+    def pool(name):
+        return BackendPool([Backend(name, f"https://{name}.example.com", "key")])
+
+    routes = {
+        "fast": LLMRoute("fast", "fast-model", pool("fast"), slo_ms=1000),
+        "strong": LLMRoute("strong", "strong-model", pool("strong"), slo_ms=5000, fallback="fast"),
+    }
+    return LLMRouter(routes, {"speech": "strong", "decision": "fast"}, "fast")
+
+
+def _select_many(router, n):
+    return [router.select("speech").name for _ in range(n)]
+
+
+def test_routes_by_profile(router):
+    assert router.select("speech").name == "strong"
+    assert router.select("decision").name == "fast"
+    assert router.select("unknown").name == "fast"
+
+
+def test_degrades_after_slo_breach_and_probes(router):
+    strong = router.routes["strong"]
+    for _ in range(50):
+        router.record(strong, 1000, True)
+    for _ in range(5):
+        router.record(strong, 20000, True)  # 一阵尖峰把p95推过SLO
+    assert not strong.is_within_slo()
+
+    chosen = _select_many(router, 30)
+    assert chosen.count("strong") == 30 // LLMRouter.SLO_PROBE_INTERVAL
+    assert chosen.count("fast") == 30 - chosen.count("strong")
+
+
+def test_recovers_after_a_few_good_probes(router):
+    strong = router.routes["strong"]
+    for _ in range(200):
+        router.record(strong, 20000, True)  # 延迟窗口全部超出SLO
+    assert not strong.is_within_slo()
+
+    for _ in range(LLMRoute.RECOVERY_PROBES - 1):
+        router.record(strong, 1000, True)
+    assert not strong.is_within_slo()
+    router.record(strong, 1000, True)
+    assert strong.is_within_slo()
+    assert _select_many(router, 5) == ["strong"] * 5
+    assert router.get_stats()["strong"]["within_slo"] is True
+
+
+def test_slow_or_failed_probe_delays_recovery(router):
+    strong = router.routes["strong"]
+    router.record(strong, 20000, True)
+    router.record(strong, 1000, True)
+    router.record(strong, 1000, False)  # 失败的探测不达标
+    router.record(strong, 1000, True)
+    router.record(strong, 1000, True)
+    assert not strong.is_within_slo()
+    router.record(strong, 1000, True)  # 失败之后连续3次达标
+    assert strong.is_within_slo()
+
+    router.record(strong, 20000, True)
+    router.record(strong, 1000, True)
+    router.record(strong, 9000, True)  # 超出SLO的慢探测
+    router.record(strong, 1000, True)
+    router.record(strong, 1000, True)
+    assert not strong.is_within_slo()
+    router.record(strong, 1000, True)
+    assert strong.is_within_slo()
+
+
+def test_breach_after_recovery_degrades_again(router):
+    strong = router.routes["strong"]
+    router.record(strong, 20000, True)
+    for _ in range(LLMRoute.RECOVERY_PROBES):
+        router.record(strong, 1000, True)
+    assert strong.is_within_slo()
+    router.record(strong, 30000, True)
+    assert not strong.is_within_slo()
+
+
+def test_unknown_default_route_rejected():
+    with pytest.raises(ValueError):
+        LLMRouter({}, {}, "missing")
+
+
+def test_latency_window_follows_setting(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTE_STATS_WINDOW", 10)
+    stats = RouteStats()
+    for latency in [100] * 10 + [5000] * 10:
+        stats.record(latency, True)
+    assert len(stats.latencies_ms) == 10
+    assert stats.percentile(50) == 5000  # 早期样本已被挤出窗口
+    assert stats.calls == 20
+    assert RouteStats(window=3).latencies_ms.maxlen == 3
@@ -0,0 +1,204 @@
+"""
+房间管理：房间数上限、对局数上限与排队准入，单局LLM预算和内存估算
+"""
+import asyncio
+import json
+
+import pytest
+
+from ai.telemetry import telemetry
+from config.settings import settings
+from core.state_events import StateJournal
+from server import room as room_module
+from server import room_manager
+from server.room import ClientStream, Room
+from server.room_manager import RoomManager
+from utils.exceptions import RoomException
+
+
+class FakeLLM:
+    def __init__(self):
+        self.max_in_flight = None
+
+    def set_max_in_flight(self, limit):
+        self.max_in_flight = limit
+
+    def get_in_flight_stats(self):
+        return {"limit": self.max_in_flight}
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    """不创建LLM客户端；对局一直进行到 finish() 被调用"""
+    monkeypatch.setattr(settings, "STATE_STORE", "memory")
+    monkeypatch.setattr(room_manager, "get_llm_client", FakeLLM)
+    gates = {}
+
+    async def play(room):
+        await gates.setdefault(room.room_id, asyncio.Event()).wait()
+
+    monkeypatch.setattr(Room, "_play", play)
+    return gates
+
+
+async def finish(gates, room):
+    """结束一个对局并等待房间关闭"""
+    gates.setdefault(room.room_id, asyncio.Event()).set()
+    await room.task
+
+
+def test_room_limit_rejects():
+    async def scenario():
+        manager = RoomManager(max_rooms=2)
+        manager.create_room()
+        manager.create_room()
+        with pytest.raises(RoomException):
+            manager.create_room()
+        assert manager.rejected == 1
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_queue_admission_in_order(offline):
+    async def scenario():
+        manager = RoomManager(max_games=2, max_queue=2)
+        rooms = [manager.create_room(room_id=f"r{i}") for i in range(5)]
+        for room in rooms[:4]:
+            await manager.start(room)
+
+        assert [r.status for r in rooms] == ["playing", "playing", "queued", "queued", "waiting"]
+        assert [r.room_id for r in manager.queue] == ["r2", "r3"]
+        assert manager.get_stats()["playing"] == 2 and manager.get_stats()["queued"] == 2
+
+        with pytest.raises(RoomException):
+            await manager.start(rooms[4])  # 排队已满
+        assert manager.rejected == 1
+        with pytest.raises(RoomException):
+            await manager.start(rooms[2])  # 已在排队
+
+        await finish(offline, rooms[1])
+        assert rooms[1].close_reason == "game_over"
+        assert "r1" not in manager.rooms
+        assert rooms[2].status == "playing"  # 先排队的先开始
+        assert [r.room_id for r in manager.queue] == ["r3"]
+
+        await finish(offline, rooms[0])
+        assert rooms[3].status == "playing"
+        assert manager.playing == 2 and not manager.queue
+        assert manager.games_finished == 2
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_destroy_queued_room_leaves_queue(offline):
+    async def scenario():
+        manager = RoomManager(max_games=1)
+        first, second, third = (manager.create_room() for _ in range(3))
+        await manager.start(first)
+        await manager.start(second)
+        await manager.start(third)
+        await manager.destroy(second)
+        assert second.close_reason == "abandoned"
+        assert list(manager.queue) == [third]
+
+        await finish(offline, first)
+        assert third.status == "playing"
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_drain_closes_unstarted_rooms_and_rejects_new_ones(offline):
+    async def scenario():
+        received = []
+
+        async def reads(text):
+            received.append(json.loads(text))
+
+        closed = []
+
+        async def on_room_closed(room):
+            closed.append((room.room_id, room.close_reason))
+
+        manager = RoomManager(max_games=1)
+        manager.on_room_closed = on_room_closed
+        playing, queued, waiting = (manager.create_room(room_id=f"r{i}") for i in range(3))
+        await manager.start(playing)
+        await manager.start(queued)
+        await waiting.connect(ClientStream(reads))
+
+        assert await manager.drain() == 1  # 只剩对局中的房间，在阶段边界迁移
+        assert playing.move_requested
+        assert closed == [("r1", "drained"), ("r2", "drained")]
+        assert received[-1] == {"type": "closed", "room": "r2", "reason": "drained"}
+        assert not manager.queue and list(manager.rooms) == ["r0"]
+        with pytest.raises(RoomException):
+            manager.create_room()
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_and_close_do_not_wait_for_stalled_client(offline, monkeypatch):
+    async def never_reads(text):
+        await asyncio.Event().wait()
+
+    async def scenario():
+        monkeypatch.setattr(settings, "SERVER_SEND_TIMEOUT", 0.05)
+        received = []
+
+        async def reads(text):
+            received.append(json.loads(text)["type"])
+
+        manager = RoomManager()
+        room = manager.create_room()
+        await room.connect(ClientStream(never_reads))
+        await room.connect(ClientStream(reads))
+        await manager.start(room)
+        room.game.emit("消息")  # 慢连接积压
+        await asyncio.wait_for(finish(offline, room), 1)
+        assert room.close_reason == "game_over"
+        assert received[-1] == "closed"
+        assert room.room_id not in manager.rooms and manager.games_finished == 1
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_room_llm_budget_set_on_start_and_released(offline):
+    async def scenario():
+        manager = RoomManager(room_max_llm_calls=5, room_max_llm_tokens=0)
+        waiting, room = manager.create_room(), manager.create_room()
+        await manager.start(room)
+        assert telemetry.budgets[room.room_id] == (5, 0)
+        assert waiting.room_id not in telemetry.budgets  # 对局开始时才设置
+        assert room.get_stats()["llm_over_budget"] is False
+        await finish(offline, room)
+        assert room.room_id not in telemetry.budgets
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_memory_bytes_reencodes_only_after_state_changes(offline, monkeypatch):
+    async def scenario():
+        manager = RoomManager()
+        room = manager.create_room()
+        await manager.start(room)
+        room.game.game_state.journal = StateJournal()
+        room.game.game_state.journal.start(room.game.game_state)
+
+        encoded = []
+        real = room_module.encode_snapshot
+        monkeypatch.setattr(room_module, "encode_snapshot", lambda data: encoded.append(1) or real(data))
+        first = room.memory_bytes()
+        assert room.memory_bytes() == first and len(encoded) == 1  # 状态未变：使用缓存
+        room.game.game_state.journal.seq += 1
+        room.memory_bytes()
+        assert len(encoded) == 2
+        await finish(offline, room)
+        await manager.close()
+
+    asyncio.run(scenario())
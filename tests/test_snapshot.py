@@ -0,0 +1,94 @@
+"""
+二进制快照：编码/解码往返与格式校验
+"""
+import json
+
+import pytest
+
+from core.game_state import GameState
+from core.snapshot import MAGIC, VERSION, SnapshotError, decode_snapshot, encode_snapshot, is_snapshot
+from core.state_events import StateEventType
+
+from tests.conftest import create_player
+
+
+@pytest.fixture
+def mid_game(state) -> GameState:
+    """第2轮白天的对局：有夜晚刀人目标、毒药目标、查验结果、角色状态、AI推理和中文发言"""
+    state.apply(StateEventType.ROUND_STARTED, round=2)
+    state.apply(StateEventType.PHASE_CHANGED, phase="night")
+    state.apply(StateEventType.PRIVATE_SPEECH, camp="werewolf", round=2, player_id=1, content="今晚刀3号预言家")
+    state.apply(StateEventType.NIGHT_TARGET, target_id=3)
+    state.apply(StateEventType.SEER_CHECKED, seer_id=3, target_id=1, result="狼人")
+    state.apply(StateEventType.WITCH_ACTION, witch_id=4, action="poison", target_id=2, round=2)
+    state.apply(StateEventType.SHERIFF_CHANGED, player_id=6)
+    state.apply(StateEventType.PHASE_CHANGED, phase="day")
+    state.apply(StateEventType.SPEECH, round=2, player_id=6, content="我是好人，“1号”发言很可疑 🐺", channel="day")
+    state.apply(StateEventType.VOTE, round=2, voter_id=7, target_id=1)
+    state.all_players[6].role_beliefs = {
+        "1": {"suspected_roles": ["狼人"], "camp_belief": "werewolf", "confidence": "高", "reasoning": "悍跳"},
+    }
+    state.all_players[0].votes_received = 1
+    return state
+
+
+def test_round_trip_equals_to_dict(mid_game):
+    data = mid_game.to_dict()
+    assert data["tonight_victim"] == 3
+    assert data["poisoned_tonight"] == [2]
+    assert data["seer_check_results"]
+
+    encoded = encode_snapshot(data)
+    assert is_snapshot(encoded)
+    assert decode_snapshot(encoded) == data
+
+
+def test_round_trip_restores_game_state(mid_game):
+    data = json.loads(json.dumps(mid_game.to_dict()))
+    restored = GameState.from_dict(decode_snapshot(encode_snapshot(data)), create_player)
+    assert restored.to_dict() == data
+    assert restored.tonight_victim is restored.all_players[2]
+    assert restored.all_players[2].role.checked_players == [1]
+    assert restored.all_players[3].role.has_poison is False
+
+
+def test_round_trip_scalars_and_containers():
+    value = {
+        "none": None, "bools": [True, False], "ints": [0, -1, 2 ** 40, -(2 ** 40)], "float": 1.5,
+        "small_ints": [1, 2, 300, 70000], "empty": {"list": [], "dict": {}, "str": ""},
+        "records": [{"a": 1}, {"a": "二"}],
+    }
+    assert decode_snapshot(encode_snapshot(value)) == value
+    with pytest.raises(TypeError):
+        encode_snapshot({(1, 2): "tuple key"})
+
+
+def test_rejects_bad_header():
+    with pytest.raises(SnapshotError):
+        decode_snapshot(b"{\"round_number\": 1}")
+
+
+def test_rejects_unknown_version(mid_game):
+    encoded = bytearray(encode_snapshot(mid_game.to_dict()))
+    assert encoded[:len(MAGIC)] == MAGIC and encoded[len(MAGIC)] == VERSION
+    encoded[len(MAGIC)] = VERSION + 1
+    with pytest.raises(SnapshotError):
+        decode_snapshot(bytes(encoded))
+
+
+def test_rejects_truncated_and_trailing_data(mid_game):
+    encoded = encode_snapshot(mid_game.to_dict())
+    with pytest.raises(SnapshotError):
+        decode_snapshot(encoded[:-3])
+    with pytest.raises(SnapshotError):
+        decode_snapshot(encoded + b"\x00")
+
+
+def test_int_keys_decode_like_json():
+    value = {"seer_checks": {3: ["1号是狼人"]}}
+    assert decode_snapshot(encode_snapshot(value)) == json.loads(json.dumps(value))
+
+
+def test_rejects_unserializable_value():
+    with pytest.raises(TypeError):
+        encode_snapshot({"player": object()})
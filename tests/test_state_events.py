@@ -0,0 +1,191 @@
+"""
+状态事件：归约函数语义与状态日志回放
+"""
+import json
+
+import pytest
+
+from core.state_events import StateEvent, StateEventType
+
+from tests.conftest import build_state, create_player
+
+
+def _plain(state):
+    """状态字典的JSON往返（与检查点、快照解码结果可比较）"""
+    return json.loads(json.dumps(state.to_dict()))
+
+
+def _night(state, victim_id=None, save=False, poison_id=None):
+    state.apply(StateEventType.NIGHT_TARGET, target_id=victim_id)
+    if save:
+        state.apply(StateEventType.WITCH_ACTION, witch_id=4, action="save", target_id=victim_id, round=1)
+    if poison_id is not None:
+        state.apply(StateEventType.WITCH_ACTION, witch_id=4, action="poison", target_id=poison_id, round=1)
+    return state.process_night_deaths()
+
+
+def _assert_dead(state, player_ids):
+    for pid in player_ids:
+        player = state.all_players[pid - 1]
+        assert not player.is_alive
+        assert player not in state.alive_players
+        assert player in state.dead_players
+    assert len(state.alive_players) + len(state.dead_players) == len(state.all_players)
+
+
+def _assert_night_reset(state):
+    assert state.tonight_victim is None
+    assert state.poisoned_tonight == []
+    assert state.saved_tonight is False
+
+
+# ---------- 夜晚结算 ----------
+
+def test_night_kill(state):
+    deaths = _night(state, victim_id=6)
+    assert [p.id for p in deaths] == [6]
+    _assert_dead(state, [6])
+    assert state.last_night_victim_name == "玩家6"
+    assert state.last_death_seat == 6
+    _assert_night_reset(state)
+
+
+def test_night_save(state):
+    deaths = _night(state, victim_id=6, save=True)
+    assert deaths == []
+    assert state.all_players[5].is_alive
+    assert state.dead_players == []
+    assert state.last_night_victim_name is None
+    assert state.all_players[3].role.has_antidote is False
+    _assert_night_reset(state)
+
+
+def test_night_poison_only(state):
+    deaths = _night(state, poison_id=1)
+    assert [p.id for p in deaths] == [1]
+    _assert_dead(state, [1])
+    assert state.all_players[3].role.has_poison is False
+    _assert_night_reset(state)
+
+
+def test_night_kill_and_poison(state):
+    deaths = _night(state, victim_id=7, poison_id=2)
+    assert [p.id for p in deaths] == [7, 2]  # 先结算刀人，再结算毒人
+    _assert_dead(state, [7, 2])
+    assert state.last_night_victim_name == "玩家7"
+    assert state.last_death_seat == 2
+    _assert_night_reset(state)
+
+
+def test_night_kill_and_poison_same_player(state):
+    deaths = _night(state, victim_id=7, poison_id=7)
+    assert [p.id for p in deaths] == [7]
+    _assert_dead(state, [7])
+    assert state.dead_players.count(state.all_players[6]) == 1
+
+
+def test_night_save_and_poison(state):
+    deaths = _night(state, victim_id=7, save=True, poison_id=1)
+    assert [p.id for p in deaths] == [1]
+    assert state.all_players[6].is_alive
+
+
+def test_night_resolved_records_dead_ids():
+    state = build_state(snapshot_interval=100)
+    _night(state, victim_id=6, poison_id=1)
+    event = state.journal.events[-1]
+    assert event.type == StateEventType.NIGHT_RESOLVED
+    assert event.data["dead_ids"] == [6, 1]
+
+
+# ---------- 白天死亡与警长 ----------
+
+def test_hunter_shot(state):
+    state.apply(StateEventType.HUNTER_SHOT, hunter_id=5, target_id=1)
+    _assert_dead(state, [1])
+    assert state.all_players[4].role.can_shoot is False
+    assert state.all_players[4].is_alive
+
+
+def test_player_exiled(state):
+    state.apply(StateEventType.PLAYER_EXILED, player_id=2)
+    _assert_dead(state, [2])
+    assert state.today_voted_out is state.all_players[1]
+
+
+def test_sheriff_changed(state):
+    state.set_sheriff(3)
+    assert state.sheriff_player_id == 3
+    assert [p.id for p in state.all_players if p.is_sheriff] == [3]
+    assert state.get_sheriff() is state.all_players[2]
+
+    state.set_sheriff(8)
+    assert [p.id for p in state.all_players if p.is_sheriff] == [8]
+
+    state.set_sheriff(None)
+    assert state.sheriff_player_id is None
+    assert not any(p.is_sheriff for p in state.all_players)
+    assert state.get_sheriff() is None
+
+
+# ---------- 状态日志 ----------
+
+def _play_two_rounds(state):
+    """两轮的典型事件序列，返回每个序号时的状态"""
+    history = {0: _plain(state)}
+
+    def step(event_type, **data):
+        state.apply(event_type, **data)
+        history[state.journal.seq] = _plain(state)
+
+    step(StateEventType.ROUND_STARTED, round=1)
+    step(StateEventType.PHASE_CHANGED, phase="night")
+    step(StateEventType.WEREWOLF_DISCUSSION, round=1)
+    step(StateEventType.PRIVATE_SPEECH, camp="werewolf", round=1, player_id=1, content="刀6号")
+    step(StateEventType.NIGHT_TARGET, target_id=6)
+    step(StateEventType.SEER_CHECKED, seer_id=3, target_id=2, result="狼人")
+    step(StateEventType.WITCH_ACTION, witch_id=4, action="skip", target_id=None, round=1)
+    step(StateEventType.NIGHT_RESOLVED)
+    step(StateEventType.PHASE_CHANGED, phase="day")
+    step(StateEventType.SHERIFF_CHANGED, player_id=3)
+    step(StateEventType.SHERIFF_ELECTION_DONE)
+    step(StateEventType.SPEAKING_DIRECTION, direction="counterclockwise")
+    step(StateEventType.SPEECH, round=1, player_id=3, content="我是预言家，2号是狼人", channel="day")
+    step(StateEventType.VOTE, round=1, voter_id=3, target_id=2)
+    step(StateEventType.VOTES_RESET)
+    step(StateEventType.PLAYER_EXILED, player_id=2)
+    step(StateEventType.ANNOUNCEMENT, round=1, content="2号被放逐")
+    step(StateEventType.ROUND_STARTED, round=2)
+    step(StateEventType.NIGHT_TARGET, target_id=5)
+    step(StateEventType.WITCH_ACTION, witch_id=4, action="poison", target_id=1, round=2)
+    step(StateEventType.NIGHT_RESOLVED)
+    step(StateEventType.HUNTER_SHOT, hunter_id=5, target_id=7)
+    return history
+
+
+@pytest.mark.parametrize("interval", [0, 1, 4, 7, 100])
+def test_replay_matches_live_state(interval):
+    state = build_state(snapshot_interval=max(interval, 1))
+    state.journal.snapshot_interval = interval  # 0：只有开局快照，全部事件重新应用
+    history = _play_two_rounds(state)
+
+    assert _plain(state.journal.replay(create_player)) == _plain(state)
+    for seq, expected in history.items():
+        assert _plain(state.journal.replay(create_player, upto=seq)) == expected, seq
+
+
+def test_replay_across_snapshot_boundary_uses_suffix():
+    state = build_state(snapshot_interval=5)
+    _play_two_rounds(state)
+    snapshot_seqs = [seq for seq, _ in state.journal.snapshots]
+    assert snapshot_seqs == [0, 5, 10, 15, 20]
+    assert [e.seq for e in state.journal.events_since(20)] == [21, 22]
+
+
+def test_event_serialization_round_trip():
+    event = StateEvent(StateEventType.SPEECH, {"round": 1, "player_id": 3, "content": "你好", "channel": "day"}, seq=7)
+    restored = StateEvent.from_dict(json.loads(json.dumps(event.to_dict())))
+    assert restored.type == event.type
+    assert restored.data == event.data
+    assert restored.seq == event.seq
+    assert restored.timestamp == event.timestamp
@@ -0,0 +1,127 @@
+"""
+状态增量同步：增量和完整状态不向无权观察者泄露狼人、预言家、女巫的私密信息
+"""
+import json
+
+import pytest
+
+from core.state_events import StateEventType
+from core.state_sync import PUBLIC_VIEWER, StateFeed, SyncCursor
+
+from tests.conftest import build_state
+
+WOLF_SECRET = "今晚刀6号"
+VILLAGER = 7
+WOLF, TEAMMATE, SEER, WITCH = 1, 2, 3, 4
+
+
+@pytest.fixture
+def night():
+    """第1晚：狼人讨论并刀6号，预言家查验2号，女巫毒1号，尚未结算"""
+    state = build_state(snapshot_interval=100)
+    state.apply(StateEventType.ROUND_STARTED, round=1)
+    state.apply(StateEventType.PHASE_CHANGED, phase="night")
+    state.apply(StateEventType.WEREWOLF_DISCUSSION, round=1)
+    state.apply(StateEventType.PRIVATE_SPEECH, camp="werewolf", round=1, player_id=WOLF, content=WOLF_SECRET)
+    state.apply(StateEventType.NIGHT_TARGET, target_id=6)
+    state.apply(StateEventType.SEER_CHECKED, seer_id=SEER, target_id=TEAMMATE, result="狼人")
+    state.apply(StateEventType.WITCH_ACTION, witch_id=WITCH, action="poison", target_id=WOLF, round=1)
+    state.add_timeout(state.all_players[SEER - 1], "choose_target.check", "heuristic", 60, public=False)
+    state.all_players[SEER - 1].role_beliefs = {"2": {"camp_belief": "werewolf"}}
+    return StateFeed(state)
+
+
+def _delta_types(feed, viewer_id, since=0):
+    message = json.loads(feed.delta(viewer_id, since))
+    return [event["type"] for event in message["events"]]
+
+
+PUBLIC_TYPES = ["round_started", "phase_changed"]
+
+
+@pytest.mark.parametrize("viewer_id", [PUBLIC_VIEWER, VILLAGER, 5])
+def test_delta_hides_private_events_from_good_players(night, viewer_id):
+    assert _delta_types(night, viewer_id) == PUBLIC_TYPES
+    assert WOLF_SECRET.encode("utf-8") not in night.delta(viewer_id, 0)
+
+
+def test_delta_per_role(night):
+    wolf_only = ["werewolf_discussion", "private_speech", "night_target"]
+    assert _delta_types(night, WOLF) == PUBLIC_TYPES + wolf_only
+    assert _delta_types(night, TEAMMATE) == PUBLIC_TYPES + wolf_only
+    assert _delta_types(night, SEER) == PUBLIC_TYPES + ["seer_checked", "decision_timeout"]
+    assert _delta_types(night, WITCH) == PUBLIC_TYPES + ["witch_action"]
+    assert len(_delta_types(night, None)) == len(night.state.journal.events)  # 上帝视角
+
+
+def test_night_resolution_is_public_without_cause(night):
+    version = night.version
+    night.state.process_night_deaths()
+    message = json.loads(night.delta(VILLAGER, version))
+    assert [(e["type"], e["data"]) for e in message["events"]] == [("night_resolved", {"dead_ids": [6, 1]})]
+
+
+@pytest.mark.parametrize("viewer_id", [PUBLIC_VIEWER, VILLAGER])
+def test_visible_state_hides_secrets_from_good_players(night, viewer_id):
+    data = night.visible_state(viewer_id)
+    assert WOLF_SECRET not in json.dumps(data, ensure_ascii=False)
+    assert all(not messages for messages in data["private_conversations"].values())
+    assert data["tonight_victim"] is None
+    assert data["last_werewolf_target"] is None
+    assert data["poisoned_tonight"] == []
+    assert data["witch_action_history"] == []
+    assert data["seer_check_results"] == []
+    assert data["action_history"] == []
+    for record in data["players"]:
+        if record["id"] != viewer_id:
+            assert record["role"] is None
+            assert record["role_state"] == {}
+            assert record["role_beliefs"] is None
+
+
+def test_visible_state_for_werewolf(night):
+    data = night.visible_state(WOLF)
+    roles = {r["id"]: r["role"] for r in data["players"]}
+    assert roles[TEAMMATE] is not None
+    assert roles[SEER] is None
+    assert data["tonight_victim"] == 6
+    assert WOLF_SECRET in json.dumps(data["private_conversations"], ensure_ascii=False)
+    assert data["poisoned_tonight"] == []  # 狼人看不到女巫用药
+    assert data["seer_check_results"] == []
+
+
+def test_visible_state_for_seer_and_witch(night):
+    seer = night.visible_state(SEER)
+    assert [k for k, _ in seer["seer_check_results"]] == [SEER]
+    assert len(seer["action_history"]) == 1
+    assert seer["tonight_victim"] is None
+    assert seer["players"][SEER - 1]["role_beliefs"] == {"2": {"camp_belief": "werewolf"}}
+
+    witch = night.visible_state(WITCH)
+    assert witch["poisoned_tonight"] == [WOLF]
+    assert witch["witch_action_history"]
+    assert witch["seer_check_results"] == []
+    assert witch["players"][SEER - 1]["role_beliefs"] is None
+
+
+def test_cursor_sends_snapshot_then_deltas(night):
+    cursor = SyncCursor(night, VILLAGER)
+    first = json.loads(cursor.pull())
+    assert first["type"] == "snapshot"
+    cursor.ack(first["version"])
+    assert not cursor.pending
+
+    night.state.apply(StateEventType.PHASE_CHANGED, phase="day")
+    second = json.loads(cursor.pull())
+    assert second["type"] == "delta"
+    assert [e["type"] for e in second["events"]] == ["phase_changed"]
+
+    cursor.restore(second["version"], epoch="other")  # 纪元不同：不恢复
+    assert cursor.acked == first["version"]
+
+
+def test_delta_falls_back_to_snapshot_when_too_far_behind(night):
+    night.max_delta = 3
+    assert night.delta(VILLAGER, 0) is None
+    assert json.loads(night.sync(VILLAGER, 0))["type"] == "snapshot"
+    assert night.delta(VILLAGER, night.version + 1) is None
@@ -0,0 +1,124 @@
+"""
+多进程部署：连接转发识别工作进程的控制消息、工作进程断开、重复的滚动重启
+"""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from server.supervisor import ClientProxy, Supervisor
+
+
+class FakeSocket:
+    """工作进程或客户端的连接：按顺序产生 frames，send 记录发送的消息"""
+
+    def __init__(self, frames=(), closed=False):
+        self.frames = list(frames)
+        self.sent = []
+        self.closed = closed
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for frame in self.frames:
+            yield frame
+
+    async def send(self, text):
+        if self.closed:
+            import websockets
+            raise websockets.ConnectionClosed(None, None)
+        self.sent.append(text)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def supervisor():
+    async def make():
+        sup = Supervisor(workers=2, port=9000)
+        for worker in sup.workers:
+            sup.ring.add(worker.name)
+        return sup
+    return asyncio.run(make())
+
+
+def _pump(supervisor, proxy, worker, frames):
+    upstream = FakeSocket(frames)
+    proxy.upstream = upstream
+    asyncio.run(proxy._pump_upstream(worker, upstream))
+    return upstream
+
+
+@pytest.mark.parametrize("frame", [
+    '{"type": "closed", "room": "r1", "reason": "moved"}',
+    '{"room":"r1","reason":"moved","type":"closed"}',
+    '{ "reason" : "moved", "type" : "closed", "room" : "r1" }',
+])
+def test_closed_moved_detected_regardless_of_formatting(supervisor, frame):
+    worker = supervisor.place("r1")
+    proxy = ClientProxy(supervisor, FakeSocket())
+    proxy.room_id = "r1"
+    _pump(supervisor, proxy, worker, [frame])
+    assert "r1" in supervisor.moving
+    assert proxy.websocket.sent == [frame]  # 原样转发
+    assert not proxy.websocket.closed  # 已收到 closed，不再补发
+
+
+def test_create_error_unplaces_room(supervisor):
+    worker = supervisor.place("r2")
+    proxy = ClientProxy(supervisor, FakeSocket())
+    proxy.pending_create = "r2"
+    _pump(supervisor, proxy, worker, ['{"message":"服务器房间已满","type":"error"}'])
+    assert "r2" not in supervisor.placement and "r2" not in worker.rooms
+    assert proxy.pending_create is None
+
+
+def test_worker_disconnect_tells_seated_client_to_reconnect(supervisor):
+    worker = supervisor.place("r3")
+    proxy = ClientProxy(supervisor, FakeSocket())
+    proxy.room_id = "r3"
+    _pump(supervisor, proxy, worker, ['{"type":"event","event":{}}'])
+    assert json.loads(proxy.websocket.sent[-1]) == {"type": "closed", "room": "r3", "reason": "moved"}
+    assert proxy.websocket.closed
+
+
+def test_forward_to_closed_worker_fails_create(supervisor):
+    async def scenario():
+        proxy = ClientProxy(supervisor, FakeSocket())
+
+        async def open_closed(worker):
+            proxy.upstream = FakeSocket(closed=True)
+            proxy.worker = worker
+
+        proxy._open = open_closed
+        with pytest.raises(OSError):
+            await proxy._forward('{"type": "create", "board": "basic"}')
+        assert proxy.pending_create is None
+        assert supervisor.placement == {}
+
+        proxy.room_id = "r4"  # 已在房间中：由转发任务通知重连，这里不报错
+        await proxy._forward('{"type": "answer", "request_id": 1, "value": 0}')
+
+    asyncio.run(scenario())
+
+
+def test_second_rolling_restart_is_ignored(supervisor):
+    drained = []
+
+    async def drain(worker):
+        drained.append(worker.name)
+        await asyncio.sleep(0.05)
+        worker.ready.set()
+
+    async def scenario():
+        supervisor.drain = drain
+        await asyncio.gather(supervisor.rolling_restart(), supervisor.rolling_restart())
+        assert drained == ["worker-0", "worker-1"]
+        await supervisor.rolling_restart()  # 完成后可以再次重启
+        assert len(drained) == 4
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+"""
+LLM遥测：对局级预算（调用次数、token总数）与用完后的调用拒绝
+"""
+import asyncio
+
+import pytest
+
+from ai.telemetry import LLMTelemetry, current_game_id, telemetry
+
+
+def _call(tel, tag="speech", tokens=100, short_circuited=False):
+    tel.record(tag, 10.0, success=not short_circuited, prompt_tokens=tokens, completion_tokens=0,
+               short_circuited=short_circuited)
+
+
+def test_call_budget_counts_only_issued_calls():
+    tel = LLMTelemetry()
+    tel.set_budget("g1", max_calls=3)
+    token = current_game_id.set("g1")
+    try:
+        _call(tel, "speech")
+        _call(tel, "vote")
+        _call(tel, "vote", short_circuited=True)  # 熔断拒绝的调用不计入
+        assert not tel.over_budget()
+        _call(tel, "night")
+        assert tel.over_budget()
+        assert tel.over_budget("g1") and not tel.over_budget("g2")
+    finally:
+        current_game_id.reset(token)
+    assert not tel.over_budget()  # 不在对局中
+
+
+def test_token_budget_and_discard():
+    tel = LLMTelemetry()
+    tel.set_budget("g1", max_tokens=250)
+    token = current_game_id.set("g1")
+    try:
+        _call(tel, tokens=200)
+        assert not tel.over_budget()
+        _call(tel, tokens=50)
+        assert tel.over_budget()
+    finally:
+        current_game_id.reset(token)
+    tel.discard("g1")
+    assert "g1" not in tel.budgets and not tel.over_budget("g1")
+
+
+def test_zero_budget_means_unlimited():
+    tel = LLMTelemetry()
+    tel.set_budget("g1", max_calls=1)
+    tel.set_budget("g1", max_calls=0, max_tokens=0)
+    token = current_game_id.set("g1")
+    try:
+        for _ in range(5):
+            _call(tel)
+        assert not tel.over_budget()
+    finally:
+        current_game_id.reset(token)
+
+
+def test_client_stops_calling_once_budget_is_spent(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    from ai.llm_client import LLMClient
+
+    client = LLMClient()
+    issued = []
+
+    async def fake_generate(prompt, profile, remaining):
+        issued.append(prompt)
+        return "好的", {"prompt_tokens": 10, "completion_tokens": 5}
+
+    monkeypatch.setattr(client, "_generate", fake_generate)
+
+    async def scenario():
+        current_game_id.set("budget-game")
+        return [await client.generate(f"第{i}次", tag="speech") for i in range(4)]
+
+    telemetry.set_budget("budget-game", max_calls=2)
+    try:
+        assert asyncio.run(scenario()) == ["好的", "好的", "", ""]
+        assert issued == ["第0次", "第1次"]
+        stats = telemetry.get_stats("budget-game")["speech"]
+        assert stats["calls"] == 4 and stats["short_circuited"] == 2
+    finally:
+        telemetry.discard("budget-game")
@@ -2,12 +2,16 @@
 CLI命令行交互界面
 """
 import asyncio
+import threading
 from typing import Optional
 
 
 class CLI:
     """命令行交互工具类"""
 
+    # 尚未返回的读取（决策超时取消等待后，读取线程仍阻塞在 input() 上）
+    _pending_read: Optional[asyncio.Future] = None
+
     @staticmethod
     def clear_input_buffer():
         """清空标准输入缓冲区,丢弃所有待处理的输入"""
@@ -31,6 +35,59 @@ class CLI:
             # 如果清空失败,静默忽略(不影响正常游戏)
             pass
 
+    @staticmethod
+    async def read_line(prompt: str) -> str:
+        """
+        读取一行输入
+
+        input() 在守护线程中执行、无法取消：等待被取消（如决策超时）后，读取线程仍在等待输入。
+        下一次读取继续等待这次读取而不是再开一个线程，玩家随后输入的一行交给新的提示；
+        无人等待期间已经读到的一行是对过期提示的回答，直接丢弃。
+        读取线程是守护线程，游戏结束时不必等玩家按回车进程就能退出
+
+        Raises:
+            EOFError: 输入流关闭
+        """
+        loop = asyncio.get_running_loop()
+        pending = CLI._pending_read
+        if pending is None or pending.done() or pending.get_loop() is not loop:
+            CLI._pending_read = pending = CLI._start_read(loop, prompt)
+        else:
+            print(prompt, end="", flush=True)
+        try:
+            return await asyncio.shield(pending)
+        finally:
+            if pending.done():
+                CLI._pending_read = None
+
+    @staticmethod
+    def _start_read(loop: asyncio.AbstractEventLoop, prompt: str) -> asyncio.Future:
+        """在守护线程中调用 input()，结果交给事件循环中的Future"""
+        future = loop.create_future()
+        # 无人等待时读取结束（如超时后输入流关闭）的异常在这里取走，不报 "Future exception was never retrieved"
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        def deliver(line: Optional[str], error: Optional[BaseException]) -> None:
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(line)
+
+        def read() -> None:
+            try:
+                line, error = input(prompt), None
+            except Exception as e:
+                line, error = None, e
+            try:
+                loop.call_soon_threadsafe(deliver, line, error)
+            except RuntimeError:
+                pass  # 事件循环已关闭（游戏已结束）
+
+        threading.Thread(target=read, name="cli-input", daemon=True).start()
+        return future
+
     @staticmethod
     async def get_input(prompt: str, allow_empty: bool = False) -> str:
         """
@@ -43,10 +100,9 @@ class CLI:
         Returns:
             str: 用户输入
         """
-        loop = asyncio.get_event_loop()
         while True:
             try:
-                user_input = await loop.run_in_executor(None, input, prompt)
+                user_input = await CLI.read_line(prompt)
                 user_input = user_input.strip()
 
                 if user_input or allow_empty:
@@ -77,10 +133,9 @@ class CLI:
         Returns:
             int: 用户输入的数字
         """
-        loop = asyncio.get_event_loop()
         while True:
             try:
-                user_input = await loop.run_in_executor(None, input, prompt)
+                user_input = await CLI.read_line(prompt)
                 number = int(user_input.strip())
 
                 if min_val <= number <= max_val:
@@ -96,17 +151,25 @@ class CLI:
             except ValueError:
                 print("输入无效，请输入数字。")
 
+    @staticmethod
+    def format_header(text: str) -> str:
+        """格式化标题"""
+        return f"\n{'='*50}\n  {text}\n{'='*50}\n"
+
+    @staticmethod
+    def format_section(title: str) -> str:
+        """格式化章节标题"""
+        return f"\n--- {title} ---\n"
+
     @staticmethod
     def print_header(text: str):
         """打印标题"""
-        print(f"\n{'='*50}")
-        print(f"  {text}")
-        print(f"{'='*50}\n")
+        print(CLI.format_header(text))
 
     @staticmethod
     def print_section(title: str):
         """打印章节标题"""
-        print(f"\n--- {title} ---\n")
+        print(CLI.format_section(title))
 
     @staticmethod
     def print_message(message: str):
@@ -0,0 +1,22 @@
+"""
+终端渲染 - 把游戏事件输出到命令行
+"""
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.events import GameEvent
+
+
+class TerminalRenderer:
+    """终端渲染订阅者：按观察者视角打印事件文本"""
+
+    def __init__(self, viewer_id: Optional[int] = None):
+        """
+        Args:
+            viewer_id: 坐在终端前的玩家ID，None表示全部显示
+        """
+        self.viewer_id = viewer_id
+
+    async def __call__(self, event: 'GameEvent') -> None:
+        if event.is_visible_to(self.viewer_id):
+            print(event.text)
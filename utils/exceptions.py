@@ -25,3 +25,13 @@ class PlayerNotFoundException(WolfkillException):
 class ConfigurationException(WolfkillException):
     """配置错误异常"""
     pass
+
+
+class RoomException(WolfkillException):
+    """房间操作异常（房间不存在、已满、已开始等）"""
+    pass
+
+
+class RoomMovedException(RoomException):
+    """房间迁移到其他工作进程（对局在阶段边界保存检查点后停止，由新的工作进程恢复）"""
+    pass
@@ -0,0 +1,183 @@
+"""
+轻量级追踪 - 记录阶段、玩家决策和LLM调用的耗时区间，导出Chrome trace格式
+
+导出的JSON可以用 chrome://tracing 或 https://ui.perfetto.dev 打开
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional, Dict, Any, List, Iterator, Callable
+
+
+class Tracer:
+    """
+    单局游戏的追踪记录器
+
+    每个区间记录为一个Chrome trace "X"（complete）事件；
+    不同的asyncio任务/线程显示为不同的轨道，便于看出哪些等待是串行的
+    """
+
+    PID = 1
+
+    def __init__(self, trace_id: str):
+        """
+        Args:
+            trace_id: 追踪ID（通常为游戏ID）
+        """
+        self.trace_id = trace_id
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._tracks: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _now_us(self) -> float:
+        """距追踪开始的微秒数"""
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def _track(self) -> int:
+        """当前asyncio任务（或线程）对应的轨道号"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task is not None else threading.get_ident()
+
+        with self._lock:
+            tid = self._tracks.get(key)
+            if tid is None:
+                tid = self._tracks[key] = len(self._tracks) + 1
+                name = task.get_name() if task is not None else threading.current_thread().name
+                self.events.append({
+                    "name": "thread_name", "ph": "M", "pid": self.PID, "tid": tid,
+                    "args": {"name": "main" if tid == 1 else name},
+                })
+        return tid
+
+    @contextmanager
+    def span(self, name: str, category: str = "game", **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        记录一个区间
+
+        Args:
+            name: 区间名称
+            category: 分类（phase / decision / llm ...）
+            **args: 附加参数（显示在事件详情中）
+
+        Yields:
+            Dict: 附加参数字典，区间内可以继续写入（如结果、token数）
+        """
+        tid = self._track()
+        start = self._now_us()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round(start, 1),
+                "dur": round(self._now_us() - start, 1),
+                "pid": self.PID,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            with self._lock:
+                self.events.append(event)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """导出为Chrome trace JSON对象"""
+        metadata = {
+            "name": "process_name", "ph": "M", "pid": self.PID,
+            "args": {"name": f"game {self.trace_id}"},
+        }
+        return {
+            "traceEvents": [metadata] + self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.trace_id},
+        }
+
+    def export(self, directory: str) -> str:
+        """
+        写入追踪文件
+
+        Args:
+            directory: 输出目录
+
+        Returns:
+            str: 文件路径
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"trace_{self.trace_id}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        return path
+
+
+# 当前上下文的追踪记录器（asyncio任务创建时继承）
+_current_tracer: ContextVar[Optional[Tracer]] = ContextVar("current_tracer", default=None)
+
+
+def start_trace(trace_id: str) -> Tracer:
+    """
+    为当前上下文开始一次追踪
+
+    Args:
+        trace_id: 追踪ID
+
+    Returns:
+        Tracer: 新的追踪记录器
+    """
+    tracer = Tracer(trace_id)
+    _current_tracer.set(tracer)
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """获取当前上下文的追踪记录器，未开始追踪时返回None"""
+    return _current_tracer.get()
+
+
+@contextmanager
+def span(name: str, category: str = "game", **args: Any) -> Iterator[Dict[str, Any]]:
+    """
+    在当前追踪中记录一个区间；未开始追踪时不做任何事
+
+    用法：
+        with span("make_speech", "decision", player_id=3) as info:
+            ...
+            info["result"] = "..."
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield args
+        return
+    with tracer.span(name, category, **args) as span_args:
+        yield span_args
+
+
+def traced(name: Optional[str] = None, category: str = "phase") -> Callable:
+    """
+    异步函数装饰器：把整个调用记录为一个区间
+
+    Args:
+        name: 区间名称，默认使用函数名
+        category: 分类
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator